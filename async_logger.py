@@ -2,9 +2,21 @@
 异步日志专员 - 即插即用，防蚂蚁隐患版
 干活的只管丢纸条，专员负责写
 修正：保持标准 logging API 兼容性
+
+丢纸条只做一件事：把原始日志记录（LogRecord，未格式化）放进队列。
+格式化、打印到控制台、写文件全部在专员线程里做，事件循环线程上不碰任何IO：
+1. 队列空时专员在条件变量上等，来了纸条立刻被唤醒（不再每10ms轮询一次）
+2. 日志文件句柄常开，按天切换（logs/app_YYYYMMDD.log）
+3. 控制台输出只有专员这一份（不再另挂同步 StreamHandler，也不再格式化两遍）
+
+注意：格式化推迟到专员线程，logger.info("%s", obj) 里的 obj 如果在写出前被改了，
+日志里看到的是改后的值。项目里基本都用 f-string，不受影响。
+
+丢纸条耗时基准：python -m benchmarks.log_enqueue
 """
 
 import asyncio
+import sys
 import threading
 import time
 from datetime import datetime
@@ -17,7 +29,7 @@ class AsyncLogger:
     """
     异步日志专员
     特点：
-    1. 所有操作非阻塞
+    1. 所有操作非阻塞（调用方只入队，不格式化、不做IO）
     2. 队列满时自动丢弃旧日志
     3. 批量写入提升性能
     4. 线程安全
@@ -41,15 +53,25 @@ class AsyncLogger:
             
         # ========== 核心组件 ==========
         # 使用 deque 替代 Queue，更轻量，可设置最大长度
-        self._queue = deque(maxlen=1000)  # 最多保留10000条，防止内存爆炸
+        # 元素: (handler, LogRecord) 或 (None, (时间戳, 级别, 消息))
+        self._queue = deque(maxlen=1000)  # 最多保留1000条，防止内存爆炸
         self._lock = threading.Lock()  # 线程锁保护队列
+        self._cond = threading.Condition(self._lock)  # 有纸条时唤醒专员
+        self._worker_waiting = False
         self._running = True
-        self._batch_size = 20  # 每20条写一次
-        self._flush_interval = 1.0  # 最多等1秒
+        self._batch_size = 200  # 每批最多写200条
+        self._flush_interval = 1.0  # 空闲时最多等1秒检查一次
+
+        # ========== 输出 ==========
+        self._stream = sys.stdout  # 控制台（Railway能看到）
+        self._log_dir = "logs"
+        self._file = None
+        self._file_day = None
         
         # ========== 统计信息 ==========
         self._total_logged = 0
         self._total_dropped = 0
+        self._total_written = 0
         self._last_flush_time = time.time()
         
         # ========== 启动后台线程 ==========
@@ -59,7 +81,7 @@ class AsyncLogger:
         self._initialized = True
         
         # 测试日志
-        self._async_log("INFO", "异步日志专员启动完成，最大队列1000条，批量20条")
+        self._async_log("INFO", "异步日志专员启动完成，最大队列1000条，批量200条")
     
     # ========== 对外接口（供干活的调用）==========
     
@@ -83,25 +105,43 @@ class AsyncLogger:
         """记录CRITICAL级别日志"""
         self._async_log("CRITICAL", msg)
     
+    def configure(self, stream=None, log_dir: Optional[str] = None):
+        """
+        切换输出位置（基准测试时指到 devnull / 临时目录）
+
+        Args:
+            stream: 控制台输出流，默认 sys.stdout
+            log_dir: 日志文件目录，默认 logs
+        """
+        with self._lock:
+            if stream is not None:
+                self._stream = stream
+            if log_dir is not None and log_dir != self._log_dir:
+                self._log_dir = log_dir
+                self._file_day = None  # 专员下次写的时候换文件
+
     # ========== 核心丢纸条方法 ==========
     
     def _async_log(self, level: str, msg: str):
         """
         丢纸条到队列（核心！绝对不阻塞）
         """
+        self._enqueue((None, (time.time(), level, msg)))
+
+    def _enqueue(self, item):
+        """入队（不格式化、不做IO）；队列满时丢最旧的"""
         try:
-            # 格式化日志
-            log_entry = f"{datetime.now().isoformat()} - {level} - {msg}"
-            
-            # 丢到队列（用deque，自动处理满的情况）
             with self._lock:
                 if len(self._queue) >= self._queue.maxlen:
                     # 队列满了，丢弃最旧的
                     self._queue.popleft()
                     self._total_dropped += 1
                 
-                self._queue.append(log_entry)
+                self._queue.append(item)
                 self._total_logged += 1
+
+                if self._worker_waiting:
+                    self._cond.notify()
                 
         except Exception:
             # 日志异常绝对不能影响主任务
@@ -111,70 +151,100 @@ class AsyncLogger:
     
     def _worker(self):
         """
-        专员线程：慢慢写日志，批量处理
+        专员线程：等纸条 → 整批取出 → 格式化 → 写控制台和文件
         """
-        buffer = []
-        last_flush = time.time()
-        
-        while self._running:
+        while True:
             try:
-                # 从队列取一批日志
-                with self._lock:
-                    while self._queue and len(buffer) < self._batch_size:
-                        buffer.append(self._queue.popleft())
+                with self._cond:
+                    while not self._queue and self._running:
+                        self._worker_waiting = True
+                        self._cond.wait(self._flush_interval)
+                        self._worker_waiting = False
+        
+                    if not self._queue and not self._running:
+                        break
                 
-                # 如果有日志，写一批
-                if buffer:
-                    self._write_batch(buffer)
-                    buffer = []
-                    last_flush = time.time()
+                    batch = []
+                    while self._queue and len(batch) < self._batch_size:
+                        batch.append(self._queue.popleft())
                 
-                # 如果队列空，或者没攒够，就等一会儿
-                time.sleep(0.01)  # 10ms，不占CPU
+                self._write_batch([self._format(item) for item in batch])
                 
-                # 强制刷：超过1秒没写，把buffer里的写了
-                if buffer and time.time() - last_flush > self._flush_interval:
-                    self._write_batch(buffer)
-                    buffer = []
-                    last_flush = time.time()
+                with self._cond:
+                    self._total_written += len(batch)
+                    self._cond.notify_all()  # 唤醒等 flush() 的调用方
                     
             except Exception as e:
                 # 专员异常不能崩溃
                 print(f"⚠️ 日志专员异常: {e}")
                 time.sleep(1)
         
-        # 退出前把剩下的写了
-        if buffer:
-            self._write_batch(buffer)
+        self._close_file()
+
+    @staticmethod
+    def _format(item) -> str:
+        """格式化一条纸条（专员线程里执行）"""
+        handler, payload = item
+        if handler is not None:
+            try:
+                return handler.format(payload)
+            except Exception:
+                # 格式器出错时退回固定格式；消息参数本身有问题（getMessage 也抛）才只打原始模板和参数
+                try:
+                    message = payload.getMessage()
+                except Exception:
+                    message = f"{payload.msg} {payload.args!r}"
+                return f"{datetime.fromtimestamp(payload.created).isoformat()} - {payload.levelname} - {message}"
+        created, level, msg = payload
+        return f"{datetime.fromtimestamp(created).isoformat()} - {level} - {msg}"
     
     def _write_batch(self, logs):
         """
-        批量写日志 - 同时写入文件和打印到控制台
+        批量写日志 - 同时写入文件和打印到控制台（只在专员线程调用）
         """
         if not logs:
             return
         
+        text = "\n".join(logs) + "\n"
+
         # ===== 1. 打印到控制台（Railway能看到）=====
-        for log in logs:
-            print(log)  # 这行让日志出现在Railway控制台
+        try:
+            self._stream.write(text)
+            self._stream.flush()
+        except Exception:
+            pass
         
         # ===== 2. 同时写入文件（永久保存）=====
         try:
-            # 确保日志目录存在
-            log_dir = "logs"
-            os.makedirs(log_dir, exist_ok=True)
-            
-            # 按天分文件
-            today = datetime.now().strftime("%Y%m%d")
-            log_file = f"{log_dir}/app_{today}.log"
-            
-            # 批量写入
-            with open(log_file, 'a', encoding='utf-8') as f:
-                f.write("\n".join(logs) + "\n")
+            log_file = self._current_file()
+            log_file.write(text)
+            log_file.flush()
+            self._last_flush_time = time.time()
                 
         except Exception as e:
             # 写文件失败时，至少控制台能看到
             print(f"⚠️ 写日志文件失败: {e}")
+            self._close_file()
+
+    def _current_file(self):
+        """当天的日志文件（句柄常开，跨天时切换）"""
+        today = datetime.now().strftime("%Y%m%d")
+        if self._file is None or self._file_day != today:
+            self._close_file()
+            # 确保日志目录存在
+            os.makedirs(self._log_dir, exist_ok=True)
+            self._file = open(f"{self._log_dir}/app_{today}.log", 'a', encoding='utf-8')
+            self._file_day = today
+        return self._file
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+        self._file = None
+        self._file_day = None
     
     # ========== 管理接口 ==========
     
@@ -186,25 +256,37 @@ class AsyncLogger:
                 "queue_max": self._queue.maxlen,
                 "total_logged": self._total_logged,
                 "total_dropped": self._total_dropped,
+                "total_written": self._total_written,
+                "log_file_day": self._file_day,
                 "running": self._running
             }
     
     def shutdown(self):
-        """关闭日志专员"""
-        self._running = False
-        self._thread.join(timeout=5)
+        """关闭日志专员（先写完队列里剩下的）"""
         self._async_log("INFO", "异步日志专员关闭")
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
     
-    def flush(self):
-        """强制刷日志"""
-        # 取出所有日志
-        logs = []
-        with self._lock:
-            while self._queue:
-                logs.append(self._queue.popleft())
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        强制刷日志：等专员把调用这一刻之前入队的纸条写完
         
-        if logs:
-            self._write_batch(logs)
+        Returns:
+            True: 已写完；False: 超时
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            # 每条纸条要么被写出、要么被丢弃（丢的总是最旧的）
+            target = self._total_logged
+            self._cond.notify()
+            while self._total_written + self._total_dropped < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                self._cond.wait(remaining)
+        return True
 
 
 # ========== 全局单例 ==========
@@ -212,16 +294,21 @@ _async_logger = AsyncLogger()
 
 
 class AsyncLogHandler(_logging.Handler):
-    """将标准 logging 日志消息路由到 AsyncLogger"""
+    """将标准 logging 日志记录原样（未格式化）交给 AsyncLogger"""
     def __init__(self, level=_logging.NOTSET):
         super().__init__(level)
         self.async_logger = _async_logger
     
+    def handle(self, record):
+        # 入队本身线程安全，不需要 Handler 的锁
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
     def emit(self, record):
         try:
-            msg = self.format(record)
-            level = record.levelname
-            self.async_logger._async_log(level, msg)
+            self.async_logger._enqueue((self, record))
         except Exception:
             # 日志异常绝对不能影响主任务
             pass
@@ -233,22 +320,22 @@ def patch_logging(show_debug=False):
     """
     🎯 极简日志补丁 - 只控制是否显示DEBUG
     
+    只挂一个 AsyncLogHandler：控制台和文件都由日志专员输出，
+    事件循环线程上不再有同步写 stdout 的 handler。
+
     Args:
         show_debug: True=显示所有日志（包括DEBUG）
                    False=屏蔽DEBUG，显示INFO及以上（默认）
     """
-    import sys
-    
     # 获取root logger
     root = _logging.getLogger()
     
-    # 记录原有handler数量
-    original_count = len(root.handlers)
-    
-    # 移除已有的AsyncLogHandler（避免重复）
+    # 移除已有的AsyncLogHandler和控制台handler（避免重复、避免同步写stdout）
     removed = 0
     for handler in root.handlers[:]:
-        if isinstance(handler, AsyncLogHandler):
+        if isinstance(handler, AsyncLogHandler) or (
+            type(handler) is _logging.StreamHandler and handler.stream in (sys.stdout, sys.stderr)
+        ):
             root.removeHandler(handler)
             removed += 1
     
@@ -267,12 +354,6 @@ def patch_logging(show_debug=False):
         root.setLevel(_logging.INFO)
         level_name = "INFO (DEBUG已屏蔽)"
     
-    # 添加控制台handler（确保能看见）
-    console = _logging.StreamHandler(sys.stdout)
-    console.setFormatter(formatter)
-    console.setLevel(root.level)
-    root.addHandler(console)
-    
     # 输出简洁提示
     print(f"\n📢 日志级别: {level_name} | 移除旧handler: {removed}个 | 当前handler: {len(root.handlers)}个\n")
     
@@ -306,4 +387,4 @@ if __name__ == "__main__":
     print("🧪 测试异步日志专员...")
     patch_logging(show_debug=True)
     time.sleep(2)
-    _async_logger.shutdown()
\ No newline at end of file
+    _async_logger.shutdown()
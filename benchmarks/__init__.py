@@ -0,0 +1,6 @@
+"""
+性能基准测试
+==================================================
+每个脚本都可以单独运行：python -m benchmarks.<脚本名>
+==================================================
+"""
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+日志丢纸条耗时基准
+==================================================
+测量事件循环线程上一次 logger.info() 调用的耗时（纳秒），对比两种日志后端：
+
+1. sync_console   旧方式：AsyncLogHandler 先格式化再入队 + 同步 StreamHandler 写控制台
+                  （原 patch_logging 的做法，每条日志格式化两遍、同步写一次 stdout）
+2. async_enqueue  新方式：只挂 AsyncLogHandler，原始记录入队，格式化和IO都在专员线程
+
+控制台输出指到 /dev/null（旧方式同样指到 /dev/null，只比较调用方开销），
+日志文件写到临时目录，不会污染 logs/。
+
+【运行】
+    python -m benchmarks.log_enqueue --calls 20000
+
+【输出】
+每种方式每次调用的 p50 / p95 / p99 / 平均 耗时（纳秒），以及丢弃条数
+==================================================
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+from typing import Dict, List
+
+# 允许直接 python benchmarks/log_enqueue.py 运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_logger import AsyncLogHandler, _async_logger
+from latency_stats import percentile
+
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class _FormatFirstHandler(AsyncLogHandler):
+    """旧方式：在调用方线程格式化后再入队"""
+
+    def emit(self, record):
+        self.async_logger._async_log(record.levelname, self.format(record))
+
+
+def _summary(name: str, samples: List[float], dropped: int) -> Dict:
+    """汇总一组耗时样本（纳秒）"""
+    ordered = sorted(samples)
+    return {
+        'name': name,
+        'calls': len(ordered),
+        'p50_ns': round(percentile(ordered, 50)),
+        'p95_ns': round(percentile(ordered, 95)),
+        'p99_ns': round(percentile(ordered, 99)),
+        'avg_ns': round(statistics.mean(ordered)) if ordered else 0,
+        'dropped': dropped,
+    }
+
+
+def _measure(name: str, handlers: List[logging.Handler], calls: int) -> Dict:
+    """用一个独立 logger 连续打 calls 条日志，记录每次调用耗时"""
+    logger = logging.getLogger(f"bench.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    for handler in handlers:
+        logger.addHandler(handler)
+
+    dropped_before = _async_logger.get_stats()['total_dropped']
+    samples = []
+    try:
+        for i in range(calls):
+            start = time.perf_counter_ns()
+            logger.info(f"📤【下单工人】BTCUSDT 开仓 | 数量 {i} | 价格 {65000.5 + i}")
+            samples.append(time.perf_counter_ns() - start)
+            if i % 500 == 499:
+                _async_logger.flush()   # 每批之间让专员写完，避免测成"队列满丢弃"的耗时
+    finally:
+        _async_logger.flush()
+        for handler in handlers:
+            logger.removeHandler(handler)
+
+    dropped = _async_logger.get_stats()['total_dropped'] - dropped_before
+    return _summary(name, samples, dropped)
+
+
+def run(calls: int) -> List[Dict]:
+    """运行两种方式的基准，返回结果列表"""
+    devnull = open(os.devnull, 'w', encoding='utf-8')
+    formatter = logging.Formatter(FORMAT)
+    results = []
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        _async_logger.configure(stream=devnull, log_dir=log_dir)
+        try:
+            # ----- 1. 旧方式：格式化入队 + 同步控制台 -----
+            old_async = _FormatFirstHandler()
+            old_async.setFormatter(formatter)
+            console = logging.StreamHandler(devnull)
+            console.setFormatter(formatter)
+            results.append(_measure('sync_console', [old_async, console], calls))
+
+            # ----- 2. 新方式：原始记录入队 -----
+            new_async = AsyncLogHandler()
+            new_async.setFormatter(formatter)
+            results.append(_measure('async_enqueue', [new_async], calls))
+        finally:
+            _async_logger.configure(stream=sys.stdout, log_dir="logs")
+            devnull.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日志丢纸条耗时基准")
+    parser.add_argument('--calls', type=int, default=20000, help="每种方式的 logger.info 调用次数")
+    args = parser.parse_args()
+
+    results = run(args.calls)
+
+    print(f"{'方式':<20}{'次数':>8}{'p50(ns)':>12}{'p95(ns)':>12}{'p99(ns)':>12}{'平均(ns)':>12}{'丢弃':>8}")
+    for r in results:
+        print(f"{r['name']:<20}{r['calls']:>8}{r['p50_ns']:>12}{r['p95_ns']:>12}"
+              f"{r['p99_ns']:>12}{r['avg_ns']:>12}{r['dropped']:>8}")
+
+
+if __name__ == '__main__':
+    main()
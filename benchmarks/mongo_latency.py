@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+MongoDB 单次请求延迟基准
+==================================================
+对比两种访问方式在同一个 MongoDB 上的单次请求延迟：
+
+1. per_request_sync   旧方式：每次请求新建 MongoClient（线程池中）→ 查询 → 关闭
+                      （原 StatsHandler._fetch_records 的做法）
+2. shared_executor    旧方式：共享同步 MongoClient + run_in_executor
+                      （原 Database 的做法）
+3. shared_async       新方式：共享异步客户端（mongo_pool.get_mongo_db）
+
+【运行】
+默认连接本地 mongod（例如 docker run -p 27017:27017 mongo），
+不要对着生产 Atlas 跑，脚本会往 bench 库里写测试数据：
+
+    MONGODB_BENCH_URI=mongodb://127.0.0.1:27017 python -m benchmarks.mongo_latency --requests 200
+
+【输出】
+每种方式的 p50 / p95 / p99 / 平均 延迟（毫秒）
+==================================================
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Callable, Dict, List
+
+# 允许直接 python benchmarks/mongo_latency.py 运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+
+from data_completion_department.mongo_pool import get_mongo_db, close_mongo_client
+from latency_stats import percentile
+
+BENCH_DB = "bench_trading_db"
+BENCH_COLLECTION = "closed_positions"
+
+
+def _summary(name: str, samples: List[float]) -> Dict:
+    """汇总一组延迟样本（毫秒）"""
+    ordered = sorted(samples)
+    return {
+        'name': name,
+        'requests': len(ordered),
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p95_ms': round(percentile(ordered, 95), 3),
+        'p99_ms': round(percentile(ordered, 99), 3),
+        'avg_ms': round(statistics.mean(ordered), 3) if ordered else 0.0,
+    }
+
+
+def _seed(uri: str, docs: int):
+    """准备测试数据"""
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    try:
+        collection = client[BENCH_DB][BENCH_COLLECTION]
+        collection.drop()
+        collection.insert_many([
+            {
+                'id': f"okx_BTC-USDT-SWAP_{i}",
+                '交易所': 'okx' if i % 2 else 'binance',
+                '开仓合约名': 'BTCUSDT',
+                '开仓时间': f"2026.01.01 00:{i % 60:02d}:00",
+                '平仓时间': f"2026.01.02 00:{i % 60:02d}:00",
+                '平仓收益': i * 0.01,
+            }
+            for i in range(docs)
+        ])
+    finally:
+        client.close()
+
+
+async def _measure(name: str, request: Callable, count: int) -> Dict:
+    """顺序执行 count 次请求，记录每次耗时"""
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        await request()
+        samples.append((time.perf_counter() - start) * 1000)
+    return _summary(name, samples)
+
+
+async def run(uri: str, count: int, docs: int) -> List[Dict]:
+    """运行三种方式的基准，返回结果列表"""
+    _seed(uri, docs)
+    loop = asyncio.get_running_loop()
+    results = []
+
+    # ----- 1. 每次请求新建客户端 -----
+    async def per_request_sync():
+        client = await loop.run_in_executor(
+            None, lambda: MongoClient(uri, serverSelectionTimeoutMS=5000)
+        )
+        try:
+            collection = client[BENCH_DB][BENCH_COLLECTION]
+            await loop.run_in_executor(None, lambda: list(collection.find({}, {'_id': 0})))
+        finally:
+            await loop.run_in_executor(None, client.close)
+
+    results.append(await _measure('per_request_sync', per_request_sync, count))
+
+    # ----- 2. 共享同步客户端 + 线程池 -----
+    shared_client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    shared_collection = shared_client[BENCH_DB][BENCH_COLLECTION]
+
+    async def shared_executor():
+        await loop.run_in_executor(None, lambda: list(shared_collection.find({}, {'_id': 0})))
+
+    try:
+        results.append(await _measure('shared_executor', shared_executor, count))
+    finally:
+        shared_client.close()
+
+    # ----- 3. 共享异步客户端 -----
+    async def shared_async():
+        db = await get_mongo_db(BENCH_DB, mongo_uri=uri)
+        await db[BENCH_COLLECTION].find({}, {'_id': 0}).to_list(None)
+
+    try:
+        results.append(await _measure('shared_async', shared_async, count))
+    finally:
+        await close_mongo_client()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MongoDB 单次请求延迟基准")
+    parser.add_argument('--uri', default=os.getenv('MONGODB_BENCH_URI', 'mongodb://127.0.0.1:27017'),
+                        help="测试用 MongoDB 连接串（默认本地 mongod）")
+    parser.add_argument('--requests', type=int, default=200, help="每种方式的请求次数")
+    parser.add_argument('--docs', type=int, default=500, help="测试集合中的文档数")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.uri, args.requests, args.docs))
+
+    print(f"{'方式':<20}{'次数':>8}{'p50(ms)':>12}{'p95(ms)':>12}{'p99(ms)':>12}{'平均(ms)':>12}")
+    for r in results:
+        print(f"{r['name']:<20}{r['requests']:>8}{r['p50_ms']:>12}{r['p95_ms']:>12}{r['p99_ms']:>12}{r['avg_ms']:>12}")
+
+
+if __name__ == '__main__':
+    main()
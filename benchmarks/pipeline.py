@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+公开数据流水线基准（shared_data）
+==================================================
+用合成的 DataStore.market_data 宇宙（默认 100 / 600 / 2000 个合约）测量一次放水的开销：
+
+1. collect        DataStore._collect_water_by_rules（放水前收集）
+2. step0~step5    每个步骤的 process 单独计时（按生产顺序串起来喂，步骤内部缓存照常演进）
+3. push           推送数据完成部门（receive_market_data，和流水线里一样先转 dict 列表）
+4. end_to_end     PipelineManager._receive_water_callback 整体（含大脑回调 + 推送）
+
+每个合约的数据形状和真实连接写入的一致：
+    币安  ticker / mark_price（WebSocket）、funding_settlement（历史费率接口）
+    欧易  ticker / mark_price / funding_rate（WebSocket）
+价格、费率由 exchange_simulator.market.Market 生成，每一跳之间行情都会推进一次。
+
+内存：另跑一遍 tracemalloc（计时和内存分开跑，tracemalloc 本身会拖慢计时），
+记录每个阶段的峰值分配和留存分配；峰值 RSS 取 getrusage（进程级单调值，所以按规模从小到大跑）。
+
+步骤0 对币安历史费率有放行次数上限，基准里把上限调到不会触发，测的是"历史费率仍在放行"的最坏情况。
+
+【运行】
+    python -m benchmarks.pipeline
+    python -m benchmarks.pipeline --sizes 100,600,2000 --ticks 30
+    python -m benchmarks.pipeline --compare benchmarks/results/pipeline_<旧提交>.json
+
+【输出】
+每个规模每个阶段的 p50 / p95 / 最大 耗时（毫秒）、峰值分配（KB），
+以及端到端 p95 占 1 秒放水间隔的比例；完整结果写到 JSON（默认 benchmarks/results/pipeline_<提交>.json），
+带上 --compare 时逐项对比旧结果，变慢超过 --threshold 的标 ⚠️
+==================================================
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import platform
+import argparse
+import resource
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List
+
+# 允许直接 python benchmarks/pipeline.py 运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_completion_department import receive_market_data
+from exchange_simulator.market import Market, fmt
+from latency_stats import percentile
+from shared_data.data_store import DataStore
+from shared_data.pipeline_manager import PipelineManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+STEPS = ["step0", "step1", "step2", "step3", "step4", "step5"]
+UNLIMITED = 10 ** 9   # 步骤0 历史费率放行上限（基准里不让它触发）
+
+STAGES = ["collect"] + STEPS + ["push", "end_to_end"]
+
+
+def _summary(samples: List[float]) -> Dict:
+    """汇总一组耗时样本（毫秒）"""
+    ordered = sorted(samples)
+    return {
+        'samples': len(ordered),
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p95_ms': round(percentile(ordered, 95), 3),
+        'max_ms': round(ordered[-1], 3) if ordered else 0.0,
+        'avg_ms': round(statistics.mean(ordered), 3) if ordered else 0.0,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def _peak_rss_mb() -> float:
+    """进程峰值 RSS（Linux 上 ru_maxrss 单位是 KB，macOS 是字节）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+# ==================== 合成数据宇宙 ====================
+
+class Universe:
+    """N 个合约的合成行情，按真实连接的格式写进一个独立的 DataStore"""
+
+    def __init__(self, size: int, seed: int = 42):
+        self.market = Market(size, seed=seed)
+        self.store = DataStore()
+
+    async def refresh(self):
+        """行情推进一步，把 6 种数据全部重新写一遍"""
+        now_ms = int(time.time() * 1000)
+        now_iso = datetime.now().isoformat()
+        next_funding = self.market.next_funding_time(now_ms)
+        last_funding = self.market.last_funding_time(now_ms)
+        interval_ms = self.market.funding_interval_ms
+
+        for base in self.market.bases:
+            self.market.step(base)
+            symbol = f"{base}USDT"
+            inst_id = f"{base}-USDT-SWAP"
+            daily = self.market.daily(base)
+            binance_last = self.market.price("binance", base)
+            okx_last = self.market.price("okx", base)
+            tick = self.market.tick_size(base)
+
+            # ----- 币安 WebSocket -----
+            ticker = {
+                "e": "24hrTicker", "E": now_ms, "s": symbol,
+                "p": fmt(binance_last - daily["open"]), "P": f"{(binance_last / daily['open'] - 1) * 100:.3f}",
+                "c": fmt(binance_last), "o": fmt(daily["open"]), "h": fmt(daily["high"]),
+                "l": fmt(daily["low"]), "v": fmt(daily["volume"]), "q": fmt(daily["volume"] * binance_last),
+            }
+            mark = {
+                "e": "markPriceUpdate", "E": now_ms, "s": symbol,
+                "p": fmt(self.market.mark_price("binance", base)),
+                "i": fmt(self.market.index_price(base)), "P": fmt(self.market.index_price(base)),
+                "r": fmt(self.market.funding_rate("binance", base)), "T": next_funding,
+            }
+            for data_type, raw in (("ticker", ticker), ("mark_price", mark)):
+                await self.store.update_market_data("binance", symbol, {
+                    "exchange": "binance", "symbol": symbol, "data_type": data_type,
+                    "event_type": raw["e"], "raw_data": raw, "timestamp": now_iso,
+                })
+
+            # ----- 币安 历史费率接口 -----
+            await self.store.update_market_data("binance", symbol, {
+                "exchange": "binance", "symbol": symbol, "data_type": "funding_settlement",
+                "raw_data": {
+                    "symbol": symbol,
+                    "fundingTime": last_funding,
+                    "fundingRate": fmt(self.market.funding_rate("binance", base)),
+                    "funding_time": last_funding,
+                    "funding_rate": self.market.funding_rate("binance", base),
+                    "next_funding_time": next_funding,
+                    "timestamp": now_iso,
+                    "source": "api",
+                },
+                "timestamp": now_iso,
+                "source": "api",
+            })
+
+            # ----- 欧易 WebSocket -----
+            okx_frames = {
+                "tickers": {
+                    "instType": "SWAP", "instId": inst_id, "last": fmt(okx_last), "lastSz": "1",
+                    "askPx": fmt(okx_last + tick), "askSz": "10", "bidPx": fmt(okx_last - tick), "bidSz": "10",
+                    "open24h": fmt(daily["open"]), "high24h": fmt(daily["high"]), "low24h": fmt(daily["low"]),
+                    "vol24h": fmt(daily["volume"]), "volCcy24h": fmt(daily["volume"] * okx_last), "ts": str(now_ms),
+                },
+                "mark-price": {
+                    "instType": "SWAP", "instId": inst_id,
+                    "markPx": fmt(self.market.mark_price("okx", base)), "ts": str(now_ms),
+                },
+                "funding-rate": {
+                    "instType": "SWAP", "instId": inst_id,
+                    "fundingRate": fmt(self.market.funding_rate("okx", base)), "nextFundingRate": "",
+                    "fundingTime": str(next_funding), "nextFundingTime": str(next_funding + interval_ms),
+                    "method": "current_period", "ts": str(now_ms),
+                },
+            }
+            for channel, data_type in (("tickers", "ticker"), ("mark-price", "mark_price"),
+                                       ("funding-rate", "funding_rate")):
+                await self.store.update_market_data("okx", symbol, {
+                    "exchange": "okx", "symbol": symbol, "data_type": data_type, "channel": channel,
+                    "raw_data": {"arg": {"channel": channel, "instId": inst_id}, "data": [okx_frames[channel]]},
+                    "original_symbol": inst_id, "timestamp": now_iso,
+                })
+
+
+# ==================== 测量 ====================
+
+async def _timed(samples: Dict[str, List[float]], stage: str, coro: Awaitable) -> Any:
+    start = time.perf_counter()
+    result = await coro
+    samples[stage].append((time.perf_counter() - start) * 1000)
+    return result
+
+
+async def _traced(memory: Dict[str, Dict[str, int]], stage: str, coro: Awaitable) -> Any:
+    """记录一个阶段的峰值分配和留存分配（字节，取多跳中的最大值）"""
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    result = await coro
+    current, peak = tracemalloc.get_traced_memory()
+    entry = memory.setdefault(stage, {"peak_bytes": 0, "retained_bytes": 0})
+    entry["peak_bytes"] = max(entry["peak_bytes"], peak - before)
+    entry["retained_bytes"] = max(entry["retained_bytes"], current - before)
+    return result
+
+
+async def _run_tick(pipeline: PipelineManager, store: DataStore,
+                    measure: Callable[[str, Awaitable], Awaitable]) -> Dict[str, int]:
+    """一跳：收集 → 步骤0~5 → 推送，各阶段单独测量，返回每个阶段的输出条数"""
+    counts = {}
+    items = await measure("collect", store._collect_water_by_rules())
+    counts["collect"] = len(items)
+    for name in STEPS:
+        if not items:
+            break
+        items = await measure(name, getattr(pipeline, name).process(items))
+        counts[name] = len(items)
+    if items:
+        await measure("push", receive_market_data([result.__dict__ for result in items]))
+    return counts
+
+
+async def _run_end_to_end(pipeline: PipelineManager, store: DataStore,
+                          measure: Callable[[str, Awaitable], Awaitable]):
+    water = await store._collect_water_by_rules()
+    await measure("end_to_end", pipeline._receive_water_callback(water))
+
+
+async def bench_size(size: int, ticks: int, warmup: int, trace_ticks: int) -> Dict:
+    """对一个规模跑计时 + 内存两遍"""
+    universe = Universe(size)
+
+    async def brain(results):
+        return None
+
+    # 分步和端到端各用一个全新的管理员（步骤内部有缓存，互不干扰）
+    stepwise = PipelineManager(brain_callback=brain)
+    whole = PipelineManager(brain_callback=brain)
+    for pipeline in (stepwise, whole):
+        pipeline.step0.update_limit(UNLIMITED)
+    await universe.store.receive_rules(stepwise.rules)
+    interval = stepwise.rules["flow"]["interval_seconds"]
+
+    # ----- 计时 -----
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    scratch: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    counts: Dict[str, int] = {}
+    for i in range(warmup + ticks):
+        await universe.refresh()
+        target = scratch if i < warmup else samples
+        measure = lambda stage, coro: _timed(target, stage, coro)
+        counts = await _run_tick(stepwise, universe.store, measure)
+        await _run_end_to_end(whole, universe.store, measure)
+
+    # ----- 内存 -----
+    memory: Dict[str, Dict[str, int]] = {}
+    measure = lambda stage, coro: _traced(memory, stage, coro)
+    tracemalloc.start()
+    try:
+        for _ in range(trace_ticks):
+            await universe.refresh()
+            await _run_tick(stepwise, universe.store, measure)
+            await _run_end_to_end(whole, universe.store, measure)
+    finally:
+        tracemalloc.stop()
+
+    stages = {}
+    for stage in STAGES:
+        stages[stage] = {
+            **_summary(samples[stage]),
+            "out": counts.get(stage),
+            "peak_kb": round(memory.get(stage, {}).get("peak_bytes", 0) / 1024, 1),
+            "retained_kb": round(memory.get(stage, {}).get("retained_bytes", 0) / 1024, 1),
+        }
+
+    tick_p95 = stages["collect"]["p95_ms"] + stages["end_to_end"]["p95_ms"]
+    return {
+        "symbols": size,
+        "water_items": counts.get("collect", 0),
+        "stages": stages,
+        "tick_p95_ms": round(tick_p95, 3),
+        "tick_budget_ratio": round(tick_p95 / (interval * 1000), 4),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+async def run(sizes: List[int], ticks: int, warmup: int, trace_ticks: int) -> Dict:
+    results = []
+    for size in sorted(sizes):
+        results.append(await bench_size(size, ticks, warmup, trace_ticks))
+    return {
+        "benchmark": "pipeline",
+        "commit": _git_commit(),
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ticks": ticks,
+        "results": results,
+    }
+
+
+# ==================== 输出 / 对比 ====================
+
+def _print_report(report: Dict):
+    print(f"提交 {report['commit']} | Python {report['python']} | 每规模 {report['ticks']} 跳")
+    for r in report["results"]:
+        print(f"\n===== {r['symbols']} 个合约（{r['water_items']} 条水）=====")
+        print(f"{'阶段':<14}{'输出':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}{'峰值KB':>12}{'留存KB':>10}")
+        for stage in STAGES:
+            s = r["stages"][stage]
+            out = "-" if s["out"] is None else s["out"]
+            print(f"{stage:<14}{out:>8}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['max_ms']:>10}"
+                  f"{s['peak_kb']:>12}{s['retained_kb']:>10}")
+        print(f"一跳 p95 {r['tick_p95_ms']}ms，占放水间隔 {r['tick_budget_ratio'] * 100:.1f}%，"
+              f"峰值 RSS {r['peak_rss_mb']}MB")
+
+
+def _compare(report: Dict, baseline: Dict, threshold: float) -> int:
+    """逐项对比 p50 / p95，返回变慢超过阈值的项数"""
+    old_by_size = {r["symbols"]: r for r in baseline.get("results", [])}
+    regressions = 0
+    print(f"\n===== 对比 {baseline.get('commit', '?')} → {report['commit']} =====")
+    for r in report["results"]:
+        old = old_by_size.get(r["symbols"])
+        if not old:
+            continue
+        for stage in STAGES:
+            new_s, old_s = r["stages"][stage], old["stages"].get(stage)
+            if not old_s:
+                continue
+            cells = []
+            for key in ("p50_ms", "p95_ms"):
+                if not old_s[key]:
+                    continue
+                change = new_s[key] / old_s[key] - 1
+                mark = ""
+                if change > threshold:
+                    mark = " ⚠️"
+                    regressions += 1
+                cells.append(f"{key[:3]} {old_s[key]}→{new_s[key]}ms ({change * 100:+.1f}%){mark}")
+            if cells:
+                print(f"{r['symbols']:>6} {stage:<14}" + " | ".join(cells))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="公开数据流水线基准")
+    parser.add_argument('--sizes', default="100,600,2000", help="合约数量，逗号分隔")
+    parser.add_argument('--ticks', type=int, default=20, help="每个规模的计时跳数")
+    parser.add_argument('--warmup', type=int, default=3, help="每个规模的预热跳数（不计入结果）")
+    parser.add_argument('--trace-ticks', type=int, default=3, help="tracemalloc 跑的跳数")
+    parser.add_argument('--out', help="结果 JSON 路径（默认 benchmarks/results/pipeline_<提交>.json）")
+    parser.add_argument('--compare', help="要对比的旧结果 JSON")
+    parser.add_argument('--threshold', type=float, default=0.10, help="变慢超过多少算回退（默认 0.10 = 10%%）")
+    parser.add_argument('--verbose', action='store_true', help="显示流水线日志")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = asyncio.run(run(sizes, args.ticks, args.warmup, args.trace_ticks))
+    _print_report(report)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"pipeline_{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if _compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
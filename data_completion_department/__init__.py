@@ -31,6 +31,7 @@ data_completion_department/
 - receive_private_data()  - 接收私人数据
 - receive_market_data()   - 接收行情数据
 - get_receiver()          - 获取接收器实例
+- SCOPE_MARKET / SCOPE_USER - 订阅范围（只接收关心的库的变化）
 - DataDetector            - 检测区类
 - Scheduler               - 调度区类
 - Database                - 数据库类
@@ -41,7 +42,13 @@ data_completion_department/
 ==================================================
 """
 
-from .receiver import receive_private_data, receive_market_data, get_receiver
+from .receiver import (
+    receive_private_data,
+    receive_market_data,
+    get_receiver,
+    SCOPE_MARKET,
+    SCOPE_USER,
+)
 from .detector import DataDetector
 from .scheduler import Scheduler
 from .database import Database
@@ -136,6 +143,8 @@ __all__ = [
     'receive_private_data',
     'receive_market_data',
     'get_receiver',
+    'SCOPE_MARKET',           # 订阅范围：行情数据
+    'SCOPE_USER',             # 订阅范围：私人数据
     
     # 主要类
     'DataDetector',
@@ -48,6 +48,19 @@ MongoDB Atlas数据库
 3. 不再需要SQL语句，直接操作Python字典
 4. 数据格式完全不变，字段名、字段值原样存储
 5. 时间字段自动填充：updated_at（持仓表）、created_at（历史表），使用北京时间（UTC+8）
+
+【异步驱动】
+连接改为共享异步客户端（mongo_pool.py），不再用 run_in_executor 包装同步 pymongo，
+和统计处理器共用同一个连接池。
+
+【写后缓冲（Write-Behind）】
+handle_data 不再直接写库，而是放进内存缓冲区，由后台任务批量写入：
+1. 持仓表按 id 合并：同一条持仓在一个刷新周期内只写最后一次
+2. 内容哈希去重：持仓内容（不含 updated_at）和上次写入相同就跳过
+3. 批量写入：每 FLUSH_INTERVAL 秒、或缓冲条数达到 FLUSH_MAX_BATCH 时，用 bulk_write 一次写完
+4. 历史表幂等：直接插入，依赖 id 唯一索引拦截重复（不再先查再写）
+5. 写入顺序：历史表插入 → 持仓表按交易所删除 → 持仓表 upsert
+6. 指标：get_metrics() 返回刷新耗时、合并比等
 ==================================================
 """
 
@@ -55,14 +68,36 @@ import os
 import asyncio
 import logging
 import time
+import json
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-from pymongo import MongoClient
-from pymongo.errors import DuplicateKeyError, ConnectionFailure
+from pymongo import UpdateOne, DeleteMany, InsertOne
+from pymongo.errors import ConnectionFailure, BulkWriteError
+
+from .mongo_pool import get_mongo_client, close_mongo_client, DATABASE_NAME
 
 # 配置日志 - 统一前缀
 logger = logging.getLogger(__name__)
 
+# MongoDB 唯一索引冲突错误码
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+# 最近创建的数据库实例（供HTTP路由查询指标）
+_latest_database = None
+
+# 历史表版本号：每次成功插入新的平仓记录 +1（统计处理器用它让缓存失效）
+_closed_positions_version = 0
+
+
+def get_database() -> Optional['Database']:
+    """获取最近创建的数据库实例（未创建时返回None）"""
+    return _latest_database
+
+
+def get_closed_positions_version() -> int:
+    """获取历史表版本号（有新平仓记录写入时变化）"""
+    return _closed_positions_version
+
 
 def get_beijing_time() -> str:
     """
@@ -87,7 +122,7 @@ class Database:
     所有方法都是私有的（_开头），对外只暴露 handle_data 一个入口。
     
     【MongoDB迁移说明】
-    - 使用 run_in_executor 将同步的pymongo操作包装成异步
+    - 使用共享异步客户端（mongo_pool），不占用线程池
     - 所有数据格式与原Turso版本完全一致
     - 中文字段名完美支持
     - 时间字段自动填充：updated_at（持仓表）、created_at（历史表），使用北京时间
@@ -95,9 +130,17 @@ class Database:
     【id生成规则】
     - 持仓表：交易所_开仓合约名_开仓时间（唯一标识一次开仓）
     - 历史表：交易所_开仓合约名_平仓时间（强制重新生成，确保格式统一）
+    
+    【写后缓冲】
+    - handle_data 只写缓冲区，后台任务按时间/条数批量刷新（见文件头说明）
+    - close() 会先把缓冲区刷完再关闭连接
     ==================================================
     """
     
+    # ===== 写后缓冲策略 =====
+    FLUSH_INTERVAL = 1.0      # 刷新周期（秒）
+    FLUSH_MAX_BATCH = 100     # 缓冲条数达到这个值立即刷新
+    
     def __init__(self):
         """
         初始化数据库连接
@@ -132,39 +175,50 @@ class Database:
         self._last_log_time = 0
         self._log_interval = 60
         logger.info(f"✅ 【数据库】日志时间控制初始化完成，间隔{self._log_interval}秒")
+        
+        # ----- 写后缓冲区 -----
+        self._pending_active = {}        # 待upsert的持仓，key=id（同id只保留最新）
+        self._pending_closed = {}        # 待插入的历史记录，key=id
+        self._pending_deletes = set()    # 待清理持仓的交易所
+        self._active_hashes = {}         # 持仓表每个id最后一次写入的内容哈希
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = None
+        
+        # ----- 写入指标 -----
+        self._metrics = {
+            'received_active': 0,          # 收到的持仓写请求
+            'skipped_unchanged': 0,        # 内容未变而跳过的持仓写请求
+            'coalesced_active': 0,         # 被同id后续请求覆盖的持仓写请求
+            'written_active': 0,           # 实际upsert的持仓条数
+            'received_closed': 0,          # 收到的历史写请求
+            'written_closed': 0,           # 实际插入的历史条数
+            'duplicate_closed': 0,         # 被唯一索引拦截的历史条数
+            'deleted_active': 0,           # 删除的持仓条数
+            'flush_count': 0,              # 刷新次数
+            'flush_errors': 0,             # 刷新失败次数
+            'last_flush_ms': 0.0,          # 最近一次刷新耗时
+            'max_flush_ms': 0.0,           # 最长刷新耗时
+            'total_flush_ms': 0.0,         # 累计刷新耗时
+        }
+        
+        global _latest_database
+        _latest_database = self
     
     async def _get_db(self):
         """
         获取MongoDB数据库连接（懒加载）
         ==================================================
-        【MongoDB迁移核心】
-        使用 run_in_executor 将同步的MongoDB操作包装成异步
-        确保与原代码的异步风格兼容
-        
-        首次调用时建立连接，后续直接返回已存在的连接
+        使用进程共享的异步客户端（mongo_pool），首次调用时建立连接，
+        后续直接返回已存在的连接。
         ==================================================
         """
         if self._client is None:
-            loop = asyncio.get_event_loop()
             try:
-                # 在线程池中执行同步的MongoDB连接
-                self._client = await loop.run_in_executor(
-                    None,
-                    lambda: MongoClient(
-                        self.mongo_uri,
-                        serverSelectionTimeoutMS=5000,  # 5秒连接超时
-                        connectTimeoutMS=5000,
-                        socketTimeoutMS=10000
-                    )
-                )
-                # 测试连接
-                await loop.run_in_executor(
-                    None,
-                    lambda: self._client.admin.command('ping')
-                )
+                self._client = await get_mongo_client(self.mongo_uri)
                 
                 # 获取数据库和集合
-                self._db = self._client["trading_db"]
+                self._db = self._client[DATABASE_NAME]
                 self._active = self._db["active_positions"]
                 self._closed = self._db["closed_positions"]
                 
@@ -196,18 +250,32 @@ class Database:
         # ----- 初始化索引 -----
         await self._init_indexes()
         
+        # ----- 启动后台刷新任务 -----
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        
         logger.info("✅ 【数据库】异步初始化完成")
     
     async def close(self):
         """
-        关闭MongoDB连接
+        关闭MongoDB连接（先刷完缓冲区）
         """
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"❌ 【数据库】关闭前刷新缓冲区失败: {e}")
+        
         if self._client:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self._client.close()
-            )
+            await close_mongo_client()
+            self._client = None
             logger.debug("🔌 【数据库】MongoDB连接已关闭")
     
     # ==================== 对外唯一入口 ====================
@@ -258,6 +326,171 @@ class Database:
         """处理持仓完整数据"""
         await self._save_active_position(data)
     
+    # ==================== 写后缓冲 ====================
+    
+    @staticmethod
+    def _content_hash(data: Dict[str, Any]) -> int:
+        """计算持仓内容哈希（不含 updated_at，它每次都会变）"""
+        content = {k: v for k, v in data.items() if k != 'updated_at'}
+        return hash(json.dumps(content, sort_keys=True, ensure_ascii=False, default=str))
+    
+    def _pending_count(self) -> int:
+        """缓冲区中的待写条数"""
+        return len(self._pending_active) + len(self._pending_closed) + len(self._pending_deletes)
+    
+    def _maybe_trigger_flush(self):
+        """缓冲条数达到上限时，通知后台任务立即刷新"""
+        if self._pending_count() >= self.FLUSH_MAX_BATCH:
+            self._flush_event.set()
+    
+    async def _flush_loop(self):
+        """
+        后台刷新循环
+        ==================================================
+        每 FLUSH_INTERVAL 秒刷新一次；缓冲条数达到 FLUSH_MAX_BATCH
+        时被提前唤醒。刷新失败的数据会放回缓冲区，下次重试。
+        ==================================================
+        """
+        logger.info(f"🔄 【数据库】写后缓冲刷新任务已启动（周期{self.FLUSH_INTERVAL}秒，批量上限{self.FLUSH_MAX_BATCH}条）")
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(), timeout=self.FLUSH_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_event.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ 【数据库】刷新循环出错: {e}", exc_info=True)
+                await asyncio.sleep(self.FLUSH_INTERVAL)
+    
+    async def flush(self):
+        """
+        把缓冲区一次性写入MongoDB
+        ==================================================
+        顺序：
+            1. 历史表：insert（无序，唯一索引拦截重复）
+            2. 持仓表：先按交易所删除，再按id upsert（有序）
+        
+        写入失败时，未写入的数据放回缓冲区（不覆盖期间到达的新数据）。
+        ==================================================
+        """
+        async with self._flush_lock:
+            if not self._pending_count():
+                return
+            
+            # ----- 取出当前缓冲区，换上空的 -----
+            closed_batch = self._pending_closed
+            delete_batch = self._pending_deletes
+            active_batch = self._pending_active
+            self._pending_closed = {}
+            self._pending_deletes = set()
+            self._pending_active = {}
+            
+            closed_ops = [InsertOne(doc) for doc in closed_batch.values()]
+            active_ops = [DeleteMany({"交易所": exchange}) for exchange in delete_batch]
+            active_ops += [
+                UpdateOne({"id": record_id}, {"$set": doc}, upsert=True)
+                for record_id, doc in active_batch.items()
+            ]
+            
+            start = time.perf_counter()
+            try:
+                await self._get_db()
+                written_closed, duplicate_closed, deleted_active, written_active = await self._bulk_write(
+                    closed_ops, active_ops
+                )
+            except Exception as e:
+                self._metrics['flush_errors'] += 1
+                # ----- 放回缓冲区，新到达的数据优先 -----
+                # 刷新期间新排队清理的交易所：旧持仓不能放回，否则下次先删后 upsert 会把已清理的持仓写回来
+                cleared_meanwhile = set(self._pending_deletes)
+                for record_id, doc in closed_batch.items():
+                    self._pending_closed.setdefault(record_id, doc)
+                self._pending_deletes |= delete_batch
+                for record_id, doc in active_batch.items():
+                    if doc.get('交易所') in cleared_meanwhile:
+                        continue
+                    if record_id not in self._pending_active:
+                        self._pending_active[record_id] = doc
+                        self._active_hashes.pop(record_id, None)
+                logger.error(f"❌ 【数据库】批量写入失败，{len(closed_batch) + len(delete_batch) + len(active_batch)}条数据已放回缓冲区: {e}")
+                return
+            
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            metrics = self._metrics
+            metrics['flush_count'] += 1
+            metrics['last_flush_ms'] = elapsed_ms
+            metrics['max_flush_ms'] = max(metrics['max_flush_ms'], elapsed_ms)
+            metrics['total_flush_ms'] += elapsed_ms
+            metrics['written_closed'] += written_closed
+            if written_closed:
+                global _closed_positions_version
+                _closed_positions_version += 1
+            metrics['duplicate_closed'] += duplicate_closed
+            metrics['deleted_active'] += deleted_active
+            metrics['written_active'] += written_active
+            
+            logger.debug(
+                f"✅ 【数据库】批量写入完成: 历史区+{written_closed}(重复{duplicate_closed}) "
+                f"持仓区删除{deleted_active} 更新{written_active}，耗时{elapsed_ms:.1f}ms"
+            )
+    
+    async def _bulk_write(self, closed_ops: List, active_ops: List):
+        """
+        执行批量写入
+        
+        :return: (历史表插入数, 历史表重复数, 持仓表删除数, 持仓表upsert数)
+        """
+        written_closed = duplicate_closed = deleted_active = written_active = 0
+        
+        if closed_ops:
+            try:
+                result = await self._closed.bulk_write(closed_ops, ordered=False)
+                written_closed = result.inserted_count
+            except BulkWriteError as e:
+                details = e.details or {}
+                write_errors = details.get('writeErrors', [])
+                non_duplicate = [err for err in write_errors if err.get('code') != DUPLICATE_KEY_ERROR_CODE]
+                if non_duplicate:
+                    raise
+                written_closed = details.get('nInserted', 0)
+                duplicate_closed = len(write_errors)
+        
+        if active_ops:
+            result = await self._active.bulk_write(active_ops, ordered=True)
+            deleted_active = result.deleted_count
+            written_active = result.upserted_count + result.matched_count
+        
+        return written_closed, duplicate_closed, deleted_active, written_active
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        获取写入指标
+        ==================================================
+        coalesce_ratio：收到的写请求数 / 实际写入数（越大说明合并越多）
+        ==================================================
+        """
+        metrics = dict(self._metrics)
+        received = metrics['received_active'] + metrics['received_closed']
+        written = metrics['written_active'] + metrics['written_closed']
+        metrics['coalesce_ratio'] = round(received / written, 2) if written else None
+        metrics['avg_flush_ms'] = (
+            round(metrics['total_flush_ms'] / metrics['flush_count'], 2)
+            if metrics['flush_count'] else 0.0
+        )
+        metrics['pending'] = {
+            'active': len(self._pending_active),
+            'closed': len(self._pending_closed),
+            'deletes': len(self._pending_deletes),
+        }
+        metrics['flush_interval'] = self.FLUSH_INTERVAL
+        metrics['flush_max_batch'] = self.FLUSH_MAX_BATCH
+        metrics['timestamp'] = datetime.now().isoformat()
+        return metrics
+    
     # ==================== MongoDB数据库操作 ====================
     
     async def _save_active_position(self, data: Dict[str, Any]):
@@ -268,7 +501,9 @@ class Database:
             - 根据 id 进行 upsert（存在则更新，不存在则插入）
             - id 格式：交易所_开仓合约名_开仓时间
             - 唯一索引保证同一个 id 只有一条记录
-            - 自动添加 updated_at 时间戳（北京时间）
+            - 内容没变（不含 updated_at）直接跳过
+            - 内容有变才刷新 updated_at 时间戳（北京时间）
+            - 只放入写后缓冲区，同id在一个刷新周期内只写最后一次
         ==================================================
         """
         # 生成id（如果不存在）
@@ -279,35 +514,30 @@ class Database:
             data['id'] = f"{exchange}_{contract}_{open_time}"
             logger.debug(f"🔑 【数据库】持仓表生成id: {data['id']}")
         
-        # 🔥 添加更新时间戳（北京时间，每次写入/更新都刷新）
-        data['updated_at'] = get_beijing_time()
-        
         record_id = data['id']
         exchange = data.get('交易所', 'unknown')
         contract = data.get('开仓合约名', 'unknown')
+        self._metrics['received_active'] += 1
         
-        db = await self._get_db()
-        loop = asyncio.get_event_loop()
+        # ===== 内容哈希去重 =====
+        content_hash = self._content_hash(data)
+        if self._active_hashes.get(record_id) == content_hash:
+            self._metrics['skipped_unchanged'] += 1
+            return
+        self._active_hashes[record_id] = content_hash
         
-        # 检查是否首次写入（用于日志控制）
-        exists = await loop.run_in_executor(
-            None,
-            lambda: self._active.find_one({"id": record_id}) is not None
-        )
+        # 🔥 添加更新时间戳（北京时间，内容有变化时刷新）
+        data['updated_at'] = get_beijing_time()
         
-        # 覆盖更新（upsert = True：存在就更新，不存在就插入）
-        await loop.run_in_executor(
-            None,
-            lambda: self._active.update_one(
-                {"id": record_id},  # 查询条件
-                {"$set": data},      # 更新操作（$set 保留未指定的字段）
-                upsert=True          # 不存在则插入
-            )
-        )
+        # ===== 放入缓冲区（存副本，避免上游后续修改）=====
+        if record_id in self._pending_active:
+            self._metrics['coalesced_active'] += 1
+        self._pending_active[record_id] = dict(data)
+        self._maybe_trigger_flush()
         
         # 日志控制
-        if not exists:
-            logger.debug(f"✅ 【数据库】成功写入持仓区{exchange}数据 - {contract}（首次）")
+        if record_id not in self._logged_active_ids:
+            logger.debug(f"✅ 【数据库】持仓区{exchange}数据已进入写入缓冲 - {contract}（首次）")
             self._logged_active_ids.add(record_id)
         else:
             # 抑制重复日志，只打印debug
@@ -320,8 +550,8 @@ class Database:
         逻辑：
             - 强制使用平仓时间重新生成 id，确保格式统一
             - id 格式：交易所_开仓合约名_平仓时间
-            - 优先：根据 id 检查是否存在，不存在才插入
-            - 备选：唯一索引拦截重复插入
+            - 缓冲区内同id只保留第一条
+            - 写库时直接插入，由唯一索引拦截重复（不再先查再写）
             - 确保同一个平仓记录只写一次
             - 自动添加 created_at 时间戳（北京时间）
         
@@ -360,64 +590,16 @@ class Database:
         clean_data['created_at'] = get_beijing_time()
         
         record_id = clean_data['id']
-        exchange_name = clean_data.get('交易所', 'unknown')
-        contract_name = clean_data.get('开仓合约名', 'unknown')
+        self._metrics['received_closed'] += 1
         
-        db = await self._get_db()
-        loop = asyncio.get_event_loop()
-        
-        # ===== 第一层保护：代码层幂等性检查 =====
-        exists = await loop.run_in_executor(
-            None,
-            lambda: self._closed.find_one({"id": record_id}) is not None
-        )
-        
-        if exists:
-            logger.debug(f"⏭️ 【数据库】历史区已存在记录，跳过写入: {record_id}")
+        # ===== 缓冲区内去重（唯一索引负责跨批次去重）=====
+        if record_id in self._pending_closed:
+            logger.debug(f"⏭️ 【数据库】历史区记录已在写入缓冲中，跳过: {record_id}")
             return
         
-        # ===== 第二层保护：数据库层唯一索引拦截 =====
-        try:
-            await loop.run_in_executor(
-                None,
-                lambda: self._closed.insert_one(clean_data)
-            )
-            logger.debug(f"✅ 【数据库】成功写入历史区{exchange_name}数据 - {contract_name} 平仓时间:{close_time}")
-        except DuplicateKeyError:
-            logger.debug(f"⏭️ 【数据库】历史区已存在记录（唯一索引拦截），跳过写入: {record_id}")
-            return
-    
-    async def _check_closed_exists(self, record_id: str) -> bool:
-        """
-        检查历史表中是否已存在该记录
-        
-        用于历史表的幂等性保护，避免重复写入。
-        查询集合: closed_positions（历史集合）
-        
-        :param record_id: 记录ID (格式: 交易所_合约名_平仓时间)
-        :return: 
-            True = 记录已存在（跳过写入）
-            False = 记录不存在（可以写入）
-        """
-        if not record_id:
-            return False
-        
-        try:
-            db = await self._get_db()
-            loop = asyncio.get_event_loop()
-            
-            exists = await loop.run_in_executor(
-                None,
-                lambda: self._closed.find_one({"id": record_id}) is not None
-            )
-            
-            if exists:
-                logger.debug(f"🔍 【数据库】历史表已存在记录: {record_id}")
-            return exists
-            
-        except Exception as e:
-            logger.error(f"❌ 【数据库】检查历史表记录失败: {e}")
-            return False  # 出错时假设不存在，让写入流程继续
+        self._pending_closed[record_id] = clean_data
+        self._maybe_trigger_flush()
+        logger.debug(f"✅ 【数据库】历史区{exchange}数据已进入写入缓冲 - {contract} 平仓时间:{close_time}")
     
     async def _check_active_exists(self, record_id: str) -> bool:
         """
@@ -435,13 +617,8 @@ class Database:
             return False
         
         try:
-            db = await self._get_db()
-            loop = asyncio.get_event_loop()
-            
-            exists = await loop.run_in_executor(
-                None,
-                lambda: self._active.find_one({"id": record_id}) is not None
-            )
+            await self._get_db()
+            exists = await self._active.find_one({"id": record_id}) is not None
             
             if exists:
                 logger.debug(f"🔍 【数据库】持仓表已存在记录: {record_id}")
@@ -458,21 +635,26 @@ class Database:
         逻辑：
             - 删除该交易所的所有持仓记录
             - 防止遗漏，确保完全清理
+            - 缓冲区里该交易所尚未写入的持仓一并丢弃
+            - 删除操作进入写后缓冲，在下一次刷新时执行
         ==================================================
         """
         if not exchange:
             logger.error("❌ 【数据库】清理持仓必须传入交易所参数，本次操作已取消")
             return
         
-        db = await self._get_db()
-        loop = asyncio.get_event_loop()
+        # 丢弃缓冲区里该交易所还没写入的持仓
+        for record_id in [rid for rid, doc in self._pending_active.items() if doc.get('交易所') == exchange]:
+            del self._pending_active[record_id]
         
-        result = await loop.run_in_executor(
-            None,
-            lambda: self._active.delete_many({"交易所": exchange})
-        )
+        # 清掉该交易所的哈希记录，下一次开仓必定写入
+        for record_id in [rid for rid in self._active_hashes if rid.startswith(f"{exchange}_")]:
+            del self._active_hashes[record_id]
+        
+        self._pending_deletes.add(exchange)
+        self._maybe_trigger_flush()
         
-        logger.debug(f"✅ 【数据库】成功清除持仓区{exchange}数据，删除了{result.deleted_count}条")
+        logger.debug(f"✅ 【数据库】持仓区{exchange}数据清理已进入写入缓冲")
     
     # ==================== 集合查询方法（用于兼容原代码）====================
     
@@ -486,12 +668,7 @@ class Database:
         ==================================================
         """
         db = await self._get_db()
-        loop = asyncio.get_event_loop()
-        
-        collections = await loop.run_in_executor(
-            None,
-            lambda: db.list_collection_names()
-        )
+        collections = await db.list_collection_names()
         
         logger.info(f"📋 【数据库】当前数据库中的集合: {collections}")
         return collections
@@ -501,14 +678,10 @@ class Database:
     async def test_connection(self) -> bool:
         """测试数据库连接是否正常"""
         try:
-            db = await self._get_db()
-            loop = asyncio.get_event_loop()
+            await self._get_db()
             
             # 发送ping命令测试连接
-            await loop.run_in_executor(
-                None,
-                lambda: self._client.admin.command('ping')
-            )
+            await self._client.admin.command('ping')
             
             logger.debug("✅ 【数据库】连接测试成功")
             return True
@@ -537,6 +710,7 @@ class Database:
                 - id: 唯一索引（防止重复写入）
                 - 交易所: 普通索引
                 - 平仓时间: 普通索引（用于时间范围查询）
+                - (开仓合约名, 开仓时间): 复合索引（统计分组+排序）
         ==================================================
         """
         try:
@@ -544,53 +718,38 @@ class Database:
             collections_before = await self._get_collections()
             logger.debug(f"📋 【数据库】初始化前数据库中的集合: {collections_before}")
             
-            db = await self._get_db()
-            loop = asyncio.get_event_loop()
+            await self._get_db()
             
             # ==================== 持仓集合索引 ====================
             # 1. id 唯一索引（防止重复开仓记录）
-            await loop.run_in_executor(
-                None,
-                lambda: self._active.create_index("id", unique=True, background=True)
-            )
+            await self._active.create_index("id", unique=True, background=True)
             logger.debug("📝 【数据库】持仓集合 id 唯一索引创建完成")
             
             # 2. 交易所索引（用于按交易所查询和删除）
-            await loop.run_in_executor(
-                None,
-                lambda: self._active.create_index("交易所", background=True)
-            )
+            await self._active.create_index("交易所", background=True)
             logger.debug("📝 【数据库】持仓集合 交易所 索引创建完成")
             
             # 3. 开仓合约名索引
-            await loop.run_in_executor(
-                None,
-                lambda: self._active.create_index("开仓合约名", background=True)
-            )
+            await self._active.create_index("开仓合约名", background=True)
             logger.debug("📝 【数据库】持仓集合 开仓合约名 索引创建完成")
             
             # ==================== 历史集合索引 ====================
             # 1. id 唯一索引（防止重复写入平仓记录）
-            await loop.run_in_executor(
-                None,
-                lambda: self._closed.create_index("id", unique=True, background=True)
-            )
+            await self._closed.create_index("id", unique=True, background=True)
             logger.debug("📝 【数据库】历史集合 id 唯一索引创建完成")
             
             # 2. 交易所索引
-            await loop.run_in_executor(
-                None,
-                lambda: self._closed.create_index("交易所", background=True)
-            )
+            await self._closed.create_index("交易所", background=True)
             logger.debug("📝 【数据库】历史集合 交易所 索引创建完成")
             
             # 3. 平仓时间索引（用于时间范围查询）
-            await loop.run_in_executor(
-                None,
-                lambda: self._closed.create_index("平仓时间", background=True)
-            )
+            await self._closed.create_index("平仓时间", background=True)
             logger.debug("📝 【数据库】历史集合 平仓时间 索引创建完成")
             
+            # 4. 开仓合约名+开仓时间 复合索引（统计处理器按合约分组、按开仓时间排序）
+            await self._closed.create_index([("开仓合约名", 1), ("开仓时间", 1)], background=True)
+            logger.debug("📝 【数据库】历史集合 开仓合约名+开仓时间 索引创建完成")
+            
             # 验证集合是否存在
             collections_after = await self._get_collections()
             logger.debug(f"📋 【数据库】初始化后数据库中的集合: {collections_after}")
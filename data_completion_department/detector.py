@@ -41,6 +41,12 @@
 【重要规则】
 - 数据标签必须带数据，信息标签绝对不能带数据
 - 空仓时同时推送数据标签和信息标签（两条独立消息）
+
+【变化驱动推送】
+- 每个交易所记录上一次推送的"指纹"：检测状态 + 业务数据哈希
+- 信息标签只看状态：状态没变就不重复推送（修复区对同一标签本来就是幂等的）
+- 数据标签看状态+数据：数据有变化才推送，保证大脑拿到最新数据
+- 心跳：超过 heartbeat_seconds 没推送过，即使没变化也重推一次（None=关闭心跳）
 ==================================================
 """
 
@@ -48,6 +54,8 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List
 import logging
 import asyncio
+import json
+import time
 
 # 导入常量（使用正确的常量名）
 from .constants import (
@@ -79,17 +87,105 @@ class DataDetector:
         4. 将标签和数据推送给调度器
     
     检测逻辑完全按照你的设计文档，不增加任何额外判断。
+    检测结果和上一次相同时不重复推送（见文件头【变化驱动推送】）。
     ==================================================
     """
     
-    def __init__(self, scheduler):
+    # 默认心跳间隔（秒）：状态不变时，最多隔这么久重推一次
+    DEFAULT_HEARTBEAT_SECONDS = 60
+    
+    def __init__(self, scheduler, heartbeat_seconds: Optional[float] = DEFAULT_HEARTBEAT_SECONDS):
         """
         初始化检测区
         
         :param scheduler: 调度器实例，用于推送检测结果
+        :param heartbeat_seconds: 心跳重推间隔（秒），None表示只在变化时推送
         """
         self.scheduler = scheduler
-        logger.info("✅ 【检测区】初始化完成")
+        self.heartbeat_seconds = heartbeat_seconds
+        
+        # ===== 上一次推送的指纹 =====
+        # key=交易所，value=(指纹, 推送时的monotonic时间)
+        self._last_emitted = {}
+        
+        # ===== 推送统计 =====
+        self.emitted_count = 0      # 实际推送的检测结果次数
+        self.suppressed_count = 0   # 因无变化被跳过的次数
+        
+        logger.info(f"✅ 【检测区】初始化完成（心跳间隔: {heartbeat_seconds}秒）")
+    
+    # ==================== 变化判断 ====================
+    
+    @staticmethod
+    def _fingerprint_data(data: Dict[str, Any]) -> int:
+        """
+        计算业务数据的指纹
+        ==================================================
+        业务数据是扁平的中文字段字典，按key排序序列化后取哈希，
+        字段值任何变化都会改变指纹。
+        ==================================================
+        """
+        try:
+            return hash(json.dumps(data, sort_keys=True, ensure_ascii=False, default=str))
+        except Exception:
+            # 序列化失败时返回唯一值，视为"有变化"
+            return hash(object())
+    
+    def _should_emit(self, exchange: str, state: str, data: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        判断本次检测结果是否需要推送
+        ==================================================
+        需要推送的情况：
+            1. 状态变了（例如 持仓完整 → 平仓完整）
+            2. 数据标签的业务数据变了
+            3. 距离上次推送超过心跳间隔
+        
+        :param exchange: 交易所
+        :param state: 检测状态（数据标签或信息标签）
+        :param data: 数据标签附带的数据，信息标签传None
+        :return: True=推送，False=跳过
+        ==================================================
+        """
+        fingerprint = (state, self._fingerprint_data(data) if data is not None else None)
+        now = time.monotonic()
+        
+        last = self._last_emitted.get(exchange)
+        if last is not None:
+            last_fingerprint, last_time = last
+            heartbeat_due = (
+                self.heartbeat_seconds is not None
+                and now - last_time >= self.heartbeat_seconds
+            )
+            if last_fingerprint == fingerprint and not heartbeat_due:
+                self.suppressed_count += 1
+                return False
+        
+        self._last_emitted[exchange] = (fingerprint, now)
+        self.emitted_count += 1
+        return True
+    
+    def reset(self, exchange: Optional[str] = None):
+        """
+        清除推送记录，下一次检测必定推送
+        
+        :param exchange: 只清除指定交易所，None表示全部
+        """
+        if exchange is None:
+            self._last_emitted.clear()
+        else:
+            self._last_emitted.pop(exchange, None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取推送统计"""
+        return {
+            'emitted_count': self.emitted_count,
+            'suppressed_count': self.suppressed_count,
+            'heartbeat_seconds': self.heartbeat_seconds,
+            'last_states': {
+                exchange: fingerprint[0]
+                for exchange, (fingerprint, _) in self._last_emitted.items()
+            }
+        }
     
     async def handle_store_snapshot(self, snapshot: Dict[str, Any]):
         """
@@ -158,6 +254,8 @@ class DataDetector:
         
         # ----- 情况a：空仓（标记价保证金为空 AND 平仓价为空）-----
         if data.get(FIELD_MARK_MARGIN) is None and data.get(FIELD_CLOSE_PRICE) is None:
+            if not self._should_emit('okx', TAG_EMPTY, data):
+                return
             logger.debug(f"🔍 【检测区】欧意检测到空仓: {data.get('交易所')}")
             
             # 同时推送两条独立消息
@@ -174,6 +272,8 @@ class DataDetector:
         
         # ----- 情况b：持仓缺失（标记价保证金有值 AND 开仓合约名空）-----
         if data.get(FIELD_MARK_MARGIN) is not None and data.get(FIELD_OPEN_CONTRACT) is None:
+            if not self._should_emit('okx', INFO_OKX_MISSING):
+                return
             logger.debug(f"🔍 【检测区】欧意检测到持仓缺失: {data.get('交易所')}")
             
             await self.scheduler.handle({
@@ -183,6 +283,8 @@ class DataDetector:
         
         # ----- 情况c：持仓完整（开仓合约名有值 AND 平仓时间空）-----
         if data.get(FIELD_OPEN_CONTRACT) and data.get(FIELD_CLOSE_TIME) is None:
+            if not self._should_emit('okx', TAG_COMPLETE, data):
+                return
             logger.debug(f"🔍【检测区】 欧意检测到持仓完整: {data.get('交易所')} - {data.get(FIELD_OPEN_CONTRACT)}")
             
             await self.scheduler.handle({
@@ -193,6 +295,8 @@ class DataDetector:
         
         # ----- 情况d：平仓完整（开仓合约名有值 AND 平仓时间有值）-----
         if data.get(FIELD_OPEN_CONTRACT) and data.get(FIELD_CLOSE_TIME):
+            if not self._should_emit('okx', TAG_CLOSED_COMPLETE, data):
+                return
             logger.debug(f"🔍【检测区】 欧意检测到平仓完整: {data.get('交易所')} - {data.get(FIELD_OPEN_CONTRACT)}")
             
             await self.scheduler.handle({
@@ -221,6 +325,8 @@ class DataDetector:
         
         # ----- 情况a：空仓（标记价保证金为空 AND 平仓价为空）-----
         if data.get(FIELD_MARK_MARGIN) is None and data.get(FIELD_CLOSE_PRICE) is None:
+            if not self._should_emit('binance', TAG_EMPTY, data):
+                return
             logger.debug(f"🔍 【检测区】币安检测到空仓: {data.get('交易所')}")
             
             # 同时推送两条独立消息
@@ -237,6 +343,8 @@ class DataDetector:
         
         # ----- 情况b：半成品（标记价保证金有值 AND 开仓合约名有值）-----
         if data.get(FIELD_MARK_MARGIN) is not None and data.get(FIELD_OPEN_CONTRACT):
+            if not self._should_emit('binance', INFO_BINANCE_SEMI):
+                return
             logger.debug(f"🔍 【检测区】币安检测到半成品: {data.get('交易所')} - {data.get(FIELD_OPEN_CONTRACT)}")
             
             await self.scheduler.handle({
@@ -246,6 +354,8 @@ class DataDetector:
         
         # ----- 情况c：持仓缺失（标记价保证金有值 AND 开仓合约名空）-----
         if data.get(FIELD_MARK_MARGIN) is not None and data.get(FIELD_OPEN_CONTRACT) is None:
+            if not self._should_emit('binance', INFO_BINANCE_MISSING):
+                return
             logger.debug(f"🔍【检测区】 币安检测到持仓缺失: {data.get('交易所')}")
             
             await self.scheduler.handle({
@@ -0,0 +1,155 @@
+"""
+MongoDB 共享异步连接池
+==================================================
+【文件职责】
+整个进程共用一个异步 MongoDB 客户端（懒加载），替代原来的：
+    - 数据库存储区：同步 pymongo + run_in_executor（占用默认线程池）
+    - 统计处理器：每次请求新建 MongoClient → 握手 → 查询 → 关闭
+
+【驱动选择】
+- 优先使用 PyMongo 自带的异步API（AsyncMongoClient，pymongo>=4.13）
+- 没有时回退到 Motor（AsyncIOMotorClient），两者接口一致
+
+【连接池配置（环境变量，均可不设）】
+- MONGODB_URI              连接串（必须）
+- MONGO_MAX_POOL_SIZE      最大连接数，默认 20
+- MONGO_MIN_POOL_SIZE      最小常驻连接数，默认 2（保持热连接，省掉握手）
+- MONGO_MAX_IDLE_TIME_MS   空闲连接回收时间，默认 300000（5分钟）
+
+【使用方式】
+    from data_completion_department.mongo_pool import get_mongo_db
+
+    db = await get_mongo_db()
+    docs = await db["closed_positions"].find({}).to_list(None)
+
+【事件循环】
+异步客户端绑定创建它的事件循环，所以按事件循环各保存一个客户端，
+同一个循环内永远复用同一个连接池。
+==================================================
+"""
+
+import os
+import asyncio
+import logging
+import weakref
+from typing import Any, Dict, Optional
+
+try:
+    from pymongo import AsyncMongoClient
+    DRIVER_NAME = 'pymongo-async'
+except ImportError:  # pragma: no cover - 老版本pymongo
+    from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+    DRIVER_NAME = 'motor'
+
+logger = logging.getLogger(__name__)
+
+# ==================== 配置 ====================
+DATABASE_NAME = "trading_db"
+
+MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '20'))
+MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '2'))
+MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '300000'))
+
+# ==================== 全局状态 ====================
+# key=事件循环，value=该循环上的客户端（循环被回收时自动清除）
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+def _build_client(mongo_uri: str):
+    """创建异步客户端（不会立即连接，首次操作时才建立连接）"""
+    return AsyncMongoClient(
+        mongo_uri,
+        maxPoolSize=MAX_POOL_SIZE,
+        minPoolSize=MIN_POOL_SIZE,
+        maxIdleTimeMS=MAX_IDLE_TIME_MS,
+        serverSelectionTimeoutMS=5000,  # 5秒服务器选择超时
+        connectTimeoutMS=5000,
+        socketTimeoutMS=10000
+    )
+
+
+async def get_mongo_client(mongo_uri: Optional[str] = None):
+    """
+    获取当前事件循环上的共享异步客户端（懒加载）
+    ==================================================
+    首次调用时创建客户端并 ping 一次确认连通，之后直接复用。
+
+    :param mongo_uri: 连接串，不传则读取环境变量 MONGODB_URI
+    :return: AsyncMongoClient 实例
+    :raises ValueError: 没有配置 MONGODB_URI
+    :raises ConnectionError: 连接失败
+    ==================================================
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is not None:
+        return client
+
+    lock = _locks.get(loop)
+    if lock is None:
+        lock = _locks[loop] = asyncio.Lock()
+
+    async with lock:
+        client = _clients.get(loop)
+        if client is not None:
+            return client
+
+        mongo_uri = mongo_uri or os.getenv('MONGODB_URI')
+        if not mongo_uri:
+            raise ValueError("❌ 【MongoDB连接池】环境变量 MONGODB_URI 未设置")
+
+        client = _build_client(mongo_uri)
+        try:
+            await client.admin.command('ping')
+        except Exception as e:
+            await _close_client(client)
+            logger.error(f"❌ 【MongoDB连接池】连接失败: {e}")
+            raise ConnectionError(f"无法连接到MongoDB: {e}")
+
+        _clients[loop] = client
+        logger.info(
+            f"✅ 【MongoDB连接池】共享客户端已创建（驱动: {DRIVER_NAME}，"
+            f"连接池 {MIN_POOL_SIZE}-{MAX_POOL_SIZE}）"
+        )
+        return client
+
+
+async def get_mongo_db(name: str = DATABASE_NAME, mongo_uri: Optional[str] = None):
+    """
+    获取共享客户端上的数据库对象
+
+    :param name: 数据库名，默认 trading_db
+    :param mongo_uri: 连接串，不传则读取环境变量 MONGODB_URI
+    :return: 异步数据库对象
+    """
+    client = await get_mongo_client(mongo_uri)
+    return client[name]
+
+
+async def close_mongo_client():
+    """关闭当前事件循环上的共享客户端（下次调用 get_mongo_client 会重新创建）"""
+    loop = asyncio.get_running_loop()
+    client = _clients.pop(loop, None)
+    if client is not None:
+        await _close_client(client)
+        logger.info("🔌 【MongoDB连接池】共享客户端已关闭")
+
+
+async def _close_client(client):
+    """关闭客户端（pymongo异步版 close 是协程，Motor 是普通方法）"""
+    result = client.close()
+    if asyncio.iscoroutine(result):
+        await result
+
+
+def get_pool_info() -> Dict[str, Any]:
+    """获取连接池配置和当前客户端数量（用于监控）"""
+    return {
+        'driver': DRIVER_NAME,
+        'database': DATABASE_NAME,
+        'max_pool_size': MAX_POOL_SIZE,
+        'min_pool_size': MIN_POOL_SIZE,
+        'max_idle_time_ms': MAX_IDLE_TIME_MS,
+        'active_clients': len(_clients),
+    }
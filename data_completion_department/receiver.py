@@ -34,9 +34,18 @@ memory_store = {
 {
     'market_data': {...},  # 所有合约的最新行情
     'user_data': {...},    # 所有交易所的最新私人数据
-    'timestamp': '2026-03-11T...'
+    'timestamp': '2026-03-11T...',
+    'version': {'market_data': 12, 'user_data': 3},   # 各库的代数（每次更新+1）
+    'changed': frozenset({'user_data'}),              # 本次变化的库
+    'changed_exchanges': frozenset({'okx'})           # 本次变化的交易所（仅私人数据）
 }
 
+【写时复制（Copy-on-Write）】
+- 存储区里的两个库永远不原地修改：每次更新先复制出新字典，改完再整体替换
+- 因此快照只需要引用当前字典，不再每次推送都 .copy()
+- 订阅者拿到的快照是只读的，后续更新不会改动它
+- 订阅时可以声明关心的库（scopes），只关心私人数据的订阅者不会收到纯行情更新
+
 【覆盖更新规则】
 - 行情数据：按合约名覆盖，新数据直接替换旧数据
 - 私人数据：按交易所覆盖，每个交易所只有一条最新数据
@@ -50,6 +59,11 @@ import asyncio
 
 logger = logging.getLogger(__name__)
 
+# ===== 存储区的库名（同时用作订阅范围和变化集合的元素）=====
+SCOPE_MARKET = 'market_data'
+SCOPE_USER = 'user_data'
+ALL_SCOPES = frozenset({SCOPE_MARKET, SCOPE_USER})
+
 
 class DataCompletionReceiver:
     """
@@ -77,11 +91,18 @@ class DataCompletionReceiver:
         """初始化接收器（只执行一次）"""
         if not self._initialized:
             # ===== 内存存储 - 分库存储，覆盖更新 =====
+            # ⚠️ 写时复制：两个库只整体替换，不原地修改（快照直接引用它们）
             self.memory_store = {
                 'market_data': {},      # 行情数据专用库，key=symbol
                 'user_data': {},        # 私人数据专用库，key=交易所_user
             }
             
+            # ===== 代数计数器（每个库每更新一次+1）=====
+            self.versions = {
+                SCOPE_MARKET: 0,
+                SCOPE_USER: 0,
+            }
+            
             # ===== 时间戳跟踪（用于监控）=====
             self.last_market_time = None      # 最后一次收到行情的时间
             self.last_account_time = None     # 最后一次收到私人数据的时间
@@ -92,30 +113,40 @@ class DataCompletionReceiver:
             # 当有新数据时，会遍历这个列表，给每个订阅者推送
             self.subscribers = []
             
+            # 每个订阅者关心的库，key=回调函数，value=frozenset(库名)
+            self.subscriber_scopes = {}
+            
+            # ===== 推送统计 =====
+            self.push_count = 0               # 生成快照的次数
+            self.skipped_push_count = 0       # 因订阅范围不匹配而跳过的推送次数
+            
             self._initialized = True
             logger.info("✅【接收存储区】 数据完成接收器初始化完成")
     
     # ==================== 订阅管理 ====================
     
-    def subscribe(self, callback: Callable):
+    def subscribe(self, callback: Callable, scopes=None):
         """
         订阅数据推送
         ==================================================
         订阅者需要提供回调函数：async def callback(store_snapshot: dict)
         
         调用示例：
-            receiver.subscribe(detector.handle_store_snapshot)
+            receiver.subscribe(detector.handle_store_snapshot, scopes=[SCOPE_USER])
             receiver.subscribe(binance_repair.handle_store_snapshot)
-            receiver.subscribe(okx_repair.handle_store_snapshot)
+            receiver.subscribe(okx_repair.handle_store_snapshot, scopes=[SCOPE_USER])
         
         订阅后立即推送一次当前数据，让新订阅者快速获取最新状态
         
         :param callback: 异步回调函数，接收一个参数（存储区快照）
+        :param scopes: 关心的库（SCOPE_MARKET / SCOPE_USER），None表示全部
+                       只有本次变化的库与之有交集时才会推送
         :return: self，支持链式调用
         ==================================================
         """
         if callback not in self.subscribers:
             self.subscribers.append(callback)
+            self.subscriber_scopes[callback] = frozenset(scopes) if scopes else ALL_SCOPES
             logger.info(f"✅【接收存储区】 新增订阅者，当前共 {len(self.subscribers)} 个订阅者")
             
             # 订阅后立即推送一次当前数据
@@ -130,6 +161,7 @@ class DataCompletionReceiver:
         """
         if callback in self.subscribers:
             self.subscribers.remove(callback)
+            self.subscriber_scopes.pop(callback, None)
             logger.info(f"✅【接收存储区】 移除订阅者，当前共 {len(self.subscribers)} 个订阅者")
     
     # ==================== 数据接收入口 ====================
@@ -166,23 +198,29 @@ class DataCompletionReceiver:
             
             now = datetime.now()
             
-            # ===== 覆盖更新存储 =====
+            # ===== 覆盖更新存储（写时复制）=====
             # 用 {exchange}_user 作为key，确保每个交易所只有一条数据
             storage_key = f"{exchange}_user"
             
-            self.memory_store['user_data'][storage_key] = {
+            new_user_data = dict(self.memory_store['user_data'])
+            new_user_data[storage_key] = {
                 'exchange': exchange,
                 'data_type': data_type,
                 'data': private_data.get('data', {}),          # 真正的业务数据
                 'timestamp': private_data.get('timestamp', now.isoformat()),
                 'received_at': now.isoformat()
             }
+            self.memory_store['user_data'] = new_user_data
+            self.versions[SCOPE_USER] += 1
             
             self.last_account_time = now
             logger.debug(f"✅ 【接收存储区】私人数据已更新: {exchange}")
             
             # ===== 推送整个存储区给所有订阅者 =====
-            await self._push_full_store()
+            await self._push_full_store(
+                changed=frozenset({SCOPE_USER}),
+                changed_exchanges=frozenset({exchange})
+            )
             
         except Exception as e:
             logger.error(f"❌ 【接收存储区】接收私人数据失败: {e}", exc_info=True)
@@ -205,17 +243,22 @@ class DataCompletionReceiver:
         ==================================================
         """
         try:
+            stored_count = 0
             if isinstance(market_data, list):
                 self.last_market_count = len(market_data)
-                await self._store_market_data(market_data)
+                stored_count = await self._store_market_data(market_data)
             else:
                 logger.warning(f"⚠️【接收存储区】 收到非列表市场数据: {type(market_data)}")
                 self.last_market_count = 0
             
             self.last_market_time = datetime.now()
             
+            # 没有任何合约被更新，库没变，不需要推送
+            if not stored_count:
+                return
+            
             # ===== 推送整个存储区给所有订阅者 =====
-            await self._push_full_store()
+            await self._push_full_store(changed=frozenset({SCOPE_MARKET}))
             
         except Exception as e:
             logger.error(f"❌ 【接收存储区】接收市场数据失败: {e}", exc_info=True)
@@ -227,6 +270,9 @@ class DataCompletionReceiver:
         遍历行情数据列表，按合约名存储到内存中。
         每个合约只有一条最新数据，新数据直接覆盖旧数据。
         
+        写时复制：在新字典上更新，全部完成后整体替换，
+        已经推送出去的快照不会被改动。
+        
         :param data_list: 行情数据列表
         :return: 成功存储的条数
         ==================================================
@@ -236,6 +282,7 @@ class DataCompletionReceiver:
                 return 0
                 
             stored_count = 0
+            new_market_data = dict(self.memory_store['market_data'])
             for item in data_list:
                 await asyncio.sleep(0)  # ✅ [蚂蚁基因修复] 循环内让出CPU，避免大量合约阻塞事件循环
                 symbol = item.get('symbol')
@@ -244,9 +291,13 @@ class DataCompletionReceiver:
                 
                 # 创建简化版市场数据
                 simplified_data = self._create_simplified_market_data(item)
-                self.memory_store['market_data'][symbol] = simplified_data
+                new_market_data[symbol] = simplified_data
                 stored_count += 1
             
+            if stored_count:
+                self.memory_store['market_data'] = new_market_data
+                self.versions[SCOPE_MARKET] += 1
+            
             logger.debug(f"✅ 【接收存储区】市场数据已更新: {stored_count} 条")
             return stored_count
             
@@ -309,38 +360,74 @@ class DataCompletionReceiver:
     
     # ==================== 推送逻辑 ====================
     
-    async def _push_full_store(self):
+    def _build_snapshot(self, changed=ALL_SCOPES, changed_exchanges=None) -> Dict[str, Any]:
+        """
+        创建存储区快照（只引用，不复制）
+        ==================================================
+        两个库遵守写时复制，快照直接引用当前字典即可，
+        之后的更新会替换成新字典，不会改动这份快照。
+        
+        :param changed: 本次变化的库
+        :param changed_exchanges: 本次变化的交易所（None表示全部）
+        :return: 快照字典
+        ==================================================
+        """
+        user_data = self.memory_store['user_data']
+        if changed_exchanges is None:
+            changed_exchanges = frozenset(item.get('exchange') for item in user_data.values())
+        
+        return {
+            'market_data': self.memory_store['market_data'],
+            'user_data': user_data,
+            'timestamp': datetime.now().isoformat(),
+            'version': dict(self.versions),
+            'changed': changed,
+            'changed_exchanges': changed_exchanges
+        }
+    
+    async def _push_full_store(self, changed=ALL_SCOPES, changed_exchanges=frozenset()):
         """
         推送完整存储区给所有订阅者
         ==================================================
         每次数据更新后调用此方法，将整个存储区快照推送给所有订阅者。
         
         推送规则：
-            - 创建快照副本，避免推送过程中数据被修改
-            - 遍历所有订阅者，为每个订阅者创建异步任务
+            - 快照只引用当前的库（写时复制保证不会被修改）
+            - 只推给订阅范围与本次变化有交集的订阅者
+            - 遍历订阅者，为每个订阅者创建异步任务
             - 等待所有推送完成，但每个推送是独立的
         
         推送格式：
             {
                 'market_data': {...},  # 所有合约的最新行情
                 'user_data': {...},    # 所有交易所的最新私人数据
-                'timestamp': '...'      # 推送时间戳
+                'timestamp': '...',    # 推送时间戳
+                'version': {...},      # 各库代数
+                'changed': ...,        # 本次变化的库
+                'changed_exchanges': ...  # 本次变化的交易所
             }
+        
+        :param changed: 本次变化的库
+        :param changed_exchanges: 本次变化的交易所
         ==================================================
         """
         if not self.subscribers:
             return
         
-        # 创建存储区快照（复制一份，避免推送过程中被修改）
-        snapshot = {
-            'market_data': self.memory_store['market_data'].copy(),
-            'user_data': self.memory_store['user_data'].copy(),
-            'timestamp': datetime.now().isoformat()
-        }
+        targets = [
+            callback for callback in self.subscribers
+            if self.subscriber_scopes.get(callback, ALL_SCOPES) & changed
+        ]
+        self.skipped_push_count += len(self.subscribers) - len(targets)
+        if not targets:
+            return
+        
+        snapshot = self._build_snapshot(changed, changed_exchanges)
+        self.push_count += 1
         
         # 创建所有推送任务
         tasks = []
-        for callback in self.subscribers:
+        for callback in targets:
             tasks.append(self._push_to_subscriber(callback, snapshot))
         
         # ✅ [蚂蚁基因修复] 等待所有推送完成
@@ -356,17 +443,13 @@ class DataCompletionReceiver:
         如果某个订阅者处理失败，不影响其他订阅者。
         
         :param callback: 订阅者的回调函数
-        :param snapshot: 要推送的快照，如果为None则创建当前快照
+        :param snapshot: 要推送的快照，如果为None则创建当前快照（视为全部变化）
         ==================================================
         """
         try:
             if snapshot is None:
                 # 如果没有提供快照，创建当前存储区的快照
-                snapshot = {
-                    'market_data': self.memory_store['market_data'].copy(),
-                    'user_data': self.memory_store['user_data'].copy(),
-                    'timestamp': datetime.now().isoformat()
-                }
+                snapshot = self._build_snapshot()
             
             # 创建异步任务推送，不等待结果
             asyncio.create_task(callback(snapshot))
@@ -406,6 +489,9 @@ class DataCompletionReceiver:
             "timestamp": datetime.now().isoformat(),
             "source_count": len(sources),
             "sources": sources,
+            "versions": dict(self.versions),
+            "push_count": self.push_count,
+            "skipped_push_count": self.skipped_push_count,
             "note": f"共{len(sources)}个数据来源，点击endpoint查看详情"
         }
     
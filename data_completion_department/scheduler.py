@@ -32,7 +32,8 @@
    - 缺点：职责混乱，数据库字段混入业务数据
 
 2. 隔离模式（USE_DEEPCOPY = True）
-   - 推送给数据库的数据使用深拷贝（独立副本）
+   - 推送给数据库的数据使用独立副本（isolated_copy：只新建容器，字符串/数字等叶子值共享，
+     不走 copy.deepcopy 的 memo 和逐对象分发，结果与深拷贝等价）
    - 数据库修改的是副本，不影响大脑收到的原始数据
    - 优点：数据纯净，职责清晰
    - 缺点：大脑在非持仓缺失修复期间，看不到数据库添加的字段。在持仓缺失修复期间，只能看到首次读取的updated_at字段，值不变。
@@ -47,7 +48,6 @@
 """
 
 import logging
-import copy
 from typing import Dict, Any
 import asyncio
 from datetime import datetime
@@ -66,6 +66,26 @@ from .constants import (
 
 logger = logging.getLogger(__name__)
 
+# 不可变的叶子值，拷贝时直接共享
+_IMMUTABLE = (str, int, float, bool, bytes, datetime, type(None))
+
+
+def isolated_copy(value: Any) -> Any:
+    """
+    结构共享拷贝（替代 copy.deepcopy）
+
+    dict / list / tuple 逐层新建，不可变的叶子值直接共享引用；
+    其他类型（自定义对象）原样共享，数据库只会增删顶层字段，不会改它们。
+    私人数据基本是一层字典，这里通常只做一次 dict 拷贝。
+    """
+    if isinstance(value, dict):
+        return {k: v if isinstance(v, _IMMUTABLE) else isolated_copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [v if isinstance(v, _IMMUTABLE) else isolated_copy(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(v if isinstance(v, _IMMUTABLE) else isolated_copy(v) for v in value)
+    return value
+
 
 class Scheduler:
     """
@@ -190,9 +210,9 @@ class Scheduler:
             - 平仓完整 → 推大脑（去除标签） + 推数据库（保留标签）
 
         【数据隔离逻辑】
-        根据 USE_DEEPCOPY 开关决定推送给数据库时是否使用深拷贝：
+        根据 USE_DEEPCOPY 开关决定推送给数据库时是否使用独立副本：
             - False（量子纠缠）：直接传原数据引用，数据库修改会影响大脑
-            - True（隔离模式）：传深拷贝副本，数据库修改不影响大脑
+            - True（隔离模式）：传独立副本（isolated_copy），数据库修改不影响大脑
 
         :param message: 包含tag和data的消息
         ==================================================
@@ -215,10 +235,10 @@ class Scheduler:
             # 2. 推数据库（保留标签）
             if self.database:
                 try:
-                    # 🔧 根据开关决定是否使用深拷贝
+                    # 🔧 根据开关决定是否使用独立副本
                     if self.USE_DEEPCOPY:
-                        # 隔离模式：使用深拷贝，数据库修改不影响大脑
-                        data_for_db = copy.deepcopy(data)
+                        # 隔离模式：使用独立副本（结构共享拷贝），数据库修改不影响大脑
+                        data_for_db = isolated_copy(data)
                         mode_desc = "隔离模式（副本）"
                     else:
                         # 量子纠缠模式：直接使用原数据，大脑能看到数据库添加的字段
@@ -0,0 +1,61 @@
+"""
+交易所地址 - 真实交易所 / 本地模拟器 一处切换
+
+默认全部走真实交易所。压测连接切换、订阅分批、下单链路时，先启动本地模拟器：
+
+    python -m exchange_simulator --symbols 200 --rate 5
+
+再用环境变量把系统指过去（模拟器启动时会打印这两行）：
+
+    BINANCE_SIMULATOR_URL=http://127.0.0.1:9100
+    OKX_SIMULATOR_URL=http://127.0.0.1:9101
+
+设置后：
+- websocket_pool 的 EXCHANGE_CONFIGS（公开/私人 WS、REST 地址）
+- 合约列表获取、下单工人（Trader）、下单网关预热、listenKey、私人连接
+都改走模拟器；限频器把模拟器主机按对应交易所的账本计数。
+两个交易所各用一个端口，和真实环境一样按主机区分。
+"""
+
+import os
+import urllib.parse
+from typing import Dict, Optional
+
+SIMULATOR_ENVS = {
+    "binance": "BINANCE_SIMULATOR_URL",
+    "okx": "OKX_SIMULATOR_URL",
+}
+
+
+def simulator_url(exchange: str) -> Optional[str]:
+    """该交易所的模拟器地址（http://主机:端口），没设置返回 None"""
+    env = SIMULATOR_ENVS.get(exchange)
+    value = os.getenv(env, "").strip().rstrip("/") if env else ""
+    return value or None
+
+
+def rest_url(exchange: str, default: str) -> str:
+    """REST 根地址：设置了模拟器用模拟器，否则用 default"""
+    return simulator_url(exchange) or default
+
+
+def ws_url(exchange: str, path: str, default: str) -> str:
+    """WebSocket 地址：设置了模拟器用 ws://模拟器 + path，否则用 default"""
+    base = simulator_url(exchange)
+    if not base:
+        return default
+    if base.startswith("https://"):
+        base = "wss://" + base[len("https://"):]
+    elif base.startswith("http://"):
+        base = "ws://" + base[len("http://"):]
+    return base + path
+
+
+def simulator_hosts() -> Dict[str, str]:
+    """模拟器主机 -> 交易所（限频器用）"""
+    hosts = {}
+    for exchange in SIMULATOR_ENVS:
+        base = simulator_url(exchange)
+        if base:
+            hosts[urllib.parse.urlsplit(base).netloc] = exchange
+    return hosts
@@ -0,0 +1,15 @@
+"""
+本地交易所模拟器（压测用，不连真实交易所）
+
+    python -m exchange_simulator --symbols 200 --rate 5
+    BINANCE_SIMULATOR_URL=... OKX_SIMULATOR_URL=... 启动系统（见 exchange_endpoints.py）
+"""
+
+from .config import DEFAULT_CONFIG, load_config
+from .server import ExchangeSimulator
+
+__all__ = [
+    'DEFAULT_CONFIG',
+    'load_config',
+    'ExchangeSimulator',
+]
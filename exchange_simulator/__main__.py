@@ -0,0 +1,3 @@
+from exchange_simulator.server import main
+
+main()
@@ -0,0 +1,445 @@
+"""
+模拟币安 U 本位合约
+
+REST：
+    GET    /fapi/v1/time | exchangeInfo | fundingRate | premiumIndex | ticker/24hr
+    GET    /fapi/v2/account, /fapi/v3/account
+    POST   /fapi/v1/order（市价单回执后 fill_delay_ms 推送成交）, DELETE /fapi/v1/order
+    POST   /fapi/v1/algoOrder, /fapi/v1/leverage
+    POST / PUT / DELETE /fapi/v1/listenKey
+WS：
+    /ws              SUBSCRIBE / UNSUBSCRIBE / LIST_SUBSCRIPTIONS，<symbol>@ticker 和 <symbol>@markPrice
+    /ws/<listenKey>  用户数据流：ORDER_TRADE_UPDATE、ACCOUNT_UPDATE
+
+返回 X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-10S / X-MBX-ORDER-COUNT-1M 用量头，
+按真实上限（权重 2400/分钟、订单 300/10秒、1200/分钟）计数，超了返回 429。
+签名接口只检查 X-MBX-APIKEY 头，不验签。
+"""
+
+import asyncio
+import itertools
+import json
+import secrets
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from http_client.rate_limiter import BINANCE_ORDER_PATHS, BINANCE_WEIGHTS, BUCKET_LIMITS
+
+from .common import SimulatedExchange, WsSession, json_response
+from .market import fmt, now_millis
+
+SIGNED_PREFIXES = ("/fapi/v1/order", "/fapi/v1/algoOrder", "/fapi/v1/leverage",
+                   "/fapi/v2/account", "/fapi/v3/account", "/fapi/v1/listenKey")
+
+
+class BinanceSimulator(SimulatedExchange):
+    """模拟币安"""
+
+    name = "binance"
+
+    def __init__(self, market, config):
+        super().__init__(market, config)
+        self._usage: Dict[str, tuple] = {}        # 桶 -> (窗口序号, 已用)
+        self._order_ids = itertools.count(8000000000)
+        self._algo_ids = itertools.count(1000000)
+        self.listen_key: Optional[str] = None
+        self.positions: Dict[str, float] = defaultdict(float)
+        self.leverage: Dict[str, int] = defaultdict(lambda: 20)
+
+    @staticmethod
+    def symbol(base: str) -> str:
+        return f"{base}USDT"
+
+    def base_of(self, symbol: str) -> Optional[str]:
+        base = symbol[:-4] if symbol.endswith("USDT") else None
+        return base if base in self.market.contracts else None
+
+    # ========== 错误 / 限频 ==========
+
+    def error_response(self, status: int, retry_after: int, reason: str) -> web.Response:
+        if status == 418:
+            until = now_millis() + retry_after * 1000
+            msg = f"Way too many requests; IP banned until {until}. ({reason})"
+        else:
+            msg = f"Too many requests; current limit is 2400 requests per minute. ({reason})"
+        return json_response({"code": -1003, "msg": msg}, status=status,
+                             headers={"Retry-After": str(retry_after)})
+
+    def _costs(self, request: web.Request):
+        costs = [("weight", BINANCE_WEIGHTS.get(request.path, 1))]
+        if request.method == "POST" and request.path in BINANCE_ORDER_PATHS:
+            costs += [("orders_10s", 1), ("orders_1m", 1)]
+        return costs
+
+    def _used(self, bucket: str, add: int = 0) -> int:
+        """固定窗口计数（和币安一样按整分钟 / 整10秒清零）"""
+        window = BUCKET_LIMITS["binance"][bucket][1]
+        index = int(time.time() // window)
+        current, used = self._usage.get(bucket, (index, 0))
+        used = (used if current == index else 0) + add
+        self._usage[bucket] = (index, used)
+        return used
+
+    def check_limits(self, request: web.Request) -> Optional[web.Response]:
+        for bucket, cost in self._costs(request):
+            limit, window = BUCKET_LIMITS["binance"][bucket]
+            if self._used(bucket, cost) > limit:
+                retry_after = int(window - time.time() % window) + 1
+                return self.error_response(429, retry_after, f"{bucket} limit")
+        return None
+
+    def decorate(self, request: web.Request, response: web.StreamResponse):
+        response.headers["X-MBX-USED-WEIGHT-1M"] = str(self._used("weight"))
+        if request.path in BINANCE_ORDER_PATHS:
+            response.headers["X-MBX-ORDER-COUNT-10S"] = str(self._used("orders_10s"))
+            response.headers["X-MBX-ORDER-COUNT-1M"] = str(self._used("orders_1m"))
+
+    # ========== 路由 ==========
+
+    def add_routes(self, app: web.Application):
+        r = app.router
+        r.add_get("/fapi/v1/time", self.handle_time)
+        r.add_get("/fapi/v1/exchangeInfo", self.handle_exchange_info)
+        r.add_get("/fapi/v1/fundingRate", self.handle_funding_rate)
+        r.add_get("/fapi/v1/premiumIndex", self.handle_premium_index)
+        r.add_get("/fapi/v1/ticker/24hr", self.handle_ticker_24hr)
+        r.add_get("/fapi/v2/account", self.handle_account)
+        r.add_get("/fapi/v3/account", self.handle_account)
+        r.add_post("/fapi/v1/order", self.handle_order)
+        r.add_delete("/fapi/v1/order", self.handle_cancel)
+        r.add_post("/fapi/v1/algoOrder", self.handle_algo_order)
+        r.add_post("/fapi/v1/leverage", self.handle_leverage)
+        r.add_route("*", "/fapi/v1/listenKey", self.handle_listen_key)
+        r.add_get("/ws", self.handle_market_ws)
+        r.add_get("/ws/{listen_key}", self.handle_user_ws)
+
+    async def _params(self, request: web.Request) -> Dict[str, str]:
+        params = dict(request.query)
+        if request.can_read_body:
+            params.update(dict(await request.post()))
+        return params
+
+    def _unauthorized(self, request: web.Request) -> Optional[web.Response]:
+        if request.path.startswith(SIGNED_PREFIXES) and not request.headers.get("X-MBX-APIKEY"):
+            return json_response({"code": -2015, "msg": "Invalid API-key, IP, or permissions for action."},
+                                 status=401)
+        return None
+
+    # ========== 公开接口 ==========
+
+    async def handle_time(self, request):
+        return json_response({"serverTime": now_millis()})
+
+    async def handle_exchange_info(self, request):
+        symbols = []
+        for base in self.market.bases:
+            symbols.append({
+                "symbol": self.symbol(base),
+                "pair": self.symbol(base),
+                "contractType": "PERPETUAL",
+                "status": "TRADING",
+                "baseAsset": base,
+                "quoteAsset": "USDT",
+                "marginAsset": "USDT",
+                "pricePrecision": 8,
+                "quantityPrecision": 3,
+                "onboardDate": 1569398400000,
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "tickSize": fmt(self.market.tick_size(base)),
+                     "minPrice": fmt(self.market.tick_size(base)), "maxPrice": "10000000"},
+                    {"filterType": "LOT_SIZE", "stepSize": fmt(self.market.step_size(base)),
+                     "minQty": fmt(self.market.step_size(base)), "maxQty": "1000000"},
+                    {"filterType": "MARKET_LOT_SIZE", "stepSize": fmt(self.market.step_size(base)),
+                     "minQty": fmt(self.market.step_size(base)), "maxQty": "100000"},
+                    {"filterType": "MIN_NOTIONAL", "notional": "5"},
+                ],
+            })
+        return json_response({"timezone": "UTC", "serverTime": now_millis(), "rateLimits": [], "symbols": symbols})
+
+    async def handle_funding_rate(self, request):
+        """最近一次结算的费率（不带 symbol 时每个合约一条）"""
+        last = self.market.last_funding_time()
+        symbol = request.query.get("symbol")
+        bases = [self.base_of(symbol)] if symbol else self.market.bases
+        rows = [{
+            "symbol": self.symbol(base),
+            "fundingRate": fmt(self.market.funding_rate("binance", base)),
+            "fundingTime": last,
+            "markPrice": fmt(self.market.mark_price("binance", base)),
+        } for base in bases if base]
+        return json_response(rows)
+
+    def _premium(self, base: str) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol(base),
+            "markPrice": fmt(self.market.mark_price("binance", base)),
+            "indexPrice": fmt(self.market.index_price(base)),
+            "estimatedSettlePrice": fmt(self.market.index_price(base)),
+            "lastFundingRate": fmt(self.market.funding_rate("binance", base)),
+            "interestRate": "0.00010000",
+            "nextFundingTime": self.market.next_funding_time(),
+            "time": now_millis(),
+        }
+
+    async def handle_premium_index(self, request):
+        symbol = request.query.get("symbol")
+        if symbol:
+            base = self.base_of(symbol)
+            if base is None:
+                return json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+            return json_response(self._premium(base))
+        return json_response([self._premium(base) for base in self.market.bases])
+
+    def _ticker(self, base: str) -> Dict[str, Any]:
+        daily = self.market.daily(base)
+        last = self.market.price("binance", base)
+        return {
+            "symbol": self.symbol(base),
+            "priceChange": fmt(last - daily["open"]),
+            "priceChangePercent": f"{(last / daily['open'] - 1) * 100:.3f}",
+            "lastPrice": fmt(last),
+            "openPrice": fmt(daily["open"]),
+            "highPrice": fmt(daily["high"]),
+            "lowPrice": fmt(daily["low"]),
+            "volume": fmt(daily["volume"]),
+            "quoteVolume": fmt(daily["volume"] * last),
+            "closeTime": now_millis(),
+        }
+
+    async def handle_ticker_24hr(self, request):
+        symbol = request.query.get("symbol")
+        if symbol:
+            base = self.base_of(symbol)
+            if base is None:
+                return json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+            return json_response(self._ticker(base))
+        return json_response([self._ticker(base) for base in self.market.bases])
+
+    # ========== 账户 / 下单 ==========
+
+    async def handle_account(self, request):
+        denied = self._unauthorized(request)
+        if denied:
+            return denied
+        positions = [{
+            "symbol": symbol,
+            "positionSide": "BOTH",
+            "positionAmt": fmt(amount),
+            "unrealizedProfit": "0",
+            "notional": fmt(amount * self.market.mark_price("binance", self.base_of(symbol))),
+            "updateTime": now_millis(),
+        } for symbol, amount in self.positions.items() if amount]
+        return json_response({
+            "totalWalletBalance": "10000.00000000",
+            "availableBalance": "10000.00000000",
+            "totalUnrealizedProfit": "0.00000000",
+            "assets": [{"asset": "USDT", "walletBalance": "10000.00000000", "availableBalance": "10000.00000000"}],
+            "positions": positions,
+        })
+
+    async def handle_order(self, request):
+        denied = self._unauthorized(request)
+        if denied:
+            return denied
+        params = await self._params(request)
+        base = self.base_of(params.get("symbol", ""))
+        if base is None:
+            return json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+
+        side = params.get("side", "BUY").upper()
+        quantity = float(params.get("quantity") or 0)
+        if params.get("closePosition") == "true" or (params.get("reduceOnly") == "true" and not quantity):
+            quantity = abs(self.positions[self.symbol(base)])
+        order = {
+            "orderId": next(self._order_ids),
+            "symbol": self.symbol(base),
+            "status": "NEW",
+            "clientOrderId": params.get("newClientOrderId") or f"sim{secrets.token_hex(8)}",
+            "price": params.get("price", "0"),
+            "avgPrice": "0.00",
+            "origQty": fmt(quantity),
+            "executedQty": "0",
+            "cumQuote": "0",
+            "timeInForce": params.get("timeInForce", "GTC"),
+            "type": params.get("type", "MARKET"),
+            "reduceOnly": params.get("reduceOnly") == "true",
+            "side": side,
+            "positionSide": params.get("positionSide", "BOTH"),
+            "updateTime": now_millis(),
+        }
+        self.stats["orders"] += 1
+        if order["type"] == "MARKET":
+            asyncio.create_task(self._fill(order, base))
+        return json_response(order)
+
+    async def handle_cancel(self, request):
+        denied = self._unauthorized(request)
+        if denied:
+            return denied
+        params = await self._params(request)
+        return json_response({"code": -2011, "msg": "Unknown order sent.", "symbol": params.get("symbol")},
+                             status=400)
+
+    async def handle_algo_order(self, request):
+        denied = self._unauthorized(request)
+        if denied:
+            return denied
+        params = await self._params(request)
+        if self.base_of(params.get("symbol", "")) is None:
+            return json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        self.stats["algo_orders"] += 1
+        return json_response({
+            "algoId": next(self._algo_ids),
+            "clientAlgoId": params.get("clientAlgoId") or f"sim{secrets.token_hex(8)}",
+            "algoType": params.get("algoType", "CONDITIONAL"),
+            "orderType": params.get("type", "STOP_MARKET"),
+            "symbol": params.get("symbol"),
+            "side": params.get("side"),
+            "positionSide": params.get("positionSide", "BOTH"),
+            "quantity": params.get("quantity", "0"),
+            "algoStatus": "NEW",
+            "triggerPrice": params.get("triggerPrice", "0"),
+            "price": params.get("price", "0"),
+            "createTime": now_millis(),
+            "updateTime": now_millis(),
+        })
+
+    async def handle_leverage(self, request):
+        denied = self._unauthorized(request)
+        if denied:
+            return denied
+        params = await self._params(request)
+        if self.base_of(params.get("symbol", "")) is None:
+            return json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        self.leverage[params["symbol"]] = int(params.get("leverage", 20))
+        return json_response({"leverage": self.leverage[params["symbol"]],
+                              "maxNotionalValue": "1000000", "symbol": params["symbol"]})
+
+    async def _fill(self, order: Dict[str, Any], base: str):
+        """市价单：先推 NEW，fill_delay_ms 后推 FILLED 和持仓变化"""
+        self._push_user(self._order_event(order, "NEW", 0.0, 0.0))
+        await asyncio.sleep(self.config.get("fill_delay_ms", 50) / 1000)
+
+        price = self.market.price("binance", base)
+        quantity = float(order["origQty"])
+        symbol = order["symbol"]
+        self.positions[symbol] += quantity if order["side"] == "BUY" else -quantity
+        self._push_user(self._order_event(order, "FILLED", quantity, price))
+        self._push_user({
+            "e": "ACCOUNT_UPDATE", "E": now_millis(), "T": now_millis(),
+            "a": {
+                "m": "ORDER",
+                "B": [{"a": "USDT", "wb": "10000.00000000", "cw": "10000.00000000", "bc": "0"}],
+                "P": [{"s": symbol, "pa": fmt(self.positions[symbol]), "ep": fmt(price),
+                       "up": "0", "mt": "cross", "iw": "0", "ps": "BOTH"}],
+            },
+        })
+
+    @staticmethod
+    def _order_event(order: Dict[str, Any], status: str, filled: float, price: float) -> Dict[str, Any]:
+        return {
+            "e": "ORDER_TRADE_UPDATE", "E": now_millis(), "T": now_millis(),
+            "o": {
+                "s": order["symbol"], "c": order["clientOrderId"], "S": order["side"],
+                "o": order["type"], "f": order["timeInForce"], "q": order["origQty"],
+                "p": "0", "ap": fmt(price), "x": "TRADE" if filled else "NEW", "X": status,
+                "i": order["orderId"], "l": fmt(filled), "z": fmt(filled), "L": fmt(price),
+                "T": now_millis(), "R": order["reduceOnly"], "ps": order["positionSide"],
+            },
+        }
+
+    def _push_user(self, event: Dict[str, Any]):
+        text = json.dumps(event, separators=(",", ":"))
+        for session in list(self.sessions):
+            if session.listen_key:
+                session.send([text])
+
+    # ========== listenKey ==========
+
+    async def handle_listen_key(self, request):
+        denied = self._unauthorized(request)
+        if denied:
+            return denied
+        if request.method == "POST":
+            # 和真实交易所一样：有效期内重复申请返回同一个
+            if self.listen_key is None:
+                self.listen_key = secrets.token_urlsafe(48)[:64]
+            return json_response({"listenKey": self.listen_key})
+        if request.method == "PUT":
+            if self.listen_key is None:
+                return json_response({"code": -1125, "msg": "This listenKey does not exist."}, status=400)
+            return json_response({})
+        if request.method == "DELETE":
+            self.listen_key = None
+            return json_response({})
+        return json_response({"code": -1000, "msg": "Unsupported method"}, status=405)
+
+    # ========== WS ==========
+
+    async def handle_market_ws(self, request):
+        session = await self.open_ws(request, heartbeat=self.config.get("binance_server_ping"))
+        return await self.serve_ws(session)
+
+    async def handle_user_ws(self, request):
+        listen_key = request.match_info["listen_key"]
+        if listen_key != self.listen_key:
+            return web.Response(status=400, text='{"code":-1125,"msg":"Invalid listenKey."}')
+        session = await self.open_ws(request, heartbeat=self.config.get("binance_server_ping"))
+        session.listen_key = listen_key
+        return await self.serve_ws(session)
+
+    async def on_text(self, session: WsSession, text: str):
+        try:
+            message = json.loads(text)
+        except json.JSONDecodeError:
+            session.send_json({"code": 3, "msg": "Invalid JSON"})
+            return
+        method = message.get("method")
+        msg_id = message.get("id")
+        params = [p.lower() for p in message.get("params") or []]
+
+        if method == "SUBSCRIBE":
+            session.subscriptions.update(params)
+            session.send_json({"result": None, "id": msg_id})
+        elif method == "UNSUBSCRIBE":
+            session.subscriptions.difference_update(params)
+            session.send_json({"result": None, "id": msg_id})
+        elif method == "LIST_SUBSCRIPTIONS":
+            session.send_json({"result": sorted(session.subscriptions), "id": msg_id})
+        else:
+            session.send_json({"error": {"code": 2, "msg": f"Invalid request: unknown method {method}"},
+                               "id": msg_id})
+
+    # ========== 推送 ==========
+
+    def publish(self, now_ms: int):
+        wanted = self.subscribed_keys()
+        if not wanted:
+            return
+        next_funding = self.market.next_funding_time(now_ms)
+        frames = {}
+        for base in self.market.bases:
+            lower = self.symbol(base).lower()
+            ticker_key, mark_key = f"{lower}@ticker", f"{lower}@markprice"
+            if ticker_key in wanted:
+                daily = self.market.daily(base)
+                last = self.market.price("binance", base)
+                frames[ticker_key] = json.dumps({
+                    "e": "24hrTicker", "E": now_ms, "s": self.symbol(base),
+                    "p": fmt(last - daily["open"]), "P": f"{(last / daily['open'] - 1) * 100:.3f}",
+                    "c": fmt(last), "o": fmt(daily["open"]), "h": fmt(daily["high"]),
+                    "l": fmt(daily["low"]), "v": fmt(daily["volume"]), "q": fmt(daily["volume"] * last),
+                }, separators=(",", ":"))
+            if mark_key in wanted:
+                frames[mark_key] = json.dumps({
+                    "e": "markPriceUpdate", "E": now_ms, "s": self.symbol(base),
+                    "p": fmt(self.market.mark_price("binance", base)),
+                    "i": fmt(self.market.index_price(base)),
+                    "P": fmt(self.market.index_price(base)),
+                    "r": fmt(self.market.funding_rate("binance", base)),
+                    "T": next_funding,
+                }, separators=(",", ":"))
+        self.broadcast(frames)
@@ -0,0 +1,263 @@
+"""
+模拟交易所公共部分：WS 会话、延迟、故障注入、统计、/sim 控制接口
+
+每个交易所的模拟服务继承 SimulatedExchange，只写自己的协议（路由、消息格式、错误格式）。
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+from aiohttp import WSCloseCode, WSMsgType, web
+
+from .config import _merge
+from .market import Market
+
+logger = logging.getLogger(__name__)
+
+
+class WsSession:
+    """
+    一条模拟 WS 连接
+
+    推送先进队列，由发送任务按"生成时间 + 延迟"发出，
+    延迟抖动不会打乱消息顺序（和真实链路一样）。
+    """
+
+    def __init__(self, exchange: "SimulatedExchange", ws: web.WebSocketResponse, path: str):
+        self.exchange = exchange
+        self.ws = ws
+        self.path = path
+        self.id = f"{exchange.name}-{next(exchange._session_seq)}"
+        self.subscriptions: Set[Any] = set()
+        self.logged_in = False
+        self.listen_key: Optional[str] = None
+        self.connected_at = time.time()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._last_due = 0.0
+        self._sender = asyncio.create_task(self._send_loop())
+
+    def send(self, frames: List[str]):
+        """推送一批消息（不等待）"""
+        if not frames or self.ws.closed:
+            return
+        due = max(time.monotonic() + self.exchange.delay(), self._last_due)
+        self._last_due = due
+        self._queue.put_nowait((due, frames))
+
+    def send_json(self, payload: Dict[str, Any]):
+        self.send([json.dumps(payload, separators=(",", ":"))])
+
+    async def _send_loop(self):
+        try:
+            while True:
+                due, frames = await self._queue.get()
+                wait = due - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                for frame in frames:
+                    await self.ws.send_str(frame)
+                self.exchange.stats["frames_sent"] += len(frames)
+        except (asyncio.CancelledError, ConnectionResetError, RuntimeError):
+            pass
+        except Exception as e:
+            logger.debug(f"【模拟器】{self.id} 发送结束: {e}")
+
+    async def close(self, code: int = WSCloseCode.GOING_AWAY, message: bytes = b""):
+        self._sender.cancel()
+        if not self.ws.closed:
+            await self.ws.close(code=code, message=message)
+
+
+class SimulatedExchange:
+    """模拟交易所基类"""
+
+    name = ""
+
+    def __init__(self, market: Market, config: Dict[str, Any]):
+        self.market = market
+        self.config = config
+        self.faults = config["faults"]
+        self.rng = random.Random(config.get("seed", 0) + len(self.name))
+        self.sessions: Set[WsSession] = set()
+        self.stats = defaultdict(int)
+        self._session_seq = itertools.count(1)
+
+    # ========== 延迟 / 故障 ==========
+
+    def delay(self) -> float:
+        latency = self.config.get("latency_ms", 0)
+        jitter = self.config.get("jitter_ms", 0)
+        if not latency and not jitter:
+            return 0.0
+        return (latency + self.rng.uniform(0, jitter)) / 1000
+
+    def injected_error(self) -> Optional[int]:
+        """按比例随机返回要注入的 HTTP 错误码"""
+        roll = self.rng.random()
+        if roll < self.faults.get("error_418_ratio", 0):
+            return 418
+        if roll < self.faults.get("error_418_ratio", 0) + self.faults.get("error_429_ratio", 0):
+            return 429
+        return None
+
+    def error_response(self, status: int, retry_after: int, reason: str) -> web.Response:
+        """交易所格式的限频错误（子类实现）"""
+        raise NotImplementedError
+
+    def check_limits(self, request: web.Request) -> Optional[web.Response]:
+        """按真实上限计数，超限返回错误响应（子类实现）"""
+        return None
+
+    def decorate(self, request: web.Request, response: web.StreamResponse):
+        """响应发出前加交易所特有的头（子类可选）"""
+
+    # ========== REST 中间件 ==========
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        if request.path.startswith("/sim/") or request.headers.get("Upgrade", "").lower() == "websocket":
+            return await handler(request)
+
+        self.stats["rest_requests"] += 1
+        delay = self.delay()
+        if delay:
+            await asyncio.sleep(delay)
+
+        status = self.injected_error()
+        if status:
+            self.stats[f"rest_injected_{status}"] += 1
+            return self.error_response(status, self.faults.get("retry_after", 5), "injected")
+
+        if self.config.get("enforce_limits", True):
+            limited = self.check_limits(request)
+            if limited is not None:
+                self.stats[f"rest_limited_{limited.status}"] += 1
+                return limited
+
+        response = await handler(request)
+        self.decorate(request, response)
+        return response
+
+    # ========== WS ==========
+
+    async def open_ws(self, request: web.Request, heartbeat: Optional[float] = None) -> WsSession:
+        # 关闭自动 pong，才能注入 pong 延迟 / 丢弃
+        ws = web.WebSocketResponse(autoping=False, heartbeat=heartbeat, max_msg_size=10 * 1024 * 1024)
+        await ws.prepare(request)
+        session = WsSession(self, ws, request.path)
+        self.sessions.add(session)
+        self.stats["ws_connections_total"] += 1
+        return session
+
+    async def serve_ws(self, session: WsSession):
+        """收消息循环：ping 帧按故障参数回 pong，文本交给 on_text"""
+        try:
+            async for msg in session.ws:
+                if msg.type == WSMsgType.TEXT:
+                    self.stats["ws_messages_received"] += 1
+                    await self.on_text(session, msg.data)
+                elif msg.type == WSMsgType.PING:
+                    self.reply_pong(session, lambda data=msg.data: session.ws.pong(data))
+                elif msg.type in (WSMsgType.CLOSE, WSMsgType.ERROR):
+                    break
+        finally:
+            self.sessions.discard(session)
+            await session.close()
+        return session.ws
+
+    async def on_text(self, session: WsSession, text: str):
+        raise NotImplementedError
+
+    def reply_pong(self, session: WsSession, send_pong):
+        """按故障参数回 pong：丢弃 / 延迟 / 立即"""
+        if self.rng.random() < self.faults.get("drop_pong_ratio", 0):
+            self.stats["pongs_dropped"] += 1
+            return
+        delay = self.faults.get("pong_delay", 0)
+        self.stats["pongs_delayed" if delay else "pongs_sent"] += 1
+
+        async def _pong():
+            if delay:
+                await asyncio.sleep(delay)
+            if not session.ws.closed:
+                await send_pong()
+
+        asyncio.create_task(_pong())
+
+    def broadcast(self, frames_by_key: Dict[Any, str]):
+        """按订阅把本轮推送发给每条连接"""
+        for session in list(self.sessions):
+            if not session.subscriptions:
+                continue
+            frames = [frames_by_key[key] for key in session.subscriptions if key in frames_by_key]
+            session.send(frames)
+
+    def subscribed_keys(self) -> Set[Any]:
+        keys = set()
+        for session in self.sessions:
+            keys |= session.subscriptions
+        return keys
+
+    async def drop_random_connection(self):
+        """故障注入：随机断开一条连接"""
+        candidates = [s for s in self.sessions if not s.ws.closed]
+        if not candidates:
+            return
+        session = self.rng.choice(candidates)
+        self.stats["disconnects_injected"] += 1
+        logger.info(f"💥【模拟器】注入断线: {session.id} ({session.path})")
+        self.sessions.discard(session)
+        await session.close(code=WSCloseCode.GOING_AWAY, message=b"simulated disconnect")
+
+    # ========== 推送（子类实现）==========
+
+    def publish(self, now_ms: int):
+        """推送一轮行情"""
+
+    def publish_funding(self, now_ms: int):
+        """推送一轮资金费率（只有单独推送费率的交易所需要）"""
+
+    # ========== 应用 ==========
+
+    def add_routes(self, app: web.Application):
+        raise NotImplementedError
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/sim/stats", self._handle_stats)
+        app.router.add_get("/sim/config", self._handle_config)
+        app.router.add_post("/sim/faults", self._handle_faults)
+        self.add_routes(app)
+        return app
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "exchange": self.name,
+            "ws_connections": len(self.sessions),
+            "subscriptions": sum(len(s.subscriptions) for s in self.sessions),
+            **dict(self.stats),
+        }
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.get_stats())
+
+    async def _handle_config(self, request: web.Request) -> web.Response:
+        return web.json_response(self.config)
+
+    async def _handle_faults(self, request: web.Request) -> web.Response:
+        """运行中修改故障参数（两个交易所共用一份，改一次两边生效）"""
+        update = await request.json()
+        _merge(self.faults, update)
+        logger.info(f"🔧【模拟器】故障参数已更新: {self.faults}")
+        return web.json_response(self.faults)
+
+
+def json_response(payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    return web.Response(text=json.dumps(payload, separators=(",", ":")), status=status,
+                        content_type="application/json", headers=headers)
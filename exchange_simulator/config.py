@@ -0,0 +1,65 @@
+"""
+交易所模拟器配置
+
+所有参数都可以用 --config 指定的 JSON 文件覆盖（只写要改的键），
+常用参数也可以直接用命令行参数覆盖；运行中用 POST /sim/faults 改故障参数。
+"""
+
+import copy
+import json
+from typing import Any, Dict, Optional
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "host": "127.0.0.1",
+    "binance_port": 9100,
+    "okx_port": 9101,
+
+    # ===== 行情 =====
+    "symbols": 50,                  # 合约数量（两个交易所同一批币种）
+    "rate": 1.0,                    # 每个合约每秒推送多少次 ticker / 标记价格
+    "funding_push_seconds": 30,     # 欧易 funding-rate 频道推送间隔
+    "funding_interval_hours": 8,    # 资金费结算周期
+    "seed": 42,                     # 随机种子（同一种子行情序列相同）
+
+    # ===== 下单 =====
+    "fill_delay_ms": 50,            # 市价单回执后多久推送成交回报
+
+    # ===== 延迟 =====
+    "latency_ms": 0,                # REST 响应、WS 推送的额外延迟
+    "jitter_ms": 0,                 # 延迟抖动（0 ~ jitter_ms 均匀分布）
+
+    # ===== 限频（按真实上限计数，超了返回 429）=====
+    "enforce_limits": True,
+
+    # ===== 故障注入（运行中可改）=====
+    "faults": {
+        "disconnect_every": 0,      # 每隔多少秒随机断开一条 WS 连接（0=关闭）
+        "error_429_ratio": 0.0,     # REST 随机返回 429 的比例
+        "error_418_ratio": 0.0,     # REST 随机返回 418（封IP）的比例
+        "retry_after": 5,           # 429 / 418 的 Retry-After 秒数
+        "pong_delay": 0.0,          # pong 延迟多少秒（欧易文本 pong 和 WS ping 帧）
+        "drop_pong_ratio": 0.0,     # 不回 pong 的比例
+    },
+
+    # 币安服务端 ping 间隔（秒，和真实交易所一样由服务端发 ping）
+    "binance_server_ping": 180,
+}
+
+
+def load_config(path: Optional[str] = None, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """默认配置 ← JSON 文件 ← 命令行覆盖（值为 None 的覆盖项忽略）"""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            _merge(config, json.load(f))
+    if overrides:
+        _merge(config, {k: v for k, v in overrides.items() if v is not None})
+    return config
+
+
+def _merge(base: Dict[str, Any], update: Dict[str, Any]):
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
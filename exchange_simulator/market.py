@@ -0,0 +1,142 @@
+"""
+模拟行情 - 两个交易所共用一批币种，各自独立随机游走
+
+币安和欧易围绕同一个"公允价"各自有小幅偏离，所以跨平台价差、费率差都有值，
+流水线 step1 ~ step5 能算出完整的 CrossPlatformData。
+"""
+
+import random
+import time
+from typing import Dict, List
+
+# 前几个用真实币种名，后面按序号生成
+BASE_ASSETS = [
+    "BTC", "ETH", "SOL", "BNB", "XRP", "DOGE", "ADA", "AVAX", "LINK", "DOT",
+    "LTC", "TRX", "BCH", "NEAR", "APT", "ARB", "OP", "SUI", "FIL", "ATOM",
+]
+START_PRICES = {"BTC": 65000.0, "ETH": 3200.0, "SOL": 150.0, "BNB": 580.0}
+
+EXCHANGES = ("binance", "okx")
+VOLATILITY = 0.0005         # 每次推送的价格波动幅度
+BASIS_LIMIT = 0.003         # 交易所价格相对公允价的最大偏离
+FUNDING_LIMIT = 0.0015      # 资金费率上下限
+
+
+class _Contract:
+    """一个币种在两个交易所的状态"""
+
+    __slots__ = ("base", "fair", "open", "high", "low", "volume",
+                 "basis", "mark_basis", "funding", "tick_size", "step_size")
+
+    def __init__(self, base: str, price: float, rng: random.Random):
+        self.base = base
+        self.fair = price
+        self.open = price
+        self.high = price
+        self.low = price
+        self.volume = 0.0
+        self.basis = {ex: rng.uniform(-BASIS_LIMIT, BASIS_LIMIT) for ex in EXCHANGES}
+        self.mark_basis = {ex: rng.uniform(-BASIS_LIMIT / 3, BASIS_LIMIT / 3) for ex in EXCHANGES}
+        self.funding = {ex: rng.uniform(-FUNDING_LIMIT / 3, FUNDING_LIMIT / 3) for ex in EXCHANGES}
+        self.tick_size = _tick_size(price)
+        self.step_size = _step_size(price)
+
+
+def _tick_size(price: float) -> float:
+    for tick in (0.1, 0.01, 0.001, 0.0001):
+        if price >= tick * 10000:
+            return tick
+    return 0.00001
+
+
+def _step_size(price: float) -> float:
+    if price >= 10000:
+        return 0.001
+    if price >= 100:
+        return 0.01
+    if price >= 1:
+        return 1.0
+    return 10.0
+
+
+class Market:
+    """模拟行情（两个交易所的模拟服务共用一个）"""
+
+    def __init__(self, symbols: int, seed: int = 42, funding_interval_hours: int = 8):
+        self.rng = random.Random(seed)
+        self.funding_interval_ms = funding_interval_hours * 3600 * 1000
+        self.contracts: Dict[str, _Contract] = {}
+
+        for i in range(symbols):
+            base = BASE_ASSETS[i] if i < len(BASE_ASSETS) else f"SIM{i:03d}"
+            price = START_PRICES.get(base) or round(self.rng.uniform(0.05, 50), 4)
+            self.contracts[base] = _Contract(base, price, self.rng)
+
+    @property
+    def bases(self) -> List[str]:
+        return list(self.contracts)
+
+    # ========== 推进 ==========
+
+    def step(self, base: str):
+        """推进一个币种的价格 / 基差 / 费率"""
+        c = self.contracts[base]
+        c.fair *= 1 + self.rng.gauss(0, VOLATILITY)
+        c.high = max(c.high, c.fair)
+        c.low = min(c.low, c.fair)
+        c.volume += self.rng.uniform(1, 100)
+        for ex in EXCHANGES:
+            c.basis[ex] = _clamp(c.basis[ex] + self.rng.gauss(0, BASIS_LIMIT / 20), BASIS_LIMIT)
+            c.mark_basis[ex] = _clamp(c.mark_basis[ex] + self.rng.gauss(0, BASIS_LIMIT / 60), BASIS_LIMIT / 3)
+            c.funding[ex] = _clamp(c.funding[ex] + self.rng.gauss(0, FUNDING_LIMIT / 200), FUNDING_LIMIT)
+
+    # ========== 读取 ==========
+
+    def price(self, exchange: str, base: str) -> float:
+        c = self.contracts[base]
+        return _round_to(c.fair * (1 + c.basis[exchange]), c.tick_size)
+
+    def mark_price(self, exchange: str, base: str) -> float:
+        c = self.contracts[base]
+        return _round_to(c.fair * (1 + c.mark_basis[exchange]), c.tick_size)
+
+    def index_price(self, base: str) -> float:
+        c = self.contracts[base]
+        return _round_to(c.fair, c.tick_size)
+
+    def funding_rate(self, exchange: str, base: str) -> float:
+        return round(self.contracts[base].funding[exchange], 8)
+
+    def next_funding_time(self, now_ms: int = None) -> int:
+        now_ms = now_ms or now_millis()
+        return (now_ms // self.funding_interval_ms + 1) * self.funding_interval_ms
+
+    def last_funding_time(self, now_ms: int = None) -> int:
+        return self.next_funding_time(now_ms) - self.funding_interval_ms
+
+    def daily(self, base: str) -> Dict[str, float]:
+        c = self.contracts[base]
+        return {"open": c.open, "high": c.high, "low": c.low, "volume": round(c.volume, 3)}
+
+    def tick_size(self, base: str) -> float:
+        return self.contracts[base].tick_size
+
+    def step_size(self, base: str) -> float:
+        return self.contracts[base].step_size
+
+
+def now_millis() -> int:
+    return int(time.time() * 1000)
+
+
+def fmt(value: float) -> str:
+    """交易所风格的数字字符串（不用科学计数法）"""
+    return f"{value:.8f}".rstrip("0").rstrip(".") or "0"
+
+
+def _clamp(value: float, limit: float) -> float:
+    return max(-limit, min(limit, value))
+
+
+def _round_to(value: float, tick: float) -> float:
+    return round(round(value / tick) * tick, 8)
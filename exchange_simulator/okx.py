@@ -0,0 +1,358 @@
+"""
+模拟欧易 v5
+
+REST：
+    GET  /api/v5/public/time | public/instruments | public/funding-rate
+    POST /api/v5/trade/order（市价单回执后 fill_delay_ms 推送成交）
+    POST /api/v5/trade/order-algo | trade/close-position | account/set-leverage
+WS：
+    /ws/v5/public   subscribe / unsubscribe：tickers、mark-price、funding-rate；文本 ping → pong
+    /ws/v5/private  login 后 subscribe：account、orders、positions
+
+按接口限频（下单 60次/2秒 等，和限频器 BUCKET_LIMITS 一致），超了返回 429 + code 50011。
+私有接口只检查 OK-ACCESS-KEY 头，WS 登录不验签。
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from http_client.rate_limiter import BUCKET_LIMITS, OKX_BUCKETS
+
+from .common import SimulatedExchange, WsSession, json_response
+from .market import fmt, now_millis
+
+PUBLIC_CHANNELS = ("tickers", "mark-price", "funding-rate")
+PRIVATE_CHANNELS = ("account", "orders", "positions", "balance_and_position")
+
+
+def _ok(data) -> Dict[str, Any]:
+    return {"code": "0", "msg": "", "data": data}
+
+
+class OkxSimulator(SimulatedExchange):
+    """模拟欧易"""
+
+    name = "okx"
+
+    def __init__(self, market, config):
+        super().__init__(market, config)
+        self._usage: Dict[str, tuple] = {}        # 桶 -> (窗口序号, 已用)
+        self._order_ids = itertools.count(600000000000000000)
+        self._algo_ids = itertools.count(700000000000000000)
+        self.positions: Dict[str, float] = defaultdict(float)
+
+    @staticmethod
+    def inst_id(base: str) -> str:
+        return f"{base}-USDT-SWAP"
+
+    def base_of(self, inst_id: str) -> Optional[str]:
+        base = inst_id[:-len("-USDT-SWAP")] if inst_id.endswith("-USDT-SWAP") else None
+        return base if base in self.market.contracts else None
+
+    # ========== 错误 / 限频 ==========
+
+    def error_response(self, status: int, retry_after: int, reason: str) -> web.Response:
+        return json_response({"code": "50011", "msg": f"Too Many Requests ({reason})", "data": []},
+                             status=status, headers={"Retry-After": str(retry_after)})
+
+    @staticmethod
+    def _bucket(path: str) -> str:
+        for prefix, bucket in OKX_BUCKETS.items():
+            if path.startswith(prefix):
+                return bucket
+        return "default"
+
+    def check_limits(self, request: web.Request) -> Optional[web.Response]:
+        bucket = self._bucket(request.path)
+        limit, window = BUCKET_LIMITS["okx"][bucket]
+        index = int(time.time() // window)
+        current, used = self._usage.get(bucket, (index, 0))
+        used = (used if current == index else 0) + 1
+        self._usage[bucket] = (index, used)
+        if used > limit:
+            return self.error_response(429, window, f"{bucket} limit")
+        return None
+
+    def _unauthorized(self, request: web.Request) -> Optional[web.Response]:
+        if not request.headers.get("OK-ACCESS-KEY"):
+            return json_response({"code": "50103", "msg": "Request header OK-ACCESS-KEY can not be empty.",
+                                  "data": []}, status=401)
+        return None
+
+    # ========== 路由 ==========
+
+    def add_routes(self, app: web.Application):
+        r = app.router
+        r.add_get("/api/v5/public/time", self.handle_time)
+        r.add_get("/api/v5/public/instruments", self.handle_instruments)
+        r.add_get("/api/v5/public/funding-rate", self.handle_funding_rate)
+        r.add_post("/api/v5/trade/order", self.handle_order)
+        r.add_post("/api/v5/trade/order-algo", self.handle_order_algo)
+        r.add_post("/api/v5/trade/close-position", self.handle_close_position)
+        r.add_post("/api/v5/account/set-leverage", self.handle_set_leverage)
+        r.add_get("/ws/v5/public", self.handle_public_ws)
+        r.add_get("/ws/v5/private", self.handle_private_ws)
+
+    # ========== 公开接口 ==========
+
+    async def handle_time(self, request):
+        return json_response(_ok([{"ts": str(now_millis())}]))
+
+    async def handle_instruments(self, request):
+        if request.query.get("instType", "SWAP") != "SWAP":
+            return json_response(_ok([]))
+        data = [{
+            "instType": "SWAP",
+            "instId": self.inst_id(base),
+            "uly": f"{base}-USDT",
+            "instFamily": f"{base}-USDT",
+            "baseCcy": "",
+            "quoteCcy": "",
+            "settleCcy": "USDT",
+            "ctVal": "0.01" if self.market.index_price(base) > 1000 else "1",
+            "ctMult": "1",
+            "ctValCcy": base,
+            "ctType": "linear",
+            "tickSz": fmt(self.market.tick_size(base)),
+            "lotSz": "0.01",
+            "minSz": "0.01",
+            "lever": "100",
+            "state": "live",
+            "listTime": "1597026383085",
+        } for base in self.market.bases]
+        return json_response(_ok(data))
+
+    def _funding(self, base: str, now_ms: int) -> Dict[str, Any]:
+        next_time = self.market.next_funding_time(now_ms)
+        return {
+            "instType": "SWAP",
+            "instId": self.inst_id(base),
+            "fundingRate": fmt(self.market.funding_rate("okx", base)),
+            "nextFundingRate": "",
+            "fundingTime": str(next_time),
+            "nextFundingTime": str(next_time + self.market.funding_interval_ms),
+            "method": "current_period",
+            "ts": str(now_ms),
+        }
+
+    async def handle_funding_rate(self, request):
+        base = self.base_of(request.query.get("instId", ""))
+        if base is None:
+            return json_response({"code": "51001", "msg": "Instrument ID does not exist", "data": []})
+        return json_response(_ok([self._funding(base, now_millis())]))
+
+    # ========== 下单 ==========
+
+    async def _body(self, request: web.Request) -> Dict[str, Any]:
+        try:
+            return await request.json()
+        except Exception:
+            return {}
+
+    async def handle_order(self, request):
+        denied = self._unauthorized(request)
+        if denied:
+            return denied
+        body = await self._body(request)
+        base = self.base_of(body.get("instId", ""))
+        if base is None:
+            return json_response(self._rejected(body, "51001", "Instrument ID does not exist"))
+
+        order = {
+            "instId": body["instId"],
+            "ordId": str(next(self._order_ids)),
+            "clOrdId": body.get("clOrdId", ""),
+            "side": body.get("side", "buy"),
+            "posSide": body.get("posSide", "net"),
+            "ordType": body.get("ordType", "market"),
+            "sz": str(body.get("sz", "0")),
+            "reduceOnly": str(body.get("reduceOnly", "false")).lower(),
+        }
+        self.stats["orders"] += 1
+        if order["ordType"] == "market":
+            asyncio.create_task(self._fill(order, base))
+        return json_response(self._accepted({"ordId": order["ordId"], "clOrdId": order["clOrdId"],
+                                             "tag": "", "sMsg": "Order placed"}))
+
+    async def handle_order_algo(self, request):
+        denied = self._unauthorized(request)
+        if denied:
+            return denied
+        body = await self._body(request)
+        if self.base_of(body.get("instId", "")) is None:
+            return json_response(self._rejected(body, "51001", "Instrument ID does not exist"))
+        self.stats["algo_orders"] += 1
+        return json_response(self._accepted({"algoId": str(next(self._algo_ids)),
+                                             "algoClOrdId": body.get("algoClOrdId", ""), "sMsg": ""}))
+
+    async def handle_close_position(self, request):
+        denied = self._unauthorized(request)
+        if denied:
+            return denied
+        body = await self._body(request)
+        base = self.base_of(body.get("instId", ""))
+        if base is None:
+            return json_response(self._rejected(body, "51001", "Instrument ID does not exist"))
+        amount = self.positions[body["instId"]]
+        if amount:
+            order = {
+                "instId": body["instId"], "ordId": str(next(self._order_ids)),
+                "clOrdId": body.get("clOrdId", ""), "side": "sell" if amount > 0 else "buy",
+                "posSide": body.get("posSide", "net"), "ordType": "market",
+                "sz": fmt(abs(amount)), "reduceOnly": "true",
+            }
+            asyncio.create_task(self._fill(order, base))
+        return json_response(_ok([{"instId": body["instId"], "posSide": body.get("posSide", "net"),
+                                   "clOrdId": body.get("clOrdId", ""), "tag": ""}]))
+
+    async def handle_set_leverage(self, request):
+        denied = self._unauthorized(request)
+        if denied:
+            return denied
+        body = await self._body(request)
+        return json_response(_ok([{"instId": body.get("instId", ""), "lever": str(body.get("lever", "")),
+                                   "mgnMode": body.get("mgnMode", "cross"), "posSide": body.get("posSide", "")}]))
+
+    @staticmethod
+    def _accepted(item: Dict[str, Any]) -> Dict[str, Any]:
+        now = str(now_millis() * 1000)
+        return {"code": "0", "msg": "", "data": [{**item, "sCode": "0", "ts": str(now_millis())}],
+                "inTime": now, "outTime": now}
+
+    @staticmethod
+    def _rejected(body: Dict[str, Any], code: str, msg: str) -> Dict[str, Any]:
+        return {"code": "1", "msg": "Operation failed.",
+                "data": [{"ordId": "", "clOrdId": body.get("clOrdId", ""), "sCode": code, "sMsg": msg}]}
+
+    async def _fill(self, order: Dict[str, Any], base: str):
+        """市价单：先推 live，fill_delay_ms 后推 filled 和持仓变化"""
+        self._push_private("orders", [self._order_data(order, "live", 0.0, 0.0)])
+        await asyncio.sleep(self.config.get("fill_delay_ms", 50) / 1000)
+
+        price = self.market.price("okx", base)
+        size = float(order["sz"])
+        self.positions[order["instId"]] += size if order["side"] == "buy" else -size
+        self._push_private("orders", [self._order_data(order, "filled", size, price)])
+        self._push_private("positions", [{
+            "instType": "SWAP", "instId": order["instId"], "posSide": "net",
+            "pos": fmt(self.positions[order["instId"]]), "avgPx": fmt(price),
+            "markPx": fmt(self.market.mark_price("okx", base)), "mgnMode": "cross",
+            "uTime": str(now_millis()),
+        }])
+
+    @staticmethod
+    def _order_data(order: Dict[str, Any], state: str, filled: float, price: float) -> Dict[str, Any]:
+        return {
+            "instType": "SWAP", "instId": order["instId"], "ordId": order["ordId"],
+            "clOrdId": order["clOrdId"], "side": order["side"], "posSide": order["posSide"],
+            "ordType": order["ordType"], "sz": order["sz"], "state": state,
+            "accFillSz": fmt(filled), "fillSz": fmt(filled), "fillPx": fmt(price) if filled else "",
+            "avgPx": fmt(price) if filled else "", "reduceOnly": order["reduceOnly"],
+            "uTime": str(now_millis()), "cTime": str(now_millis()),
+        }
+
+    def _push_private(self, channel: str, data):
+        for session in list(self.sessions):
+            if not session.logged_in:
+                continue
+            for arg in session.subscriptions:
+                if isinstance(arg, tuple) and arg[0] == channel:
+                    session.send_json({"arg": dict(arg[1]), "data": data})
+                    break
+
+    # ========== WS ==========
+
+    async def handle_public_ws(self, request):
+        return await self.serve_ws(await self.open_ws(request))
+
+    async def handle_private_ws(self, request):
+        return await self.serve_ws(await self.open_ws(request))
+
+    async def on_text(self, session: WsSession, text: str):
+        if text == "ping":
+            self.reply_pong(session, lambda: session.ws.send_str("pong"))
+            return
+        try:
+            message = json.loads(text)
+        except json.JSONDecodeError:
+            session.send_json({"event": "error", "code": "60012", "msg": f"Invalid request: {text[:50]}"})
+            return
+
+        op = message.get("op")
+        private = session.path.endswith("/private")
+        if op == "login" and private:
+            session.logged_in = True
+            session.send_json({"event": "login", "code": "0", "msg": "", "connId": session.id})
+        elif op in ("subscribe", "unsubscribe"):
+            if private and not session.logged_in:
+                session.send_json({"event": "error", "code": "60011", "msg": "Please log in", "connId": session.id})
+                return
+            allowed = PRIVATE_CHANNELS if private else PUBLIC_CHANNELS
+            for arg in message.get("args") or []:
+                channel = arg.get("channel")
+                if channel not in allowed:
+                    session.send_json({"event": "error", "code": "60018",
+                                       "msg": f"Wrong URL or channel:{channel} doesn't exist.", "connId": session.id})
+                    continue
+                key = (channel, tuple(sorted(arg.items()))) if private else (channel, arg.get("instId"))
+                if op == "subscribe":
+                    session.subscriptions.add(key)
+                else:
+                    session.subscriptions.discard(key)
+                session.send_json({"event": op, "arg": arg, "connId": session.id})
+                if op == "subscribe" and channel == "funding-rate":
+                    base = self.base_of(arg.get("instId", ""))
+                    if base:
+                        session.send_json({"arg": arg, "data": [self._funding(base, now_millis())]})
+        else:
+            session.send_json({"event": "error", "code": "60012", "msg": f"Invalid request: {text[:50]}",
+                               "connId": session.id})
+
+    # ========== 推送 ==========
+
+    def publish(self, now_ms: int):
+        wanted = self.subscribed_keys()
+        if not wanted:
+            return
+        frames = {}
+        ts = str(now_ms)
+        for base in self.market.bases:
+            inst = self.inst_id(base)
+            if ("tickers", inst) in wanted:
+                daily = self.market.daily(base)
+                last = self.market.price("okx", base)
+                tick = self.market.tick_size(base)
+                frames[("tickers", inst)] = json.dumps({
+                    "arg": {"channel": "tickers", "instId": inst},
+                    "data": [{
+                        "instType": "SWAP", "instId": inst, "last": fmt(last), "lastSz": "1",
+                        "askPx": fmt(last + tick), "askSz": "10", "bidPx": fmt(last - tick), "bidSz": "10",
+                        "open24h": fmt(daily["open"]), "high24h": fmt(daily["high"]), "low24h": fmt(daily["low"]),
+                        "vol24h": fmt(daily["volume"]), "volCcy24h": fmt(daily["volume"] * last), "ts": ts,
+                    }],
+                }, separators=(",", ":"))
+            if ("mark-price", inst) in wanted:
+                frames[("mark-price", inst)] = json.dumps({
+                    "arg": {"channel": "mark-price", "instId": inst},
+                    "data": [{"instType": "SWAP", "instId": inst,
+                              "markPx": fmt(self.market.mark_price("okx", base)), "ts": ts}],
+                }, separators=(",", ":"))
+        self.broadcast(frames)
+
+    def publish_funding(self, now_ms: int):
+        wanted = self.subscribed_keys()
+        frames = {}
+        for base in self.market.bases:
+            inst = self.inst_id(base)
+            if ("funding-rate", inst) in wanted:
+                frames[("funding-rate", inst)] = json.dumps({
+                    "arg": {"channel": "funding-rate", "instId": inst},
+                    "data": [self._funding(base, now_ms)],
+                }, separators=(",", ":"))
+        self.broadcast(frames)
@@ -0,0 +1,188 @@
+"""
+交易所模拟器 - 启动入口
+
+币安、欧易各占一个端口（和真实环境一样按主机区分，限频器按主机记账），
+共用一份行情和一份故障参数。
+
+【运行】
+    python -m exchange_simulator
+    python -m exchange_simulator --symbols 300 --rate 5 --latency-ms 20 --jitter-ms 10
+    python -m exchange_simulator --disconnect-every 30 --error-429 0.05 --pong-delay 12
+    python -m exchange_simulator --config sim.json
+
+然后给系统设置（启动时会打印）：
+    BINANCE_SIMULATOR_URL=http://127.0.0.1:9100
+    OKX_SIMULATOR_URL=http://127.0.0.1:9101
+
+【运行中控制】（两个端口都可以）
+    GET  /sim/stats                      连接数、订阅数、推送帧数、注入的故障次数
+    GET  /sim/config                     当前配置
+    POST /sim/faults {"error_429_ratio": 0.1, "disconnect_every": 10}
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+# 允许直接 python exchange_simulator/server.py 运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exchange_endpoints import SIMULATOR_ENVS
+from exchange_simulator.binance import BinanceSimulator
+from exchange_simulator.config import load_config
+from exchange_simulator.market import Market, now_millis
+from exchange_simulator.okx import OkxSimulator
+
+logger = logging.getLogger(__name__)
+
+
+class ExchangeSimulator:
+    """两个模拟交易所 + 行情推进 + 断线注入"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.market = Market(config["symbols"], seed=config["seed"],
+                             funding_interval_hours=config["funding_interval_hours"])
+        self.exchanges = {
+            "binance": BinanceSimulator(self.market, config),
+            "okx": OkxSimulator(self.market, config),
+        }
+        self._runners: List[web.AppRunner] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def url(self, exchange: str) -> str:
+        return f"http://{self.config['host']}:{self.config[f'{exchange}_port']}"
+
+    # ========== 启停 ==========
+
+    async def start(self):
+        for name, exchange in self.exchanges.items():
+            runner = web.AppRunner(exchange.build_app(), access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, self.config["host"], self.config[f"{name}_port"])
+            await site.start()
+            self._runners.append(runner)
+
+        self._tasks = [
+            asyncio.create_task(self._market_loop()),
+            asyncio.create_task(self._funding_loop()),
+            asyncio.create_task(self._disconnect_loop()),
+        ]
+        logger.info(f"🧪【模拟器】已启动：{self.config['symbols']} 个合约，每合约 {self.config['rate']} 次/秒")
+        for name in self.exchanges:
+            logger.info(f"🧪【模拟器】{SIMULATOR_ENVS[name]}={self.url(name)}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for exchange in self.exchanges.values():
+            for session in list(exchange.sessions):
+                await session.close()
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+    # ========== 后台循环 ==========
+
+    async def _market_loop(self):
+        """按 rate 推进行情并推送"""
+        interval = 1.0 / max(self.config["rate"], 0.01)
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        while True:
+            next_at += interval
+            for base in self.market.bases:
+                self.market.step(base)
+            now_ms = now_millis()
+            for exchange in self.exchanges.values():
+                exchange.publish(now_ms)
+            # 推送跟不上时不追帧，直接从现在重新计时
+            next_at = max(next_at, loop.time())
+            await asyncio.sleep(next_at - loop.time())
+
+    async def _funding_loop(self):
+        while True:
+            await asyncio.sleep(self.config["funding_push_seconds"])
+            now_ms = now_millis()
+            for exchange in self.exchanges.values():
+                exchange.publish_funding(now_ms)
+
+    async def _disconnect_loop(self):
+        """每隔 disconnect_every 秒随机断开一条连接（运行中可改，0=关闭）"""
+        faults = self.config["faults"]
+        while True:
+            every = faults.get("disconnect_every", 0)
+            await asyncio.sleep(every if every > 0 else 1)
+            if every > 0:
+                exchange = self.exchanges[self.market.rng.choice(list(self.exchanges))]
+                await exchange.drop_random_connection()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: exchange.get_stats() for name, exchange in self.exchanges.items()}
+
+
+# ==================== 命令行 ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="本地交易所模拟器（币安 U 本位 + 欧易 v5）")
+    parser.add_argument("--config", help="JSON 配置文件（只写要改的键，见 exchange_simulator/config.py）")
+    parser.add_argument("--host")
+    parser.add_argument("--binance-port", type=int)
+    parser.add_argument("--okx-port", type=int)
+    parser.add_argument("--symbols", type=int, help="合约数量")
+    parser.add_argument("--rate", type=float, help="每个合约每秒推送次数")
+    parser.add_argument("--latency-ms", type=float, help="REST / WS 额外延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, help="延迟抖动（毫秒）")
+    parser.add_argument("--fill-delay-ms", type=float, help="市价单成交回报延迟（毫秒）")
+    parser.add_argument("--disconnect-every", type=float, help="每隔多少秒随机断开一条 WS")
+    parser.add_argument("--error-429", type=float, help="REST 随机 429 比例")
+    parser.add_argument("--error-418", type=float, help="REST 随机 418 比例（币安封IP）")
+    parser.add_argument("--pong-delay", type=float, help="pong 延迟秒数")
+    parser.add_argument("--drop-pong", type=float, help="不回 pong 的比例")
+    parser.add_argument("--no-limits", action="store_true", help="不按真实上限限频")
+    args = parser.parse_args()
+
+    config = load_config(args.config, {
+        "host": args.host,
+        "binance_port": args.binance_port,
+        "okx_port": args.okx_port,
+        "symbols": args.symbols,
+        "rate": args.rate,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "fill_delay_ms": args.fill_delay_ms,
+        "enforce_limits": False if args.no_limits else None,
+        "faults": {k: v for k, v in {
+            "disconnect_every": args.disconnect_every,
+            "error_429_ratio": args.error_429,
+            "error_418_ratio": args.error_418,
+            "pong_delay": args.pong_delay,
+            "drop_pong_ratio": args.drop_pong,
+        }.items() if v is not None},
+    })
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    async def _run():
+        simulator = ExchangeSimulator(config)
+        await simulator.start()
+        for name in simulator.exchanges:
+            print(f"export {SIMULATOR_ENVS[name]}={simulator.url(name)}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await simulator.stop()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
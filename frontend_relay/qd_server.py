@@ -12,7 +12,21 @@ import os
 from typing import List, Dict, Any, Optional
 from aiohttp import web
 
+from hot_logger import get_hot_logger, lazy
+
 logger = logging.getLogger(__name__)
+hot = get_hot_logger(__name__)
+
+
+def _describe_results(results, with_success: bool = True) -> str:
+    """执行结果逐条摘要（只在调试日志放行时才拼）"""
+    parts = []
+    for i, res in enumerate(results):
+        text = f"第{i+1}条: exchange={res.get('exchange')}, type={res.get('type')}"
+        if with_success:
+            text += f", success={res.get('success')}"
+        parts.append(text)
+    return " | ".join(parts)
 
 
 class FrontendRelayServer:
@@ -352,10 +366,10 @@ class FrontendRelayServer:
     
     async def broadcast_market_data(self, market_data):
         """广播市场数据到所有前端"""
-        logger.debug(f"📤【客户端】【市场数据推送】开始推送，客户端数: {len(self.ws_clients)}")
+        hot.debug("broadcast.market_data", "📤【客户端】【市场数据推送】开始推送，客户端数: %s", len(self.ws_clients))
         
         if not self.ws_clients:
-            logger.debug(f"⚠️【客户端】【市场数据推送】没有客户端连接，跳过推送")
+            hot.debug("broadcast.market_data.no_client", "⚠️【客户端】【市场数据推送】没有客户端连接，跳过推送")
             return
         
         message = {
@@ -368,10 +382,10 @@ class FrontendRelayServer:
     
     async def broadcast_private_data(self, private_data):
         """广播私人数据到所有前端"""
-        logger.debug(f"📤【客户端】【私人数据推送】开始推送，客户端数: {len(self.ws_clients)}")
+        hot.debug("broadcast.private_data", "📤【客户端】【私人数据推送】开始推送，客户端数: %s", len(self.ws_clients))
         
         if not self.ws_clients:
-            logger.debug(f"⚠️【客户端】【私人数据推送】没有客户端连接，跳过推送")
+            hot.debug("broadcast.private_data.no_client", "⚠️【客户端】【私人数据推送】没有客户端连接，跳过推送")
             return
         
         message = {
@@ -384,10 +398,10 @@ class FrontendRelayServer:
     
     async def broadcast_reference_data(self, reference_data):
         """广播面值数据到所有前端"""
-        logger.debug(f"📤【客户端】【面值数据推送】开始推送，客户端数: {len(self.ws_clients)}")
+        hot.debug("broadcast.reference_data", "📤【客户端】【面值数据推送】开始推送，客户端数: %s", len(self.ws_clients))
         
         if not self.ws_clients:
-            logger.debug(f"⚠️【客户端】【面值数据推送】没有客户端连接，跳过推送")
+            hot.debug("broadcast.reference_data.no_client", "⚠️【客户端】【面值数据推送】没有客户端连接，跳过推送")
             return
         
         message = {
@@ -400,10 +414,10 @@ class FrontendRelayServer:
     
     async def broadcast_system_status(self, status_data):
         """广播系统状态到所有前端"""
-        logger.debug(f"📤【客户端】【系统状态推送】开始推送，客户端数: {len(self.ws_clients)}")
+        hot.debug("broadcast.system_status", "📤【客户端】【系统状态推送】开始推送，客户端数: %s", len(self.ws_clients))
         
         if not self.ws_clients:
-            logger.debug(f"⚠️【客户端】【系统状态推送】没有客户端连接，跳过推送")
+            hot.debug("broadcast.system_status.no_client", "⚠️【客户端】【系统状态推送】没有客户端连接，跳过推送")
             return
         
         message = {
@@ -417,12 +431,11 @@ class FrontendRelayServer:
     async def broadcast_execution_results(self, results):
         """广播订单执行结果到前端"""
         # ========== 收到数据时打印 ==========
-        logger.debug(f"📥【客户端收到】results 数量: {len(results)}")
-        for i, res in enumerate(results):
-            logger.debug(f"📥【客户端收到】第{i+1}条: exchange={res.get('exchange')}, type={res.get('type')}, success={res.get('success')}")
+        hot.debug("broadcast.execution_results", "📥【客户端收到】results 数量: %s | %s",
+                  len(results), lazy(_describe_results, results), rate=5)
         
         if not self.ws_clients:
-            logger.debug(f"⚠️【客户端】【执行结果推送】没有客户端连接，跳过推送")
+            hot.debug("broadcast.execution_results.no_client", "⚠️【客户端】【执行结果推送】没有客户端连接，跳过推送")
             return
         
         message = {
@@ -432,18 +445,17 @@ class FrontendRelayServer:
         }
         
         # ========== 发送前打印 ==========
-        logger.debug(f"📤【客户端发送】准备广播: type={message['type']}, data数量={len(message['data'])}")
-        for i, res in enumerate(message['data']):
-            logger.debug(f"📤【客户端发送】第{i+1}条: exchange={res.get('exchange')}, type={res.get('type')}")
+        hot.debug("broadcast.execution_results.send", "📤【客户端发送】准备广播: type=%s, data数量=%s | %s",
+                  message['type'], len(message['data']), lazy(_describe_results, message['data'], False), rate=5)
         
         await self._safe_broadcast(message)
     
     async def broadcast_binance_ticker_24hr(self, ticker_data: Dict):
         """广播币安24小时涨跌幅数据到所有前端"""
-        logger.debug(f"📤【客户端】【涨跌幅数据推送】开始推送，客户端数: {len(self.ws_clients)}")
+        hot.debug("broadcast.ticker_24hr", "📤【客户端】【涨跌幅数据推送】开始推送，客户端数: %s", len(self.ws_clients))
         
         if not self.ws_clients:
-            logger.debug(f"⚠️【客户端】【涨跌幅数据推送】没有客户端连接，跳过推送")
+            hot.debug("broadcast.ticker_24hr.no_client", "⚠️【客户端】【涨跌幅数据推送】没有客户端连接，跳过推送")
             return
         
         message = {
@@ -462,11 +474,12 @@ class FrontendRelayServer:
         authenticated_clients = [c for c in self.ws_clients if c.get('authenticated', False)]
         
         if not authenticated_clients:
-            logger.debug(f"⚠️【客户端】【广播】没有已认证的客户端，跳过")
+            hot.debug("broadcast.no_authenticated", "⚠️【客户端】【广播】没有已认证的客户端，跳过")
             return
         
         message_type = message.get('type', 'unknown')
-        logger.debug(f"🔥【客户端】【广播开始】类型: {message_type}, 已认证客户端数: {len(authenticated_clients)}")
+        hot.debug("broadcast.start", "🔥【客户端】【广播开始】类型: %s, 已认证客户端数: %s",
+                  message_type, len(authenticated_clients))
         
         dead_clients = []
         message_json = json.dumps(message, default=str)
@@ -476,7 +489,7 @@ class FrontendRelayServer:
             client_id = client.get('client_id', 'unknown')
             try:
                 await ws.send_str(message_json)
-                logger.debug(f"✅【客户端】【广播成功】类型: {message_type}, 客户端: {client_id}")
+                hot.debug("broadcast.sent", "✅【客户端】【广播成功】类型: %s, 客户端: %s", message_type, client_id)
             except Exception as e:
                 logger.error(f"❌【客户端】【广播失败】类型: {message_type}, 客户端: {client_id}, 错误: {e}")
                 dead_clients.append(client)
@@ -490,7 +503,8 @@ class FrontendRelayServer:
             self.stats["current_connections"] = len(self.ws_clients)
         
         self.stats["messages_broadcast"] += len(authenticated_clients) - len(dead_clients)
-        logger.debug(f"✅【客户端】【广播完成】类型: {message_type}, 成功发送到 {len(authenticated_clients) - len(dead_clients)} 个客户端")
+        hot.debug("broadcast.done", "✅【客户端】【广播完成】类型: %s, 成功发送到 %s 个客户端",
+                  message_type, len(authenticated_clients) - len(dead_clients))
     
     # ==================== 辅助方法 ====================
     
@@ -11,32 +11,48 @@ qd_server 收到前端 get_stats 指令
 转发给 StatsHandler.handle(ws, data, client_id)
         ↓
 StatsHandler 自己：
-    1. 解析时间范围
-    2. 连接 MongoDB，查询 closed_positions 集合
-    3. 按交易所分组 → 配对筛选（套利 vs 单边）
+    1. 解析时间范围，先查结果缓存
+    2. MongoDB 聚合查询 closed_positions：按时间过滤、只取统计字段、
+       按 (开仓合约名, 交易所) 分组、组内按开仓时间排序
+    3. 每个合约组内排序归并配对（套利 vs 单边），O(n log n)
     4. 计算 15 个统计指标
     5. 调用 ws.send_json() 把结果推给前端
 
+【结果缓存】
+- 按时间范围缓存结果（模块级，所有 StatsHandler 实例共用）
+- 有新的平仓记录写入（数据库存储区的历史表版本号变化）时整体失效
+- today/week/month 的起止时间随当前时间移动，额外设 RELATIVE_RANGE_TTL 过期
+- 所有缓存最多保留 CACHE_MAX_AGE 秒（兜底：写入方不在本进程时也能刷新）
+- 最多保留 CACHE_MAX_ENTRIES 个时间范围：写入时先清掉失效的，仍超出就淘汰最久没用的
+
 【依赖说明】
 - 只依赖环境变量 MONGODB_URI
 - 不依赖大脑实例、不依赖存储区
-- 按需连接 MongoDB，用完即关
+- 使用进程共享的异步 MongoDB 连接池（data_completion_department/mongo_pool.py），
+  不再每次请求新建连接
 
 【可调参数】
 - TIME_DIFF_THRESHOLD = 60  # 套利配对时间差阈值（秒）
 - LEVERAGE = 20             # 固定杠杆倍数
 - FEE_RATE = 0.001          # 手续费率 0.1%（开仓+平仓合计）
 - DECIMAL_PLACES = 4        # 保留小数位数
+- RELATIVE_RANGE_TTL = 60   # 相对时间范围缓存有效期（秒）
+- CACHE_MAX_AGE = 600       # 所有缓存最长有效期（秒）
+- CACHE_MAX_ENTRIES = 64    # 缓存最多保留的时间范围数
 ======================================================================
 """
 
 import os
+import time
+import bisect
 import asyncio
 import logging
 import json
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
-from pymongo import MongoClient
+
+from data_completion_department.mongo_pool import get_mongo_db
+from data_completion_department.database import get_closed_positions_version
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +61,18 @@ TIME_DIFF_THRESHOLD = 60  # 套利配对时间差阈值（秒）
 LEVERAGE = 20             # 固定杠杆倍数
 FEE_RATE = 0.001          # 手续费率 0.1%（开仓+平仓合计）
 DECIMAL_PLACES = 4        # 保留小数位数
+RELATIVE_RANGE_TTL = 60   # 相对时间范围缓存有效期（秒）
+CACHE_MAX_AGE = 600       # 所有缓存最长有效期（秒）
+CACHE_MAX_ENTRIES = 64    # 缓存最多保留的时间范围数（自定义范围的键不可枚举）
+
+TIME_FORMAT = '%Y.%m.%d %H:%M:%S'
+
+# 统计只需要这些字段，聚合时只投影它们
+STATS_FIELDS = ('交易所', '开仓合约名', '开仓时间', '平仓时间', '开仓保证金', '累计资金费', '平仓收益')
+
+# ==================== 结果缓存（模块级）====================
+# key=缓存键，value=(历史表版本号, 写入时间monotonic, 有效期秒, 结果)
+_summary_cache: Dict[Tuple, Tuple[int, float, float, Dict[str, Any]]] = {}
 
 
 class StatsHandler:
@@ -110,30 +138,72 @@ class StatsHandler:
     async def _get_summary(self, range_param: str) -> Dict[str, Any]:
         """按预设范围查询"""
         start_time, end_time = self._parse_time_range(range_param)
-        return await self._get_summary_by_range(start_time, end_time)
+        ttl = CACHE_MAX_AGE if range_param == 'all' else RELATIVE_RANGE_TTL
+        return await self._get_summary_by_range(start_time, end_time, cache_key=('preset', range_param), ttl=ttl)
     
-    async def _get_summary_by_range(self, start_time: Optional[str], end_time: Optional[str]) -> Dict[str, Any]:
-        """按自定义范围查询"""
-        # 1. 从 MongoDB 查询数据
-        records = await self._fetch_records(start_time, end_time)
-        logger.info(f"   从数据库读取 {len(records)} 条记录")
+    async def _get_summary_by_range(self, start_time: Optional[str], end_time: Optional[str],
+                                    cache_key: Optional[Tuple] = None,
+                                    ttl: float = CACHE_MAX_AGE) -> Dict[str, Any]:
+        """按自定义范围查询（带缓存）"""
+        if cache_key is None:
+            cache_key = ('range', start_time, end_time)
         
-        if not records:
-            return self._empty_result()
+        # 1. 查缓存
+        version = get_closed_positions_version()
+        cached = self._get_cached(cache_key, version)
+        if cached is not None:
+            logger.info(f"   命中统计缓存: {cache_key}")
+            return cached
         
-        # 2. 按交易所分组
-        okx_records, binance_records = self._group_by_exchange(records)
-        logger.debug(f"   欧易: {len(okx_records)} 条, 币安: {len(binance_records)} 条")
+        # 2. 从 MongoDB 聚合查询（已按合约+交易所分组）
+        groups = await self._fetch_grouped_records(start_time, end_time)
+        logger.info(f"   从数据库读取 {sum(len(v) for v in groups.values())} 条记录，{len(groups)} 组")
         
         # 3. 配对筛选
-        okx_paired, binance_paired = self._match_pairs(okx_records, binance_records)
+        okx_paired, binance_paired = self._match_pairs(groups)
         logger.info(f"   配对成功: 欧易 {len(okx_paired)} 条, 币安 {len(binance_paired)} 条")
         
+        # 4. 计算指标
         if not okx_paired or not binance_paired:
-            return self._empty_result()
+            result = self._empty_result()
+        else:
+            result = self._calculate(okx_paired, binance_paired)
         
-        # 4. 计算指标
-        return self._calculate(okx_paired, binance_paired)
+        self._put_cached(cache_key, version, ttl, result)
+        return result
+    
+    # ==================== 结果缓存 ====================
+    
+    def _get_cached(self, cache_key: Tuple, version: int) -> Optional[Dict[str, Any]]:
+        """读取缓存：版本号一致且未过期才返回"""
+        entry = _summary_cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        cached_version, cached_at, ttl, result = entry
+        if cached_version != version or time.monotonic() - cached_at > ttl:
+            del _summary_cache[cache_key]
+            return None
+        # 命中的挪到末尾，淘汰时从最久没用的开始
+        _summary_cache[cache_key] = _summary_cache.pop(cache_key)
+        return result
+    
+    def _put_cached(self, cache_key: Tuple, version: int, ttl: float, result: Dict[str, Any]):
+        """写入缓存：先清掉失效条目，仍超过 CACHE_MAX_ENTRIES 就淘汰最久没用的"""
+        now = time.monotonic()
+        _summary_cache.pop(cache_key, None)
+        if len(_summary_cache) >= CACHE_MAX_ENTRIES:
+            for key, (cached_version, cached_at, cached_ttl, _) in list(_summary_cache.items()):
+                if cached_version != version or now - cached_at > cached_ttl:
+                    del _summary_cache[key]
+        while len(_summary_cache) >= CACHE_MAX_ENTRIES:
+            del _summary_cache[next(iter(_summary_cache))]
+        _summary_cache[cache_key] = (version, now, min(ttl, CACHE_MAX_AGE), result)
+    
+    @staticmethod
+    def clear_cache():
+        """清空统计缓存"""
+        _summary_cache.clear()
     
     # ==================== 时间范围解析 ====================
     
@@ -154,121 +224,155 @@ class StatsHandler:
         else:
             return None, None
         
-        format_str = '%Y.%m.%d %H:%M:%S'
-        return start_time.strftime(format_str), end_time.strftime(format_str)
+        return start_time.strftime(TIME_FORMAT), end_time.strftime(TIME_FORMAT)
     
     # ==================== 数据库查询 ====================
     
-    async def _fetch_records(self, start_time: Optional[str], end_time: Optional[str]) -> List[Dict]:
-        """从 MongoDB 的 closed_positions 集合查询数据"""
+    async def _fetch_grouped_records(self, start_time: Optional[str],
+                                     end_time: Optional[str]) -> Dict[Tuple[str, str], List[Dict]]:
+        """
+        从 MongoDB 的 closed_positions 集合聚合查询数据
+        ==================================================
+        在数据库端完成：
+            1. 按平仓时间过滤、去掉缺少合约名/开仓时间的记录
+            2. 只投影统计需要的字段
+            3. 按 (开仓合约名, 开仓时间) 排序（走复合索引）
+            4. 按 (开仓合约名, 小写交易所) 分组
+        
+        :return: {(合约名, 交易所): [记录, ...]}，组内按开仓时间升序
+        ==================================================
+        """
         if not self.mongo_uri:
             logger.error("❌ 【数据统计处理器】MONGODB_URI 未设置")
-            return []
-        
-        loop = asyncio.get_event_loop()
-        client = None
+            return {}
         
         try:
-            client = await loop.run_in_executor(
-                None,
-                lambda: MongoClient(self.mongo_uri, serverSelectionTimeoutMS=5000)
-            )
-            
-            db = client["trading_db"]
+            db = await get_mongo_db(mongo_uri=self.mongo_uri)
             collection = db["closed_positions"]
             
-            query_filter = {}
+            query_filter = {
+                "开仓合约名": {"$nin": [None, ""]},
+                "开仓时间": {"$nin": [None, ""]},
+            }
             if start_time and end_time:
                 query_filter["平仓时间"] = {"$gte": start_time, "$lte": end_time}
             
-            cursor = await loop.run_in_executor(
-                None,
-                lambda: collection.find(query_filter).sort("平仓时间", -1)
-            )
-            
-            records = await loop.run_in_executor(None, lambda: list(cursor))
+            pipeline = [
+                {"$match": query_filter},
+                {"$project": {"_id": 0, **{field: 1 for field in STATS_FIELDS}}},
+                {"$sort": {"开仓合约名": 1, "开仓时间": 1}},
+                {"$group": {
+                    "_id": {
+                        "contract": "$开仓合约名",
+                        "exchange": {"$toLower": {"$ifNull": ["$交易所", ""]}},
+                    },
+                    "records": {"$push": "$$ROOT"},
+                }},
+            ]
             
-            for record in records:
-                if '_id' in record:
-                    del record['_id']
+            cursor = collection.aggregate(pipeline, allowDiskUse=True)
+            if asyncio.iscoroutine(cursor):
+                # PyMongo 异步API的 aggregate 是协程，Motor 直接返回游标
+                cursor = await cursor
             
-            return records
+            groups = {}
+            async for group in cursor:
+                key = group["_id"]
+                if key["exchange"] in ('okx', 'binance'):
+                    groups[(key["contract"], key["exchange"])] = group["records"]
+            return groups
             
         except Exception as e:
             logger.error(f"❌ 【数据统计处理器】查询数据库失败: {e}")
-            return []
-        finally:
-            if client:
-                await loop.run_in_executor(None, client.close)
-    
-    # ==================== 数据分组 ====================
-    
-    def _group_by_exchange(self, records: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
-        """按交易所分组"""
-        okx_records = []
-        binance_records = []
-        
-        for record in records:
-            exchange = record.get('交易所', '').lower()
-            if exchange == 'okx':
-                okx_records.append(record)
-            elif exchange == 'binance':
-                binance_records.append(record)
-        
-        return okx_records, binance_records
+            return {}
     
     # ==================== 配对算法 ====================
     
-    def _match_pairs(self, okx_records: List[Dict], binance_records: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
-        """配对筛选：时间差 ≤ 60秒 + 合约名相同"""
+    def _match_pairs(self, groups: Dict[Tuple[str, str], List[Dict]]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        配对筛选：时间差 ≤ 60秒 + 合约名相同
+        ==================================================
+        每个合约组内做排序归并：
+            - 开仓时间只解析一次
+            - 币安记录按开仓时间排好序，欧易每条记录用二分查找最近的币安记录
+            - 欧易按平仓时间倒序依次配对（与原来逐条扫描的顺序一致），
+              配上的币安记录在跳转表里标记为已用，找邻居时直接跳过
+        总复杂度 O(n log n)
+        ==================================================
+        """
         okx_paired = []
         binance_paired = []
-        available_binance = list(binance_records)
         
-        for okx in okx_records:
-            okx_contract = okx.get('开仓合约名', '')
-            okx_open_time = okx.get('开仓时间', '')
-            
-            if not okx_contract or not okx_open_time:
+        for (contract, exchange), okx_records in groups.items():
+            if exchange != 'okx':
+                continue
+            binance_records = groups.get((contract, 'binance'))
+            if not okx_records or not binance_records:
                 continue
             
-            best_match = None
-            best_diff = float('inf')
-            best_index = -1
+            # 币安候选：按开仓时间升序；配上的只做标记，不从列表中间删（删一次 O(n)）
+            candidates = self._sorted_by_open_time(binance_records)
+            times = [ts for ts, _ in candidates]
+            count = len(times)
+            # 并查集式跳转表：right[i] = i 及其右侧第一个未配对下标（count 表示没有），
+            # left[i + 1] = i 及其左侧第一个未配对下标（-1 表示没有）
+            right = list(range(count + 1))
+            left = list(range(-1, count))
             
-            for i, binance in enumerate(available_binance):
-                binance_contract = binance.get('开仓合约名', '')
-                binance_open_time = binance.get('开仓时间', '')
-                
-                if not binance_contract or not binance_open_time:
-                    continue
-                
-                if okx_contract != binance_contract:
+            # 欧易按平仓时间倒序依次配对
+            for okx in sorted(okx_records, key=lambda r: r.get('平仓时间') or '', reverse=True):
+                okx_ts = self._parse_time(okx.get('开仓时间'))
+                if okx_ts is None:
                     continue
                 
-                time_diff = self._time_diff_seconds(okx_open_time, binance_open_time)
+                # 最近的未配对币安记录只可能在插入点左右两侧
+                index = bisect.bisect_left(times, okx_ts)
+                best_index = -1
+                best_diff = float('inf')
+                for i in (self._find_free(left, index - 1, 1), self._find_free(right, index, 0)):
+                    if 0 <= i < count:
+                        diff = abs(times[i] - okx_ts)
+                        if diff < best_diff:
+                            best_diff = diff
+                            best_index = i
                 
-                if time_diff < best_diff:
-                    best_diff = time_diff
-                    best_match = binance
-                    best_index = i
-            
-            if best_match is not None and best_diff <= TIME_DIFF_THRESHOLD:
-                okx_paired.append(okx)
-                binance_paired.append(best_match)
-                available_binance.pop(best_index)
+                if best_index >= 0 and best_diff <= TIME_DIFF_THRESHOLD:
+                    okx_paired.append(okx)
+                    binance_paired.append(candidates[best_index][1])
+                    right[best_index] = best_index + 1
+                    left[best_index + 1] = best_index - 1
         
         return okx_paired, binance_paired
     
-    def _time_diff_seconds(self, time_str1: str, time_str2: str) -> float:
-        """计算两个时间字符串的差值（秒）"""
+    @staticmethod
+    def _find_free(jump: List[int], index: int, offset: int) -> int:
+        """顺着跳转表找 index 方向上第一个未配对下标，顺带压缩路径（均摊近似 O(1)）"""
+        root = index
+        while jump[root + offset] != root:
+            root = jump[root + offset]
+        while jump[index + offset] != root:
+            jump[index + offset], index = root, jump[index + offset]
+        return root
+    
+    def _sorted_by_open_time(self, records: List[Dict]) -> List[Tuple[float, Dict]]:
+        """把记录按解析后的开仓时间升序排列，返回 [(时间戳, 记录)]，解析失败的丢弃"""
+        parsed = []
+        for record in records:
+            ts = self._parse_time(record.get('开仓时间'))
+            if ts is not None:
+                parsed.append((ts, record))
+        parsed.sort(key=lambda item: item[0])
+        return parsed
+    
+    @staticmethod
+    def _parse_time(time_str: Optional[str]) -> Optional[float]:
+        """把 'YYYY.MM.DD HH:MM:SS' 解析成时间戳（秒），失败返回None"""
+        if not time_str:
+            return None
         try:
-            fmt = '%Y.%m.%d %H:%M:%S'
-            dt1 = datetime.strptime(time_str1, fmt)
-            dt2 = datetime.strptime(time_str2, fmt)
-            return abs((dt1 - dt2).total_seconds())
-        except Exception:
-            return float('inf')
+            return datetime.strptime(time_str, TIME_FORMAT).timestamp()
+        except (TypeError, ValueError):
+            return None
     
     # ==================== 指标计算 ====================
     
@@ -0,0 +1,206 @@
+"""
+热路径日志 - 按调用点限流 / 采样 / 惰性求值
+
+行情回调、流水线步骤、前端广播这类每秒跑成百上千次的地方，原来各自手写
+last_log_time / process_count 来控制频率，而且很多 f-string 在级别判断之前就拼好了
+（DEBUG 关着也要付格式化的钱）。这里统一成一个门卫：
+
+1. 先判断级别，没开的级别直接返回，不拼字符串
+2. 每个调用点（site，调用方起的短名字）一个令牌桶：every=N 秒最多一条，
+   或 rate=每秒条数 + burst=突发条数
+3. sample=0.01 这样的采样比例：每 100 次放行 1 次（按计数，不用随机数）
+4. 参数用 %s 占位（格式化在日志专员线程里做）；要现算的值用 lazy(函数, 参数...) 包起来，
+   只有真的放行时才在调用方线程求值
+5. 被压掉的条数按调用点累计，下一条放行时在末尾带上"(+N 条已抑制)"，
+   总数在 /api/monitor/metrics 的 hot_logs 里查看
+
+使用方式：
+    from hot_logger import get_hot_logger, lazy
+    hot = get_hot_logger(__name__)
+
+    hot.info("step1.done", "✅【流水线步骤1】过滤完成，共提取 %s 条", len(results), every=120)
+    hot.debug("broadcast.sent", "✅【客户端】【广播成功】%s -> %s", msg_type, client_id, rate=5)
+    hot.info("callback.flow", "已接收 %s 条", lazy(format, count, ","), every=60)
+
+    # 一整段日志共用一个门卫
+    if hot.allow("step2.report", every=180):
+        ...
+
+计数器（替代挂在函数上的计数属性）：
+    received = hot.count("callback.received")
+
+调用点状态只在放行判断时做几次加减，不加锁；多线程并发时计数可能有少量误差，不影响限流效果。
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_RATE = 1.0        # 没有指定限流参数时：每秒 1 条
+DEFAULT_BURST = 5         # 突发 5 条
+
+
+class lazy:
+    """惰性参数：放行时才调用 fn(*args)"""
+
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def __call__(self):
+        return self.fn(*self.args)
+
+
+class _Site:
+    """一个调用点的令牌桶和计数"""
+
+    __slots__ = ("rate", "burst", "sample_every", "tokens", "updated",
+                 "seen", "emitted", "suppressed", "pending")
+
+    def __init__(self, every: Optional[float], rate: Optional[float],
+                 burst: Optional[int], sample: Optional[float]):
+        if every is not None:
+            self.rate = 1.0 / every if every > 0 else None
+            self.burst = burst or 1
+        elif rate is not None:
+            self.rate = rate if rate > 0 else None
+            self.burst = burst or max(1, int(rate))
+        elif sample is not None:
+            self.rate = None              # 只采样，不限流
+            self.burst = 1
+        else:
+            self.rate = DEFAULT_RATE
+            self.burst = burst or DEFAULT_BURST
+        self.sample_every = max(1, int(round(1 / sample))) if sample else 1
+        self.tokens = float(self.burst)   # 第一次总是放行
+        self.updated = time.monotonic()
+        self.seen = 0
+        self.emitted = 0
+        self.suppressed = 0
+        self.pending = 0                  # 上次放行之后被压掉的条数
+
+    def admit(self) -> bool:
+        self.seen += 1
+        if self.sample_every > 1 and (self.seen - 1) % self.sample_every:
+            self.suppressed += 1
+            self.pending += 1
+            return False
+        if self.rate is not None:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                self.suppressed += 1
+                self.pending += 1
+                return False
+            self.tokens -= 1
+        self.emitted += 1
+        return True
+
+
+# (logger名, 调用点) -> _Site，全进程共享，供指标汇总
+_sites: Dict[Tuple[str, str], _Site] = {}
+_counters: Dict[Tuple[str, str], int] = {}
+_hot_loggers: Dict[str, "HotLogger"] = {}
+
+
+class HotLogger:
+    """包装一个标准 logger，按调用点限流（见 get_hot_logger）"""
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.name = logger.name
+
+    # ========== 门卫 ==========
+
+    def _site(self, site: str, every, rate, burst, sample) -> _Site:
+        key = (self.name, site)
+        state = _sites.get(key)
+        if state is None:
+            # 限流参数以调用点第一次调用为准
+            state = _sites[key] = _Site(every, rate, burst, sample)
+        return state
+
+    def allow(self, site: str, every: Optional[float] = None, rate: Optional[float] = None,
+              burst: Optional[int] = None, sample: Optional[float] = None,
+              level: int = logging.INFO) -> bool:
+        """这个调用点这次是否放行（一整段日志共用一个门卫时用）"""
+        if not self.logger.isEnabledFor(level):
+            return False
+        return self._site(site, every, rate, burst, sample).admit()
+
+    def log(self, level: int, site: str, msg: str, *args,
+            every: Optional[float] = None, rate: Optional[float] = None,
+            burst: Optional[int] = None, sample: Optional[float] = None,
+            exc_info=None, _stacklevel: int = 2):
+        """
+        限流后写一条日志。_stacklevel 让日志里的文件名 / 行号指向业务调用点：
+        直接调 log() 时是 2（log 的调用方），经 debug()/info() 等转一层时由它们传 3
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        state = self._site(site, every, rate, burst, sample)
+        if not state.admit():
+            return
+
+        if args:
+            args = tuple(a() if isinstance(a, lazy) else a for a in args)
+        if state.pending:
+            if not args:
+                msg = msg.replace("%", "%%")
+            msg = f"{msg} (+%d 条已抑制)"
+            args = args + (state.pending,)
+            state.pending = 0
+        self.logger.log(level, msg, *args, exc_info=exc_info, stacklevel=_stacklevel)
+
+    def debug(self, site: str, msg: str, *args, **limits):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.log(logging.DEBUG, site, msg, *args, _stacklevel=3, **limits)
+
+    def info(self, site: str, msg: str, *args, **limits):
+        if self.logger.isEnabledFor(logging.INFO):
+            self.log(logging.INFO, site, msg, *args, _stacklevel=3, **limits)
+
+    def warning(self, site: str, msg: str, *args, **limits):
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.log(logging.WARNING, site, msg, *args, _stacklevel=3, **limits)
+
+    def error(self, site: str, msg: str, *args, **limits):
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.log(logging.ERROR, site, msg, *args, _stacklevel=3, **limits)
+
+    # ========== 计数器 ==========
+
+    def count(self, site: str, n: int = 1) -> int:
+        """累加并返回该调用点的计数"""
+        key = (self.name, site)
+        value = _counters.get(key, 0) + n
+        _counters[key] = value
+        return value
+
+
+def get_hot_logger(name: str) -> HotLogger:
+    """按 logger 名取热路径日志（同名共用一个）"""
+    hot = _hot_loggers.get(name)
+    if hot is None:
+        hot = _hot_loggers[name] = HotLogger(logging.getLogger(name))
+    return hot
+
+
+def get_hot_log_stats() -> Dict[str, Any]:
+    """每个调用点的调用 / 放行 / 抑制次数，以及计数器当前值"""
+    sites = {
+        f"{name}:{site}": {
+            "seen": state.seen,
+            "emitted": state.emitted,
+            "suppressed": state.suppressed,
+        }
+        for (name, site), state in list(_sites.items())
+    }
+    return {
+        "total_suppressed": sum(s["suppressed"] for s in sites.values()),
+        "sites": sites,
+        "counters": {f"{name}:{site}": value for (name, site), value in list(_counters.items())},
+    }
@@ -0,0 +1,13 @@
+"""
+共享HTTP客户端模块
+所有公共获取器、listenKey、保活 ping 共用按主机复用的连接池
+（下单走 http_server/order_gateway.py 自己的连接池，不和后台请求抢连接）
+交易所REST权重由 rate_limiter 统一记账，下单优先
+"""
+from .rate_limiter import PRIORITY_BACKGROUND, PRIORITY_ORDER, RateLimiter, get_rate_limiter
+from .registry import HttpClientRegistry, HttpResponse, get_http_client
+
+__all__ = [
+    'HttpClientRegistry', 'HttpResponse', 'get_http_client',
+    'RateLimiter', 'get_rate_limiter', 'PRIORITY_ORDER', 'PRIORITY_BACKGROUND',
+]
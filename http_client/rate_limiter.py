@@ -0,0 +1,357 @@
+# http_client/rate_limiter.py
+"""
+交易所REST限频器 - 全进程共用的权重令牌桶
+
+币安按 IP 统计每分钟权重（期货 2400/分钟），下单另有账户级订单数限制；
+欧易按接口分别限频（如下单 60次/2秒）。原来各个调用方（账户轮询、历史费率、
+24小时行情、合约信息、listenKey 续期、下单）各跑各的，互相不知道对方用了多少，
+撞上限就是 429，继续撞就是 418 封IP。
+
+这里按 (交易所, 接口类别) 维护令牌桶：
+1. 请求前按接口权重扣令牌，不够就等（acquire）
+2. 响应后按交易所返回的用量头校准（observe）：
+   币安 X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-10S / X-MBX-ORDER-COUNT-1M
+   429 / 418 带 Retry-After 时整个桶停用到期满
+   欧易不返回用量头，429 或 code 50011 时按该接口的窗口冷却
+3. 下单优先：后台请求（行情、账户轮询等）必须给下单留出 RESERVE_RATIO 的余量，
+   被封期间后台请求等到解封，下单不等（交易所会直接拒绝，由下单工人按错误处理）
+
+使用方式（共享HTTP客户端、下单网关已自动接入，自己持有会话的调用方手动调用）：
+    limiter = get_rate_limiter()
+    await limiter.acquire(url, "GET")                       # 后台请求
+    await limiter.acquire(url, "POST", priority=PRIORITY_ORDER)
+    ...发请求...
+    limiter.observe(url, status, headers, text)
+
+当前预算在 /api/monitor/metrics 的 rate_limits 里查看。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import urllib.parse
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from exchange_endpoints import simulator_hosts
+from latency_stats import summarize
+
+logger = logging.getLogger(__name__)
+
+
+PRIORITY_ORDER = "order"              # 下单：只要令牌够就发，不受后台余量、封禁等待限制
+PRIORITY_BACKGROUND = "background"    # 后台：行情、账户轮询、listenKey 等
+
+SAFETY_RATIO = 0.9        # 只用交易所上限的 90%（用量头有延迟、还有在途请求）
+RESERVE_RATIO = 0.2       # 后台请求必须给下单留下的余量（占桶容量）
+ORDER_MAX_WAIT = 1.0      # 下单最多等令牌多少秒，超过直接发（让交易所裁决）
+WAIT_HISTORY = 200        # 每个桶保留最近多少次等待的耗时
+
+# 主机 -> 限频账本（测试网和正式网分开计数）
+HOST_EXCHANGES = {
+    "fapi.binance.com": "binance",
+    "testnet.binancefuture.com": "binance_testnet",
+    "www.okx.com": "okx",
+}
+# 本地交易所模拟器按对应交易所的账本计数（见 exchange_endpoints.py）
+HOST_EXCHANGES.update(simulator_hosts())
+
+# 各交易所的桶：名称 -> (上限, 窗口秒)
+BUCKET_LIMITS = {
+    "binance": {
+        "weight": (2400, 60),
+        "orders_10s": (300, 10),
+        "orders_1m": (1200, 60),
+    },
+    "okx": {
+        "trade_order": (60, 2),
+        "trade_algo": (20, 2),
+        "trade_close": (20, 2),
+        "account_leverage": (20, 2),
+        "public_instruments": (20, 2),
+        "public_time": (10, 2),
+        "default": (10, 2),
+    },
+}
+
+# 币安用量头（小写）-> 桶
+BINANCE_USAGE_HEADERS = {
+    "x-mbx-used-weight-1m": "weight",
+    "x-mbx-order-count-10s": "orders_10s",
+    "x-mbx-order-count-1m": "orders_1m",
+}
+
+# 币安接口权重（IP权重），没列出的按 1
+BINANCE_WEIGHTS = {
+    "/fapi/v1/ticker/24hr": 40,       # 不带 symbol 全量
+    "/fapi/v1/fundingRate": 10,
+    "/fapi/v3/account": 5,
+    "/fapi/v2/account": 5,
+    "/fapi/v1/exchangeInfo": 1,
+}
+
+# 币安计入订单数的接口（POST 下单 / 条件单）
+BINANCE_ORDER_PATHS = ("/fapi/v1/order", "/fapi/v1/algoOrder")
+
+# 欧易接口 -> 桶（前缀匹配，没列出的进 default）
+OKX_BUCKETS = {
+    "/api/v5/trade/order-algo": "trade_algo",
+    "/api/v5/trade/close-position": "trade_close",
+    "/api/v5/trade/order": "trade_order",
+    "/api/v5/account/set-leverage": "account_leverage",
+    "/api/v5/public/instruments": "public_instruments",
+    "/api/v5/public/time": "public_time",
+}
+
+# 欧易限频错误码
+OKX_RATE_LIMIT_CODES = ('"50011"', '"50061"')
+
+
+class _Bucket:
+    """单个令牌桶（按窗口匀速回填）"""
+
+    __slots__ = ("limit", "window", "capacity", "rate", "tokens", "updated",
+                 "blocked_until", "reported_used", "reported_at",
+                 "acquired", "waits", "wait_ms", "throttled", "forced")
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.capacity = limit * SAFETY_RATIO
+        self.rate = self.capacity / window
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0          # monotonic
+        self.reported_used: Optional[int] = None
+        self.reported_at: Optional[float] = None
+        self.acquired = 0
+        self.waits = 0
+        self.wait_ms = deque(maxlen=WAIT_HISTORY)
+        self.throttled = 0                # 收到 429 / 418 次数
+        self.forced = 0                   # 下单等满 ORDER_MAX_WAIT 后强发次数
+
+    def refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+
+class RateLimiter:
+    """交易所限频器（进程内单例，见 get_rate_limiter）"""
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        # 同步包装会在别的线程里跑临时事件循环，令牌计算用线程锁（临界区很短）
+        self._lock = threading.Lock()
+
+    # ========== 分类 ==========
+
+    @staticmethod
+    def exchange_for(url: str) -> Optional[str]:
+        """URL 属于哪个限频账本（不认识的主机返回 None，不限频）"""
+        return HOST_EXCHANGES.get(urllib.parse.urlsplit(url).netloc)
+
+    def classify(self, url: str, method: str = "GET") -> Tuple[Optional[str], List[Tuple[str, float]]]:
+        """
+        返回 (账本, [(桶, 消耗)])
+
+        币安：所有请求扣 IP 权重；POST 下单 / 条件单额外扣订单数
+        欧易：每个接口一个桶，每次请求扣 1
+        """
+        exchange = self.exchange_for(url)
+        if exchange is None:
+            return None, []
+        path = urllib.parse.urlsplit(url).path
+
+        if exchange.startswith("binance"):
+            costs = [("weight", BINANCE_WEIGHTS.get(path, 1))]
+            if method.upper() == "POST" and path in BINANCE_ORDER_PATHS:
+                costs += [("orders_10s", 1), ("orders_1m", 1)]
+            return exchange, costs
+
+        for prefix, bucket in OKX_BUCKETS.items():
+            if path.startswith(prefix):
+                return exchange, [(bucket, 1)]
+        return exchange, [("default", 1)]
+
+    def _bucket(self, exchange: str, name: str) -> _Bucket:
+        key = (exchange, name)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit, window = BUCKET_LIMITS[exchange.split("_")[0]][name]
+            bucket = self._buckets[key] = _Bucket(limit, window)
+        return bucket
+
+    # ========== 取令牌 ==========
+
+    async def acquire(self, url: str, method: str = "GET",
+                      priority: str = PRIORITY_BACKGROUND,
+                      wait_ban: bool = True) -> float:
+        """
+        请求前取令牌（不够就等）
+
+        参数:
+            url / method: 用来判断交易所和接口权重
+            priority: PRIORITY_ORDER / PRIORITY_BACKGROUND
+            wait_ban: 后台请求遇到封禁是否等到解封（418 后换连接重试时传 False）
+        返回: 等待时间（毫秒）
+        """
+        exchange, costs = self.classify(url, method)
+        if not costs:
+            return 0.0
+
+        is_order = priority == PRIORITY_ORDER
+        start = time.monotonic()
+        slept = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                buckets = [(self._bucket(exchange, name), cost) for name, cost in costs]
+                delay = 0.0
+                for bucket, cost in buckets:
+                    bucket.refill(now)
+                    if not is_order and wait_ban and bucket.blocked_until > now:
+                        delay = max(delay, bucket.blocked_until - now)
+                        continue
+                    reserve = 0.0 if is_order else bucket.capacity * RESERVE_RATIO
+                    # 单次消耗超过桶的可用范围时只要求桶满
+                    need = min(cost + reserve, bucket.capacity)
+                    if bucket.tokens < need:
+                        delay = max(delay, (need - bucket.tokens) / bucket.rate)
+
+                if is_order and delay > 0 and now - start + delay > ORDER_MAX_WAIT:
+                    for bucket, _ in buckets:
+                        bucket.forced += 1
+                    logger.warning(f"⚠️【限频器】{exchange} 下单令牌不足，已等待 {(now - start) * 1000:.0f}ms，直接发送")
+                    delay = 0.0
+
+                if delay <= 0:
+                    waited_ms = (now - start) * 1000 if slept else 0.0
+                    for bucket, cost in buckets:
+                        bucket.tokens -= cost
+                        bucket.acquired += 1
+                        if slept:
+                            bucket.waits += 1
+                            bucket.wait_ms.append(round(waited_ms, 3))
+                    return waited_ms
+
+            if is_order:
+                delay = min(delay, ORDER_MAX_WAIT)
+            elif delay > 5:
+                logger.info(f"⏳【限频器】{exchange} {urllib.parse.urlsplit(url).path} 等待 {delay:.1f} 秒")
+            await asyncio.sleep(delay)
+            slept = True
+
+    # ========== 校准 ==========
+
+    def observe(self, url: str, status: int, headers: Optional[Dict[str, Any]] = None,
+                text: Optional[str] = None):
+        """
+        响应后按交易所返回校准
+
+        参数:
+            status: HTTP 状态码
+            headers: 响应头（大小写不限）
+            text: 响应体（欧易限频错误码在 body 里）
+        """
+        exchange, costs = self.classify(url)
+        if exchange is None:
+            return
+        lowered = {str(k).lower(): v for k, v in (headers or {}).items()}
+        retry_after = self._retry_after(lowered.get("retry-after"))
+
+        with self._lock:
+            now = time.monotonic()
+
+            if exchange.startswith("binance"):
+                for header, name in BINANCE_USAGE_HEADERS.items():
+                    used = self._to_int(lowered.get(header))
+                    if used is None:
+                        continue
+                    bucket = self._bucket(exchange, name)
+                    bucket.refill(now)
+                    remaining = bucket.capacity - used
+                    if bucket.reported_used is not None and used < bucket.reported_used:
+                        # 交易所的窗口翻篇了，以交易所为准
+                        bucket.tokens = remaining
+                    else:
+                        bucket.tokens = min(bucket.tokens, remaining)
+                    bucket.reported_used = used
+                    bucket.reported_at = time.time()
+
+                if status in (418, 429):
+                    self._throttle(exchange, "weight", f"HTTP {status}", retry_after, now)
+                return
+
+            # 欧易：没有用量头，只能按 429 / 限频错误码冷却
+            if status == 429:
+                reason = "HTTP 429"
+            elif text and any(code in text for code in OKX_RATE_LIMIT_CODES):
+                reason = "限频错误码"
+            else:
+                return
+            for name, _ in costs:
+                self._throttle(exchange, name, reason, retry_after, now)
+
+    def _throttle(self, exchange: str, name: str, reason: str,
+                  retry_after: Optional[float], now: float):
+        bucket = self._bucket(exchange, name)
+        cooldown = retry_after if retry_after is not None else bucket.window
+        bucket.tokens = 0.0
+        bucket.updated = now
+        bucket.blocked_until = max(bucket.blocked_until, now + cooldown)
+        bucket.throttled += 1
+        logger.warning(f"🚫【限频器】{exchange}/{name} 被限频（{reason}），后台请求暂停 {cooldown:.0f} 秒")
+
+    @staticmethod
+    def _to_int(value) -> Optional[int]:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _retry_after(value) -> Optional[float]:
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return None
+
+    # ========== 指标 ==========
+
+    def get_budget(self) -> Dict[str, Any]:
+        """每个桶的上限、可用令牌、交易所报告的用量、封禁剩余、等待统计"""
+
+        result: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            now = time.monotonic()
+            for (exchange, name), bucket in sorted(self._buckets.items()):
+                bucket.refill(now)
+                result.setdefault(exchange, {})[name] = {
+                    "limit": bucket.limit,
+                    "window_seconds": bucket.window,
+                    "capacity": round(bucket.capacity, 1),
+                    "available": round(max(0.0, bucket.tokens), 1),
+                    "reported_used": bucket.reported_used,
+                    "reported_at": bucket.reported_at,
+                    "blocked_seconds": round(max(0.0, bucket.blocked_until - now), 1),
+                    "acquired": bucket.acquired,
+                    "waits": bucket.waits,
+                    "wait_ms": summarize(bucket.wait_ms),
+                    "throttled": bucket.throttled,
+                    "forced_orders": bucket.forced,
+                }
+        return result
+
+
+# ==================== 全局单例 ====================
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """获取全局限频器"""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter()
+    return _limiter
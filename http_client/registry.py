@@ -0,0 +1,227 @@
+# http_client/registry.py
+"""
+共享HTTP客户端 - 按主机复用连接池
+
+替代各个获取器"每次请求 async with aiohttp.ClientSession()"的做法：
+1. 每个主机一个常驻 ClientSession（keep-alive 连接池，不再每次重新握手 TCP + TLS）
+2. DNS 结果缓存（ttl_dns_cache）
+3. 每个主机限制并发请求数（HOST_CONCURRENCY）
+4. 每个请求记录耗时（首字节、总耗时），按主机统计 p50 / p95 / max
+5. 交易所主机的请求自动经过限频器（见 rate_limiter.py）：发送前扣权重，响应后按用量头校准
+
+"换新连接重试"（418 被封后换IP）保留为显式选项：
+    await client.request("GET", url, fresh_connection=True)
+这时不走连接池，用一次性会话（不复用连接、不用 DNS 缓存），用完即关。
+
+使用方式：
+    from http_client import get_http_client
+
+    resp = await get_http_client().request("GET", url, params=..., timeout=10)
+    resp.status / resp.text / resp.json()
+
+会话和事件循环绑定：同一主机在不同事件循环里（如同步包装里临时建的循环）各有一个会话，
+循环关闭后对应会话自动丢弃。
+"""
+
+import asyncio
+import json
+import logging
+import time
+import urllib.parse
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from latency_stats import summarize
+
+from .rate_limiter import PRIORITY_BACKGROUND, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+POOL_LIMIT_PER_HOST = 10      # 每个主机连接池上限
+HOST_CONCURRENCY = 8          # 每个主机同时在途的请求数上限
+KEEPALIVE_TIMEOUT = 60        # 空闲连接保持时间（秒）
+DNS_CACHE_TTL = 300           # DNS 缓存时间（秒）
+DEFAULT_TIMEOUT = 30          # 默认总超时（秒，调用方可以按请求覆盖）
+
+METRICS_HISTORY = 200         # 每个主机保留最近多少条请求的耗时记录
+
+
+class HttpResponse:
+    """响应（已读完body，连接已归还连接池）"""
+
+    __slots__ = ("status", "text", "headers", "timing")
+
+    def __init__(self, status: int, text: str, headers: Dict[str, str], timing: Dict[str, Any]):
+        self.status = status
+        self.text = text
+        self.headers = headers
+        self.timing = timing
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class HttpClientRegistry:
+    """按主机管理的共享会话（进程内单例，见 get_http_client）"""
+
+    def __init__(self):
+        # (主机, 事件循环) -> 会话 / 并发信号量
+        self._sessions: Dict[Tuple[str, asyncio.AbstractEventLoop], aiohttp.ClientSession] = {}
+        self._semaphores: Dict[Tuple[str, asyncio.AbstractEventLoop], asyncio.Semaphore] = {}
+
+        self._timings: Dict[str, deque] = {}
+        self._errors: Dict[str, int] = {}
+        self._fresh_connections: Dict[str, int] = {}
+
+    # ========== 会话 ==========
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urllib.parse.urlsplit(url).netloc
+
+    def _prune_closed_loops(self):
+        for key in [k for k in self._sessions if k[1].is_closed()]:
+            self._sessions.pop(key, None)
+            self._semaphores.pop(key, None)
+
+    def session_for(self, url: str) -> aiohttp.ClientSession:
+        """
+        取该主机的常驻会话（懒加载，当前事件循环）
+
+        需要流式读取等特殊用法时直接用会话；不要 close 它。
+        """
+        loop = asyncio.get_running_loop()
+        key = (self.host_of(url), loop)
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            self._prune_closed_loops()
+            connector = aiohttp.TCPConnector(
+                limit_per_host=POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT),
+            )
+            self._sessions[key] = session
+            self._semaphores[key] = asyncio.Semaphore(HOST_CONCURRENCY)
+            logger.info(f"🔌【共享HTTP】{key[0]} 连接池已创建 | 每主机上限 {POOL_LIMIT_PER_HOST} | 并发 {HOST_CONCURRENCY}")
+        return session
+
+    async def close(self):
+        """关闭当前事件循环里的所有会话"""
+        loop = asyncio.get_running_loop()
+        for key in [k for k in self._sessions if k[1] is loop]:
+            session = self._sessions.pop(key)
+            self._semaphores.pop(key, None)
+            if not session.closed:
+                await session.close()
+        logger.info("🔌【共享HTTP】连接池已关闭")
+
+    # ========== 请求 ==========
+
+    async def request(self, method: str, url: str,
+                      params: Optional[Dict] = None,
+                      data: Any = None,
+                      json_body: Any = None,
+                      headers: Optional[Dict] = None,
+                      timeout: Optional[float] = None,
+                      fresh_connection: bool = False,
+                      endpoint: Optional[str] = None,
+                      priority: str = PRIORITY_BACKGROUND) -> HttpResponse:
+        """
+        发送请求并读完响应
+
+        参数:
+            method: GET / POST / PUT / DELETE
+            url: 完整URL
+            params: URL查询参数
+            data / json_body: 请求体（二选一）
+            headers: 请求头
+            timeout: 本次请求总超时（秒），默认 DEFAULT_TIMEOUT
+            fresh_connection: True = 不走连接池，新建连接（418 后换IP重试用）
+            endpoint: 指标里记录的接口名（默认取URL路径）
+            priority: 限频优先级（默认后台；换新连接时不等封禁解除）
+        异常:
+            asyncio.TimeoutError / aiohttp.ClientError 原样抛出，调用方按原来的方式处理
+        """
+        host = self.host_of(url)
+        request_timeout = aiohttp.ClientTimeout(total=timeout or DEFAULT_TIMEOUT)
+        kwargs = dict(params=params, data=data, json=json_body, headers=headers, timeout=request_timeout)
+
+        limiter = get_rate_limiter()
+        await limiter.acquire(url, method, priority=priority, wait_ban=not fresh_connection)
+
+        start = time.perf_counter()
+        try:
+            if fresh_connection:
+                self._fresh_connections[host] = self._fresh_connections.get(host, 0) + 1
+                connector = aiohttp.TCPConnector(force_close=True, use_dns_cache=False)
+                async with aiohttp.ClientSession(connector=connector) as session:
+                    status, text, response_headers, first_byte = await self._send(session, method, url, kwargs)
+            else:
+                session = self.session_for(url)
+                async with self._semaphores[(host, asyncio.get_running_loop())]:
+                    start = time.perf_counter()
+                    status, text, response_headers, first_byte = await self._send(session, method, url, kwargs)
+        except Exception:
+            self._errors[host] = self._errors.get(host, 0) + 1
+            raise
+
+        finished = time.perf_counter()
+        limiter.observe(url, status, response_headers, text)
+        timing = {
+            "endpoint": endpoint or urllib.parse.urlsplit(url).path,
+            "status": status,
+            "fresh": fresh_connection,
+            "ttfb_ms": round((first_byte - start) * 1000, 3),
+            "total_ms": round((finished - start) * 1000, 3),
+            "at": time.time(),
+        }
+        self._timings.setdefault(host, deque(maxlen=METRICS_HISTORY)).append(timing)
+        return HttpResponse(status, text, response_headers, timing)
+
+    @staticmethod
+    async def _send(session: aiohttp.ClientSession, method: str, url: str, kwargs: Dict) -> tuple:
+        async with session.request(method, url, **kwargs) as response:
+            first_byte = time.perf_counter()
+            text = await response.text()
+            return response.status, text, dict(response.headers), first_byte
+
+    async def get(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request("GET", url, **kwargs)
+
+    # ========== 指标 ==========
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """每个主机的请求数、错误数、首字节 / 总耗时 p50 / p95 / max"""
+
+        result = {}
+        for host in set(self._timings) | set(self._errors):
+            records = list(self._timings.get(host, ()))
+            result[host] = {
+                "requests": len(records),
+                "errors": self._errors.get(host, 0),
+                "fresh_connections": self._fresh_connections.get(host, 0),
+                "pooled_sessions": sum(1 for k in self._sessions if k[0] == host),
+                "ttfb_ms": summarize(t["ttfb_ms"] for t in records),
+                "total_ms": summarize(t["total_ms"] for t in records),
+                "recent": records[-3:],
+            }
+        return result
+
+
+# ==================== 全局单例 ====================
+_registry: Optional[HttpClientRegistry] = None
+
+
+def get_http_client() -> HttpClientRegistry:
+    """获取全局共享HTTP客户端"""
+    global _registry
+    if _registry is None:
+        _registry = HttpClientRegistry()
+    return _registry
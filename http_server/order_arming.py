@@ -0,0 +1,206 @@
+# http_server/order_arming.py
+"""
+订单预装（arming）- 预签名模板
+
+把"下单前能做的事"全部提前做完，发射时只剩：盖时间戳 → 签名 → 发出去。
+
+预装阶段（arm）：
+1. 校验订单（交易所 / 类型 / 必填字段）
+2. 确定接口路径、请求方法、固定请求头
+3. 带上客户端订单号（client_id，见 order_lifecycle.CLIENT_ID_PARAMS；订单里已有的不覆盖）
+4. 预编码请求体：
+   - 币安：参数按字母排序、百分比编码好，只在 timestamp 的排序位置留空
+   - 欧易：请求体 JSON 序列化好
+5. 缓存 HMAC 密钥（SigningKey：已装好密钥的 hmac 对象，签名时 copy 一份再 update）
+
+发射阶段（sign）：
+- 币安：把 timestamp=xxx 插进预留位置 → HMAC-SHA256(hex) → 拼 &signature=
+- 欧易：timestamp + method + endpoint + body → HMAC-SHA256(base64) → 写请求头
+
+签名规则与原来 Trader 里的实现完全一致（币安 2026-01-15 新规：先对整串做百分比编码、保留 = 和 &，再签名）。
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+import urllib.parse
+from typing import Any, Dict, Optional, Tuple
+
+
+# ========== 接口路由 ==========
+BINANCE_ENDPOINTS = {
+    "set_leverage": "/fapi/v1/leverage",
+    "open_market": "/fapi/v1/order",
+    "algo_order": "/fapi/v1/algoOrder",
+    "close_position": "/fapi/v1/order",
+}
+
+OKX_ENDPOINTS = {
+    "set_leverage": "/api/v5/account/set-leverage",
+    "open_market": "/api/v5/trade/order",
+    "oco": "/api/v5/trade/order-algo",
+    "close_position": "/api/v5/trade/close-position",
+}
+
+# 每个交易所必填的参数（预装时校验，缺了直接判失败，不发请求）
+REQUIRED_PARAMS = {
+    "binance": ("symbol",),
+    "okx": ("instId",),
+}
+
+BINANCE_RECV_WINDOW = 5000
+
+
+class ArmingError(Exception):
+    """预装失败（订单不合法 / 凭证不完整）"""
+
+
+class SigningKey:
+    """
+    缓存的签名密钥
+
+    hmac.new() 每次都要处理一遍密钥（ipad/opad），这里只做一次，
+    签名时 copy() 已装好密钥的对象再 update 消息。
+    """
+
+    __slots__ = ("exchange", "api_key", "passphrase", "_mac")
+
+    def __init__(self, exchange: str, creds: Dict[str, Any]):
+        api_key = creds.get("api_key")
+        api_secret = creds.get("api_secret")
+        if not api_key or not api_secret:
+            raise ArmingError(f"{exchange} API凭证不完整")
+
+        self.exchange = exchange
+        self.api_key = api_key
+        self.passphrase = creds.get("passphrase", "") or ""
+        self._mac = hmac.new(api_secret.encode(), digestmod=hashlib.sha256)
+
+    def digest(self, message: str) -> bytes:
+        mac = self._mac.copy()
+        mac.update(message.encode())
+        return mac.digest()
+
+    def hexdigest(self, message: str) -> str:
+        mac = self._mac.copy()
+        mac.update(message.encode())
+        return mac.hexdigest()
+
+
+class ArmedOrder:
+    """
+    一条已预装的订单（一个腿）
+
+    sign(timestamp) 返回 (url, body, headers)，可以直接交给 OrderGateway。
+    """
+
+    __slots__ = (
+        "order", "exchange", "order_type", "method", "endpoint", "url",
+        "key", "armed_at", "client_id", "_headers", "_prefix", "_suffix", "_body",
+    )
+
+    def __init__(self, order: Dict[str, Any], key: SigningKey, base_url: str,
+                 simulated: Optional[str] = None,
+                 client_id: Optional[str] = None, client_id_param: Optional[str] = None):
+        exchange = order.get("exchange")
+        order_type = order.get("type")
+        params = order.get("params")
+
+        if not isinstance(params, dict):
+            raise ArmingError(f"{exchange}/{order_type} 缺少 params")
+        for field in REQUIRED_PARAMS.get(exchange, ()):
+            if params.get(field) in (None, ""):
+                raise ArmingError(f"{exchange}/{order_type} 缺少必填参数 {field}")
+
+        self.order = order
+        self.exchange = exchange
+        self.order_type = order_type
+        self.method = "POST"
+        self.key = key
+        self.armed_at = time.time()
+        self._prefix = self._suffix = self._body = ""
+
+        # 客户端订单号：订单里已经带了就用订单里的
+        self.client_id = None
+        if client_id_param:
+            if params.get(client_id_param):
+                self.client_id = str(params[client_id_param])
+            elif client_id:
+                params = dict(params, **{client_id_param: client_id})
+                self.client_id = client_id
+
+        if exchange == "binance":
+            endpoint = BINANCE_ENDPOINTS.get(order_type)
+            if endpoint is None:
+                raise ArmingError(f"币安未知 order_type: {order_type}")
+            self._arm_binance(params)
+            self._headers = {
+                "X-MBX-APIKEY": key.api_key,
+                "Content-Type": "application/x-www-form-urlencoded",
+            }
+        elif exchange == "okx":
+            endpoint = OKX_ENDPOINTS.get(order_type)
+            if endpoint is None:
+                raise ArmingError(f"欧易未知 order_type: {order_type}")
+            self._arm_okx(params)
+            self._headers = {
+                "OK-ACCESS-KEY": key.api_key,
+                "OK-ACCESS-PASSPHRASE": key.passphrase,
+                "Content-Type": "application/json",
+                "x-simulated-trading": simulated or "0",
+            }
+        else:
+            raise ArmingError(f"未知交易所: {exchange}")
+
+        self.endpoint = endpoint
+        self.url = base_url + endpoint
+
+    # ========== 预装 ==========
+
+    def _arm_binance(self, params: Dict[str, Any]):
+        """排序 + 编码好除 timestamp 以外的所有参数，记住 timestamp 的插入位置"""
+        sign_params = {k: v for k, v in params.items() if k not in ('signature', 'timestamp')}
+        sign_params['recvWindow'] = BINANCE_RECV_WINDOW
+
+        before = [(k, v) for k, v in sorted(sign_params.items()) if k < 'timestamp']
+        after = [(k, v) for k, v in sorted(sign_params.items()) if k > 'timestamp']
+
+        # "=" 和 "&" 本来就不编码，所以分段编码和整串编码结果一样
+        self._prefix = urllib.parse.quote("&".join(f"{k}={v}" for k, v in before), safe='=&')
+        self._suffix = urllib.parse.quote("&".join(f"{k}={v}" for k, v in after), safe='=&')
+
+    def _arm_okx(self, params: Dict[str, Any]):
+        body_params = params.copy()
+        if self.order_type == "open_market" and 'sz' in body_params:
+            body_params['sz'] = round(float(body_params['sz']), 8)
+        self._body = json.dumps(body_params)
+
+    # ========== 发射 ==========
+
+    def sign(self, timestamp) -> Tuple[str, str, Dict[str, str]]:
+        """
+        盖时间戳并签名
+
+        参数:
+            timestamp: 币安为毫秒整数（已校准偏移），欧易为 ISO 字符串
+        返回:
+            (url, body, headers)
+        """
+        if self.exchange == "binance":
+            parts = [p for p in (self._prefix, f"timestamp={timestamp}", self._suffix) if p]
+            payload = "&".join(parts)
+            body = payload + "&signature=" + self.key.hexdigest(payload)
+            return self.url, body, self._headers
+
+        sign_str = f"{timestamp}{self.method}{self.endpoint}{self._body}"
+        headers = dict(self._headers)
+        headers["OK-ACCESS-SIGN"] = base64.b64encode(self.key.digest(sign_str)).decode()
+        headers["OK-ACCESS-TIMESTAMP"] = timestamp
+        return self.url, self._body, headers
+
+    def describe(self) -> Dict[str, Any]:
+        """日志 / 指标用的简要信息（不含密钥）"""
+        return {"exchange": self.exchange, "type": self.order_type, "endpoint": self.endpoint,
+                "client_order_id": self.client_id}
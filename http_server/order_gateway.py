@@ -0,0 +1,278 @@
+# http_server/order_gateway.py
+"""
+下单HTTP网关 - 持久连接池 + 延迟指标
+
+替代原来"线程池里 import requests 再 post"的做法：
+1. 每个交易所一个常驻 aiohttp.ClientSession（keep-alive 连接池，下单不再每次握手TLS）
+2. DNS 结果缓存（ttl_dns_cache）
+3. 所有请求都有明确超时（连接超时 + 读超时 + 总超时）
+4. 预热：在关键时间窗口（第55分平仓、第57分开仓）之前提前建好连接
+5. 每个请求记录分段延迟：DNS、建连（TCP+TLS）、首字节（TTFB）、总耗时、是否复用连接
+6. 和后台请求共用交易所限频器（http_client/rate_limiter.py），下单按最高优先级取令牌
+
+使用方式：
+    gateway = OrderGateway()
+    resp = await gateway.request("binance", "POST", url, data=..., headers=...)
+    resp.status / resp.text / resp.json()
+    await gateway.close()
+"""
+
+import asyncio
+import json
+import logging
+import time
+import urllib.parse
+from collections import deque
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from exchange_endpoints import rest_url
+from latency_stats import summarize
+from http_client import PRIORITY_ORDER, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+# ========== 每个交易所的连接配置 ==========
+EXCHANGES = ("binance", "okx")
+
+# 预热用的轻量接口（服务器时间）
+WARMUP_URLS = {
+    "binance": rest_url("binance", "https://fapi.binance.com") + "/fapi/v1/time",
+    "okx": rest_url("okx", "https://www.okx.com") + "/api/v5/public/time",
+}
+
+POOL_LIMIT_PER_HOST = 10      # 每个主机最多并发连接数
+KEEPALIVE_TIMEOUT = 60        # 空闲连接保持时间（秒）
+DNS_CACHE_TTL = 300           # DNS 缓存时间（秒）
+
+CONNECT_TIMEOUT = 3           # 建连超时（秒，含TLS）
+READ_TIMEOUT = 5              # 读超时（秒）
+TOTAL_TIMEOUT = 10            # 总超时（秒）
+
+METRICS_HISTORY = 200         # 每个交易所保留最近多少条请求的延迟记录
+
+
+class GatewayResponse:
+    """网关响应（已读完body，连接已归还连接池）"""
+
+    __slots__ = ("status", "text", "headers", "timing")
+
+    def __init__(self, status: int, text: str, headers: Dict[str, str], timing: Dict[str, Any]):
+        self.status = status
+        self.text = text
+        self.headers = headers
+        self.timing = timing
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class OrderGateway:
+    """
+    下单HTTP网关
+
+    每个交易所一个 ClientSession，在第一次使用时（在当前事件循环里）创建。
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._timeout = aiohttp.ClientTimeout(
+            total=TOTAL_TIMEOUT,
+            sock_connect=CONNECT_TIMEOUT,
+            sock_read=READ_TIMEOUT,
+        )
+
+        # 每个交易所最近的请求延迟记录
+        self._timings: Dict[str, deque] = {
+            exchange: deque(maxlen=METRICS_HISTORY) for exchange in EXCHANGES
+        }
+        self._error_counts: Dict[str, int] = {exchange: 0 for exchange in EXCHANGES}
+
+    # ========== 连接池 ==========
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """请求分段计时（结果写进 trace_request_ctx 字典）"""
+        trace = aiohttp.TraceConfig()
+
+        def _now() -> float:
+            return time.perf_counter()
+
+        async def on_request_start(session, ctx, params):
+            ctx.trace_request_ctx["request_start"] = _now()
+
+        async def on_dns_start(session, ctx, params):
+            ctx.trace_request_ctx["dns_start"] = _now()
+
+        async def on_dns_end(session, ctx, params):
+            ctx.trace_request_ctx["dns_end"] = _now()
+
+        async def on_dns_cache_hit(session, ctx, params):
+            ctx.trace_request_ctx["dns_cache_hit"] = True
+
+        async def on_conn_start(session, ctx, params):
+            ctx.trace_request_ctx["connect_start"] = _now()
+
+        async def on_conn_end(session, ctx, params):
+            ctx.trace_request_ctx["connect_end"] = _now()
+
+        async def on_conn_reuse(session, ctx, params):
+            ctx.trace_request_ctx["reused"] = True
+
+        async def on_headers_sent(session, ctx, params):
+            ctx.trace_request_ctx["headers_sent"] = _now()
+
+        async def on_request_end(session, ctx, params):
+            ctx.trace_request_ctx["response_start"] = _now()
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_dns_resolvehost_start.append(on_dns_start)
+        trace.on_dns_resolvehost_end.append(on_dns_end)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_connection_create_start.append(on_conn_start)
+        trace.on_connection_create_end.append(on_conn_end)
+        trace.on_connection_reuseconn.append(on_conn_reuse)
+        trace.on_request_headers_sent.append(on_headers_sent)
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+    def _get_session(self, exchange: str) -> aiohttp.ClientSession:
+        """获取交易所的常驻会话（懒加载）"""
+        session = self._sessions.get(exchange)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._timeout,
+                trace_configs=[self._build_trace_config()],
+            )
+            self._sessions[exchange] = session
+            logger.info(f"🔌【下单网关】{exchange} 连接池已创建 | 每主机上限 {POOL_LIMIT_PER_HOST} | keep-alive {KEEPALIVE_TIMEOUT}s")
+        return session
+
+    async def close(self):
+        """关闭所有连接池"""
+        for exchange, session in list(self._sessions.items()):
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+        logger.info("🔌【下单网关】所有连接池已关闭")
+
+    # ========== 请求 ==========
+
+    async def request(self, exchange: str, method: str, url: str,
+                      data: Optional[str] = None,
+                      params: Optional[Dict] = None,
+                      headers: Optional[Dict] = None,
+                      endpoint: Optional[str] = None) -> GatewayResponse:
+        """
+        发送请求并读完响应
+
+        参数:
+            exchange: 交易所（决定用哪个连接池）
+            method: GET / POST / PUT / DELETE
+            url: 完整URL
+            data: 请求体（已编码好的字符串）
+            params: URL查询参数
+            headers: 请求头
+            endpoint: 用于指标记录的接口名（默认取URL路径）
+        """
+        session = self._get_session(exchange)
+        limiter = get_rate_limiter()
+        await limiter.acquire(url, method, priority=PRIORITY_ORDER)
+        trace_ctx: Dict[str, Any] = {"reused": False, "dns_cache_hit": False}
+
+        try:
+            async with session.request(method, url, data=data, params=params,
+                                       headers=headers, trace_request_ctx=trace_ctx) as response:
+                text = await response.text()
+                status = response.status
+                response_headers = dict(response.headers)
+        except Exception:
+            self._error_counts[exchange] = self._error_counts.get(exchange, 0) + 1
+            raise
+
+        limiter.observe(url, status, response_headers, text)
+        endpoint = endpoint or urllib.parse.urlsplit(url).path
+        timing = self._record_timing(exchange, endpoint, status, trace_ctx, time.perf_counter())
+        return GatewayResponse(status, text, response_headers, timing)
+
+    def _record_timing(self, exchange: str, endpoint: str, status: int,
+                       ctx: Dict[str, Any], finished: float) -> Dict[str, Any]:
+        """把一次请求的分段耗时写进环形缓冲"""
+
+        def _span(start_key: str, end_key: str) -> Optional[float]:
+            start, end = ctx.get(start_key), ctx.get(end_key)
+            if start is None or end is None:
+                return None
+            return round((end - start) * 1000, 3)
+
+        timing = {
+            "endpoint": endpoint,
+            "status": status,
+            "reused": ctx.get("reused", False),
+            "dns_ms": _span("dns_start", "dns_end"),
+            "connect_ms": _span("connect_start", "connect_end"),   # TCP + TLS 握手
+            "ttfb_ms": _span("headers_sent", "response_start"),    # 请求发出 → 响应头到达
+            "total_ms": round((finished - ctx["request_start"]) * 1000, 3) if "request_start" in ctx else None,
+            "sent_at": ctx.get("headers_sent"),                    # 请求头发出时刻（perf_counter），算两腿时差用
+            "at": time.time(),
+        }
+        self._timings.setdefault(exchange, deque(maxlen=METRICS_HISTORY)).append(timing)
+        return timing
+
+    # ========== 预热 ==========
+
+    async def prewarm(self, exchange: str, connections: int = 2):
+        """
+        提前建好连接（并发请求服务器时间接口，连接留在 keep-alive 池里）
+
+        参数:
+            exchange: 交易所
+            connections: 预热的连接数（并发请求数）
+        """
+        url = WARMUP_URLS.get(exchange)
+        if not url:
+            return
+
+        async def _one():
+            try:
+                await self.request(exchange, "GET", url, endpoint="warmup")
+            except Exception as e:
+                logger.warning(f"⚠️【下单网关】{exchange} 预热失败: {e}")
+
+        await asyncio.gather(*[_one() for _ in range(max(1, connections))])
+        logger.debug(f"🔥【下单网关】{exchange} 已预热 {connections} 个连接")
+
+    async def prewarm_all(self, connections: int = 2):
+        """预热所有交易所"""
+        await asyncio.gather(*[self.prewarm(exchange, connections) for exchange in WARMUP_URLS])
+
+    # ========== 指标 ==========
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        获取每个交易所的延迟指标（最近 METRICS_HISTORY 条请求）
+
+        返回每段耗时的 p50 / p95 / max，以及连接复用率
+        """
+
+        result = {}
+        for exchange, timings in self._timings.items():
+            records = list(timings)
+            result[exchange] = {
+                "requests": len(records),
+                "errors": self._error_counts.get(exchange, 0),
+                "reuse_rate": round(sum(1 for t in records if t["reused"]) / len(records), 3) if records else None,
+                "dns_ms": summarize(t["dns_ms"] for t in records),
+                "connect_ms": summarize(t["connect_ms"] for t in records),
+                "ttfb_ms": summarize(t["ttfb_ms"] for t in records),
+                "total_ms": summarize(t["total_ms"] for t in records),
+                "recent": records[-5:],
+            }
+        return result
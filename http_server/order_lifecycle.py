@@ -0,0 +1,221 @@
+# http_server/order_lifecycle.py
+"""
+订单生命周期追踪 - 决策 → 发出 → 回执 → 成交
+
+每条腿预装时分配一个客户端订单号（client order id），随订单一起发给交易所：
+- 币安：newClientOrderId（普通单）/ clientAlgoId（条件单）
+- 欧易：clOrdId（下单 / 市价全平）/ algoClOrdId（OCO）
+
+成交回报从私人 WebSocket 进来（PrivateDataProcessor 的订单监听），按客户端订单号
+和 REST 回执对上，一条腿记录四个时间点（本地时间）：
+    decided_at  大脑把订单交给下单工人
+    sent_at     已签名、交给 HTTP 网关
+    ack_at      收到 REST 回执
+    fill_at     私人 WS 推来完全成交
+
+延迟（毫秒）：queue_ms = 决策→发出，ack_ms = 发出→回执，fill_ms = 发出→成交，
+total_ms = 决策→成交。按 "交易所/订单类型" 分组统计，保留最近 LIFECYCLE_HISTORY 条。
+
+注意：市价单的 WS 成交回报经常比 REST 回执先到，两者到达顺序不限。
+"""
+
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from latency_stats import summarize
+
+logger = logging.getLogger(__name__)
+
+
+# 每种订单用哪个参数带客户端订单号（没有的不分配，如设置杠杆）
+CLIENT_ID_PARAMS = {
+    ("binance", "open_market"): "newClientOrderId",
+    ("binance", "close_position"): "newClientOrderId",
+    ("binance", "algo_order"): "clientAlgoId",
+    ("okx", "open_market"): "clOrdId",
+    ("okx", "close_position"): "clOrdId",
+    ("okx", "oco"): "algoClOrdId",
+}
+
+# 这些订单会立即成交，要等 WS 成交回报；其它订单收到回执就结束
+FILL_ORDER_TYPES = ("open_market", "close_position")
+
+FILL_TIMEOUT_SECONDS = 60       # 回执后多久没等到成交回报就按"未见成交"结束
+LIFECYCLE_HISTORY = 200         # 保留最近多少条已结束的记录
+CLIENT_ID_PREFIX = "sb"         # 客户端订单号前缀（欧易要求字母开头、只含字母数字）
+
+
+def _ms(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return round((end - start) * 1000, 3)
+
+
+class OrderLifecycleTracker:
+    """订单生命周期追踪（下单工人持有一个）"""
+
+    def __init__(self):
+        self._seq = itertools.count(1)
+        self._open: Dict[str, Dict[str, Any]] = {}        # client_id -> 进行中的记录
+        self._completed = deque(maxlen=LIFECYCLE_HISTORY)
+        self.unmatched_fills = 0
+
+    # ========== 客户端订单号 ==========
+
+    def new_client_id(self) -> str:
+        """生成客户端订单号（≤ 32 位字母数字，币安、欧易通用）"""
+        return f"{CLIENT_ID_PREFIX}{int(time.time() * 1000):x}{next(self._seq) % 0xfffff:05x}"
+
+    @staticmethod
+    def client_id_param(exchange: str, order_type: str) -> Optional[str]:
+        return CLIENT_ID_PARAMS.get((exchange, order_type))
+
+    # ========== 生命周期 ==========
+
+    def open(self, client_id: str, exchange: str, order_type: str,
+             symbol: Optional[str] = None, decided_at: Optional[float] = None):
+        """预装时登记一条腿"""
+        self._expire()
+        self._open[client_id] = {
+            "client_order_id": client_id,
+            "exchange": exchange,
+            "type": order_type,
+            "symbol": symbol,
+            "decided_at": decided_at,
+            "sent_at": None,
+            "ack_at": None,
+            "fill_at": None,
+            "ack_success": None,
+            "order_id": None,
+            "status": "armed",
+        }
+
+    def mark_sent(self, client_id: Optional[str]):
+        record = self._open.get(client_id)
+        if record is not None:
+            record["sent_at"] = time.time()
+            record["status"] = "sent"
+
+    def mark_ack(self, client_id: Optional[str], success: bool, order_id: Any = None):
+        """收到 REST 回执（或发送失败）"""
+        record = self._open.get(client_id)
+        if record is None:
+            return
+        record["ack_at"] = time.time()
+        record["ack_success"] = bool(success)
+        if order_id is not None:
+            record["order_id"] = order_id
+
+        if not success:
+            self._finish(client_id, "rejected")
+        elif record["type"] not in FILL_ORDER_TYPES:
+            self._finish(client_id, "acked")
+        elif record["fill_at"] is not None:
+            self._finish(client_id, "filled")
+        else:
+            record["status"] = "acked"
+
+    def discard(self, client_id: Optional[str], reason: str = "discarded"):
+        """预装后没有发射（作废 / 过期）"""
+        if client_id in self._open:
+            self._finish(client_id, reason)
+
+    # ========== 私人 WS 成交回报 ==========
+
+    def on_ws_order_event(self, exchange: str, raw: Dict[str, Any]):
+        """
+        私人 WS 订单推送（PrivateDataProcessor 订单监听回调）
+
+        币安：ORDER_TRADE_UPDATE，o.c = 客户端订单号，o.X = 状态
+        欧易：orders 频道，data[].clOrdId / data[].state
+        """
+        received_at = time.time()
+        if not self._open or not isinstance(raw, dict):
+            return
+
+        if exchange == "binance":
+            o = raw.get("o") or {}
+            events = [(o.get("c"), o.get("X") == "FILLED", o.get("i"))]
+        elif exchange == "okx":
+            events = [(d.get("clOrdId"), d.get("state") == "filled", d.get("ordId"))
+                      for d in raw.get("data") or [] if isinstance(d, dict)]
+        else:
+            return
+
+        for client_id, filled, order_id in events:
+            if not filled:
+                continue
+            record = self._open.get(client_id)
+            if record is None:
+                if client_id and client_id.startswith(CLIENT_ID_PREFIX):
+                    self.unmatched_fills += 1
+                continue
+            record["fill_at"] = received_at
+            if record["order_id"] is None:
+                record["order_id"] = order_id
+            # 回执还没到：先记下成交时间，等回执到了再结束
+            if record["ack_at"] is not None:
+                self._finish(client_id, "filled")
+
+    # ========== 结束 / 过期 ==========
+
+    def _finish(self, client_id: str, status: str):
+        record = self._open.pop(client_id, None)
+        if record is None:
+            return
+        record["status"] = status
+        record["queue_ms"] = _ms(record["decided_at"], record["sent_at"])
+        record["ack_ms"] = _ms(record["sent_at"], record["ack_at"])
+        record["fill_ms"] = _ms(record["sent_at"], record["fill_at"])
+        record["total_ms"] = _ms(record["decided_at"], record["fill_at"] or record["ack_at"])
+        self._completed.append(record)
+
+        if status == "filled":
+            logger.info(
+                f"⏱️【订单追踪】{record['exchange']}/{record['type']} {client_id} 成交 | "
+                f"排队 {record['queue_ms']}ms | 回执 {record['ack_ms']}ms | 成交 {record['fill_ms']}ms"
+            )
+
+    def _expire(self):
+        """发出后超过 FILL_TIMEOUT_SECONDS 还没结束的记录按"未见成交"结束"""
+        now = time.time()
+        for client_id, record in list(self._open.items()):
+            started = record["sent_at"] or record["decided_at"] or now
+            if now - started > FILL_TIMEOUT_SECONDS:
+                self._finish(client_id, "no_fill" if record["ack_at"] else "no_ack")
+
+    # ========== 指标 ==========
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """按 交易所/订单类型 分组的各段延迟 p50 / p95 / max（最近 LIFECYCLE_HISTORY 条）"""
+        self._expire()
+
+        records = list(self._completed)
+        groups: Dict[str, list] = {}
+        for record in records:
+            groups.setdefault(f"{record['exchange']}/{record['type']}", []).append(record)
+
+        by_leg = {}
+        for leg, items in groups.items():
+            statuses: Dict[str, int] = {}
+            for r in items:
+                statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+            by_leg[leg] = {
+                "count": len(items),
+                "statuses": statuses,
+                "queue_ms": summarize(r["queue_ms"] for r in items),
+                "ack_ms": summarize(r["ack_ms"] for r in items),
+                "fill_ms": summarize(r["fill_ms"] for r in items),
+                "total_ms": summarize(r["total_ms"] for r in items),
+            }
+
+        return {
+            "open": len(self._open),
+            "completed": len(records),
+            "unmatched_fills": self.unmatched_fills,
+            "by_leg": by_leg,
+            "recent": records[-5:],
+        }
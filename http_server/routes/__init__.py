@@ -57,7 +57,7 @@ def setup_routes(app: web.Application):
     setup_main_routes(app)
     
     # 功能路由
-    setup_debug_routes(app)           # 已精简，只有websocket_status
+    setup_debug_routes(app)           # websocket_status + profile
     setup_monitor_routes(app)
     
     # 资金费率结算路由
@@ -81,11 +81,11 @@ def setup_routes(app: web.Application):
     logger.info("📊 路由统计:")
     logger.info(f"   - 总路由数: {total_routes}")
     logger.info(f"   - 基础接口: /, /health, /public/ping (3个)")
-    logger.info(f"   - 调试接口: /api/debug/websocket_status (1个)")
-    logger.info(f"   - 监控接口: /api/monitor/* (3个)")
+    logger.info(f"   - 调试接口: /api/debug/websocket_status, /api/debug/profile (2个)")
+    logger.info(f"   - 监控接口: /api/monitor/* (6个)")
     logger.info(f"   - 资金费率: /api/funding/settlement/* (4个)")
     logger.info(f"   - 私人数据处理: /api/private_data_processing/* (5个)")
-    logger.info(f"   - 数据完成部门: /api/completion/data/* (3个)")  # ← 只改了这一行
+    logger.info(f"   - 数据完成部门: /api/completion/* (4个)")
     logger.info("=" * 60)
     logger.info("📌 公开数据路由已在 server.py 中注册: /api/public/data/* (2个)")
     logger.info("=" * 60)
\ No newline at end of file
@@ -27,6 +27,7 @@ class BrainRoutes:
                 "/api/brain/data/okx_contracts": "查看OKX合约面值数据详情（262个合约）",
                 "/api/brain/data/binance_contracts": "查看币安合约精度数据详情",
                 "/api/brain/data/binance_ticker_24hr": "查看币安24小时涨跌幅数据",
+                "/api/brain/data/opportunities": "查看按费率差排序的机会排行（?k=&min_rate_diff=&max_countdown=）",
                 "/api/brain/apis": "查看API凭证状态",
                 "/api/brain/status": "查看系统状态",
                 "/api/brain/data/clear": "清空所有数据（谨慎使用）",
@@ -118,6 +119,39 @@ class BrainRoutes:
                 "timestamp": datetime.now().isoformat()
             }, status=500)
     
+    async def get_opportunities(self, request):
+        """获取按费率差排序的机会排行（?k=10&min_rate_diff=0.8&max_countdown=200）"""
+        try:
+            query = request.query
+            k = int(query.get('k', 10))
+            min_rate_diff = float(query['min_rate_diff']) if 'min_rate_diff' in query else None
+            max_countdown = float(query['max_countdown']) if 'max_countdown' in query else None
+            
+            items = self.brain.data_manager.get_top_opportunities(
+                k,
+                min_rate_diff=min_rate_diff,
+                max_okx_countdown=max_countdown,
+                max_binance_countdown=max_countdown
+            )
+            return web.json_response({
+                "source": "opportunities",
+                "description": "按费率差排序的合约排行（倒计时已折算到当前时间）",
+                "timestamp": datetime.now().isoformat(),
+                "count": len(items),
+                "data": items
+            })
+        except ValueError as e:
+            return web.json_response({
+                "error": f"参数错误: {e}",
+                "timestamp": datetime.now().isoformat()
+            }, status=400)
+        except Exception as e:
+            logger.error(f"获取机会排行失败: {e}")
+            return web.json_response({
+                "error": str(e),
+                "timestamp": datetime.now().isoformat()
+            }, status=500)
+    
     async def get_binance_ticker_24hr(self, request):
         """获取币安24小时涨跌幅数据"""
         try:
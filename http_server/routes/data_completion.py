@@ -6,6 +6,7 @@ import logging
 import asyncio  # ✅ [蚂蚁基因修复] 导入asyncio
 from datetime import datetime
 from data_completion_department.receiver import get_receiver
+from data_completion_department.database import get_database
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +60,24 @@ def setup_data_completion_routes(app: web.Application):
                 "timestamp": datetime.now().isoformat()
             }, status=500)
     
+    # ===== 数据库写入指标 =====
+    async def get_database_metrics(request):
+        """获取数据库写后缓冲指标（刷新耗时、合并比）"""
+        try:
+            database = get_database()
+            if database is None:
+                return web.json_response({
+                    "error": "数据库区未初始化",
+                    "timestamp": datetime.now().isoformat()
+                }, status=503)
+            return web.json_response(database.get_metrics())
+        except Exception as e:
+            logger.error(f"获取数据库指标失败: {e}")
+            return web.json_response({
+                "error": str(e),
+                "timestamp": datetime.now().isoformat()
+            }, status=500)
+    
     # ===== 注册路由 =====
     # 根路由 - 改为 /api/completion/data
     app.router.add_get('/api/completion/data', get_data_summary)
@@ -66,8 +85,10 @@ def setup_data_completion_routes(app: web.Application):
     # 数据分路由（路径不变）
     app.router.add_get('/api/completion/data/public_market', get_public_market_data)
     app.router.add_get('/api/completion/data/private_user', get_private_user_data)
+    app.router.add_get('/api/completion/database/metrics', get_database_metrics)
     
     logger.info("✅ 数据完成部门路由注册完成")
     logger.info("   - GET /api/completion/data                 # 数据大纲")
     logger.info("   - GET /api/completion/data/public_market   # 行情数据")
-    logger.info("   - GET /api/completion/data/private_user    # 私人数据")
\ No newline at end of file
+    logger.info("   - GET /api/completion/data/private_user    # 私人数据")
+    logger.info("   - GET /api/completion/database/metrics     # 数据库写入指标")
\ No newline at end of file
@@ -4,14 +4,17 @@
 from aiohttp import web
 import datetime
 import logging
+import math
 import asyncio  # ✅ [蚂蚁基因修复] 导入asyncio
 
 from shared_data.data_store import data_store
+from ..auth import require_auth
 
 logger = logging.getLogger(__name__)
 
+PROFILE_REPLY_GRACE = 10   # 子进程采样：采样时长之外再等多少秒回复
+
 
-# ============ 只保留这一个函数 ============
 async def get_websocket_status(request: web.Request) -> web.Response:
     """
     【调试接口】查看WebSocket连接池状态
@@ -32,12 +35,20 @@ async def get_websocket_status(request: web.Request) -> web.Response:
             "data_statistics": data_stats
         }
         
-        return web.json_response({
+        response = {
             "success": True,
             "timestamp": datetime.datetime.now().isoformat(),
             "stats": stats,
             "connection_status": connection_status
-        })
+        }
+        
+        # 多进程模式：附上子进程和进程间通道状态
+        from multi_process import get_process_supervisor
+        supervisor = get_process_supervisor()
+        if supervisor.running:
+            response["processes"] = supervisor.get_status()
+        
+        return web.json_response(response)
         
     except Exception as e:
         logger.error(f"获取WebSocket状态失败: {e}")
@@ -47,9 +58,84 @@ async def get_websocket_status(request: web.Request) -> web.Response:
         }, status=500)
 
 
+@require_auth
+async def get_profile(request: web.Request) -> web.Response:
+    """
+    【调试接口】对一个进程（所有线程）做一次限时采样分析（需要密码）
+    地址：GET /api/debug/profile?seconds=10&hz=100&format=collapsed&idle=0&threads=MainThread&process=pipeline
+    
+    - seconds  采样时长（默认10秒，最多60秒），请求会等采样结束才返回
+    - hz       每秒采样次数（默认100）
+    - format   collapsed = 火焰图折叠格式（纯文本，可直接拖进 speedscope）；json = 函数排行 + 折叠栈
+    - idle     1 = 保留空闲栈（select / 队列等待）
+    - threads  只采这些线程，逗号分隔
+    - process  main = 主进程（默认）；多进程模式下可选 pipeline / ingest-binance / ingest-okx，
+               经命令管道让子进程自己采样后把结果发回来（WS 解码和流水线步骤都在子进程里）
+    """
+    from system_monitor.profiler import profile, ProfilerBusy, DEFAULT_SECONDS, DEFAULT_HZ, MAX_SECONDS
+    from multi_process import get_process_supervisor
+    
+    try:
+        seconds = float(request.query.get("seconds", DEFAULT_SECONDS))
+        hz = float(request.query.get("hz", DEFAULT_HZ))
+    except ValueError:
+        return web.json_response({"success": False, "error": "seconds / hz 必须是数字"}, status=400)
+    if not (math.isfinite(seconds) and math.isfinite(hz)):
+        return web.json_response({"success": False, "error": "seconds / hz 必须是有限数字"}, status=400)
+    output = request.query.get("format", "collapsed")
+    if output not in ("collapsed", "json"):
+        return web.json_response({"success": False, "error": "format 只能是 collapsed 或 json"}, status=400)
+    idle = request.query.get("idle", "0") == "1"
+    threads = [name for name in request.query.get("threads", "").split(",") if name] or None
+    process = request.query.get("process", "main")
+    
+    supervisor = get_process_supervisor()
+    if process != "main" and (not supervisor.running or process not in supervisor.processes):
+        available = ["main"] + (list(supervisor.processes) if supervisor.running else [])
+        return web.json_response({"success": False, "error": f"没有进程 {process}，可选: {', '.join(available)}"},
+                                 status=400)
+    
+    try:
+        logger.info(f"🔬【调试】开始采样分析: 进程={process}, {seconds}秒, {hz}Hz, 线程={threads or '全部'}")
+        if process == "main":
+            result = (await profile(seconds=seconds, hz=hz, idle=idle, threads=threads)).to_dict()
+        else:
+            args = {"seconds": seconds, "hz": hz, "idle": idle, "threads": threads}
+            reply = await supervisor.request(process, "profile", args, timeout=min(seconds, MAX_SECONDS) + PROFILE_REPLY_GRACE)
+            if "error" in reply:
+                return web.json_response({"success": False, "error": reply["error"]}, status=reply.get("status", 500))
+            result = reply["result"]
+    except ProfilerBusy as e:
+        return web.json_response({"success": False, "error": str(e)}, status=409)
+    except ValueError as e:
+        return web.json_response({"success": False, "error": str(e)}, status=400)
+    except KeyError:
+        return web.json_response({"success": False, "error": f"进程 {process} 的命令管道不可用"}, status=503)
+    except (asyncio.TimeoutError, ConnectionError):
+        return web.json_response({"success": False, "error": f"进程 {process} 没有按时返回采样结果"}, status=504)
+    except Exception as e:
+        logger.error(f"采样分析失败: {e}")
+        return web.json_response({"success": False, "error": str(e)}, status=500)
+    
+    if output == "json":
+        return web.json_response({
+            "success": True,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "process": process,
+            "profile": result
+        })
+    return web.Response(
+        text=result["collapsed"],
+        content_type="text/plain",
+        headers={"Content-Disposition": f"inline; filename=profile_{process}_{int(result['seconds'])}s_{result['hz']}hz.folded"}
+    )
+
+
 def setup_debug_routes(app: web.Application):
     """设置调试接口路由 - 只保留真正的调试接口"""
     app.router.add_get('/api/debug/websocket_status', get_websocket_status)
+    app.router.add_get('/api/debug/profile', get_profile)
     
     logger.info("✅ 调试路由已加载 (精简版):")
-    logger.info("   GET /api/debug/websocket_status")
\ No newline at end of file
+    logger.info("   GET /api/debug/websocket_status")
+    logger.info("   GET /api/debug/profile")
\ No newline at end of file
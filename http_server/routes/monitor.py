@@ -5,7 +5,6 @@
 from aiohttp import web
 import datetime
 import logging
-import asyncio  # ✅ [蚂蚁基因修复] 导入asyncio
 
 from ..auth import require_auth
 
@@ -25,10 +24,8 @@ async def get_system_health(request: web.Request) -> web.Response:
     try:
         from system_monitor.collector import SystemMonitor
         
-        monitor = SystemMonitor()
-        # ✅ [蚂蚁基因修复] 在线程池中执行同步方法
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(None, monitor.check_health)
+        # 后台采样线程的缓存，直接读，不占线程池
+        data = SystemMonitor().check_health()
         
         # 只返回基本信息，不暴露敏感数据
         safe_data = {
@@ -42,7 +39,7 @@ async def get_system_health(request: web.Request) -> web.Response:
         })
         
     except ImportError:
-        return system_monitor_placeholder(request)
+        return await system_monitor_placeholder(request)
     except Exception as e:
         logger.error(f"获取系统健康状态失败: {e}")
         return web.json_response({
@@ -57,10 +54,19 @@ async def get_system_metrics(request: web.Request) -> web.Response:
     try:
         from system_monitor.collector import SystemMonitor
         
-        monitor = SystemMonitor()
-        # ✅ [蚂蚁基因修复] 在线程池中执行同步方法
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(None, monitor.collect_light)
+        data = SystemMonitor().collect_light()
+        
+        # 共享HTTP连接池：每个主机的请求数、错误数、耗时
+        from http_client import get_http_client, get_rate_limiter
+        data["http_clients"] = get_http_client().get_metrics()
+        # 交易所REST限频：每个桶的可用权重、交易所报告的用量、封禁剩余
+        data["rate_limits"] = get_rate_limiter().get_budget()
+        # 热路径日志：每个调用点的放行 / 抑制次数
+        from hot_logger import get_hot_log_stats
+        data["hot_logs"] = get_hot_log_stats()
+        # 公开数据流水线：每个阶段的耗时、条数、超时、事件循环延迟（最近5分钟）
+        from shared_data.pipeline_metrics import get_pipeline_metrics
+        data["pipeline"] = get_pipeline_metrics().snapshot()
         
         return web.json_response({
             "success": True,
@@ -68,7 +74,7 @@ async def get_system_metrics(request: web.Request) -> web.Response:
         })
         
     except ImportError:
-        return system_monitor_placeholder(request)
+        return await system_monitor_placeholder(request)
     except Exception as e:
         logger.error(f"获取系统指标失败: {e}")
         return web.json_response({
@@ -83,10 +89,7 @@ async def get_system_status(request: web.Request) -> web.Response:
     try:
         from system_monitor.collector import SystemMonitor
         
-        monitor = SystemMonitor()
-        # ✅ [蚂蚁基因修复] 在线程池中执行同步方法
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(None, monitor.collect_all)
+        data = SystemMonitor().collect_all()
         
         return web.json_response({
             "success": True,
@@ -94,7 +97,7 @@ async def get_system_status(request: web.Request) -> web.Response:
         })
         
     except ImportError:
-        return system_monitor_placeholder(request)
+        return await system_monitor_placeholder(request)
     except Exception as e:
         logger.error(f"获取系统状态失败: {e}")
         return web.json_response({
@@ -103,10 +106,69 @@ async def get_system_status(request: web.Request) -> web.Response:
         }, status=500)
 
 
+@require_auth
+async def get_system_history(request: web.Request) -> web.Response:
+    """轻量指标的环形历史（最近10分钟，每5秒一个点，前端画走势图用）（需要密码）"""
+    try:
+        from system_monitor.collector import SystemMonitor
+        
+        return web.json_response({
+            "success": True,
+            "data": SystemMonitor().get_history()
+        })
+        
+    except ImportError:
+        return await system_monitor_placeholder(request)
+    except Exception as e:
+        logger.error(f"获取系统指标历史失败: {e}")
+        return web.json_response({
+            "success": False,
+            "error": str(e)
+        }, status=500)
+
+
+@require_auth
+async def get_loop_status(request: web.Request) -> web.Response:
+    """事件循环健康状态：调度延迟、卡顿位置、慢回调、按协程统计的任务数（需要密码）"""
+    try:
+        from system_monitor.loop_monitor import get_loop_monitor
+        
+        return web.json_response({
+            "success": True,
+            "data": get_loop_monitor().snapshot()
+        })
+        
+    except Exception as e:
+        logger.error(f"获取事件循环状态失败: {e}")
+        return web.json_response({
+            "success": False,
+            "error": str(e)
+        }, status=500)
+
+
+@require_auth
+async def get_prometheus_metrics(request: web.Request) -> web.Response:
+    """Prometheus 文本格式指标（需要密码，抓取配置里加 X-Access-Password 请求头）"""
+    try:
+        from shared_data.pipeline_metrics import get_pipeline_metrics
+        
+        return web.Response(
+            body=get_pipeline_metrics().prometheus().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+        )
+        
+    except Exception as e:
+        logger.error(f"获取Prometheus指标失败: {e}")
+        return web.Response(text=f"# error: {e}\n", status=500, content_type="text/plain")
+
+
 def setup_monitor_routes(app: web.Application):
     """设置系统监控路由"""
     app.router.add_get('/api/monitor/health', get_system_health)
     app.router.add_get('/api/monitor/metrics', get_system_metrics)
+    app.router.add_get('/api/monitor/metrics/prometheus', get_prometheus_metrics)
     app.router.add_get('/api/monitor/status', get_system_status)
+    app.router.add_get('/api/monitor/history', get_system_history)
+    app.router.add_get('/api/monitor/loop', get_loop_status)
     
-    logger.info("✅ 监控路由已加载: /api/monitor/health, /api/monitor/metrics, /api/monitor/status")
\ No newline at end of file
+    logger.info("✅ 监控路由已加载: /api/monitor/health, /api/monitor/metrics, /api/monitor/metrics/prometheus, /api/monitor/status, /api/monitor/history, /api/monitor/loop")
\ No newline at end of file
@@ -87,6 +87,9 @@ class HTTPServer:
             
             # 5. 币安24小时涨跌幅数据
             self.app.router.add_get('/api/brain/data/binance_ticker_24hr', brain_routes.get_binance_ticker_24hr)
+            
+            # 6. 机会排行（按费率差排序）
+            self.app.router.add_get('/api/brain/data/opportunities', brain_routes.get_opportunities)
 
             # ===== 系统管理路由 =====
             self.app.router.add_get('/api/brain/apis', brain_routes.get_apis)
@@ -11,23 +11,51 @@
 各个工人文件，单方向> 下单工人
 下单工人文件，单方向> 大脑。 
 之间通过数据传递，数据驱动工作，没有调用关系
+
+HTTP 请求统一走 OrderGateway（order_gateway.py）：
+每个交易所常驻 keep-alive 连接池，明确超时，关键时间窗口前预热连接，
+并记录每个请求的分段延迟（get_latency_metrics）。
+
+订单预装（order_arming.py）：
+每批订单先预装（校验、预编码请求体、缓存签名密钥），发射时只盖时间戳、签名，
+所有腿并发发出，两腿时差报告给大脑（get_dispatch_stats）。
+- send_orders(orders)：预装后立即发射（原有用法不变）
+- arm_orders(orders) → arm_id，之后 fire_armed(arm_id)：提前预装、择时发射
+- prime_credentials()：关键时间窗口前预热凭证和签名密钥
+
+订单追踪（order_lifecycle.py）：
+预装时给每条腿分配客户端订单号，REST 回执和私人 WS 成交回报按订单号对上，
+记录 决策→发出→回执→成交 各段延迟（get_lifecycle_metrics）。
 """
 
 import asyncio
 import logging
 import time
-import hmac
-import hashlib
-import base64
-import json
-import urllib.parse
+from collections import deque
 from datetime import datetime, timezone
 from typing import Dict, Any, List
-from concurrent.futures import ThreadPoolExecutor
+
+from exchange_endpoints import rest_url, simulator_url
+from latency_stats import summarize
+from smart_brain.settlement_scheduler import get_settlement_scheduler
+
+from .order_arming import ArmedOrder, ArmingError, SigningKey
+from .order_gateway import OrderGateway
+from .order_lifecycle import OrderLifecycleTracker
 
 logger = logging.getLogger(__name__)
 
 
+# 关键时间窗口（每小时的第几分钟）：第55分全自动平仓、第57分侦察兵开仓
+PREWARM_MINUTES = (55, 57)
+# 提前多少秒预热连接（要小于连接池的 keep-alive 时间）
+PREWARM_LEAD_SECONDS = 20
+
+ARM_TTL_SECONDS = 120             # 预装订单有效期（超时未发射自动作废）
+CREDENTIALS_TTL_SECONDS = 300     # 签名密钥缓存时间
+DISPATCH_HISTORY = 50             # 保留最近多少次多腿发射的时差记录
+
+
 class Trader:
     def __init__(self, brain, use_sandbox: bool = True):
         """
@@ -39,7 +67,9 @@ class Trader:
         """
         self.brain = brain
         self.use_sandbox = use_sandbox
-        self._executor = ThreadPoolExecutor(max_workers=10)
+        
+        # HTTP网关：每个交易所常驻连接池
+        self._gateway = OrderGateway()
         
         # 消息队列：大脑发来的订单放这里
         self._order_queue = asyncio.Queue()
@@ -53,6 +83,15 @@ class Trader:
         self._okx_time_offset = 0
         self._okx_last_sync = 0
         
+        # 订单预装
+        self._signing_keys: Dict[str, tuple] = {}   # exchange -> (SigningKey, 缓存时间)
+        self._armed: Dict[str, Dict] = {}           # arm_id -> {"prepared": [...], "armed_at": ...}
+        self._arm_seq = 0
+        self._dispatch_reports = deque(maxlen=DISPATCH_HISTORY)
+        
+        # 订单生命周期（客户端订单号 + 各段延迟）
+        self._lifecycle = OrderLifecycleTracker()
+        
         # 控制工人运行状态
         self._running = False
         
@@ -66,7 +105,7 @@ class Trader:
         
         大脑调用这个方法，把订单参数扔给工人，然后继续干自己的事。
         """
-        self._order_queue.put_nowait(orders)
+        self._order_queue.put_nowait((orders, time.time()))
         logger.info(f"📤【下单工人】大脑发来 {len(orders)} 个订单，已放入队列")
     
     # ========== 工人主循环 ==========
@@ -78,11 +117,13 @@ class Trader:
         
         asyncio.create_task(self._binance_time_sync_loop())
         asyncio.create_task(self._okx_time_sync_loop())
+        asyncio.create_task(self._prewarm_loop())
+        self._listen_order_events()
         
         while self._running:
             try:
-                orders = await self._order_queue.get()
-                asyncio.create_task(self._process_orders(orders))
+                orders, decided_at = await self._order_queue.get()
+                asyncio.create_task(self._process_orders(orders, decided_at))
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -98,38 +139,146 @@ class Trader:
                 self._order_queue.get_nowait()
             except:
                 break
+        await self._gateway.close()
+    
+    def get_latency_metrics(self) -> Dict[str, Any]:
+        """获取下单请求的延迟指标（DNS / 建连 / 首字节 / 总耗时）"""
+        return self._gateway.get_metrics()
+    
+    # ========== 连接预热 ==========
+    
+    def _seconds_until_next_prewarm(self) -> float:
+        """距离下一个预热时间点的秒数（关键分钟前 PREWARM_LEAD_SECONDS 秒）"""
+        now = datetime.now()
+        seconds_into_hour = now.minute * 60 + now.second + now.microsecond / 1_000_000
+        targets = sorted(minute * 60 - PREWARM_LEAD_SECONDS for minute in PREWARM_MINUTES)
+        for target in targets:
+            if target > seconds_into_hour:
+                return target - seconds_into_hour
+        return 3600 - seconds_into_hour + targets[0]
+    
+    async def _prewarm_loop(self):
+        """在每小时的关键时间窗口之前预热两个交易所的连接"""
+        while self._running:
+            try:
+                await asyncio.sleep(self._seconds_until_next_prewarm())
+                if not self._running:
+                    break
+                await self._gateway.prewarm_all()
+                logger.info("🔥【下单工人】关键时间窗口前已预热交易所连接")
+                # 避免同一秒内重复触发
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌【下单工人】连接预热失败: {e}")
+                await asyncio.sleep(5)
+    
+    # ========== 订单预装（arming） ==========
+    
+    async def prime_credentials(self, exchanges=("okx", "binance")) -> Dict[str, bool]:
+        """
+        提前拉取 API 凭证并缓存签名密钥（关键时间窗口前调用）
+        
+        返回: {exchange: 是否就绪}
+        """
+        keys = await self._get_signing_keys(set(exchanges))
+        ready = {exchange: keys.get(exchange) is not None for exchange in exchanges}
+        logger.info(f"🔑【下单工人】签名密钥已预热: {ready}")
+        return ready
+    
+    async def arm_orders(self, orders: List[Dict]) -> str:
+        """
+        预装一批订单（不发送）
+        
+        校验参数、预编码请求体、准备好签名密钥，返回 arm_id。
+        之后调用 fire_armed(arm_id) 时只盖时间戳、签名、并发发出。
+        预装结果超过 ARM_TTL_SECONDS 未发射自动作废。
+        """
+        self._purge_expired_armed()
+        
+        prepared = await self._arm(self._expand_orders(orders), decided_at=time.time())
+        self._arm_seq += 1
+        arm_id = f"arm-{self._arm_seq}"
+        self._armed[arm_id] = {"prepared": prepared, "armed_at": time.time()}
+        
+        failed = sum(1 for item in prepared if not isinstance(item, ArmedOrder))
+        logger.info(f"🎯【下单工人】已预装 {arm_id} | {len(prepared)} 个订单，校验失败 {failed} 个")
+        return arm_id
+    
+    async def fire_armed(self, arm_id: str) -> List[Dict]:
+        """发射预装好的订单（结果照常发回大脑）"""
+        entry = self._armed.pop(arm_id, None)
+        if entry is None:
+            logger.error(f"❌【下单工人】预装订单不存在或已发射: {arm_id}")
+            return []
+        
+        if time.time() - entry["armed_at"] > ARM_TTL_SECONDS:
+            logger.warning(f"⚠️【下单工人】预装订单已过期，拒绝发射: {arm_id}")
+            self._discard_prepared(entry["prepared"], "expired")
+            results = [self._error_result(item.order, "预装订单已过期") if isinstance(item, ArmedOrder) else item
+                       for item in entry["prepared"]]
+        else:
+            results = await self._fire(entry["prepared"])
+        
+        await self._send_results_to_brain(results)
+        return results
+    
+    def disarm(self, arm_id: str) -> bool:
+        """作废预装订单"""
+        entry = self._armed.pop(arm_id, None)
+        removed = entry is not None
+        if removed:
+            self._discard_prepared(entry["prepared"], "disarmed")
+            logger.info(f"🧹【下单工人】预装订单已作废: {arm_id}")
+        return removed
+    
+    def _purge_expired_armed(self):
+        now = time.time()
+        for arm_id in [k for k, v in self._armed.items() if now - v["armed_at"] > ARM_TTL_SECONDS]:
+            self._discard_prepared(self._armed.pop(arm_id)["prepared"], "expired")
+            logger.info(f"🧹【下单工人】预装订单过期作废: {arm_id}")
+    
+    def get_dispatch_stats(self) -> Dict[str, Any]:
+        """获取多腿发射的时差统计（最近 DISPATCH_HISTORY 次）"""
+        
+        reports = list(self._dispatch_reports)
+        return {
+            "volleys": len(reports),
+            "armed_pending": len(self._armed),
+            "sign_ms": summarize(r["sign_ms"] for r in reports),
+            "dispatch_skew_ms": summarize(r["dispatch_skew_ms"] for r in reports),
+            "wire_skew_ms": summarize(r["wire_skew_ms"] for r in reports),
+            "recent": reports[-5:],
+        }
+    
+    def _discard_prepared(self, prepared: List[Any], reason: str):
+        for item in prepared:
+            if isinstance(item, ArmedOrder):
+                self._lifecycle.discard(item.client_id, reason)
+    
+    def get_lifecycle_metrics(self) -> Dict[str, Any]:
+        """获取订单生命周期延迟统计（决策→发出→回执→成交）"""
+        return self._lifecycle.get_metrics()
+    
+    def _listen_order_events(self):
+        """订阅私人 WS 订单推送（成交回报和回执按客户端订单号对上）"""
+        try:
+            from private_data_processing.manager import get_processor
+            get_processor().add_order_listener(self._lifecycle.on_ws_order_event)
+            logger.info("🔗【下单工人】已订阅私人订单推送（订单追踪）")
+        except Exception as e:
+            logger.warning(f"⚠️【下单工人】订阅私人订单推送失败，只记录到回执: {e}")
     
     # ========== 处理订单 ==========
     
-    async def _process_orders(self, orders: List[Dict]):
-        """处理收到的订单"""
+    async def _process_orders(self, orders: List[Dict], decided_at: float = None):
+        """处理收到的订单（预装后立即发射）"""
         try:
             logger.info(f"🔧【下单工人】开始处理 {len(orders)} 个订单")
             
-            expanded_orders = []
-            for order in orders:
-                exchange = order.get("exchange")
-                order_type = order.get("type")
-                
-                if exchange == "binance" and order_type == "oco":
-                    sl_order, tp_order = self._expand_binance_oco(order)
-                    expanded_orders.append(sl_order)
-                    expanded_orders.append(tp_order)
-                else:
-                    expanded_orders.append(order)
-            
-            creds_map = await self._fetch_all_credentials(expanded_orders)
-            
-            tasks = []
-            for order in expanded_orders:
-                exchange = order.get("exchange")
-                creds = creds_map.get(exchange)
-                if not creds:
-                    tasks.append(self._error_result(order, f"无法获取 {exchange} API凭证"))
-                else:
-                    tasks.append(self._send_order(order, creds))
-            
-            results = await asyncio.gather(*tasks)
+            prepared = await self._arm(self._expand_orders(orders), decided_at=decided_at)
+            results = await self._fire(prepared)
             await self._send_results_to_brain(results)
             
             logger.info(f"✅【下单工人】处理完成，共 {len(results)} 个结果已发回大脑")
@@ -141,6 +290,160 @@ class Trader:
                 "error": f"工人处理异常: {str(e)}"
             }])
     
+    def _expand_orders(self, orders: List[Dict]) -> List[Dict]:
+        """展开币安 OCO（一个 OCO → 两个独立的条件单）"""
+        expanded_orders = []
+        for order in orders:
+            if order.get("exchange") == "binance" and order.get("type") == "oco":
+                sl_order, tp_order = self._expand_binance_oco(order)
+                expanded_orders.append(sl_order)
+                expanded_orders.append(tp_order)
+            else:
+                expanded_orders.append(order)
+        return expanded_orders
+    
+    async def _arm(self, orders: List[Dict], decided_at: float = None) -> List[Any]:
+        """
+        预装订单（并给每条腿分配客户端订单号、登记订单追踪）
+        
+        返回与 orders 等长的列表：预装成功为 ArmedOrder，失败为错误结果字典
+        """
+        decided_at = decided_at or time.time()
+        keys = await self._get_signing_keys({order.get("exchange") for order in orders} & {"binance", "okx"})
+        
+        prepared = []
+        for order in orders:
+            exchange = order.get("exchange")
+            key = keys.get(exchange)
+            if exchange in ("binance", "okx") and key is None:
+                prepared.append(self._error_result(order, f"无法获取 {exchange} API凭证"))
+                continue
+            client_id_param = self._lifecycle.client_id_param(exchange, order.get("type"))
+            client_id = self._lifecycle.new_client_id() if client_id_param else None
+            try:
+                if exchange == "binance":
+                    leg = ArmedOrder(order, key, self._binance_get_base_url(),
+                                     client_id=client_id, client_id_param=client_id_param)
+                elif exchange == "okx":
+                    leg = ArmedOrder(order, key, self._okx_get_base_url(),
+                                     simulated=self._okx_get_simulated_header(),
+                                     client_id=client_id, client_id_param=client_id_param)
+                else:
+                    prepared.append(self._error_result(order, f"未知交易所: {exchange}"))
+                    continue
+                prepared.append(leg)
+                if leg.client_id:
+                    params = order.get("params") or {}
+                    self._lifecycle.open(leg.client_id, exchange, leg.order_type,
+                                         symbol=params.get("symbol") or params.get("instId"),
+                                         decided_at=decided_at)
+            except ArmingError as e:
+                logger.error(f"❌【下单工人】预装失败 [{exchange}/{order.get('type')}]: {e}")
+                prepared.append(self._error_result(order, str(e)))
+        return prepared
+    
+    async def _fire(self, prepared: List[Any]) -> List[Dict]:
+        """
+        发射：先把所有腿签好名，再一起并发发出
+        
+        同一交易所的腿共用一个时间戳；多腿时计算两腿时差并报告给大脑。
+        """
+        legs = [item for item in prepared if isinstance(item, ArmedOrder)]
+        if not legs:
+            return list(prepared)
+        
+        # 1. 盖时间戳 + 签名（纯计算，微秒级）
+        sign_start = time.perf_counter()
+        timestamps = {
+            "binance": self._binance_get_timestamp(),
+            "okx": self._okx_get_timestamp(),
+        }
+        signed = [(leg, leg.sign(timestamps[leg.exchange])) for leg in legs]
+        sign_ms = (time.perf_counter() - sign_start) * 1000
+        
+        # 2. 并发发出
+        sent = await asyncio.gather(*[self._send_signed(leg, *request) for leg, request in signed])
+        
+        # 3. 按原顺序合并结果
+        leg_results = iter(sent)
+        results = [next(leg_results)[0] if isinstance(item, ArmedOrder) else item for item in prepared]
+        
+        if len(legs) >= 2:
+            await self._report_dispatch(legs, sent, sign_ms)
+        return results
+    
+    async def _send_signed(self, leg: ArmedOrder, url: str, body: str, headers: Dict) -> tuple:
+        """
+        发出一条已签名的订单
+        
+        返回: (结果字典, 发射信息)
+        """
+        called_at = time.perf_counter()
+        timing = None
+        self._lifecycle.mark_sent(leg.client_id)
+        try:
+            response = await self._gateway.request(
+                leg.exchange, leg.method, url, data=body, headers=headers, endpoint=leg.endpoint
+            )
+            timing = response.timing
+            if leg.exchange == "binance":
+                logger.info(f"📤【下单工人】币安请求 [{leg.endpoint}] 最终请求体: {body[:200]}...")
+                data = self._binance_parse_response(leg.endpoint, response)
+            else:
+                logger.info(f"📤【下单工人】欧易请求 [{leg.endpoint}] Body: {body}")
+                data = self._okx_parse_response(leg.endpoint, response)
+            result = {
+                "success": True,
+                "exchange": leg.exchange,
+                "type": leg.order_type,
+                "client_order_id": leg.client_id,
+                "data": data
+            }
+            self._lifecycle.mark_ack(leg.client_id, *self._ack_of(leg.exchange, data))
+        except Exception as e:
+            logger.error(f"❌【下单工人】发送失败 [{leg.exchange}/{leg.order_type}]: {e}")
+            result = {
+                "success": False,
+                "exchange": leg.exchange,
+                "type": leg.order_type,
+                "client_order_id": leg.client_id,
+                "error": str(e)
+            }
+            self._lifecycle.mark_ack(leg.client_id, False)
+        return result, {"called_at": called_at, "timing": timing}
+    
+    async def _report_dispatch(self, legs: List[ArmedOrder], sent: List[tuple], sign_ms: float):
+        """计算多腿时差并报告给大脑"""
+        called = [info["called_at"] for _, info in sent]
+        wire = [info["timing"].get("sent_at") if info["timing"] else None for _, info in sent]
+        
+        report = {
+            "legs": [
+                dict(leg.describe(),
+                     success=result.get("success"),
+                     total_ms=info["timing"].get("total_ms") if info["timing"] else None)
+                for leg, (result, info) in zip(legs, sent)
+            ],
+            "sign_ms": round(sign_ms, 3),
+            # 从第一条腿交给网关 → 最后一条腿交给网关
+            "dispatch_skew_ms": round((max(called) - min(called)) * 1000, 3),
+            # 从第一条腿请求头发出 → 最后一条腿请求头发出（有一条没发出去则为 None）
+            "wire_skew_ms": round((max(wire) - min(wire)) * 1000, 3) if None not in wire else None,
+            "arm_age_ms": round((time.time() - min(leg.armed_at for leg in legs)) * 1000, 3),
+            "at": time.time(),
+        }
+        self._dispatch_reports.append(report)
+        logger.info(
+            f"⏱️【下单工人】{len(legs)} 腿并发发射 | 签名 {report['sign_ms']}ms | "
+            f"发射时差 {report['dispatch_skew_ms']}ms | 线上时差 {report['wire_skew_ms']}ms"
+        )
+        
+        if hasattr(self.brain, 'on_trader_dispatch_report'):
+            try:
+                await self.brain.on_trader_dispatch_report(report)
+            except Exception as e:
+                logger.error(f"❌【下单工人】发射报告发送给大脑失败: {e}")
+    
     async def _send_results_to_brain(self, results: List[Dict]):
         """
         把结果消息发给大脑（分两条独立发送）
@@ -154,13 +457,14 @@ class Trader:
             return
         
         for result in results:
-            # 第一条：原始数据（原样发送，不添加任何字段）
+            # 第一条：原始数据（原样发送，只附带客户端订单号用于对账）
             original_data = {
                 "success": result.get("success"),
                 "exchange": result.get("exchange"),
                 "type": result.get("type"),
                 "data": result.get("data", {}),
-                "error": result.get("error")
+                "error": result.get("error"),
+                "client_order_id": result.get("client_order_id")
             }
             await self.brain.on_trader_results(original_data)
             
@@ -207,6 +511,23 @@ class Trader:
         
         return None
     
+    @staticmethod
+    def _ack_of(exchange: str, data: Dict) -> tuple:
+        """
+        从 REST 响应判断交易所是否受理，并取交易所订单号
+        
+        返回: (是否受理, 订单号)
+        """
+        if not isinstance(data, dict):
+            return False, None
+        if exchange == "okx":
+            rows = data.get("data") or [{}]
+            row = rows[0] if isinstance(rows[0], dict) else {}
+            return str(data.get("code", "")) == "0", row.get("ordId") or row.get("algoId")
+        code = data.get("code")
+        accepted = "error" not in data and not (isinstance(code, int) and code < 0)
+        return accepted, data.get("orderId") or data.get("algoId")
+    
     # ========== 币安 OCO 展开 ==========
     
     def _expand_binance_oco(self, oco_order: Dict) -> tuple:
@@ -251,38 +572,37 @@ class Trader:
         
         return creds_map
     
-    # ========== 发送订单（路由） ==========
-    
-    async def _send_order(self, order: Dict, creds: Dict) -> Dict:
-        """发送单个订单"""
-        exchange = order.get("exchange")
-        order_type = order.get("type")
-        params = order.get("params", {})
+    async def _get_signing_keys(self, exchanges) -> Dict[str, Any]:
+        """
+        获取签名密钥（带缓存，CREDENTIALS_TTL_SECONDS 内不重复拉取凭证）
         
-        try:
-            if exchange == "binance":
-                result = await self._binance_send(creds, order_type, params)
-            elif exchange == "okx":
-                result = await self._okx_send(creds, order_type, params)
+        返回: {exchange: SigningKey 或 None}
+        """
+        now = time.time()
+        keys = {}
+        missing = []
+        for exchange in exchanges:
+            cached = self._signing_keys.get(exchange)
+            if cached and now - cached[1] < CREDENTIALS_TTL_SECONDS:
+                keys[exchange] = cached[0]
             else:
-                return {"success": False, "error": f"未知交易所: {exchange}"}
-            
-            return {
-                "success": True,
-                "exchange": exchange,
-                "type": order_type,
-                "data": result
-            }
-        except Exception as e:
-            logger.error(f"❌【下单工人】发送失败 [{exchange}/{order_type}]: {e}")
-            return {
-                "success": False,
-                "exchange": exchange,
-                "type": order_type,
-                "error": str(e)
-            }
+                missing.append(exchange)
+        
+        if missing:
+            creds_map = await self._fetch_all_credentials([{"exchange": e} for e in missing])
+            for exchange, creds in creds_map.items():
+                key = None
+                if creds:
+                    try:
+                        key = SigningKey(exchange, creds)
+                        self._signing_keys[exchange] = (key, now)
+                    except ArmingError as e:
+                        logger.error(f"❌【下单工人】{e}")
+                keys[exchange] = key
+        
+        return keys
     
-    async def _error_result(self, order: Dict, error: str) -> Dict:
+    def _error_result(self, order: Dict, error: str) -> Dict:
         return {
             "success": False,
             "exchange": order.get("exchange"),
@@ -293,6 +613,8 @@ class Trader:
     # ========== 币安 ==========
     
     def _binance_get_base_url(self) -> str:
+        if simulator_url("binance"):
+            return simulator_url("binance")
         if self.use_sandbox:
             return "https://testnet.binancefuture.com"
         return "https://fapi.binance.com"
@@ -312,110 +634,24 @@ class Trader:
     async def _binance_sync_time(self):
         """同步币安服务器时间"""
         try:
-            url = "https://fapi.binance.com/fapi/v1/time"
-            loop = asyncio.get_running_loop()
-            
-            def _request():
-                import requests
-                return requests.get(url)
-            
-            response = await loop.run_in_executor(self._executor, _request)
+            url = rest_url("binance", "https://fapi.binance.com") + "/fapi/v1/time"
+            response = await self._gateway.request("binance", "GET", url)
             data = response.json()
             server_time = data["serverTime"]
             local_time = int(time.time() * 1000)
             self._binance_time_offset = server_time - local_time
             self._binance_last_sync = time.time()
+            get_settlement_scheduler().set_time_offset("binance", self._binance_time_offset)
             logger.info(f"⏱️【下单工人】币安时间同步 | 偏移量: {self._binance_time_offset}ms")
         except Exception as e:
             logger.error(f"❌【下单工人】币安时间同步失败: {e}")
     
-    async def _binance_send(self, creds: Dict, order_type: str, params: Dict) -> Dict:
-        """币安路由"""
-        api_key = creds.get("api_key")
-        api_secret = creds.get("api_secret")
-        
-        if order_type == "set_leverage":
-            endpoint = "/fapi/v1/leverage"
-            req_params = params.copy()
-            return await self._binance_http_request(api_key, api_secret, "POST", endpoint, req_params)
-        
-        elif order_type == "open_market":
-            endpoint = "/fapi/v1/order"
-            req_params = params.copy()
-            return await self._binance_http_request(api_key, api_secret, "POST", endpoint, req_params)
-        
-        elif order_type == "algo_order":
-            endpoint = "/fapi/v1/algoOrder"
-            req_params = params.copy()
-            return await self._binance_http_request(api_key, api_secret, "POST", endpoint, req_params)
-        
-        elif order_type == "close_position":
-            endpoint = "/fapi/v1/order"
-            req_params = params.copy()
-            return await self._binance_http_request(api_key, api_secret, "POST", endpoint, req_params)
-        
-        else:
-            raise Exception(f"币安未知 order_type: {order_type}")
-    
-    async def _binance_http_request(self, api_key: str, api_secret: str,
-                                     method: str, endpoint: str, params: Dict) -> Dict:
-        """
-        执行币安 HTTP 请求（新版签名规则）
-        
-        根据币安 2026-01-15 生效的新规：
-        1. 构建原始参数字符串（key=value&key=value...），按字母顺序排序
-        2. 对整个原始字符串做百分比编码（保留 = 和 & 不编码）
-        3. 对编码后的字符串计算 HMAC-SHA256 签名
-        4. 发送时使用编码后的字符串 + &signature=签名
-        """
-        base_url = self._binance_get_base_url()
-        
-        # 复制参数，避免修改原字典
-        params = params.copy()
-        
-        # 添加必要参数
-        params['timestamp'] = self._binance_get_timestamp()
-        params['recvWindow'] = 5000
-        
-        # 步骤1：构建原始参数字符串（按字母顺序排序，排除 signature）
-        sign_params = {k: v for k, v in params.items() if k != 'signature'}
-        sorted_params = sorted(sign_params.items())
-        raw_query_string = "&".join([f"{k}={v}" for k, v in sorted_params])
-        
-        # 步骤2：对整个原始字符串做百分比编码（保留 = 和 & 不编码）
-        encoded_payload = urllib.parse.quote(raw_query_string, safe='=&')
-        
-        # 步骤3：对编码后的字符串计算签名
-        signature = hmac.new(api_secret.encode(), encoded_payload.encode(), hashlib.sha256).hexdigest()
-        
-        # 步骤4：最终请求体 = 编码后的字符串 + "&signature=" + 签名
-        final_query_string = encoded_payload + "&signature=" + signature
-        
-        logger.info(f"📤【下单工人】币安请求 [{endpoint}] 最终请求体: {final_query_string[:200]}...")
-        
-        url = base_url + endpoint
-        headers = {
-            "X-MBX-APIKEY": api_key,
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
-        
-        loop = asyncio.get_running_loop()
-        
-        def _request():
-            import requests
-            if method == "POST":
-                return requests.post(url, data=final_query_string, headers=headers)
-            else:
-                # GET 请求：把 final_query_string 拼到 URL
-                full_url = f"{url}?{final_query_string}"
-                return requests.get(full_url, headers=headers)
-        
-        response = await loop.run_in_executor(self._executor, _request)
-        
+    def _binance_parse_response(self, endpoint: str, response) -> Dict:
+        """解析币安响应（HTTP 错误 / 非 JSON 都转成带 error 的字典）"""
         # 检查 HTTP 状态码
-        if response.status_code >= 400:
-            logger.error(f"❌【下单工人】币安 HTTP 错误 [{endpoint}]: {response.status_code} - {response.text[:200]}")
-            return {"error": f"HTTP {response.status_code}", "raw_response": response.text[:500]}
+        if response.status >= 400:
+            logger.error(f"❌【下单工人】币安 HTTP 错误 [{endpoint}]: {response.status} - {response.text[:200]}")
+            return {"error": f"HTTP {response.status}", "raw_response": response.text[:500]}
         
         try:
             result = response.json()
@@ -429,7 +665,7 @@ class Trader:
     # ========== 欧易 ==========
     
     def _okx_get_base_url(self) -> str:
-        return "https://www.okx.com"
+        return rest_url("okx", "https://www.okx.com")
     
     def _okx_get_simulated_header(self) -> str:
         return "1" if self.use_sandbox else "0"
@@ -447,90 +683,23 @@ class Trader:
     
     async def _okx_sync_time(self):
         try:
-            import requests
-            url = "https://www.okx.com/api/v5/public/time"
-            loop = asyncio.get_running_loop()
-            
-            def _request():
-                return requests.get(url, timeout=5)
-            
-            response = await loop.run_in_executor(self._executor, _request)
+            url = rest_url("okx", "https://www.okx.com") + "/api/v5/public/time"
+            response = await self._gateway.request("okx", "GET", url)
             data = response.json()
             if data.get("code") == "0":
                 server_time = int(data["data"][0]["ts"])
                 local_time = int(time.time() * 1000)
                 self._okx_time_offset = server_time - local_time
                 self._okx_last_sync = time.time()
+                get_settlement_scheduler().set_time_offset("okx", self._okx_time_offset)
                 logger.info(f"⏱️【下单工人】欧易时间同步 | 偏移量: {self._okx_time_offset}ms")
             else:
                 logger.warning(f"⏱️【下单工人】欧易时间同步返回异常: {data}")
         except Exception as e:
             logger.error(f"❌【下单工人】欧易时间同步失败: {e}")
     
-    async def _okx_send(self, creds: Dict, order_type: str, params: Dict) -> Dict:
-        api_key = creds.get("api_key")
-        api_secret = creds.get("api_secret")
-        passphrase = creds.get("passphrase", "")
-        
-        if order_type == "set_leverage":
-            endpoint = "/api/v5/account/set-leverage"
-            body_params = params.copy()
-            return await self._okx_http_request(api_key, api_secret, passphrase, "POST", endpoint, body_params)
-        
-        elif order_type == "open_market":
-            endpoint = "/api/v5/trade/order"
-            body_params = params.copy()
-            if 'sz' in body_params:
-                body_params['sz'] = round(float(body_params['sz']), 8)
-            return await self._okx_http_request(api_key, api_secret, passphrase, "POST", endpoint, body_params)
-        
-        elif order_type == "oco":
-            endpoint = "/api/v5/trade/order-algo"
-            body_params = params.copy()
-            return await self._okx_http_request(api_key, api_secret, passphrase, "POST", endpoint, body_params)
-        
-        elif order_type == "close_position":
-            endpoint = "/api/v5/trade/close-position"
-            body_params = params.copy()
-            return await self._okx_http_request(api_key, api_secret, passphrase, "POST", endpoint, body_params)
-        
-        else:
-            raise Exception(f"欧易未知 order_type: {order_type}")
-    
-    async def _okx_http_request(self, api_key: str, api_secret: str, passphrase: str,
-                                 method: str, endpoint: str, params: Dict) -> Dict:
-        base_url = self._okx_get_base_url()
-        
-        timestamp = self._okx_get_timestamp()
-        body = json.dumps(params)
-        sign_str = timestamp + method + endpoint + body
-        signature = base64.b64encode(
-            hmac.new(api_secret.encode(), sign_str.encode(), hashlib.sha256).digest()
-        ).decode()
-        
-        url = base_url + endpoint
-        headers = {
-            "OK-ACCESS-KEY": api_key,
-            "OK-ACCESS-SIGN": signature,
-            "OK-ACCESS-TIMESTAMP": timestamp,
-            "OK-ACCESS-PASSPHRASE": passphrase,
-            "Content-Type": "application/json",
-            "x-simulated-trading": self._okx_get_simulated_header()
-        }
-        
-        logger.info(f"📤【下单工人】欧易请求 [{endpoint}] Body: {body}")
-        
-        loop = asyncio.get_running_loop()
-        
-        def _request():
-            import requests
-            if method == "POST":
-                return requests.post(url, data=body, headers=headers)
-            else:
-                return requests.get(url, params=params, headers=headers)
-        
-        response = await loop.run_in_executor(self._executor, _request)
-        
+    def _okx_parse_response(self, endpoint: str, response) -> Dict:
+        """解析欧易响应"""
         try:
             result = response.json()
             logger.info(f"📡【下单工人】欧易响应 [{endpoint}] -> {result}")
@@ -538,4 +707,4 @@ class Trader:
         except:
             raw_text = response.text
             logger.warning(f"⚠️【下单工人】欧易响应非JSON格式 [{endpoint}] -> {raw_text[:500]}")
-            return {"raw_response": raw_text}
\ No newline at end of file
+            return {"raw_response": raw_text}
@@ -2,6 +2,7 @@ import aiohttp  # ✅ [蚂蚁基因修复] 导入aiohttp
 import asyncio  # ✅ [蚂蚁基因修复] 导入asyncio
 import time
 import random
+from http_client import get_http_client
 from .config import Config
 
 class Pinger:
@@ -13,11 +14,9 @@ class Pinger:
         if timeout is None:
             timeout = Config.REQUEST_TIMEOUT
         
-        # ✅ [蚂蚁基因修复] 创建或使用传入的session
-        close_session = False
+        # 没传session就用共享连接池里该主机的会话（常驻，不关闭）
         if session is None:
-            session = aiohttp.ClientSession()
-            close_session = True
+            session = get_http_client().session_for(url)
         
         try:
             headers = {'User-Agent': Config.get_random_user_agent()}
@@ -40,9 +39,6 @@ class Pinger:
             return False, url
         except Exception:
             return False, url
-        finally:
-            if close_session:
-                await session.close()
     
     @classmethod
     async def ping_with_retry_async(cls, url, max_retries=None, session=None):
@@ -50,42 +46,29 @@ class Pinger:
         if max_retries is None:
             max_retries = Config.MAX_RETRIES
         
-        # ✅ [蚂蚁基因修复] 创建或使用传入的session
-        close_session = False
-        if session is None:
-            session = aiohttp.ClientSession()
-            close_session = True
-        
-        try:
-            for attempt in range(max_retries + 1):  # 包括首次尝试
-                await asyncio.sleep(0)  # ✅ [蚂蚁基因修复] 循环内让出CPU
-                success, used_url = await cls.ping_single_async(url, session=session)
-                if success:
-                    return True, used_url
-                
-                # 快速重试等待（如果还有重试次数）
-                if attempt < max_retries:
-                    await asyncio.sleep(1)  # ✅ [蚂蚁基因修复] 异步sleep
-        finally:
-            if close_session:
-                await session.close()
+        for attempt in range(max_retries + 1):  # 包括首次尝试
+            await asyncio.sleep(0)  # ✅ [蚂蚁基因修复] 循环内让出CPU
+            success, used_url = await cls.ping_single_async(url, session=session)
+            if success:
+                return True, used_url
+            
+            # 快速重试等待（如果还有重试次数）
+            if attempt < max_retries:
+                await asyncio.sleep(1)  # ✅ [蚂蚁基因修复] 异步sleep
         
         return False, url
     
     @classmethod
     async def self_ping_async(cls):
         """异步自ping - 带端点回退策略"""
-        # ✅ [蚂蚁基因修复] 创建一个共享session，避免重复创建
-        async with aiohttp.ClientSession() as session:
-            # 按优先级尝试所有端点
-            for endpoint in Config.SELF_ENDPOINTS:
-                await asyncio.sleep(0)  # ✅ [蚂蚁基因修复] 循环内让出CPU
-                success, used_url = await cls.ping_with_retry_async(
-                    endpoint, max_retries=1, session=session
-                )
-                if success:
-                    return True, used_url
-                # 立即尝试下一个端点，不等待
+        # 共享连接池：每个端点主机一个常驻会话，不再每次新建
+        # 按优先级尝试所有端点
+        for endpoint in Config.SELF_ENDPOINTS:
+            await asyncio.sleep(0)  # ✅ [蚂蚁基因修复] 循环内让出CPU
+            success, used_url = await cls.ping_with_retry_async(endpoint, max_retries=1)
+            if success:
+                return True, used_url
+            # 立即尝试下一个端点，不等待
         
         return False, "all_failed"
     
@@ -94,12 +77,9 @@ class Pinger:
         """异步外ping - 保持不变"""
         target = Config.get_random_external_target()
         
-        # ✅ [蚂蚁基因修复] 创建一个新的session
-        async with aiohttp.ClientSession() as session:
-            success, used_url = await cls.ping_with_retry_async(
-                target, max_retries=2, session=session
-            )
-            return success, used_url
+        # 共享连接池：目标主机的常驻会话
+        success, used_url = await cls.ping_with_retry_async(target, max_retries=2)
+        return success, used_url
     
     # ✅ [蚂蚁基因修复] 保留同步版本供非异步代码调用（内部使用run_in_executor）
     @classmethod
@@ -110,6 +90,8 @@ class Pinger:
         try:
             return loop.run_until_complete(cls.self_ping_async())
         finally:
+            # 临时事件循环里建的共享会话随循环一起关掉
+            loop.run_until_complete(get_http_client().close())
             loop.close()
     
     @classmethod
@@ -120,6 +102,8 @@ class Pinger:
         try:
             return loop.run_until_complete(cls.external_ping_async())
         finally:
+            # 临时事件循环里建的共享会话随循环一起关掉
+            loop.run_until_complete(get_http_client().close())
             loop.close()
     
     @staticmethod
@@ -0,0 +1,51 @@
+"""
+延迟分位数统计 - 各处指标接口和基准脚本共用
+
+各模块的 get_metrics / get_budget 都要把最近一批耗时样本汇总成 p50 / p95 / max，
+基准脚本和回放驱动也要算分位数，这里统一成一套算法（最近秩：下标 round(p/100 × (n-1))）。
+
+使用方式：
+    from latency_stats import percentile, summarize
+
+    summarize(r["total_ms"] for r in records)            # {"p50": .., "p95": .., "max": ..}，没有样本返回 None
+    summarize(lags, percentiles=(50, 95, 99), digits=3)  # 多一个 p99，保留 3 位小数
+    summarize(seconds, digits=3, scale=1000)             # 秒 → 毫秒
+
+    ordered = sorted(samples)
+    percentile(ordered, 95)                              # 已排序样本的单个分位数
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """已排序样本的第 pct 百分位（没有样本返回 0.0）"""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(values: Iterable[Optional[float]], percentiles: Sequence[int] = (50, 95),
+              digits: Optional[int] = None, scale: float = 1.0) -> Optional[Dict[str, float]]:
+    """
+    一组样本 → {"p50": .., "p95": .., "max": ..}
+
+    :param values: 样本（None 跳过，不用事先排序）
+    :param percentiles: 要算的分位数，键名是 "p" + 数字
+    :param digits: 保留小数位数（None = 不取整）
+    :param scale: 结果乘的系数（比如秒 → 毫秒传 1000）
+    :return: 没有样本时返回 None
+    """
+    ordered = sorted(v for v in values if v is not None)
+    if not ordered:
+        return None
+
+    def _out(value: float) -> float:
+        if scale != 1.0:
+            value *= scale
+        return round(value, digits) if digits is not None else value
+
+    result = {f"p{pct}": _out(percentile(ordered, pct)) for pct in percentiles}
+    result["max"] = _out(ordered[-1])
+    return result
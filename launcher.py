@@ -1,6 +1,6 @@
 """
 极简启动器 - 重构版：接管所有模块启动
-支持单线程/多线程一键切换
+支持单进程/多进程一键切换
 """
 
 import asyncio
@@ -27,12 +27,6 @@ test_logger = logging.getLogger("test")
 test_logger.info("如果看到这行日志，说明日志成功异步！")
 
 
-# ==================== 运行模式配置 ====================
-# True  = 多线程模式（生产环境，榨干CPU）
-# False = 单线程模式（调试模式，方便定位问题）
-MULTI_THREAD_MODE = True  # 默认多线程
-# ====================================================
-
 # ==================== 强制启动标记 ====================
 print("🚨🚨🚨 LAUNCHER.PY 开始执行", file=sys.stderr)
 sys.stderr.flush()  # 强制刷新，确保输出
@@ -43,6 +37,13 @@ from dotenv import load_dotenv
 load_dotenv()  # 从 .env 文件加载环境变量
 # =======================================================
 
+# ==================== 运行模式配置 ====================
+# True  = 多进程模式（生产环境：每个交易所一个行情进程 + 一个流水线进程，大脑/中继/HTTP在主进程，真正用上多核）
+# False = 单进程模式（调试模式，所有模块在同一个事件循环里，方便定位问题）
+# 环境变量 MULTI_PROCESS_MODE=0 可以不改代码切回单进程
+MULTI_PROCESS_MODE = os.getenv("MULTI_PROCESS_MODE", "1") != "0"  # 默认多进程
+# ====================================================
+
 # 设置路径
 CURRENT_FILE = os.path.abspath(__file__)
 PROJECT_ROOT = os.path.dirname(CURRENT_FILE)
@@ -50,6 +51,8 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from websocket_pool.admin import WebSocketAdmin
+from multi_process import get_process_supervisor
+from replay import close_frame_recorder
 from http_server.server import HTTPServer
 from shared_data.pipeline_manager import PipelineManager
 from frontend_relay import FrontendRelayServer
@@ -108,6 +111,17 @@ async def delayed_ws_init(ws_admin):
     except Exception as e:
         logger.error(f"WebSocket初始化失败: {e}")
 
+async def delayed_process_init(supervisor):
+    """延迟启动行情进程和流水线进程（多进程模式，延迟原因同 delayed_ws_init）"""
+    await asyncio.sleep(10)
+    try:
+        logger.info("⏳ 延迟启动行情/流水线子进程...")
+        if await supervisor.start():
+            logger.info("✅ 子进程初始化完成")
+    except Exception as e:
+        logger.error(f"子进程初始化失败: {e}")
+        logger.error(traceback.format_exc())
+
 async def safe_get_pool_status(pool):
     """安全获取连接池状态"""
     try:
@@ -128,108 +142,6 @@ async def safe_get_pool_status(pool):
         logger.error(f"获取连接池状态失败: {e}")
         return {'connections': {}}
 
-# ==================== 多线程模式相关函数 ====================
-# 只有在 MULTI_THREAD_MODE = True 时才使用这些函数
-
-def run_async_in_thread(coro_func, name, daemon=True):
-    """
-    在独立线程中运行异步函数
-    每个线程有自己的事件循环
-    
-    Args:
-        coro_func: 要运行的异步函数
-        name: 线程名称
-        daemon: 是否为守护线程
-    
-    Returns:
-        threading.Thread: 启动的线程对象
-    """
-    def target():
-        try:
-            # 每个线程创建自己的事件循环
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(coro_func())
-        except Exception as e:
-            logger.error(f"❌ 线程 {name} 异常退出: {e}")
-            logger.error(traceback.format_exc())
-        finally:
-            loop.close()
-    
-    thread = threading.Thread(target=target, name=name, daemon=daemon)
-    thread.start()
-    return thread
-
-
-# ==================== 各模块的运行函数（多线程用）====================
-# 这些函数在单线程模式下不会用到
-
-async def run_public_websocket(brain):
-    """运行公共WebSocket模块（多线程用）"""
-    logger.info("🌐【公共WebSocket线程】已启动")
-    try:
-        # 如果已有ws_admin，让它运行
-        if brain.ws_admin:
-            # ws_admin 已经在运行，只需要保持
-            while brain.running:
-                await asyncio.sleep(1)
-        else:
-            # 如果没有，就等着
-            await asyncio.Future()
-    except Exception as e:
-        logger.error(f"❌ 公共WebSocket线程异常: {e}")
-
-async def run_private_websocket(brain):
-    """运行私人WebSocket模块（多线程用）"""
-    logger.info("🔒【私人WebSocket线程】已启动")
-    try:
-        # 私人连接池已经在运行，只需要保持
-        while brain.running:
-            await asyncio.sleep(1)
-    except Exception as e:
-        logger.error(f"❌ 私人WebSocket线程异常: {e}")
-
-async def run_public_pipeline(brain):
-    """运行公开数据处理流水线（多线程用）"""
-    logger.info("📊【公开数据处理线程】已启动")
-    try:
-        # pipeline_manager 已经在运行，只需要保持
-        while brain.running:
-            await asyncio.sleep(1)
-    except Exception as e:
-        logger.error(f"❌ 公开数据处理线程异常: {e}")
-
-async def run_private_pipeline(brain):
-    """运行私人数据处理流水线（多线程用）"""
-    logger.info("📝【私人数据处理线程】已启动")
-    try:
-        # 私人数据处理模块已经在运行，只需要保持
-        while brain.running:
-            await asyncio.sleep(1)
-    except Exception as e:
-        logger.error(f"❌ 私人数据处理线程异常: {e}")
-
-async def run_completion_module(brain):
-    """运行数据完成部门模块（多线程用）"""
-    logger.info("✅【数据完成部门线程】已启动")
-    try:
-        # 数据完成部门已经在运行，只需要保持
-        while brain.running:
-            await asyncio.sleep(1)
-    except Exception as e:
-        logger.error(f"❌ 数据完成部门线程异常: {e}")
-
-async def run_ticker_manager(brain):
-    """运行币安24h涨跌幅数据管理器（多线程用）"""
-    logger.info("📈【币安Ticker线程】已启动")
-    try:
-        # ticker_manager 已经在运行，只需要保持
-        while brain.running:
-            await asyncio.sleep(1)
-    except Exception as e:
-        logger.error(f"❌ 币安Ticker线程异常: {e}")
-
-
 # ==================== 主启动函数 ====================
 async def main():
     """主启动函数"""
@@ -243,18 +155,25 @@ async def main():
     logger.info("🚨🚨🚨 MAIN 函数开始执行")
     
     # 显示当前运行模式
-    mode_str = "多线程" if MULTI_THREAD_MODE else "单线程"
+    mode_str = "多进程" if MULTI_PROCESS_MODE else "单进程"
     logger.info(f"⚙️ 运行模式: {mode_str}")
     
     # 启动保活服务（已经在独立线程中）
     start_keep_alive_background()
     
+    # 事件循环健康监控（调度延迟 / 卡顿位置 / 任务数，见 /api/monitor/loop）
+    from system_monitor.loop_monitor import get_loop_monitor
+    get_loop_monitor().start()
+    
+    # 系统指标后台采样（/api/monitor/* 只读缓存）
+    from system_monitor.collector import get_system_sampler
+    get_system_sampler().start()
+    
     logger.info("=" * 60)
     logger.info("🚀 智能大脑启动中...")
     logger.info("=" * 60)
     
     brain = None
-    module_threads = []  # 保存所有模块线程（仅多线程模式用）
     
     try:
         # ==================== 验证环境变量 ====================
@@ -295,8 +214,12 @@ async def main():
         logger.info("✅ HTTP服务已就绪！")
 
         # ==================== 4. 初始化PipelineManager ====================
-        logger.info("【4️⃣】初始化PipelineManager...")
-        pipeline_manager = PipelineManager()
+        if MULTI_PROCESS_MODE:
+            logger.info("【4️⃣】多进程模式：流水线在独立进程里运行，主进程不创建PipelineManager")
+            pipeline_manager = None
+        else:
+            logger.info("【4️⃣】初始化PipelineManager...")
+            pipeline_manager = PipelineManager()
         brain.pipeline_manager = pipeline_manager
         
         # ==================== 5. 初始化资金费率管理器 ====================
@@ -330,17 +253,30 @@ async def main():
         
         # ==================== 8. 设置PipelineManager回调 ====================
         logger.info("【8️⃣】设置数据处理回调...")
-        pipeline_manager.set_brain_callback(brain.data_manager.receive_market_data)
+        if MULTI_PROCESS_MODE:
+            supervisor = get_process_supervisor()
+            supervisor.set_brain_callback(brain.data_manager.receive_market_data)
+            brain.process_supervisor = supervisor
+        else:
+            pipeline_manager.set_brain_callback(brain.data_manager.receive_market_data)
         
         # ==================== 9. 启动数据处理管道 ====================
-        logger.info("【9️⃣】启动数据处理管道...")
-        await pipeline_manager.start()
+        if MULTI_PROCESS_MODE:
+            logger.info("【9️⃣】数据处理管道随子进程一起启动")
+        else:
+            logger.info("【9️⃣】启动数据处理管道...")
+            await pipeline_manager.start()
         
         # ==================== 10. 延迟启动WebSocket ====================
-        logger.info("【🔟】准备延迟启动WebSocket...")
-        ws_admin = WebSocketAdmin()
-        asyncio.create_task(delayed_ws_init(ws_admin))
-        brain.ws_admin = ws_admin
+        if MULTI_PROCESS_MODE:
+            logger.info("【🔟】准备延迟启动行情进程和流水线进程...")
+            asyncio.create_task(delayed_process_init(supervisor))
+            brain.ws_admin = None
+        else:
+            logger.info("【🔟】准备延迟启动WebSocket...")
+            ws_admin = WebSocketAdmin()
+            asyncio.create_task(delayed_ws_init(ws_admin))
+            brain.ws_admin = ws_admin
         
         # ==================== 11. 启动私人WebSocket连接池 ====================
         logger.info("【🅱️】启动私人WebSocket连接池...")
@@ -425,6 +361,7 @@ async def main():
                 Database,
                 BinanceRepairArea,
                 OkxMissingRepair,
+                SCOPE_USER,
             )
             logger.info("✅ 成功导入数据完成部门模块")
             
@@ -447,9 +384,10 @@ async def main():
             okx_repair = OkxMissingRepair(scheduler)
             logger.info("✅【启动文件】【数据完成部门】 欧易修复区已初始化")
             
-            data_receiver.subscribe(detector.handle_store_snapshot)
+            # 检测区和欧易修复区只读私人数据，纯行情更新不推给它们
+            data_receiver.subscribe(detector.handle_store_snapshot, scopes=[SCOPE_USER])
             data_receiver.subscribe(binance_repair.handle_store_snapshot)
-            data_receiver.subscribe(okx_repair.handle_store_snapshot)
+            data_receiver.subscribe(okx_repair.handle_store_snapshot, scopes=[SCOPE_USER])
             logger.info("✅【启动文件】【数据完成部门】 接收存储区已连接检测区和修复区")
             
             scheduler.set_database(database)
@@ -488,98 +426,20 @@ async def main():
         logger.info("=" * 60)
         
         # ==================== 19. 根据模式选择运行方式 ====================
-        if MULTI_THREAD_MODE:
-            # ===== 多线程模式 =====
-            logger.info("🚀 进入多模块并行运行模式...")
-            
-            # 启动各个模块的独立线程
-            module_threads = []
-            
-            # 1. 公共WebSocket线程
-            if brain.ws_admin:
-                module_threads.append(run_async_in_thread(
-                    lambda: run_public_websocket(brain),
-                    "PublicWS"
-                ))
-                logger.info("  ├─ 公共WebSocket线程已启动")
-            
-            # 2. 私人WebSocket线程
-            if brain.private_pool:
-                module_threads.append(run_async_in_thread(
-                    lambda: run_private_websocket(brain),
-                    "PrivateWS"
-                ))
-                logger.info("  ├─ 私人WebSocket线程已启动")
-            
-            # 3. 公开数据处理线程
-            if brain.pipeline_manager:
-                module_threads.append(run_async_in_thread(
-                    lambda: run_public_pipeline(brain),
-                    "Pipeline"
-                ))
-                logger.info("  ├─ 公开数据处理线程已启动")
-            
-            # 4. 私人数据处理线程（如果有）
-            module_threads.append(run_async_in_thread(
-                lambda: run_private_pipeline(brain),
-                "PrivatePipeline"
-            ))
-            logger.info("  ├─ 私人数据处理线程已启动")
-            
-            # 5. 数据完成部门线程
-            if brain.data_scheduler:
-                module_threads.append(run_async_in_thread(
-                    lambda: run_completion_module(brain),
-                    "Completion"
-                ))
-                logger.info("  ├─ 数据完成部门线程已启动")
-            
-            # 6. 币安24h涨跌幅数据管理器线程
-            if brain.ticker_manager:
-                module_threads.append(run_async_in_thread(
-                    lambda: run_ticker_manager(brain),
-                    "TickerManager"
-                ))
-                logger.info("  └─ 币安Ticker线程已启动")
-            
-            logger.info(f"✅ 共启动 {len(module_threads)} 个模块线程")
+        if MULTI_PROCESS_MODE:
+            # ===== 多进程模式 =====
+            logger.info("🚀 进入多进程运行模式（行情进程 × 交易所数 + 流水线进程）...")
             logger.info("=" * 60)
             logger.info("🛑 按 Ctrl+C 停止")
             logger.info("=" * 60)
             
-            # 主线程只做监控
+            # 主进程事件循环跑大脑 / 中继 / HTTP，这里只看护子进程
             while brain.running:
                 await asyncio.sleep(5)
-                
-                # 检查所有线程是否健康
-                for i, thread in enumerate(module_threads):
-                    if not thread.is_alive():
-                        logger.error(f"⚠️ 模块线程 {thread.name} 已停止，尝试重启...")
-                        # 重启线程
-                        thread_funcs = [
-                            lambda: run_public_websocket(brain),
-                            lambda: run_private_websocket(brain),
-                            lambda: run_public_pipeline(brain),
-                            lambda: run_private_pipeline(brain),
-                            lambda: run_completion_module(brain),
-                            lambda: run_ticker_manager(brain)
-                        ]
-                        # 根据线程名称找到对应的函数
-                        name_to_func = {
-                            "PublicWS": thread_funcs[0],
-                            "PrivateWS": thread_funcs[1],
-                            "Pipeline": thread_funcs[2],
-                            "PrivatePipeline": thread_funcs[3],
-                            "Completion": thread_funcs[4],
-                            "TickerManager": thread_funcs[5]
-                        }
-                        func = name_to_func.get(thread.name)
-                        if func:
-                            new_thread = run_async_in_thread(func, thread.name)
-                            module_threads[i] = new_thread
+                await supervisor.check()
         
         else:
-            # ===== 单线程模式 =====
+            # ===== 单进程模式 =====
             logger.info("🚀 进入单事件循环模式（调试模式）...")
             logger.info("=" * 60)
             logger.info("🛑 按 Ctrl+C 停止")
@@ -596,10 +456,16 @@ async def main():
         logger.error(f"运行错误: {e}")
         logger.error(traceback.format_exc())
     finally:
+        get_loop_monitor().stop()
+        get_system_sampler().stop()
+        if MULTI_PROCESS_MODE:
+            await get_process_supervisor().stop()
         if brain:
             brain.running = False
             await brain.shutdown()
             logger.info("✅ 所有模块已停止")
+        # 连接都停了再收尾录制，最后一个分段才是完整的 gzip
+        close_frame_recorder()
 
 if __name__ == "__main__":
     print("🚨🚨🚨 进入 __main__", file=sys.stderr)
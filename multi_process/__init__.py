@@ -0,0 +1,13 @@
+"""
+多进程运行模式：每个交易所一个行情进程 + 一个流水线进程，大脑 / 中继 / HTTP 留在主进程
+
+进程之间用单向管道传紧凑二进制记录（records.py），批量成帧（channel.py）。
+启动器里 MULTI_PROCESS_MODE 打开时由 ProcessSupervisor 拉起和看护子进程；关掉就是原来的单进程模式。
+"""
+
+from .supervisor import ProcessSupervisor, get_process_supervisor
+
+__all__ = [
+    'ProcessSupervisor',
+    'get_process_supervisor',
+]
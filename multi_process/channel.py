@@ -0,0 +1,232 @@
+# multi_process/channel.py
+"""
+进程间通道 - 单向管道 + 批量帧
+
+每条通道是一根 multiprocessing.Pipe(duplex=False)（Linux 上就是 os.pipe），两端都挂到 asyncio 上：
+
+    ChannelWriter   send(record) 只把记录追加到缓冲；同一轮事件循环里攒下的记录
+                    在下一轮拼成一帧（4 字节长度 + 记录首尾相接）一次写出。
+                    缓冲一满 MAX_BATCH_BYTES 立刻写，不等下一轮。
+    ChannelReader   按帧切分，整帧交给 handler（异步），handler 里用 decode_batch 逐条解。
+
+背压：行情是"最新值覆盖"的，发送方绝不能被接收方拖住。
+写端管道缓冲超过 MAX_BUFFERED_BYTES 时整批丢弃并计数；
+读端待处理帧超过 MAX_PENDING_FRAMES 时暂停读管道，让压力回到写端（最终变成写端丢批）。
+"""
+
+import asyncio
+import logging
+import os
+import struct
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from .records import decode_batch, Record
+
+logger = logging.getLogger(__name__)
+
+FRAME = struct.Struct("<I")
+
+MAX_BATCH_BYTES = 256 * 1024             # 单帧上限，超过立刻写出
+MAX_BUFFERED_BYTES = 16 * 1024 * 1024    # 写端管道缓冲上限，超过丢批
+MAX_PENDING_FRAMES = 256                 # 读端待处理帧上限，超过暂停读
+
+
+def _open_pipe(connection, mode: str):
+    """把 multiprocessing 的 Connection 换成 asyncio 能挂的文件对象（dup 一份，原对象关掉）"""
+    fd = os.dup(connection.fileno())
+    connection.close()
+    return open(fd, mode, buffering=0)
+
+
+class ChannelWriter(asyncio.Protocol):
+    """通道写端"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.transport: Optional[asyncio.WriteTransport] = None
+        self.closed = False
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._flush_scheduled = False
+
+        self.records_sent = 0
+        self.batches_sent = 0
+        self.bytes_sent = 0
+        self.records_dropped = 0
+
+    async def open(self, connection):
+        self._loop = asyncio.get_running_loop()
+        await self._loop.connect_write_pipe(lambda: self, _open_pipe(connection, "wb"))
+
+    # ========== asyncio.Protocol ==========
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.closed = True
+        if exc:
+            logger.warning(f"⚠️【进程通道】{self.name} 写端断开: {exc}")
+
+    # ========== 发送 ==========
+
+    def send(self, record: bytes):
+        if self.closed or self.transport is None:
+            self.records_dropped += 1
+            return
+        self._pending.append(record)
+        self._pending_bytes += len(record)
+        if self._pending_bytes >= MAX_BATCH_BYTES:
+            self.flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self.flush)
+
+    def flush(self):
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        records = self._pending
+        batch = b"".join(records)
+        self._pending = []
+        self._pending_bytes = 0
+
+        if self.closed or self.transport.is_closing():
+            self.records_dropped += len(records)
+            return
+        if self.transport.get_write_buffer_size() > MAX_BUFFERED_BYTES:
+            self.records_dropped += len(records)
+            return
+        self.transport.write(FRAME.pack(len(batch)) + batch)
+        self.records_sent += len(records)
+        self.batches_sent += 1
+        self.bytes_sent += len(batch) + FRAME.size
+
+    def close(self):
+        self.flush()
+        if self.transport is not None:
+            self.transport.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "records_sent": self.records_sent,
+            "batches_sent": self.batches_sent,
+            "bytes_sent": self.bytes_sent,
+            "records_dropped": self.records_dropped,
+            "write_buffer_bytes": self.transport.get_write_buffer_size() if self.transport else 0,
+        }
+
+
+class ChannelReader(asyncio.Protocol):
+    """通道读端：整帧交给 handler(records)，handler 在独立任务里按顺序执行"""
+
+    def __init__(self, name: str, handler: Callable[[List[Record]], Awaitable[None]]):
+        self.name = name
+        self.handler = handler
+        self.transport: Optional[asyncio.ReadTransport] = None
+        self.closed = False
+
+        self._buffer = bytearray()
+        self._frames: Deque[Optional[bytes]] = deque()
+        self._wakeup = asyncio.Event()
+        self._paused = False
+        self._task: Optional[asyncio.Task] = None
+
+        self.records_received = 0
+        self.batches_received = 0
+        self.bytes_received = 0
+        self.max_pending_frames = 0
+        self.bad_frames = 0
+
+    async def open(self, connection):
+        loop = asyncio.get_running_loop()
+        await loop.connect_read_pipe(lambda: self, _open_pipe(connection, "rb"))
+        self._task = asyncio.create_task(self._consume(), name=f"channel-{self.name}")
+
+    # ========== asyncio.Protocol ==========
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        self._buffer += data
+        self.bytes_received += len(data)
+        buffer = self._buffer
+        offset = 0
+        while len(buffer) - offset >= FRAME.size:
+            (length,) = FRAME.unpack_from(buffer, offset)
+            if len(buffer) - offset - FRAME.size < length:
+                break
+            start = offset + FRAME.size
+            self._frames.append(bytes(buffer[start:start + length]))
+            offset = start + length
+        if offset:
+            del buffer[:offset]
+
+        if self._frames:
+            self.max_pending_frames = max(self.max_pending_frames, len(self._frames))
+            self._wakeup.set()
+            if len(self._frames) > MAX_PENDING_FRAMES and not self._paused:
+                self._paused = True
+                self.transport.pause_reading()
+
+    def eof_received(self):
+        return False
+
+    def connection_lost(self, exc):
+        self.closed = True
+        self._frames.append(None)
+        self._wakeup.set()
+
+    # ========== 消费 ==========
+
+    async def _consume(self):
+        while True:
+            if not self._frames:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            frame = self._frames.popleft()
+            if frame is None:
+                logger.info(f"🔌【进程通道】{self.name} 对端已关闭")
+                return
+            if self._paused and len(self._frames) < MAX_PENDING_FRAMES // 2:
+                self._paused = False
+                self.transport.resume_reading()
+
+            # 解不开的帧（两端版本不一致 / 数据损坏）跳过并计数，不能让消费任务死掉、通道悄悄停住
+            try:
+                records = list(decode_batch(frame))
+            except Exception as e:
+                self.bad_frames += 1
+                logger.error(f"❌【进程通道】{self.name} 第{self.bad_frames}个坏帧已跳过（{len(frame)}字节）: {e!r}")
+                continue
+            self.records_received += len(records)
+            self.batches_received += 1
+            try:
+                await self.handler(records)
+            except Exception as e:
+                logger.error(f"❌【进程通道】{self.name} 处理记录失败: {e}")
+
+    async def wait_closed(self):
+        if self._task:
+            await self._task
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+        if self._task:
+            self._task.cancel()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "records_received": self.records_received,
+            "batches_received": self.batches_received,
+            "bytes_received": self.bytes_received,
+            "pending_frames": sum(1 for frame in self._frames if frame is not None),
+            "max_pending_frames": self.max_pending_frames,
+            "bad_frames": self.bad_frames,
+        }
@@ -0,0 +1,345 @@
+# multi_process/supervisor.py
+"""
+多进程看护者（主进程一侧）
+
+拓扑：
+
+    行情进程 binance ──行情──┐
+    行情进程 okx     ──行情──┼──► 流水线进程 ──结果 / 指标──► 主进程（大脑 / 中继 / HTTP）
+    主进程资金费率   ──行情──┘
+    行情进程 ──连接池状态 / 调试命令回复──► 主进程
+    流水线进程 ──最新行情镜像（每秒合并一次）──► 主进程
+    主进程 ──调试命令──► 每个子进程
+
+1. start()：主进程先拉合约列表并做双平台匹配（和单进程模式同一套逻辑），
+   再按交易所拉起行情进程、拉起流水线进程、连好所有通道
+2. 主进程 DataStore 里写入的行情（资金费率结算等 HTTP 数据）通过转发钩子发给流水线进程
+3. 流水线结果交给大脑回调和数据完成部门（和单进程模式下 PipelineManager 做的一样）；
+   流水线指标存进本进程的 PipelineMetrics（mirror），/api/monitor/* 照常可看；
+   连接池状态写进本进程的 DataStore，/api/debug/websocket_status 照常可看；
+   最新行情镜像写进本进程的 DataStore（不再转发），/api/public/data/* 照常可看（最多晚 1 秒左右）
+4. check()：任何一个子进程退出就整组重启（通道两头都要换，单独重启一个接不上）；
+   重启前先退避（RESTART_BACKOFF_BASE 秒起，连续很快失败就翻倍），
+   连续 MAX_QUICK_FAILURES 次启动后不到 QUICK_FAILURE_SECONDS 秒就退出则放弃重启，
+   免得交易所连不上 / 被封时反复建连接把限额打满；
+   重启后把主进程 DataStore 里已有的行情重发一遍，流水线进程不会缺资金费率
+
+5. request()：经每个子进程的命令管道发调试命令（采样分析），等它从回主进程的通道回复，
+   /api/debug/profile?process=pipeline 这类请求靠它看到子进程里的 CPU 热点
+
+子进程用 spawn 启动（主进程里已经有好几个线程，fork 不安全）。
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from replay.recorder import get_frame_recorder
+from shared_data.data_store import data_store
+from shared_data.pipeline_metrics import get_pipeline_metrics
+
+from .channel import ChannelReader, ChannelWriter
+from .records import (encode, encode_market, KIND_COMMAND, KIND_MARKET, KIND_METRICS, KIND_REPLY,
+                      KIND_RESULTS, KIND_STATUS, Record)
+from .workers import ingestion_main, pipeline_main
+
+logger = logging.getLogger(__name__)
+
+JOIN_TIMEOUT = 5                # 停子进程时等它自己退出的秒数，超时强杀
+RESTART_BACKOFF_BASE = 5        # 重启前的等待（秒），每多一次连续很快失败翻一倍
+RESTART_BACKOFF_MAX = 300       # 重启等待上限（秒）
+QUICK_FAILURE_SECONDS = 60      # 启动后多久内退出算"很快失败"
+MAX_QUICK_FAILURES = 5          # 连续很快失败这么多次就不再重启
+
+
+class ProcessSupervisor:
+    """拉起 / 连线 / 看护子进程"""
+
+    def __init__(self):
+        self._context = multiprocessing.get_context("spawn")
+        self.brain_callback: Optional[Callable] = None
+        self.running = False
+
+        self.plan: Dict[str, Tuple[List[str], str]] = {}    # 交易所 → (合约列表, 模式)
+        self.processes: Dict[str, Any] = {}
+        self._readers: List[ChannelReader] = []
+        self._forward: Optional[ChannelWriter] = None
+        self._commands: Dict[str, ChannelWriter] = {}        # 子进程名 → 命令管道
+        self._requests: Dict[int, asyncio.Future] = {}       # 等回复的调试命令
+        self._next_request_id = 0
+
+        self.restarts = 0
+        self.started_at = 0.0                         # 最近一次拉起子进程的时间
+        self.quick_failures = 0                       # 连续很快失败的次数
+        self.next_restart_at: Optional[float] = None  # 退避中：到这个时间再拉起
+        self.gave_up = False
+        self.results_received = 0
+        self.last_results_at: Optional[float] = None
+        self.pipeline_status: Dict[str, Any] = {}
+        self.ingestion_channels: Dict[str, Dict[str, int]] = {}
+
+    def set_brain_callback(self, callback: Callable):
+        """设置市场数据大脑回调（和 PipelineManager.set_brain_callback 一样）"""
+        self.brain_callback = callback
+
+    # ========== 启停 ==========
+
+    async def start(self):
+        from websocket_pool.pool_manager import WebSocketPoolManager
+
+        logger.info("🚀【多进程】计算各交易所合约...")
+        self.plan = await WebSocketPoolManager().plan_exchange_symbols()
+        if not self.plan:
+            logger.error("❌【多进程】没有可用合约，行情进程不启动")
+            return False
+
+        # 开了录制的话先在主进程定下会话目录（写进环境变量），之后 spawn 的行情进程录到同一个目录
+        get_frame_recorder()
+
+        await self._spawn()
+        data_store.set_market_data_forwarder(self._forward_market_data)
+        self.running = True
+        return True
+
+    async def stop(self):
+        self.running = False
+        data_store.set_market_data_forwarder(None)
+        await self._terminate()
+        logger.info("✅【多进程】子进程已全部停止")
+
+    async def check(self):
+        """看护：任何子进程退出就整组重启（带退避，连续很快失败就放弃）"""
+        if not self.running or self.gave_up:
+            return
+        now = time.time()
+        if self.next_restart_at is not None:
+            if now >= self.next_restart_at:
+                self.next_restart_at = None
+                await self._spawn()
+                self.restarts += 1
+            return
+
+        dead = [name for name, process in self.processes.items() if not process.is_alive()]
+        if not dead:
+            return
+        for name in dead:
+            logger.error(f"⚠️【多进程】子进程 {name} 已退出 (exitcode={self.processes[name].exitcode})")
+        await self._terminate()
+
+        uptime = now - self.started_at
+        self.quick_failures = self.quick_failures + 1 if uptime < QUICK_FAILURE_SECONDS else 0
+        if self.quick_failures >= MAX_QUICK_FAILURES:
+            self.gave_up = True
+            logger.critical(f"🆘【多进程】子进程连续 {self.quick_failures} 次启动后 {QUICK_FAILURE_SECONDS} 秒内退出，"
+                            f"停止自动重启，请检查交易所连通性后重启服务")
+            return
+        delay = min(RESTART_BACKOFF_BASE * 2 ** self.quick_failures, RESTART_BACKOFF_MAX)
+        self.next_restart_at = now + delay
+        logger.error(f"🔄【多进程】{delay}秒后整组重启（运行了{uptime:.0f}秒，连续很快失败{self.quick_failures}次）")
+
+    # ========== 拉起 / 停止子进程 ==========
+
+    async def _spawn(self):
+        context = self._context
+        self.started_at = time.time()
+        child_ends = []
+        pipeline_inputs = []
+        controls = []
+        commands = {}
+
+        for exchange, (symbols, mode) in self.plan.items():
+            name = f"ingest-{exchange}"
+            market_r, market_w = context.Pipe(duplex=False)
+            control_r, control_w = context.Pipe(duplex=False)
+            command_r, commands[name] = context.Pipe(duplex=False)
+            self.processes[name] = context.Process(
+                target=ingestion_main, args=(exchange, symbols, mode, market_w, control_w, command_r),
+                name=name, daemon=True)
+            pipeline_inputs.append(market_r)
+            controls.append((exchange, control_r))
+            child_ends += [market_r, market_w, control_w, command_r]
+
+        forward_r, forward_w = context.Pipe(duplex=False)
+        results_r, results_w = context.Pipe(duplex=False)
+        command_r, commands["pipeline"] = context.Pipe(duplex=False)
+        pipeline_inputs.append(forward_r)
+        child_ends += [forward_r, results_w, command_r]
+        self.processes["pipeline"] = context.Process(
+            target=pipeline_main, args=(pipeline_inputs, results_w, command_r),
+            name="pipeline", daemon=True)
+
+        # 流水线先起，行情进程后起；子进程那头的管道端在主进程里关掉，对端退出时才能读到 EOF
+        for name in ["pipeline"] + [name for name in self.processes if name != "pipeline"]:
+            self.processes[name].start()
+            logger.info(f"✅【多进程】子进程 {name} 已启动 (pid={self.processes[name].pid})")
+        for connection in child_ends:
+            connection.close()
+
+        results = ChannelReader("流水线结果", self._on_pipeline_records)
+        await results.open(results_r)
+        self._readers = [results]
+        for exchange, control_r in controls:
+            reader = ChannelReader(f"{exchange}状态", self._on_status_records)
+            await reader.open(control_r)
+            self._readers.append(reader)
+
+        self._forward = ChannelWriter("主进程→流水线")
+        await self._forward.open(forward_w)
+        for name, command_w in commands.items():
+            writer = ChannelWriter(f"主进程→{name}命令")
+            await writer.open(command_w)
+            self._commands[name] = writer
+        await self._replay_market_data()
+
+    async def _terminate(self):
+        if self._forward:
+            self._forward.close()
+            self._forward = None
+        for writer in self._commands.values():
+            writer.close()
+        self._commands = {}
+        for reader in self._readers:
+            reader.close()
+        self._readers = []
+        for future in self._requests.values():
+            if not future.done():
+                future.set_exception(ConnectionError("子进程已停止"))
+        self._requests = {}
+
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        for name, process in self.processes.items():
+            await asyncio.to_thread(process.join, JOIN_TIMEOUT)
+            if process.is_alive():
+                logger.warning(f"⚠️【多进程】子进程 {name} 未按时退出，强制结束")
+                process.kill()
+                await asyncio.to_thread(process.join)
+        self.processes = {}
+
+    # ========== 主进程 → 流水线 ==========
+
+    def _forward_market_data(self, exchange: str, symbol: str, data: Dict[str, Any]):
+        if self._forward:
+            self._forward.send(encode_market({**data, "exchange": exchange, "symbol": symbol}))
+
+    async def _replay_market_data(self):
+        """把主进程自己写入的行情（资金费率等，不含镜像回来的 WebSocket 行情）发给（新的）流水线进程"""
+        count = 0
+        for exchange, symbols in data_store.market_data.items():
+            for symbol, entries in symbols.items():
+                for data_type, data in entries.items():
+                    if data_type == "latest" or data.get("source", "websocket") == "websocket":
+                        continue
+                    self._forward_market_data(exchange, symbol, data)
+                    count += 1
+        if count:
+            logger.info(f"📤【多进程】已向流水线进程重发 {count} 条主进程行情")
+
+    # ========== 调试命令 ==========
+
+    async def request(self, process: str, op: str, args: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        给子进程发一条调试命令并等回复
+
+        :return: {"result": ...} 或 {"error": ..., "status": HTTP状态码}
+        :raises KeyError: 没有这个子进程
+        :raises asyncio.TimeoutError: 超时没回复
+        :raises ConnectionError: 等待期间子进程被停掉 / 重启
+        """
+        writer = self._commands.get(process)
+        if writer is None or writer.closed:
+            raise KeyError(process)
+        self._next_request_id += 1
+        request_id = self._next_request_id
+        future = asyncio.get_running_loop().create_future()
+        self._requests[request_id] = future
+        try:
+            writer.send(encode(KIND_COMMAND, {"id": request_id, "op": op, "args": args}))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._requests.pop(request_id, None)
+
+    def _on_reply(self, payload: Dict[str, Any]):
+        future = self._requests.get(payload.get("id"))
+        if future is not None and not future.done():
+            future.set_result(payload)
+
+    # ========== 子进程 → 主进程 ==========
+
+    async def _on_pipeline_records(self, records: List[Record]):
+        for record in records:
+            if record.kind == KIND_RESULTS:
+                await self._deliver_results(record.payload)
+            elif record.kind == KIND_MARKET:
+                await data_store.update_market_data(record.exchange, record.symbol, record.payload, forward=False)
+            elif record.kind == KIND_METRICS:
+                get_pipeline_metrics().mirror(record.payload["snapshot"], record.payload["prometheus"])
+                self.pipeline_status = record.payload["status"]
+            elif record.kind == KIND_REPLY:
+                self._on_reply(record.payload)
+
+    async def _deliver_results(self, results: List[Dict[str, Any]]):
+        """流水线一跳的结果：给大脑，再推数据完成部门（和 PipelineManager 单进程时一致）"""
+        self.results_received += 1
+        self.last_results_at = time.time()
+        if self.brain_callback:
+            await self.brain_callback(results)
+        try:
+            from data_completion_department import receive_market_data
+            await receive_market_data(results)
+        except Exception as e:
+            logger.error(f"❌【多进程】推送行情数据到数据完成部门失败: {e}")
+
+    async def _on_status_records(self, records: List[Record]):
+        for record in records:
+            if record.kind == KIND_REPLY:
+                self._on_reply(record.payload)
+                continue
+            if record.kind != KIND_STATUS:
+                continue
+            for connection_type, status in record.payload["connections"].items():
+                await data_store.update_connection_status(record.exchange, connection_type, status)
+            self.ingestion_channels[record.exchange] = record.payload["channel"]
+
+    # ========== 状态 ==========
+
+    def child_pids(self) -> Dict[str, int]:
+        """子进程名 → pid（系统监控的采样线程里调用，先拷一份再遍历）"""
+        return {name: process.pid for name, process in dict(self.processes).items() if process.pid}
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "restarts": self.restarts,
+            "quick_failures": self.quick_failures,
+            "next_restart_at": self.next_restart_at,
+            "gave_up": self.gave_up,
+            "processes": {
+                name: {"pid": process.pid, "alive": process.is_alive(), "exitcode": process.exitcode}
+                for name, process in self.processes.items()
+            },
+            "symbols": {exchange: len(symbols) for exchange, (symbols, _) in self.plan.items()},
+            "results_received": self.results_received,
+            "last_results_at": self.last_results_at,
+            "pipeline": self.pipeline_status,
+            "channels": {
+                "ingestion": self.ingestion_channels,
+                "readers": {reader.name: reader.get_stats() for reader in self._readers},
+                "forward": self._forward.get_stats() if self._forward else None,
+            },
+        }
+
+
+# ==================== 全局单例 ====================
+_supervisor: Optional[ProcessSupervisor] = None
+
+
+def get_process_supervisor() -> ProcessSupervisor:
+    """获取全局多进程看护者"""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = ProcessSupervisor()
+    return _supervisor
@@ -0,0 +1,223 @@
+# multi_process/workers.py
+"""
+子进程入口（spawn 方式启动，每个子进程有自己的解释器、GIL 和事件循环）
+
+    ingestion_main   行情进程，每个交易所一个：WebSocket 连接池 + JSON 解码，
+                     行情编码后写给流水线进程，连接池状态定时写给主进程
+    pipeline_main    流水线进程：DataStore + PipelineManager（step0 ~ step5），
+                     每一跳的结果写给主进程，流水线指标定时写给主进程，
+                     WebSocket 行情的最新值每 MIRROR_INTERVAL 秒合并一次镜像给主进程
+
+每个子进程还有一条主进程 → 子进程的命令管道（调试用，目前只有采样分析 profile），
+回复走子进程原有的回主进程通道（行情进程走状态通道，流水线进程走结果通道）。
+
+子进程不处理 Ctrl+C（由主进程统一停）；父进程没了（getppid 变了）或者回主进程的通道断了就自己退出。
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from latency_stats import summarize
+
+from .channel import ChannelReader, ChannelWriter
+from .records import (encode, encode_market, KIND_COMMAND, KIND_METRICS, KIND_REPLY,
+                      KIND_RESULTS, KIND_STATUS, Record)
+
+logger = logging.getLogger(__name__)
+
+STATUS_INTERVAL = 3       # 行情进程上报连接池状态的间隔（秒）
+METRICS_INTERVAL = 5      # 流水线进程上报指标的间隔（秒）
+MIRROR_INTERVAL = 1.0     # 流水线进程把最新行情镜像给主进程的间隔（秒）
+
+
+def _setup_process():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+        stream=sys.stdout
+    )
+
+
+# ==================== 调试命令 ====================
+
+async def _run_command(payload: Dict[str, Any], reply: ChannelWriter):
+    """执行一条主进程发来的调试命令，结果写回主进程"""
+    from system_monitor.profiler import profile, ProfilerBusy
+
+    request_id = payload.get("id")
+    if payload.get("op") != "profile":
+        reply.send(encode(KIND_REPLY, {"id": request_id, "error": f"未知命令: {payload.get('op')}", "status": 400}))
+        return
+    try:
+        result = await profile(**payload.get("args", {}))
+    except ProfilerBusy as e:
+        reply.send(encode(KIND_REPLY, {"id": request_id, "error": str(e), "status": 409}))
+    except (TypeError, ValueError) as e:
+        reply.send(encode(KIND_REPLY, {"id": request_id, "error": str(e), "status": 400}))
+    except Exception as e:
+        logger.error(f"❌【子进程】采样分析失败: {e}")
+        reply.send(encode(KIND_REPLY, {"id": request_id, "error": str(e), "status": 500}))
+    else:
+        reply.send(encode(KIND_REPLY, {"id": request_id, "result": result.to_dict()}))
+
+
+async def _open_commands(connection, reply: ChannelWriter) -> ChannelReader:
+    """挂上命令管道；每条命令在独立任务里跑（采样要跑好几秒，不能堵住管道）"""
+    tasks = set()
+
+    async def on_command(records: List[Record]):
+        for record in records:
+            if record.kind != KIND_COMMAND:
+                continue
+            task = asyncio.create_task(_run_command(record.payload, reply))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    reader = ChannelReader("主进程命令", on_command)
+    await reader.open(connection)
+    return reader
+
+
+# ==================== 行情进程 ====================
+
+def ingestion_main(exchange: str, symbols: List[str], mode: str, market_conn, control_conn, command_conn):
+    """行情进程入口"""
+    _setup_process()
+    try:
+        asyncio.run(_run_ingestion(exchange, symbols, mode, market_conn, control_conn, command_conn))
+    except asyncio.CancelledError:
+        pass
+
+
+async def _run_ingestion(exchange: str, symbols: List[str], mode: str, market_conn, control_conn, command_conn):
+    from replay import close_frame_recorder
+    from shared_data.data_store import data_store
+    from websocket_pool.admin import WebSocketAdmin
+
+    # 主进程用 terminate()（SIGTERM）停子进程：取消主任务，让 finally 停连接、收尾录制分段
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+    market = ChannelWriter(f"{exchange}→流水线")
+    await market.open(market_conn)
+    control = ChannelWriter(f"{exchange}→主进程")
+    await control.open(control_conn)
+    commands = await _open_commands(command_conn, control)
+
+    async def forward(data):
+        if data and data.get("exchange") and data.get("symbol"):
+            market.send(encode_market(data))
+
+    admin = WebSocketAdmin()
+    if not await admin.start_exchange(exchange, symbols, mode, forward):
+        sys.exit(1)
+    logger.info(f"✅【行情进程】{exchange} 已启动 (pid={os.getpid()})")
+
+    parent = os.getppid()
+    try:
+        while os.getppid() == parent and not control.closed:
+            connections = await data_store.get_connection_status(exchange)
+            control.send(encode(KIND_STATUS, {
+                "connections": connections,
+                "channel": market.get_stats(),
+            }, exchange=exchange))
+            await asyncio.sleep(STATUS_INTERVAL)
+    finally:
+        logger.info(f"🛑【行情进程】{exchange} 退出")
+        await admin.stop()
+        close_frame_recorder()
+        commands.close()
+        market.close()
+        control.close()
+
+
+# ==================== 流水线进程 ====================
+
+def pipeline_main(market_conns: list, results_conn, command_conn):
+    """流水线进程入口"""
+    _setup_process()
+    try:
+        asyncio.run(_run_pipeline(market_conns, results_conn, command_conn))
+    except asyncio.CancelledError:
+        pass
+
+
+async def _run_pipeline(market_conns: list, results_conn, command_conn):
+    from shared_data.data_store import data_store
+    from shared_data.pipeline_manager import PipelineManager
+    from shared_data.pipeline_metrics import get_pipeline_metrics
+
+    # 和行情进程一样：SIGTERM 取消主任务，让 finally 停流水线、关通道
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+    results = ChannelWriter("流水线→主进程")
+    await results.open(results_conn)
+    commands = await _open_commands(command_conn, results)
+
+    # 跨进程延迟：每批第一条（最早那条）从发出到写进 DataStore 的时间
+    lags: List[float] = []
+    # 待镜像给主进程的最新行情（/api/public/data/* 读主进程的 DataStore）；
+    # 同一个（交易所, 合约, 类型）一个间隔内只发最后一次。主进程自己写来的（资金费率等）不回传
+    latest: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+    async def on_market(records: List[Record]):
+        lags.append(time.time() - records[0].sent_at)
+        for record in records:
+            await data_store.update_market_data(record.exchange, record.symbol, record.payload)
+            if record.payload.get("source", "websocket") == "websocket":
+                latest[(record.exchange, record.symbol, record.data_type)] = record.payload
+
+    async def mirror_loop():
+        while True:
+            await asyncio.sleep(MIRROR_INTERVAL)
+            batch = list(latest.values())
+            latest.clear()
+            for data in batch:
+                results.send(encode_market(data))
+
+    readers = []
+    for i, connection in enumerate(market_conns):
+        reader = ChannelReader(f"行情输入{i}", on_market)
+        await reader.open(connection)
+        readers.append(reader)
+
+    async def to_main(all_results):
+        results.send(encode(KIND_RESULTS, all_results))
+
+    pipeline = PipelineManager(brain_callback=to_main, push_to_completion=False)
+    await pipeline.start()
+    logger.info(f"✅【流水线进程】已启动 (pid={os.getpid()})，输入通道 {len(readers)} 条")
+
+    mirror_task = asyncio.create_task(mirror_loop())
+    metrics = get_pipeline_metrics()
+    parent = os.getppid()
+    try:
+        while os.getppid() == parent and not results.closed:
+            await asyncio.sleep(METRICS_INTERVAL)
+            window = list(lags)
+            lags.clear()
+            snapshot = metrics.snapshot()
+            snapshot["ipc"] = {
+                "lag_ms": summarize(window, percentiles=(50,), digits=3, scale=1000),
+                "inputs": [reader.get_stats() for reader in readers],
+                "output": results.get_stats(),
+            }
+            results.send(encode(KIND_METRICS, {
+                "snapshot": snapshot,
+                "prometheus": metrics.prometheus(),
+                "status": pipeline.get_status(),
+            }))
+    finally:
+        logger.info("🛑【流水线进程】退出")
+        mirror_task.cancel()
+        await pipeline.stop()
+        for reader in readers:
+            reader.close()
+        commands.close()
+        results.close()
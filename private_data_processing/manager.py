@@ -30,6 +30,7 @@ class PrivateDataProcessor:
         if not self._initialized:
             self.memory_store = {'private_data': {}}
             self._lock = threading.Lock()  # 添加线程锁
+            self._order_listeners = []     # 订单推送监听（下单工人的订单追踪）
             self._initialized = True
             logger.info("✅ [私人数据处理] 模块已初始化")
             
@@ -197,12 +198,35 @@ class PrivateDataProcessor:
         except Exception as e:
             logger.error(f"❌【私人数据处理】【Manager】喂给Step1完整存储区失败: {e}")
     
+    def add_order_listener(self, callback):
+        """
+        登记订单推送监听
+        
+        callback(exchange, raw_data)：每条订单推送（币安 ORDER_TRADE_UPDATE、欧易 orders 频道）
+        到达时立即同步调用，在存储和分类之前，不能阻塞
+        """
+        if callback not in self._order_listeners:
+            self._order_listeners.append(callback)
+    
+    def _notify_order_listeners(self, private_data):
+        exchange = private_data.get('exchange')
+        raw_data = private_data.get('data')
+        for callback in self._order_listeners:
+            try:
+                callback(exchange, raw_data)
+            except Exception as e:
+                logger.error(f"❌【私人数据处理】订单推送监听异常: {e}")
+    
     async def receive_private_data(self, private_data):
         """
         接收私人数据
         格式：{'exchange': 'binance', 'data_type': 'account_update', 'data': {...}, 'timestamp': '...'}
         """
         try:
+            # ===== 订单推送先通知监听方（成交回报计时，不等调度器）=====
+            if self._order_listeners and private_data.get('data_type') == 'order_update':
+                self._notify_order_listeners(private_data)
+            
             # ===== 确保调度器已启动 =====
             await self._ensure_scheduler_started()
             
@@ -15,6 +15,9 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 import aiohttp
 
+from exchange_endpoints import rest_url, simulator_url
+from http_client import get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -93,14 +96,14 @@ class PrivateHTTPFetcher:
 
         # ==================== API 配置 ====================
         # 模拟交易端点（Testnet）
-        self.BASE_URL = "https://testnet.binancefuture.com"
+        self.BASE_URL = rest_url("binance", "https://testnet.binancefuture.com")
         # 真实交易端点（正式环境取消注释）
         # self.BASE_URL = "https://fapi.binance.com"
 
         self.ACCOUNT_ENDPOINT = "/fapi/v3/account"
         self.RECV_WINDOW = 5000  # 5秒接收窗口
 
-        self.environment = "testnet" if "testnet" in self.BASE_URL else "live"
+        self.environment = "testnet" if "testnet" in self.BASE_URL else ("simulator" if simulator_url("binance") else "live")
         logger.info(f"🔗 [HTTP获取器] 冷酷重启版初始化完成（环境: {self.environment}）")
 
     # ==================== 启动方法 ====================
@@ -427,15 +430,19 @@ class PrivateHTTPFetcher:
                 self.quality_stats['account_fetch']['last_error'] = "凭证读取失败"
                 return False
 
+            url = f"{self.BASE_URL}{self.ACCOUNT_ENDPOINT}"
+            # 先取限频令牌再签名（等待不吃掉 recvWindow）
+            await get_rate_limiter().acquire(url, "GET")
+
             params = {
                 'timestamp': int(time.time() * 1000),
                 'recvWindow': self.RECV_WINDOW
             }
             signed_params = self._sign_params(params, api_secret)
-            url = f"{self.BASE_URL}{self.ACCOUNT_ENDPOINT}"
             headers = {'X-MBX-APIKEY': api_key}
 
             async with self.session.get(url, params=signed_params, headers=headers) as resp:
+                get_rate_limiter().observe(url, resp.status, resp.headers)
 
                 if resp.status == 200:
                     data = await resp.json()
@@ -509,15 +516,19 @@ class PrivateHTTPFetcher:
                     await asyncio.sleep(self.account_check_interval)
                     continue
 
+                url = f"{self.BASE_URL}{self.ACCOUNT_ENDPOINT}"
+                # 先取限频令牌再签名（等待不吃掉 recvWindow）
+                await get_rate_limiter().acquire(url, "GET")
+
                 params = {
                     'timestamp': int(time.time() * 1000),
                     'recvWindow': self.RECV_WINDOW
                 }
                 signed_params = self._sign_params(params, api_secret)
-                url = f"{self.BASE_URL}{self.ACCOUNT_ENDPOINT}"
                 headers = {'X-MBX-APIKEY': api_key}
 
                 async with self.session.get(url, params=signed_params, headers=headers) as resp:
+                    get_rate_limiter().observe(url, resp.status, resp.headers)
 
                     if resp.status == 200:
                         data = await resp.json()
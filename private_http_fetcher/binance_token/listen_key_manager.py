@@ -9,6 +9,9 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import re
 
+from exchange_endpoints import rest_url
+from http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 class ListenKeyManager:
@@ -29,7 +32,7 @@ class ListenKeyManager:
         self.api_check_interval = 5  # 5秒检查API
         
         # HTTP配置
-        self.binance_testnet_url = "https://testnet.binancefuture.com/fapi/v1/listenKey"
+        self.binance_testnet_url = rest_url("binance", "https://testnet.binancefuture.com") + "/fapi/v1/listenKey"
         
         # 重试配置
         self.max_token_retries = 3
@@ -407,31 +410,30 @@ class ListenKeyManager:
             url = self.binance_testnet_url
             headers = {"X-MBX-APIKEY": api_key}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, timeout=30) as response:
-                    response_text = await response.text()
-                    
-                    try:
-                        data = json.loads(response_text)
-                    except json.JSONDecodeError:
-                        return {
-                            "success": False,
-                            "error": f"响应不是有效JSON: {response_text[:100]}..."
-                        }
-                    
-                    if 'listenKey' in data:
-                        logger.info("✅ [HTTP] 币安listenKey获取成功")
-                        return {"success": True, "listenKey": data['listenKey']}
-                    else:
-                        error_msg = data.get('msg', 'Unknown error')
-                        error_code = data.get('code', 0)
-                        logger.error(f"❌ [HTTP] 币安listenKey获取失败 [{error_code}]: {error_msg}")
-                        return {
-                            "success": False,
-                            "error": f"[{error_code}] {error_msg}",
-                            "raw_response": response_text
-                        }
-                        
+            response = await get_http_client().request("POST", url, headers=headers, timeout=30)
+            response_text = response.text
+            
+            try:
+                data = json.loads(response_text)
+            except json.JSONDecodeError:
+                return {
+                    "success": False,
+                    "error": f"响应不是有效JSON: {response_text[:100]}..."
+                }
+            
+            if 'listenKey' in data:
+                logger.info("✅ [HTTP] 币安listenKey获取成功")
+                return {"success": True, "listenKey": data['listenKey']}
+            else:
+                error_msg = data.get('msg', 'Unknown error')
+                error_code = data.get('code', 0)
+                logger.error(f"❌ [HTTP] 币安listenKey获取失败 [{error_code}]: {error_msg}")
+                return {
+                    "success": False,
+                    "error": f"[{error_code}] {error_msg}",
+                    "raw_response": response_text
+                }
+                
         except asyncio.TimeoutError:
             return {
                 "success": False,
@@ -454,31 +456,30 @@ class ListenKeyManager:
             url = self.binance_testnet_url
             headers = {"X-MBX-APIKEY": api_key}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.put(url, headers=headers, timeout=30) as response:
-                    response_text = await response.text()
-                    
-                    try:
-                        data = json.loads(response_text)
-                    except json.JSONDecodeError:
-                        return {
-                            "success": False,
-                            "error": f"响应不是有效JSON: {response_text[:100]}..."
-                        }
-                    
-                    if response.status == 200:
-                        logger.debug(f"✅ [HTTP] 币安listenKey续期成功: {listen_key[:10]}...")
-                        return {"success": True}
-                    else:
-                        error_msg = data.get('msg', f'HTTP {response.status}')
-                        error_code = data.get('code', 0)
-                        logger.warning(f"⚠️ [HTTP] 币安listenKey续期失败 [{error_code}]: {error_msg}")
-                        return {
-                            "success": False,
-                            "error": f"[{error_code}] {error_msg}",
-                            "raw_response": response_text
-                        }
-                        
+            response = await get_http_client().request("PUT", url, headers=headers, timeout=30)
+            response_text = response.text
+            
+            try:
+                data = json.loads(response_text)
+            except json.JSONDecodeError:
+                return {
+                    "success": False,
+                    "error": f"响应不是有效JSON: {response_text[:100]}..."
+                }
+            
+            if response.status == 200:
+                logger.debug(f"✅ [HTTP] 币安listenKey续期成功: {listen_key[:10]}...")
+                return {"success": True}
+            else:
+                error_msg = data.get('msg', f'HTTP {response.status}')
+                error_code = data.get('code', 0)
+                logger.warning(f"⚠️ [HTTP] 币安listenKey续期失败 [{error_code}]: {error_msg}")
+                return {
+                    "success": False,
+                    "error": f"[{error_code}] {error_msg}",
+                    "raw_response": response_text
+                }
+                
         except asyncio.TimeoutError:
             return {
                 "success": False,
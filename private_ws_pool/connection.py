@@ -16,8 +16,59 @@ import websockets
 import ssl
 import traceback
 
+from exchange_endpoints import simulator_url, ws_url
+from replay.recorder import get_frame_recorder
+
 logger = logging.getLogger(__name__)
 
+
+# ==================== 原始帧 → 标准格式（连接和回放共用）====================
+
+BINANCE_EVENT_TYPES = {
+    'ORDER_TRADE_UPDATE': 'order_update',
+    'ACCOUNT_UPDATE': 'account_update',
+    'ACCOUNT_CONFIG_UPDATE': 'account_config_update',
+    'MARGIN_CALL': 'risk_event',
+    'listenKeyExpired': 'system_event',
+    'balanceUpdate': 'balance_update',
+    'outboundAccountPosition': 'account_update',
+    'executionReport': 'order_update'
+}
+
+OKX_CHANNEL_TYPES = {
+    'account': 'account_update',
+    'orders': 'order_update',
+    'positions': 'position_update',
+    'balance_and_position': 'account_position_update'
+}
+
+OKX_SYSTEM_EVENTS = ('channel-conn-count', 'login', 'subscribe', 'error', 'unsubscribe')
+
+
+def format_binance_private(data: Dict[str, Any]) -> Dict[str, Any]:
+    """币安私人业务消息 → 私人数据处理的输入格式"""
+    event_type = data.get('e', 'unknown')
+    return {
+        'exchange': 'binance',
+        'data_type': BINANCE_EVENT_TYPES.get(event_type, event_type.lower()),
+        'timestamp': datetime.now().isoformat(),
+        'data': data
+    }
+
+
+def format_okx_private(data: Dict[str, Any]):
+    """欧易私人消息 → 私人数据处理的输入格式（系统事件返回 None）"""
+    if data.get('event', '') in OKX_SYSTEM_EVENTS:
+        return None
+    channel = data.get('arg', {}).get('channel', 'unknown')
+    return {
+        'exchange': 'okx',
+        'data_type': OKX_CHANNEL_TYPES.get(channel, 'unknown'),
+        'timestamp': datetime.now().isoformat(),
+        'data': data
+    }
+
+
 class PrivateWebSocketConnection:
     """私人WebSocket连接基类 - 双模式稳定版"""
     
@@ -52,6 +103,9 @@ class PrivateWebSocketConnection:
         self.quick_retry_delays = [2, 4, 8]
         self.slow_retry_delays = [15, 30, 60]
         
+        # 录制（设置了 WS_RECORD_DIR 才开启，见 replay/recorder.py）
+        self._recorder = get_frame_recorder()
+        
         logger.info(f"[私人连接池] {connection_id} 初始化完成")
     
     async def connect(self):
@@ -162,6 +216,9 @@ class BinancePrivateConnection(PrivateWebSocketConnection):
             f"wss://fstream.binancefuture.com/ws/{listen_key}",
             f"wss://fstream.binance.com/ws/{listen_key}",
         ]
+        if simulator_url('binance'):
+            self.ws_url = ws_url('binance', f"/ws/{listen_key}", self.ws_url)
+            self.backup_servers = [self.ws_url]
         self.current_server_index = 0
         
         logger.info(f"[私人连接池] 币安私人 初始化完成（主动探测模式，间隔{self.probe_interval}秒）")
@@ -223,7 +280,7 @@ class BinancePrivateConnection(PrivateWebSocketConnection):
         self.ws = await asyncio.wait_for(
             websockets.connect(
                 self.ws_url,
-                ssl=ssl_context,
+                ssl=ssl_context if self.ws_url.startswith('wss://') else None,
                 ping_interval=30,
                 ping_timeout=15,
                 close_timeout=8,
@@ -297,6 +354,8 @@ class BinancePrivateConnection(PrivateWebSocketConnection):
                 await asyncio.sleep(0)  # ✅ [蚂蚁基因修复] 异步迭代循环内让出CPU，避免消息风暴时阻塞
                 self.last_message_time = datetime.now()
                 self.message_counter += 1
+                if self._recorder is not None:
+                    self._recorder.record("private", "binance", self.connection_id, message)
                 
                 if not self.first_message_received:
                     self.first_message_received = True
@@ -315,13 +374,7 @@ class BinancePrivateConnection(PrivateWebSocketConnection):
                         continue  # 不转发探测响应
                     
                     # 正常业务消息
-                    event_type = data.get('e', 'unknown')
-                    formatted_data = {
-                        'exchange': 'binance',
-                        'data_type': self._map_binance_event_type(event_type),
-                        'timestamp': datetime.now().isoformat(),
-                        'data': data
-                    }
+                    formatted_data = format_binance_private(data)
                     
                     # 异步转发，不等待
                     asyncio.create_task(self.data_callback(formatted_data))
@@ -348,17 +401,7 @@ class BinancePrivateConnection(PrivateWebSocketConnection):
     
     def _map_binance_event_type(self, event_type: str) -> str:
         """映射币安事件类型到标准类型"""
-        mapping = {
-            'ORDER_TRADE_UPDATE': 'order_update',
-            'ACCOUNT_UPDATE': 'account_update',
-            'ACCOUNT_CONFIG_UPDATE': 'account_config_update',
-            'MARGIN_CALL': 'risk_event',
-            'listenKeyExpired': 'system_event',
-            'balanceUpdate': 'balance_update',
-            'outboundAccountPosition': 'account_update',
-            'executionReport': 'order_update'
-        }
-        return mapping.get(event_type, event_type.lower())
+        return BINANCE_EVENT_TYPES.get(event_type, event_type.lower())
     
     async def disconnect(self):
         """断开连接 - 清理探测任务"""
@@ -384,6 +427,9 @@ class OKXPrivateConnection(PrivateWebSocketConnection):
         self.ws_url = "wss://wspap.okx.com:8443/ws/v5/private?brokerId=9999"
         self.broker_id = "9999"
         self.backup_url = "wss://ws.okx.com:8443/ws/v5/private"
+        if simulator_url('okx'):
+            self.ws_url = ws_url('okx', "/ws/v5/private", self.ws_url)
+            self.backup_url = self.ws_url
         
         # 主动模式参数
         self.authenticated = False
@@ -592,6 +638,8 @@ class OKXPrivateConnection(PrivateWebSocketConnection):
                 # 只记录必要信息
                 self.last_message_time = datetime.now()
                 self.message_counter += 1
+                if self._recorder is not None:
+                    self._recorder.record("private", "okx", self.connection_id, message)
                 
                 if not self.first_message_received:
                     self.first_message_received = True
@@ -601,31 +649,14 @@ class OKXPrivateConnection(PrivateWebSocketConnection):
                     # 直接解析并推送，不做任何判断和处理
                     data = json.loads(message)
                     
-                    # ===== 过滤系统事件 =====
-                    event = data.get('event', '')
-                    if event in ['channel-conn-count', 'login', 'subscribe', 'error', 'unsubscribe']:
-                        logger.debug(f"[私人连接池] 欧意私人 过滤系统事件: {event}")
+                    # ===== 过滤系统事件 + 映射 channel 到标准类型 =====
+                    formatted_data = format_okx_private(data)
+                    if formatted_data is None:
+                        logger.debug(f"[私人连接池] 欧意私人 过滤系统事件: {data.get('event')}")
                         continue  # 跳过，不推送
                     
-                    # 提取 channel 并映射到标准类型
-                    arg = data.get('arg', {})
-                    channel = arg.get('channel', 'unknown')
-                    
-                    channel_mapping = {
-                        'account': 'account_update',
-                        'orders': 'order_update',
-                        'positions': 'position_update',
-                        'balance_and_position': 'account_position_update'
-                    }
-                    data_type = channel_mapping.get(channel, 'unknown')
-                    
                     # 使用create_task异步推送，不等待
-                    asyncio.create_task(self.data_callback({
-                        'exchange': 'okx',
-                        'data_type': data_type,
-                        'timestamp': datetime.now().isoformat(),
-                        'data': data
-                    }))
+                    asyncio.create_task(self.data_callback(formatted_data))
                     
                 except json.JSONDecodeError:
                     logger.warning(f"[私人连接池] 欧意私人 无法解析JSON: {message[:100]}")
@@ -8,6 +8,9 @@ import aiohttp
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from exchange_endpoints import rest_url
+from http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,7 +18,7 @@ class BinanceContractFetcher:
     """币安合约精度获取器（只获取，不推送）"""
     
     # U本位永续合约接口
-    API_URL = "https://fapi.binance.com/fapi/v1/exchangeInfo"
+    API_URL = rest_url("binance", "https://fapi.binance.com") + "/fapi/v1/exchangeInfo"
     
     def __init__(self):
         self.is_fetched = False
@@ -101,52 +104,51 @@ class BinanceContractFetcher:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.API_URL, timeout=30) as response:
-                    
-                    if response.status != 200:
-                        result['error'] = f"HTTP {response.status}"
-                        return result
-                    
-                    data = await response.json()
-                    
-                    # 检查币安的错误格式
-                    if 'code' in data and data['code'] != 200:
-                        result['error'] = f"API错误: {data.get('msg', '未知错误')}"
-                        return result
-                    
-                    symbols = data.get('symbols', [])
-                    result['total_count'] = len(symbols)
-                    
-                    # 过滤：只保留 U本位永续合约
-                    # 币安symbols里可能包含当季、次季合约，通过 contractType 过滤
-                    loop = asyncio.get_event_loop()
-                    
-                    perpetual_contracts = await loop.run_in_executor(
-                        None,
-                        lambda: [
-                            s for s in symbols 
-                            if s.get('contractType') == 'PERPETUAL'
-                            and s.get('symbol', '').endswith('USDT')   # ← 只加这一行
-                        ]
-                    )
-                    
-                    result['contract_count'] = len(perpetual_contracts)
-                    
-                    # 构建原始数据（保留所有字段）
-                    result['filtered_data'] = {
-                        'exchange': 'binance',
-                        'data_type': 'contract_info_raw',
-                        'timestamp': datetime.now().isoformat(),
-                        'data': {
-                            'total_raw_contracts': result['total_count'],
-                            'perpetual_contracts': perpetual_contracts
-                        }
-                    }
-                    result['success'] = True
-                    
-                    logger.info(f"✅ 获取到 {result['total_count']} 个原始合约，其中永续合约 {result['contract_count']} 个")
-                    
+            response = await get_http_client().get(self.API_URL, timeout=30)
+            
+            if response.status != 200:
+                result['error'] = f"HTTP {response.status}"
+                return result
+            
+            data = response.json()
+            
+            # 检查币安的错误格式
+            if 'code' in data and data['code'] != 200:
+                result['error'] = f"API错误: {data.get('msg', '未知错误')}"
+                return result
+            
+            symbols = data.get('symbols', [])
+            result['total_count'] = len(symbols)
+            
+            # 过滤：只保留 U本位永续合约
+            # 币安symbols里可能包含当季、次季合约，通过 contractType 过滤
+            loop = asyncio.get_event_loop()
+            
+            perpetual_contracts = await loop.run_in_executor(
+                None,
+                lambda: [
+                    s for s in symbols 
+                    if s.get('contractType') == 'PERPETUAL'
+                    and s.get('symbol', '').endswith('USDT')   # ← 只加这一行
+                ]
+            )
+            
+            result['contract_count'] = len(perpetual_contracts)
+            
+            # 构建原始数据（保留所有字段）
+            result['filtered_data'] = {
+                'exchange': 'binance',
+                'data_type': 'contract_info_raw',
+                'timestamp': datetime.now().isoformat(),
+                'data': {
+                    'total_raw_contracts': result['total_count'],
+                    'perpetual_contracts': perpetual_contracts
+                }
+            }
+            result['success'] = True
+            
+            logger.info(f"✅ 获取到 {result['total_count']} 个原始合约，其中永续合约 {result['contract_count']} 个")
+            
         except asyncio.TimeoutError:
             result['error'] = "请求超时"
         except aiohttp.ClientError as e:
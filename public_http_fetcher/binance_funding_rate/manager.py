@@ -19,12 +19,14 @@ if root_dir not in sys.path:
     sys.path.insert(0, root_dir)
 
 from shared_data.data_store import data_store
+from exchange_endpoints import rest_url
+from http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
 
 class FundingSettlementManager:
-    BINANCE_FUNDING_RATE_URL = "https://fapi.binance.com/fapi/v1/fundingRate"
+    BINANCE_FUNDING_RATE_URL = rest_url("binance", "https://fapi.binance.com") + "/fapi/v1/fundingRate"
     API_WEIGHT_PER_REQUEST = 10
     
     def __init__(self):
@@ -69,120 +71,116 @@ class FundingSettlementManager:
                 params = {"limit": 1000}
                 logger.info(f"   参数: {params}")
                 
-                # Step 2: 创建Session
-                logger.info("【历史费率】Step 2: 创建aiohttp Session")
-                session_timeout = aiohttp.ClientTimeout(total=30)
-                logger.info(f"【历史费率】 超时设置: {session_timeout.total}秒")
+                # Step 2: 取共享连接池（不再每次新建 Session）
+                logger.info("【历史费率】Step 2: 使用共享HTTP连接池")
                 
-                async with aiohttp.ClientSession(timeout=session_timeout) as session:
-                    logger.info("✅【历史费率】 Session创建成功")
+                # Step 3: 发送请求
+                logger.info("【历史费率】Step 3: 发送HTTP请求")
+                logger.info(f"【历史费率】URL: {self.BINANCE_FUNDING_RATE_URL}")
+                logger.info(f" 【历史费率】方法: GET")
+                
+                response = await get_http_client().get(
+                    self.BINANCE_FUNDING_RATE_URL,
+                    params=params,
+                    timeout=30
+                )
+                
+                # Step 4: 检查响应状态
+                logger.info(f"【历史费率】Step 4: 收到HTTP响应")
+                logger.info(f"【历史费率】   状态码: {response.status}")
+                logger.info(f"【历史费率】   响应头: {dict(response.headers)}")
+                
+                # 检查状态码
+                if response.status != 200:
+                    error_text = response.text
+                    logger.error(f"❌【历史费率】 HTTP错误！状态码: {response.status}")
+                    logger.error(f"   ❌【历史费率】错误内容: {error_text[:200]}")
                     
-                    # Step 3: 发送请求
-                    logger.info("【历史费率】Step 3: 发送HTTP请求")
-                    logger.info(f"【历史费率】URL: {self.BINANCE_FUNDING_RATE_URL}")
-                    logger.info(f" 【历史费率】方法: GET")
+                    # 处理 418 状态码（IP被封禁）
+                    if response.status == 418:
+                        logger.error("💥❌【历史费率】 IP被封禁！币安API限制")
+                        logger.error("️⚠️⚠️【历史费率】 建议：等待封禁解除（通常几小时）")
+                        result["error"] = "⚠️【历史费率】IP被封禁，请稍后重试"
+                        return result  # ✅ 直接返回，不重试
+                    elif response.status == 429:
+                        logger.error(" ⚠️【历史费率】  原因: API权重超限")
+                    elif response.status == 403:
+                        logger.error(" ❌【历史费率】  原因: IP被封禁")
+                    else:
+                        logger.error(f" ❌【历史费率】原因: 未知HTTP错误")
                     
-                    async with session.get(
-                        self.BINANCE_FUNDING_RATE_URL,
-                        params=params
-                    ) as response:
-                        
-                        # Step 4: 检查响应状态
-                        logger.info(f"【历史费率】Step 4: 收到HTTP响应")
-                        logger.info(f"【历史费率】   状态码: {response.status}")
-                        logger.info(f"【历史费率】   响应头: {dict(response.headers)}")
-                        
-                        # 检查状态码
-                        if response.status != 200:
-                            error_text = await response.text()
-                            logger.error(f"❌【历史费率】 HTTP错误！状态码: {response.status}")
-                            logger.error(f"   ❌【历史费率】错误内容: {error_text[:200]}")
-                            
-                            # 处理 418 状态码（IP被封禁）
-                            if response.status == 418:
-                                logger.error("💥❌【历史费率】 IP被封禁！币安API限制")
-                                logger.error("️⚠️⚠️【历史费率】 建议：等待封禁解除（通常几小时）")
-                                result["error"] = "⚠️【历史费率】IP被封禁，请稍后重试"
-                                return result  # ✅ 直接返回，不重试
-                            elif response.status == 429:
-                                logger.error(" ⚠️【历史费率】  原因: API权重超限")
-                            elif response.status == 403:
-                                logger.error(" ❌【历史费率】  原因: IP被封禁")
-                            else:
-                                logger.error(f" ❌【历史费率】原因: 未知HTTP错误")
-                            
-                            result["error"] = f"HTTP {response.status}: {error_text[:100]}"
-                            continue  # 重试
-                        
-                        # Step 5: 解析JSON
-                        logger.info("【历史费率】Step 5: 解析JSON响应")
-                        try:
-                            data = await response.json()
-                            logger.info(f"✅ 【历史费率】JSON解析成功，数据类型: {type(data)}")
-                            logger.info(f"【历史费率】   数据长度: {len(data)}")
-                            
-                            if isinstance(data, list) and len(data) == 0:
-                                logger.warning("⚠️【历史费率】  API返回空列表！")
-                                result["error"] = "⚠️【历史费率】API返回空数据"
-                                continue
-                            
-                            if isinstance(data, dict) and data.get('code'):
-                                logger.error(f"❌ A【历史费率】PI返回错误码: {data.get('code')}")
-                                logger.error(f"❌【历史费率】错误信息: {data.get('msg')}")
-                                result["error"] = f"❌【历史费率】API错误: {data.get('msg')}"
-                                continue
-                                
-                        except json.JSONDecodeError as e:
-                            logger.error(f"💥 【历史费率】JSON解析失败！")
-                            logger.error(f"   ❌【历史费率】错误: {e}")
-                            logger.error(f"   🤔【历史费率】原始响应: {await response.text()[:200]}")
-                            result["error"] = "❌【历史费率】JSON解析失败"
-                            continue
-                        
-                        # Step 6: 过滤合约
-                        logger.info("🔂【历史费率】Step 6: 过滤USDT永续合约")
-                        logger.info(f"   📝【历史费率】原始合约数: {len(data)}")
-                        
-                        # ✅ [蚂蚁基因修复] 将同步的过滤函数放到线程池执行
-                        loop = asyncio.get_event_loop()
-                        filtered_data = await loop.run_in_executor(
-                            None, self._filter_usdt_perpetual, data
-                        )
-                        
-                        logger.info(f"✅【历史费率】 过滤完成，USDT合约数: {len(filtered_data)}")
-                        
-                        if len(filtered_data) == 0:
-                            logger.warning("⚠️ 【历史费率】 过滤后没有USDT合约！")
-                            logger.warning("   ⚠️【历史费率】检查过滤规则是否正确")
-                            result["error"] = "⚠️【历史费率】没有符合条件的USDT合约"
-                            continue
-                        
-                        # Step 7: 推送到data_store
-                        logger.info("🔂【历史费率】Step 7: 推送到共享数据模块")
-                        await self._push_to_data_store(filtered_data)
-                        logger.info("✅【历史费率】 推送成功！")
-                        
-                        # 成功返回
-                        result["success"] = True
-                        result["contract_count"] = len(data)
-                        result["filtered_count"] = len(filtered_data)
-                        result["weight_used"] = self.API_WEIGHT_PER_REQUEST
-                        result["contracts"] = list(filtered_data.keys())
-                        
-                        logger.info("=" * 60)
-                        logger.info("🎉【历史费率】 币安历史费率数据获取成功！")
-                        logger.info(f"【历史费率】   总合约: {len(data)}")
-                        logger.info(f" 【历史费率】USDT合约: {len(filtered_data)}")
-                        logger.info(f" 【历史费率】  权重消耗: {self.API_WEIGHT_PER_REQUEST}")
-                        logger.info(f"【历史费率】   示例合约: {list(filtered_data.keys())[:3]}")
-                        logger.info("=" * 60)
-                        
-                        # 更新状态
-                        self.last_fetch_time = time.time()
-                        self.is_auto_fetched = True
+                    result["error"] = f"HTTP {response.status}: {error_text[:100]}"
+                    continue  # 重试
+                
+                # Step 5: 解析JSON
+                logger.info("【历史费率】Step 5: 解析JSON响应")
+                try:
+                    data = response.json()
+                    logger.info(f"✅ 【历史费率】JSON解析成功，数据类型: {type(data)}")
+                    logger.info(f"【历史费率】   数据长度: {len(data)}")
+                    
+                    if isinstance(data, list) and len(data) == 0:
+                        logger.warning("⚠️【历史费率】  API返回空列表！")
+                        result["error"] = "⚠️【历史费率】API返回空数据"
+                        continue
+                    
+                    if isinstance(data, dict) and data.get('code'):
+                        logger.error(f"❌ A【历史费率】PI返回错误码: {data.get('code')}")
+                        logger.error(f"❌【历史费率】错误信息: {data.get('msg')}")
+                        result["error"] = f"❌【历史费率】API错误: {data.get('msg')}"
+                        continue
                         
-                        return result
+                except json.JSONDecodeError as e:
+                    logger.error(f"💥 【历史费率】JSON解析失败！")
+                    logger.error(f"   ❌【历史费率】错误: {e}")
+                    logger.error(f"   🤔【历史费率】原始响应: {response.text[:200]}")
+                    result["error"] = "❌【历史费率】JSON解析失败"
+                    continue
+                
+                # Step 6: 过滤合约
+                logger.info("🔂【历史费率】Step 6: 过滤USDT永续合约")
+                logger.info(f"   📝【历史费率】原始合约数: {len(data)}")
+                
+                # ✅ [蚂蚁基因修复] 将同步的过滤函数放到线程池执行
+                loop = asyncio.get_event_loop()
+                filtered_data = await loop.run_in_executor(
+                    None, self._filter_usdt_perpetual, data
+                )
                 
+                logger.info(f"✅【历史费率】 过滤完成，USDT合约数: {len(filtered_data)}")
+                
+                if len(filtered_data) == 0:
+                    logger.warning("⚠️ 【历史费率】 过滤后没有USDT合约！")
+                    logger.warning("   ⚠️【历史费率】检查过滤规则是否正确")
+                    result["error"] = "⚠️【历史费率】没有符合条件的USDT合约"
+                    continue
+                
+                # Step 7: 推送到data_store
+                logger.info("🔂【历史费率】Step 7: 推送到共享数据模块")
+                await self._push_to_data_store(filtered_data)
+                logger.info("✅【历史费率】 推送成功！")
+                
+                # 成功返回
+                result["success"] = True
+                result["contract_count"] = len(data)
+                result["filtered_count"] = len(filtered_data)
+                result["weight_used"] = self.API_WEIGHT_PER_REQUEST
+                result["contracts"] = list(filtered_data.keys())
+                
+                logger.info("=" * 60)
+                logger.info("🎉【历史费率】 币安历史费率数据获取成功！")
+                logger.info(f"【历史费率】   总合约: {len(data)}")
+                logger.info(f" 【历史费率】USDT合约: {len(filtered_data)}")
+                logger.info(f" 【历史费率】  权重消耗: {self.API_WEIGHT_PER_REQUEST}")
+                logger.info(f"【历史费率】   示例合约: {list(filtered_data.keys())[:3]}")
+                logger.info("=" * 60)
+                
+                # 更新状态
+                self.last_fetch_time = time.time()
+                self.is_auto_fetched = True
+                
+                return result
+        
             except aiohttp.ClientError as e:
                 logger.error(f"💥❌【历史费率】 网络连接失败！")
                 logger.error(f"   ⚠️【历史费率】异常类型: {type(e).__name__}")
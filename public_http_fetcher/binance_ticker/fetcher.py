@@ -2,12 +2,14 @@
 币安24小时涨跌幅数据获取器
 """
 
-import aiohttp
 import asyncio
 import logging
 import time
 from typing import Dict, Optional, Set
 
+from exchange_endpoints import rest_url
+from http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,7 +17,7 @@ class BinanceTickerFetcher:
     """币安24小时涨跌幅数据获取器"""
     
     def __init__(self):
-        self.base_url = "https://fapi.binance.com"
+        self.base_url = rest_url("binance", "https://fapi.binance.com")
         self._valid_symbols: Optional[Set[str]] = None
         self._whitelist_updated_at: float = 0
         self._whitelist_ttl = 3600  # 白名单缓存1小时
@@ -39,27 +41,26 @@ class BinanceTickerFetcher:
         url = f"{self.base_url}/fapi/v1/exchangeInfo"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        logger.error(f"❌【币安Ticker】获取白名单失败: HTTP {response.status}")
-                        return self._valid_symbols or set()
-                    
-                    data = await response.json()
-                    symbols = set()
-                    
-                    for s in data.get('symbols', []):
-                        if (s.get('status') == 'TRADING' and 
-                            s.get('quoteAsset') == 'USDT' and 
-                            s.get('contractType') == 'PERPETUAL'):
-                            symbols.add(s.get('symbol'))
-                    
-                    self._valid_symbols = symbols
-                    self._whitelist_updated_at = now
-                    
-                    logger.info(f"✅【币安Ticker】白名单已更新，共 {len(symbols)} 个有效USDT永续合约")
-                    return symbols
-                    
+            response = await get_http_client().get(url)
+            if response.status != 200:
+                logger.error(f"❌【币安Ticker】获取白名单失败: HTTP {response.status}")
+                return self._valid_symbols or set()
+            
+            data = response.json()
+            symbols = set()
+            
+            for s in data.get('symbols', []):
+                if (s.get('status') == 'TRADING' and 
+                    s.get('quoteAsset') == 'USDT' and 
+                    s.get('contractType') == 'PERPETUAL'):
+                    symbols.add(s.get('symbol'))
+            
+            self._valid_symbols = symbols
+            self._whitelist_updated_at = now
+            
+            logger.info(f"✅【币安Ticker】白名单已更新，共 {len(symbols)} 个有效USDT永续合约")
+            return symbols
+            
         except asyncio.TimeoutError:
             logger.error("❌【币安Ticker】获取白名单超时")
             return self._valid_symbols or set()
@@ -74,49 +75,48 @@ class BinanceTickerFetcher:
         url = f"{self.base_url}/fapi/v1/ticker/24hr"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                # 第一步：获取白名单（带缓存）
-                valid_symbols = await self._fetch_valid_symbols()
+            # 第一步：获取白名单（带缓存）
+            valid_symbols = await self._fetch_valid_symbols()
+            
+            if not valid_symbols:
+                logger.warning("⚠️【币安Ticker】白名单为空，跳过本次获取")
+                return None
+            
+            # 第二步：获取全量行情数据
+            response = await get_http_client().get(url)
+            if response.status != 200:
+                logger.error(f"❌【币安Ticker】请求失败: HTTP {response.status}")
+                return None
+            
+            raw_data = response.json()
+            
+            # 第三步：用白名单过滤
+            result = {}
+            filtered_count = 0
+            
+            for item in raw_data:
+                symbol = item.get('symbol', '')
                 
-                if not valid_symbols:
-                    logger.warning("⚠️【币安Ticker】白名单为空，跳过本次获取")
-                    return None
+                if symbol not in valid_symbols:
+                    filtered_count += 1
+                    continue
                 
-                # 第二步：获取全量行情数据
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        logger.error(f"❌【币安Ticker】请求失败: HTTP {response.status}")
-                        return None
-                    
-                    raw_data = await response.json()
-                    
-                    # 第三步：用白名单过滤
-                    result = {}
-                    filtered_count = 0
-                    
-                    for item in raw_data:
-                        symbol = item.get('symbol', '')
-                        
-                        if symbol not in valid_symbols:
-                            filtered_count += 1
-                            continue
-                        
-                        try:
-                            result[symbol] = {
-                                'symbol': symbol,
-                                'priceChangePercent': float(item.get('priceChangePercent', 0)),
-                                'lastPrice': float(item.get('lastPrice', 0)),
-                                'volume': float(item.get('volume', 0))
-                            }
-                        except (ValueError, TypeError):
-                            continue
-                    
-                    if filtered_count > 0:
-                        logger.debug(f"🧹【币安Ticker】已过滤 {filtered_count} 个无效合约")
-                    
-                    logger.info(f"✅【币安Ticker】获取成功，共 {len(result)} 个有效USDT永续合约")
-                    return result
-                    
+                try:
+                    result[symbol] = {
+                        'symbol': symbol,
+                        'priceChangePercent': float(item.get('priceChangePercent', 0)),
+                        'lastPrice': float(item.get('lastPrice', 0)),
+                        'volume': float(item.get('volume', 0))
+                    }
+                except (ValueError, TypeError):
+                    continue
+            
+            if filtered_count > 0:
+                logger.debug(f"🧹【币安Ticker】已过滤 {filtered_count} 个无效合约")
+            
+            logger.info(f"✅【币安Ticker】获取成功，共 {len(result)} 个有效USDT永续合约")
+            return result
+            
         except asyncio.TimeoutError:
             logger.error("❌【币安Ticker】请求超时")
             return None
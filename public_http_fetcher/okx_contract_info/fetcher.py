@@ -8,13 +8,16 @@ import aiohttp
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from exchange_endpoints import rest_url
+from http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
 class OKXContractFetcher:
     """OKX合约面值获取器（只获取+过滤，不推送）"""
     
-    API_URL = "https://www.okx.com/api/v5/public/instruments"
+    API_URL = rest_url("okx", "https://www.okx.com") + "/api/v5/public/instruments"
     
     def __init__(self):
         self.is_fetched = False
@@ -102,47 +105,46 @@ class OKXContractFetcher:
         try:
             params = {"instType": "SWAP"}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.API_URL, params=params, timeout=30) as response:
-                    
-                    if response.status != 200:
-                        result['error'] = f"HTTP {response.status}"
-                        return result
-                    
-                    data = await response.json()
-                    
-                    if data.get('code') != '0':
-                        result['error'] = f"API错误: {data.get('msg', '未知错误')}"
-                        return result
-                    
-                    instruments = data.get('data', [])
-                    result['total_count'] = len(instruments)
-                    
-                    # ✅ [蚂蚁基因修复] 将过滤操作放到线程池执行，避免阻塞事件循环
-                    loop = asyncio.get_event_loop()
-                    
-                    # 使用线程池执行过滤操作
-                    usdt_contracts = await loop.run_in_executor(
-                        None,
-                        lambda: [inst for inst in instruments if inst.get('settleCcy') == 'USDT']
-                    )
-                    
-                    result['usdt_count'] = len(usdt_contracts)
-                    
-                    # 构建原始数据（保留所有字段）
-                    result['filtered_data'] = {
-                        'exchange': 'okx',
-                        'data_type': 'contract_info_raw',
-                        'timestamp': datetime.now().isoformat(),
-                        'data': {
-                            'total_raw_contracts': result['total_count'],
-                            'usdt_contracts': usdt_contracts
-                        }
-                    }
-                    result['success'] = True
-                    
-                    logger.info(f"✅ 获取到 {result['total_count']} 个原始合约，其中USDT合约 {result['usdt_count']} 个")
-                    
+            response = await get_http_client().get(self.API_URL, params=params, timeout=30)
+            
+            if response.status != 200:
+                result['error'] = f"HTTP {response.status}"
+                return result
+            
+            data = response.json()
+            
+            if data.get('code') != '0':
+                result['error'] = f"API错误: {data.get('msg', '未知错误')}"
+                return result
+            
+            instruments = data.get('data', [])
+            result['total_count'] = len(instruments)
+            
+            # ✅ [蚂蚁基因修复] 将过滤操作放到线程池执行，避免阻塞事件循环
+            loop = asyncio.get_event_loop()
+            
+            # 使用线程池执行过滤操作
+            usdt_contracts = await loop.run_in_executor(
+                None,
+                lambda: [inst for inst in instruments if inst.get('settleCcy') == 'USDT']
+            )
+            
+            result['usdt_count'] = len(usdt_contracts)
+            
+            # 构建原始数据（保留所有字段）
+            result['filtered_data'] = {
+                'exchange': 'okx',
+                'data_type': 'contract_info_raw',
+                'timestamp': datetime.now().isoformat(),
+                'data': {
+                    'total_raw_contracts': result['total_count'],
+                    'usdt_contracts': usdt_contracts
+                }
+            }
+            result['success'] = True
+            
+            logger.info(f"✅ 获取到 {result['total_count']} 个原始合约，其中USDT合约 {result['usdt_count']} 个")
+            
         except asyncio.TimeoutError:
             result['error'] = "请求超时"
         except aiohttp.ClientError as e:
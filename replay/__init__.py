@@ -0,0 +1,17 @@
+"""
+WebSocket 原始帧录制 / 回放
+
+录制：设置环境变量 WS_RECORD_DIR，公开和私人连接收到的原始帧写成压缩分段文件
+回放：python -m replay.driver <录制目录> --speed 1|10|max
+"""
+
+from .recorder import (FrameRecorder, get_frame_recorder, close_frame_recorder,
+                       RECORD_DIR_ENV, RECORD_SESSION_ENV)
+
+__all__ = [
+    'FrameRecorder',
+    'get_frame_recorder',
+    'close_frame_recorder',
+    'RECORD_DIR_ENV',
+    'RECORD_SESSION_ENV',
+]
@@ -0,0 +1,344 @@
+# replay/driver.py
+"""
+WebSocket 录制回放驱动 - 离线跑完整条流水线
+
+把 replay/recorder.py 录下的原始帧按原顺序喂回系统，不连网络：
+
+- 公开帧：离线的 WebSocketConnection._process_message → default_data_callback → data_store
+  → 每隔 flow.interval_seconds（按录制时间）放一次水 → step0 ~ step5
+- 私人帧：和私人连接同样的过滤/格式化 → private_data_processing.receive_private_data
+
+速度：
+    --speed 1     按录制时的节奏回放（1×）
+    --speed 10    10 倍速
+    --speed max   不等待，能多快跑多快
+
+报告：
+    帧数 / 墙钟耗时 / 吞吐（帧每秒）
+    每帧接入耗时（解析 + 回调 + 写数据池）p50 / p95 / max
+    每个步骤每次放水的耗时 p50 / p95 / max
+    最终 CrossPlatformData 每个合约的校验和（去掉 metadata 和 *_countdown_seconds 这些随墙钟变化的字段），
+    同一份录制在改代码前后回放，校验和不变说明结果没变
+
+【运行】
+    python -m replay.driver recordings/20240101_120000 --speed max
+    python -m replay.driver recordings/20240101_120000 --speed 10 --no-private --json report.json
+
+注意：只回放 WebSocket 帧。REST 拉取的数据（币安历史结算等）不在录制里，
+回放结果里相应字段为空，和实时系统并不完全一致。
+"""
+
+import argparse
+import asyncio
+import glob
+import gzip
+import hashlib
+import heapq
+import json
+import logging
+import os
+import sys
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import asdict
+from typing import Any, Dict, Iterator, List, Optional
+
+# 允许直接 python replay/driver.py 运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from latency_stats import percentile
+from replay.recorder import SEGMENT_PATTERN
+
+logger = logging.getLogger(__name__)
+
+STEP_NAMES = ["step0", "step1", "step2", "step3", "step4", "step5"]
+VOLATILE_FIELDS = ("metadata", "okx_countdown_seconds", "binance_countdown_seconds")
+
+
+# ==================== 读取录制 ====================
+
+def _segment_streams(path: str) -> List[List[str]]:
+    """
+    录制路径 → 按写入进程分好的分段文件列表（每个进程一组，组内按分段序号排好）
+
+    路径可以是单个分段、会话目录，或 WS_RECORD_DIR（下面所有会话一起回放）
+    """
+    if os.path.isfile(path):
+        return [[path]]
+    files = glob.glob(os.path.join(path, SEGMENT_PATTERN))
+    if not files:
+        files = glob.glob(os.path.join(path, "*", SEGMENT_PATTERN))
+
+    # seg_<进程名>_<pid>_00001.jsonl.gz → (目录, "<进程名>_<pid>")；老格式 seg_00001 的进程名为空
+    streams: Dict[tuple, List[str]] = defaultdict(list)
+    for file in files:
+        name = os.path.basename(file)[len("seg_"):-len(".jsonl.gz")]
+        stream = name.rpartition("_")[0]
+        streams[(os.path.dirname(file), stream)].append(file)
+    return [sorted(group) for _, group in sorted(streams.items())]
+
+
+def _iter_stream(files: List[str]) -> Iterator[list]:
+    """逐帧读一个进程的分段（同一进程内帧已按接收时间排好）"""
+    for file in files:
+        try:
+            with gzip.open(file, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"⚠️【回放】{os.path.basename(file)} 有一行无法解析，已跳过")
+        except (EOFError, OSError, zlib.error) as e:
+            logger.warning(f"⚠️【回放】{os.path.basename(file)} 不完整，读到截断处为止: {e}")
+
+
+def iter_frames(path: str) -> Iterator[list]:
+    """
+    逐帧读取录制：[接收时间戳, source, exchange, connection_id, 原始帧]
+
+    多进程模式下每个进程各录一组分段，这里按接收时间戳归并成一条时间线。
+    进程被杀时最后一个分段可能没写完，读到截断处就停（前面的帧照常返回）。
+    """
+    streams = [_iter_stream(files) for files in _segment_streams(path)]
+    if len(streams) == 1:
+        yield from streams[0]
+    else:
+        yield from heapq.merge(*streams, key=lambda frame: frame[0])
+
+
+# ==================== 统计 ====================
+
+def _stats_ms(samples: List[float]) -> Dict[str, Any]:
+    """一组耗时（秒）→ 次数 / p50 / p95 / max（毫秒）"""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def checksum_results(results) -> Dict[str, str]:
+    """CrossPlatformData 列表 → {合约: sha256}（去掉随墙钟变化的字段）"""
+    checksums = {}
+    for item in results:
+        data = asdict(item)
+        for key in VOLATILE_FIELDS:
+            data.pop(key, None)
+        text = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+        checksums[item.symbol] = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return dict(sorted(checksums.items()))
+
+
+# ==================== 回放驱动 ====================
+
+class ReplayDriver:
+    """把一份录制喂回公开/私人数据流水线"""
+
+    def __init__(self, path: str, speed: Optional[float] = None, private: bool = True):
+        """
+        Args:
+            path: 录制目录或分段文件
+            speed: 回放倍速，None 表示不等待（max）
+            private: 是否回放私人帧
+        """
+        self.path = path
+        self.speed = speed
+        self.private = private
+
+        self.frames = defaultdict(int)          # (source, exchange) -> 帧数
+        self.skipped = 0
+        self.ingest_latency = {"public": [], "private": []}
+        self.step_latency = {name: [] for name in STEP_NAMES}
+        self.flows = 0
+        self.final_results = []
+
+    # ========== 初始化离线组件 ==========
+
+    async def _setup(self):
+        from shared_data.data_store import data_store
+        from shared_data.pipeline_manager import PipelineManager
+        from websocket_pool.connection import WebSocketConnection
+        from websocket_pool.pool_manager import default_data_callback
+
+        self.data_store = data_store
+        await data_store.clear_market_data()
+
+        # 全新的流水线（不挂大脑回调，不启动放水循环，由回放按录制时间驱动）
+        self.pipeline = PipelineManager()
+        await data_store.receive_rules(self.pipeline.rules)
+        self.flow_interval = self.pipeline.rules["flow"]["interval_seconds"]
+
+        self.parsers = {
+            exchange: WebSocketConnection(
+                exchange=exchange,
+                ws_url="replay://",
+                connection_id=f"replay_{exchange}",
+                connection_type="master",
+                data_callback=default_data_callback,
+            )
+            for exchange in ("binance", "okx")
+        }
+
+        if self.private:
+            from private_data_processing.manager import receive_private_data
+            from private_ws_pool.connection import format_binance_private, format_okx_private
+            self._receive_private = receive_private_data
+            self._formatters = {"binance": format_binance_private, "okx": format_okx_private}
+
+    # ========== 单帧 ==========
+
+    async def _feed_public(self, exchange: str, frame: str) -> bool:
+        parser = self.parsers.get(exchange)
+        if parser is None:
+            return False
+        start = time.perf_counter()
+        await parser._process_message(frame)
+        self.ingest_latency["public"].append(time.perf_counter() - start)
+        return True
+
+    async def _feed_private(self, exchange: str, frame: str) -> bool:
+        formatter = self._formatters.get(exchange)
+        if formatter is None:
+            return False
+        start = time.perf_counter()
+        try:
+            data = json.loads(frame)
+        except json.JSONDecodeError:
+            return False
+        if exchange == "binance" and "id" in data and "e" not in data:
+            return False            # 探测响应，连接里也不转发
+        formatted = formatter(data)
+        if formatted is None:
+            return False            # 欧易系统事件
+        await self._receive_private(formatted)
+        self.ingest_latency["private"].append(time.perf_counter() - start)
+        return True
+
+    # ========== 放水 + 流水线 ==========
+
+    async def _flow(self):
+        """放一次水，按步骤计时跑 step0 ~ step5"""
+        water = await self.data_store._collect_water_by_rules()
+        if not water:
+            return
+        self.flows += 1
+
+        results = water
+        for name in STEP_NAMES:
+            step = getattr(self.pipeline, name)
+            start = time.perf_counter()
+            results = await step.process(results)
+            self.step_latency[name].append(time.perf_counter() - start)
+            if not results:
+                return
+        self.final_results = results
+
+    # ========== 主循环 ==========
+
+    async def run(self) -> Dict[str, Any]:
+        await self._setup()
+
+        first_at = None
+        next_flow = None
+        wall_start = time.perf_counter()
+
+        for received_at, source, exchange, _, frame in iter_frames(self.path):
+            if first_at is None:
+                first_at = received_at
+                next_flow = received_at + self.flow_interval
+
+            # 按录制时间放水（和实时系统一样，放水期间行情照常进来）
+            while received_at >= next_flow:
+                await self._flow()
+                next_flow += self.flow_interval
+
+            # 按倍速等待
+            if self.speed:
+                delay = (received_at - first_at) / self.speed - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            if source == "public":
+                fed = await self._feed_public(exchange, frame)
+            elif source == "private" and self.private:
+                fed = await self._feed_private(exchange, frame)
+            else:
+                fed = False
+
+            if fed:
+                self.frames[(source, exchange)] += 1
+            else:
+                self.skipped += 1
+
+        if first_at is not None:
+            await self._flow()
+
+        return self._report(time.perf_counter() - wall_start)
+
+    def _report(self, wall_seconds: float) -> Dict[str, Any]:
+        total = sum(self.frames.values())
+        return {
+            "recording": self.path,
+            "speed": self.speed or "max",
+            "frames": {f"{source}.{exchange}": count for (source, exchange), count in sorted(self.frames.items())},
+            "frames_total": total,
+            "frames_skipped": self.skipped,
+            "wall_seconds": round(wall_seconds, 3),
+            "throughput_fps": round(total / wall_seconds, 1) if wall_seconds > 0 else 0.0,
+            "ingest": {source: _stats_ms(samples) for source, samples in self.ingest_latency.items()},
+            "flows": self.flows,
+            "steps": {name: _stats_ms(samples) for name, samples in self.step_latency.items()},
+            "final_contracts": len(self.final_results),
+            "checksums": checksum_results(self.final_results),
+        }
+
+
+# ==================== 命令行 ====================
+
+def _parse_speed(value: str) -> Optional[float]:
+    if value.lower() == "max":
+        return None
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("倍速必须大于 0，或者用 max")
+    return speed
+
+
+def _print_report(report: Dict[str, Any]):
+    print(f"录制: {report['recording']}  倍速: {report['speed']}")
+    print(f"帧数: {report['frames_total']}（跳过 {report['frames_skipped']}） {report['frames']}")
+    print(f"耗时: {report['wall_seconds']}s  吞吐: {report['throughput_fps']} 帧/秒  放水: {report['flows']} 次")
+    print(f"{'阶段':<12}{'次数':>8}{'p50(ms)':>12}{'p95(ms)':>12}{'max(ms)':>12}")
+    rows = [(f"ingest.{k}", v) for k, v in report["ingest"].items()] + list(report["steps"].items())
+    for name, s in rows:
+        print(f"{name:<12}{s['count']:>8}{s['p50_ms']:>12}{s['p95_ms']:>12}{s['max_ms']:>12}")
+    combined = hashlib.sha256(json.dumps(report["checksums"], sort_keys=True).encode()).hexdigest()
+    print(f"最终合约: {report['final_contracts']}  总校验和: {combined}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 录制回放")
+    parser.add_argument("path", help="录制目录（WS_RECORD_DIR 下的会话目录）或分段文件")
+    parser.add_argument("--speed", type=_parse_speed, default=None, help="回放倍速：1 / 10 / max（默认 max）")
+    parser.add_argument("--no-private", action="store_true", help="不回放私人帧")
+    parser.add_argument("--json", help="把完整报告（含每个合约的校验和）写到这个文件")
+    parser.add_argument("--verbose", action="store_true", help="显示流水线日志")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    report = asyncio.run(ReplayDriver(args.path, speed=args.speed, private=not args.no_private).run())
+    _print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# replay/recorder.py
+"""
+WebSocket 原始帧录制器
+
+打开方式：设置环境变量 WS_RECORD_DIR（例如 WS_RECORD_DIR=recordings），
+公开行情连接（websocket_pool）和私人连接（private_ws_pool）收到的每一帧原样录下：
+
+    <WS_RECORD_DIR>/<启动时间>/seg_<进程名>_<pid>_00001.jsonl.gz
+    每行一个 JSON 数组: [接收时间戳(秒), "public"/"private", 交易所, 连接ID, 原始帧文本]
+
+多进程模式下每个进程（主进程的私人连接、每个行情进程的公开连接）各录各的分段，
+文件名里带进程名和 pid，互不覆盖（子进程重启后 pid 变了也不会覆盖上一轮的分段）；
+会话目录由主进程第一次调用 get_frame_recorder() 时定下，经环境变量 RECORD_SESSION_ENV
+传给之后 spawn 的子进程，一次运行的所有分段都在同一个会话目录里。回放时按接收时间戳归并。
+
+- 连接里只做一次入队（时间戳 + 原始帧引用），压缩和写盘在后台线程
+- 每 SEGMENT_SECONDS 秒或 SEGMENT_MAX_FRAMES 帧切一个分段，分段文件各自是完整的 gzip
+- 队列满时丢最旧的帧并计数（录制不能拖慢行情）
+
+没设置 WS_RECORD_DIR 时 get_frame_recorder() 返回 None，连接里不做任何事。
+进程退出前要调用 close_frame_recorder()，否则最后一个分段的 gzip 尾部没写，文件是截断的。
+回放见 replay/driver.py。
+"""
+
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+RECORD_DIR_ENV = "WS_RECORD_DIR"
+RECORD_SESSION_ENV = "WS_RECORD_SESSION"    # 本次运行的会话目录名（主进程定，子进程继承）
+
+SEGMENT_SECONDS = 300          # 每个分段最多覆盖多少秒
+SEGMENT_MAX_FRAMES = 200000    # 每个分段最多多少帧
+QUEUE_MAX = 100000             # 待写队列上限（满了丢最旧的）
+FLUSH_INTERVAL = 1.0           # 空闲时多久把 gzip 缓冲刷到磁盘
+COMPRESS_LEVEL = 6
+
+SEGMENT_PATTERN = "seg_*.jsonl.gz"
+
+
+class FrameRecorder:
+    """原始帧录制器（进程内单例，见 get_frame_recorder）"""
+
+    def __init__(self, base_dir: str):
+        session = os.environ.get(RECORD_SESSION_ENV) or datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.environ[RECORD_SESSION_ENV] = session
+        self.directory = os.path.join(base_dir, session)
+        os.makedirs(self.directory, exist_ok=True)
+        self.stream = f"{multiprocessing.current_process().name}_{os.getpid()}"
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._worker_waiting = False
+        self._running = True
+
+        self._segment = None
+        self._segment_index = 0
+        self._segment_started = 0.0
+        self._segment_frames = 0
+
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+
+        self._thread = threading.Thread(target=self._worker, daemon=True, name="FrameRecorder")
+        self._thread.start()
+        logger.info(f"🎙️【录制器】WebSocket 原始帧录制已开启: {self.directory}（{self.stream}）")
+
+    # ========== 录制（连接里调用，只入队）==========
+
+    def record(self, source: str, exchange: str, connection_id: str, frame: Any):
+        if not self._running:
+            return
+        item = (time.time(), source, exchange, connection_id, frame)
+        with self._cond:
+            if len(self._queue) >= QUEUE_MAX:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(item)
+            self.recorded += 1
+            if self._worker_waiting:
+                self._cond.notify()
+
+    # ========== 后台写盘 ==========
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue and self._running:
+                    self._worker_waiting = True
+                    notified = self._cond.wait(FLUSH_INTERVAL)
+                    self._worker_waiting = False
+                    if not notified and self._segment is not None:
+                        break   # 空闲：去刷一下缓冲
+                if not self._queue and not self._running:
+                    break
+                batch = list(self._queue)
+                self._queue.clear()
+
+            try:
+                if batch:
+                    self._write(batch)
+                elif self._segment is not None:
+                    self._segment.flush()
+            except Exception as e:
+                logger.error(f"❌【录制器】写分段失败: {e}")
+
+        self._close_segment()
+
+    def _write(self, batch):
+        lines = []
+        for received_at, source, exchange, connection_id, frame in batch:
+            if isinstance(frame, (bytes, bytearray)):
+                frame = frame.decode("utf-8", "replace")
+            lines.append(json.dumps([round(received_at, 6), source, exchange, connection_id, frame],
+                                    ensure_ascii=False, separators=(",", ":")))
+
+        start = 0
+        while start < len(lines):
+            segment = self._current_segment(batch[start][0])
+            room = SEGMENT_MAX_FRAMES - self._segment_frames
+            chunk = lines[start:start + room]
+            segment.write("\n".join(chunk) + "\n")
+            self._segment_frames += len(chunk)
+            self.written += len(chunk)
+            start += len(chunk)
+
+    def _current_segment(self, received_at: float):
+        if (self._segment is None
+                or self._segment_frames >= SEGMENT_MAX_FRAMES
+                or received_at - self._segment_started >= SEGMENT_SECONDS):
+            self._close_segment()
+            self._segment_index += 1
+            path = os.path.join(self.directory, f"seg_{self.stream}_{self._segment_index:05d}.jsonl.gz")
+            self._segment = gzip.open(path, "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL)
+            self._segment_started = received_at
+            self._segment_frames = 0
+        return self._segment
+
+    def _close_segment(self):
+        if self._segment is not None:
+            try:
+                self._segment.close()
+            except Exception as e:
+                logger.error(f"❌【录制器】关闭分段失败: {e}")
+            self._segment = None
+
+    # ========== 管理 ==========
+
+    def close(self, timeout: float = 10.0):
+        """写完队列里剩下的帧并关闭当前分段"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+        logger.info(f"🎙️【录制器】录制结束: {self.written} 帧，{self._segment_index} 个分段，丢弃 {self.dropped} 帧")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "stream": self.stream,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": len(self._queue),
+            "segments": self._segment_index,
+        }
+
+
+# ==================== 全局单例 ====================
+_recorder: Optional[FrameRecorder] = None
+_recorder_checked = False
+_recorder_lock = threading.Lock()
+
+
+def get_frame_recorder() -> Optional[FrameRecorder]:
+    """获取录制器；没设置 WS_RECORD_DIR 时返回 None"""
+    global _recorder, _recorder_checked
+    if _recorder_checked:
+        return _recorder
+    with _recorder_lock:
+        if not _recorder_checked:
+            base_dir = os.getenv(RECORD_DIR_ENV, "").strip()
+            if base_dir:
+                try:
+                    _recorder = FrameRecorder(base_dir)
+                except Exception as e:
+                    logger.error(f"❌【录制器】无法开启录制（{base_dir}）: {e}")
+            _recorder_checked = True
+    return _recorder
+
+
+def close_frame_recorder():
+    """关闭录制器（写完剩下的帧、收尾最后一个分段）；没开启过录制时什么都不做"""
+    global _recorder
+    with _recorder_lock:
+        recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.close()
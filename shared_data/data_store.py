@@ -39,6 +39,9 @@ class DataStore:
         self.flow_task = None
         self.water_callback = None
         
+        # 多进程模式：本进程写入的行情同时转发给流水线进程（见 multi_process）
+        self.market_data_forwarder = None
+        
         # 规则执行记录
         self.execution_records = {
             "total_flows": 0,                   # 总共放水次数
@@ -62,6 +65,10 @@ class DataStore:
         """设置市场数据回调"""
         self.water_callback = callback
     
+    def set_market_data_forwarder(self, forwarder: Optional[Callable]):
+        """设置行情转发（同步调用，只做入队；None = 关闭）"""
+        self.market_data_forwarder = forwarder
+    
     # ==================== HTTP服务相关方法 ====================
     
     def set_http_server_ready(self, ready: bool):
@@ -198,8 +205,8 @@ class DataStore:
     
     # ==================== 数据接收接口 ====================
     
-    async def update_market_data(self, exchange: str, symbol: str, data: Dict[str, Any]):
-        """接收市场数据"""
+    async def update_market_data(self, exchange: str, symbol: str, data: Dict[str, Any], forward: bool = True):
+        """接收市场数据（forward=False：流水线进程镜像回来的行情，不再转发回去）"""
         async with self.locks['market_data']:
             if exchange not in self.market_data:
                 self.market_data[exchange] = defaultdict(dict)
@@ -218,6 +225,9 @@ class DataStore:
             
             # 存储最新引用
             self.market_data[exchange][symbol]['latest'] = data_type
+        
+        if forward and self.market_data_forwarder:
+            self.market_data_forwarder(exchange, symbol, data)
     
     async def update_account_data(self, exchange: str, data: Dict[str, Any]):
         """接收账户数据（仅存储，不处理）"""
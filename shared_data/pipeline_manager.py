@@ -16,6 +16,7 @@ from shared_data.step2_fusion import Step2Fusion
 from shared_data.step3_align import Step3Align
 from shared_data.step4_calc import Step4Calc
 from shared_data.step5_cross_calc import Step5CrossCalc
+from shared_data.pipeline_metrics import get_pipeline_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -31,17 +32,21 @@ class PipelineManager:
         return cls._instance
     
     def __init__(self, 
-                 brain_callback: Optional[Callable] = None):
-        """✅ 已集成Step0限流器"""
+                 brain_callback: Optional[Callable] = None,
+                 push_to_completion: bool = True):
+        """
+        ✅ 已集成Step0限流器
+        push_to_completion=False：不在本进程推数据完成部门（多进程模式下结果发回主进程，由主进程推）
+        """
         if hasattr(self, '_initialized'):
             return
         
         # 大脑回调（仅市场数据）
         self.brain_callback = brain_callback
+        self.push_to_completion = push_to_completion
         
-        # 每小时重置计时器
-        self._last_hourly_reset = time.time()
-        self._hourly_reset_interval = 3600  # 1小时 = 3600秒
+        # 分阶段耗时 / 条数 / 超时 / 事件循环延迟（滚动窗口）
+        self.metrics = get_pipeline_metrics()
         
         # 立法：制定核心规则
         self.rules = {
@@ -101,7 +106,6 @@ class PipelineManager:
         
         logger.info("🚀【 公开数据处理管理员】开始启动系统...")
         self.system_running = True
-        self._last_hourly_reset = time.time()  # 重置计时器
         
         try:
             # 1. 把规则发给DataStore
@@ -119,7 +123,7 @@ class PipelineManager:
             # 4. 系统运行中
             logger.info("🎉【 公开数据处理管理员】系统启动完成，开始自动运行")
             
-            # 5. 启动状态监控（包含每小时重置检查）
+            # 5. 启动状态监控
             self._monitor_task = asyncio.create_task(self._monitor_system())
             
         except Exception as e:
@@ -168,16 +172,17 @@ class PipelineManager:
         """
         接收DataStore放过来的市场数据水
         ✅ 已集成Step0限流器
+        每个阶段的耗时 / 输出条数记到 self.metrics（滚动窗口，不再每小时清零）
         """
         if not water_data:
             return
         
+        tick = self.metrics.start_tick(len(water_data))
         try:
-            # 检查是否需要每小时重置统计
-            self._check_hourly_reset()
-            
             # ✅ 步骤0：币安历史费率限流
+            started = time.perf_counter()
             step0_results = await self.step0.process(water_data)
+            tick.stage("step0", started, step0_results)
             
             # 记录Step0统计
             step0_status = self.step0.get_status()
@@ -192,27 +197,37 @@ class PipelineManager:
                 return
             
             # ✅ 步骤1：过滤提取（接收Step0的输出！）
+            started = time.perf_counter()
             step1_results = await self.step1.process(step0_results)
+            tick.stage("step1", started, step1_results)
             if not step1_results:
                 return
             
             # 步骤2：融合
+            started = time.perf_counter()
             step2_results = await self.step2.process(step1_results)
+            tick.stage("step2", started, step2_results)
             if not step2_results:
                 return
             
             # 步骤3：对齐
+            started = time.perf_counter()
             step3_results = await self.step3.process(step2_results)
+            tick.stage("step3", started, step3_results)
             if not step3_results:
                 return
             
             # 步骤4：计算
+            started = time.perf_counter()
             step4_results = await self.step4.process(step3_results)
+            tick.stage("step4", started, step4_results)
             if not step4_results:
                 return
             
             # 步骤5：跨平台计算
+            started = time.perf_counter()
             step5_results = await self.step5.process(step4_results)
+            tick.stage("step5", started, step5_results)
             if not step5_results:
                 return
             
@@ -222,13 +237,18 @@ class PipelineManager:
             
             # 给大脑（保持原样，N次推送）
             if self.brain_callback:
+                started = time.perf_counter()
                 all_results = [result.__dict__ for result in step5_results]
                 await self.brain_callback(all_results)
+                tick.stage("brain", started)
             
             # ⭐⭐⭐ 推送到数据完成部门的接收器 - 直接推列表，和大脑模块完全一致 ⭐⭐⭐
+            if not self.push_to_completion:
+                return
             try:
                 from data_completion_department import receive_market_data
                 
+                started = time.perf_counter()
                 # ✅ [蚂蚁基因修复] 将列表推导式改为循环添加，并在循环内让出CPU
                 market_data_list = []
                 for result in step5_results:
@@ -236,6 +256,7 @@ class PipelineManager:
                     market_data_list.append(result.__dict__)
                 
                 await receive_market_data(market_data_list)
+                tick.stage("push", started)
                 
                 logger.debug(f"📤【 公开数据处理管理员】已推送 {len(market_data_list)} 个合约的行情数据到数据完成部门")
             except Exception as e:
@@ -244,51 +265,20 @@ class PipelineManager:
         except Exception as e:
             logger.error(f"❌【 公开数据处理管理员】流水线处理失败: {e}")
             self.stats["errors"] += 1
-    
-    # ==================== 每小时重置方法 ====================
-    
-    def _check_hourly_reset(self):
-        """检查并执行每小时统计重置"""
-        current_time = time.time()
-        time_since_reset = current_time - self._last_hourly_reset
-        
-        if time_since_reset >= self._hourly_reset_interval:
-            self._reset_hourly_stats()
-            self._last_hourly_reset = current_time
-    
-    def _reset_hourly_stats(self):
-        """每小时重置统计计数"""
-        logger.debug("🕐【 公开数据处理管理员】每小时统计重置开始")
-        
-        # 重置所有统计计数
-        self.stats["total_processed"] = 0
-        self.stats["errors"] = 0
-        
-        # 重置Step0统计
-        self.stats["step0_stats"]["total_in"] = 0
-        self.stats["step0_stats"]["total_out"] = 0
-        self.stats["step0_stats"]["binance_funding_blocked"] = 0
-        self.stats["step0_stats"]["binance_funding_passed"] = 0
-        
-        # 重置Step0限流器内部计数
-        if hasattr(self, 'step0') and hasattr(self.step0, 'reset_counters'):
-            self.step0.reset_counters()
-        
-        logger.debug("✅【 公开数据处理管理员】每小时统计重置完成")
+            tick.error = True
+        finally:
+            self.metrics.finish_tick(tick, self.rules["flow"]["interval_seconds"])
     
     # ==================== 系统监控 ====================
     
     async def _monitor_system(self):
-        """监控系统运行状态（包含每小时重置检查）"""
+        """监控系统运行状态"""
         while self.system_running:
             await asyncio.sleep(0)  # ✅ [蚂蚁基因修复] 循环开始让出CPU
             try:
                 # 每分钟报告一次状态
                 await asyncio.sleep(60)
                 
-                # 检查每小时重置
-                self._check_hourly_reset()
-                
                 # 格式化运行时间
                 uptime_seconds = time.time() - self.stats["start_time"]
                 uptime_str = self._format_uptime(uptime_seconds)
@@ -321,8 +311,6 @@ class PipelineManager:
     
     def get_status(self) -> Dict[str, Any]:
         """获取系统状态（保持接口兼容）"""
-        self._check_hourly_reset()  # 确保统计是最新的
-        
         uptime_seconds = time.time() - self.stats["start_time"]
         uptime_str = self._format_uptime(uptime_seconds)
         
@@ -340,8 +328,6 @@ class PipelineManager:
     
     def get_system_status(self) -> Dict[str, Any]:
         """✅ 增强：获取系统状态（详细版，包含Step0）"""
-        self._check_hourly_reset()  # 确保统计是最新的
-        
         uptime_seconds = time.time() - self.stats["start_time"]
         uptime_str = self._format_uptime(uptime_seconds)
         
@@ -352,14 +338,12 @@ class PipelineManager:
             "stats": self.stats.copy(),
             "rules": self.rules.copy(),
             "step0_status": self.step0.get_status(),
+            "metrics": self.metrics.snapshot(),
             "timestamp": time.time(),
-            "next_hourly_reset_in": max(0, self._hourly_reset_interval - (time.time() - self._last_hourly_reset))
         }
     
     def get_pipeline_stats(self) -> Dict[str, Any]:
         """获取流水线统计（包含Step0）"""
-        self._check_hourly_reset()  # 确保统计是最新的
-        
         return {
             "step0_stats": self.step0.get_status() if hasattr(self.step0, 'get_status') else {},
             "step1_stats": dict(self.step1.stats) if hasattr(self.step1, 'stats') else {},
@@ -367,6 +351,7 @@ class PipelineManager:
             "step3_stats": self.step3.stats if hasattr(self.step3, 'stats') else {},
             "step4_stats": self.step4.stats if hasattr(self.step4, 'stats') else {},
             "step5_stats": self.step5.stats if hasattr(self.step5, 'stats') else {},
+            "metrics": self.metrics.snapshot(),
         }
     
     # ==================== 回调设置方法 ====================
@@ -0,0 +1,295 @@
+"""
+流水线指标 - 每一跳的分阶段耗时、条数、超时和事件循环延迟
+
+PipelineManager 原来只有累计计数，而且每小时清零一次（清零前后的数字没法对比）。
+这里按"跳"（DataStore 放一次水 = 一跳）记录：
+
+1. 每个阶段的耗时：step0 ~ step5、brain（大脑回调）、push（推送数据完成部门）
+2. 每个阶段的输出条数（water 是进流水线的条数）
+3. 一跳总耗时超过放水间隔（rules["flow"]["interval_seconds"]）记一次超时
+4. 一跳进行期间，每 LAG_PROBE_INTERVAL 秒探测一次事件循环的调度延迟
+
+两种视图：
+    snapshot()     最近 WINDOW_SECONDS 秒的滚动窗口（p50 / p95 / max），不需要清零
+    prometheus()   Prometheus 文本格式：累计直方图 + 计数器（窗口交给 rate() 去算）
+
+使用方式：
+    metrics = get_pipeline_metrics()
+    tick = metrics.start_tick(len(water))
+    started = time.perf_counter()
+    results = await step.process(water)
+    tick.stage("step0", started, results)
+    ...
+    metrics.finish_tick(tick, interval_seconds)
+
+只在事件循环线程里调用，不加锁。
+
+多进程模式下流水线跑在子进程里，主进程的实例不记录，只用 mirror() 保存子进程定时发回来的两种视图。
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sized, Tuple
+
+from latency_stats import summarize
+
+STAGES = ["step0", "step1", "step2", "step3", "step4", "step5", "brain", "push"]
+
+WINDOW_SECONDS = 300          # 滚动窗口长度（秒）
+WINDOW_MAX_SAMPLES = 3600     # 每个序列最多保留多少个样本（1 秒一跳 = 1 小时）
+LAG_PROBE_INTERVAL = 0.01     # 一跳进行期间事件循环延迟的探测间隔（秒）
+
+# Prometheus 直方图桶（秒）
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Window:
+    """最近 WINDOW_SECONDS 秒的 (时间, 值) 样本"""
+
+    __slots__ = ("samples",)
+
+    def __init__(self):
+        self.samples: Deque[Tuple[float, Any]] = deque(maxlen=WINDOW_MAX_SAMPLES)
+
+    def add(self, value: Any, now: float):
+        self.samples.append((now, value))
+        self._trim(now)
+
+    def values(self, now: float) -> List[Any]:
+        self._trim(now)
+        return [value for _, value in self.samples]
+
+    def _trim(self, now: float):
+        cutoff = now - WINDOW_SECONDS
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+
+
+class _Histogram:
+    """Prometheus 累计直方图（秒）"""
+
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.sum += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+    def lines(self, name: str, labels: str = "") -> List[str]:
+        prefix = f"{labels}," if labels else ""
+        lines = [f'{name}_bucket{{{prefix}le="{bound}"}} {count}'
+                 for bound, count in zip(BUCKETS, self.buckets)]
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum:.6f}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class _LagProbe:
+    """一跳进行期间，用 call_later 链测量事件循环的调度延迟"""
+
+    __slots__ = ("loop", "expected", "handle", "samples")
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.samples: List[float] = []
+        self.expected = self.loop.time() + LAG_PROBE_INTERVAL
+        self.handle = self.loop.call_later(LAG_PROBE_INTERVAL, self._fire)
+
+    def _fire(self):
+        now = self.loop.time()
+        self.samples.append(max(0.0, now - self.expected))
+        self.expected = now + LAG_PROBE_INTERVAL
+        self.handle = self.loop.call_later(LAG_PROBE_INTERVAL, self._fire)
+
+    def stop(self) -> List[float]:
+        self.handle.cancel()
+        return self.samples
+
+
+class PipelineTick:
+    """一跳的测量记录"""
+
+    __slots__ = ("started", "water", "durations", "counts", "error", "probe")
+
+    def __init__(self, water: int):
+        self.started = time.perf_counter()
+        self.water = water
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {"water": water}
+        self.error = False
+        self.probe = _LagProbe()
+
+    def stage(self, name: str, started: float, results: Optional[Sized] = None):
+        """记录一个阶段：started 是该阶段开始时的 perf_counter，results 是输出（有的话记条数）"""
+        self.durations[name] = time.perf_counter() - started
+        if results is not None:
+            self.counts[name] = len(results)
+
+
+class PipelineMetrics:
+    """流水线指标汇总"""
+
+    def __init__(self):
+        self._stage_windows: Dict[str, _Window] = {stage: _Window() for stage in STAGES}
+        self._stage_histograms: Dict[str, _Histogram] = {stage: _Histogram() for stage in STAGES}
+        self._tick_window = _Window()            # (总毫秒, 是否超时, 各阶段条数)
+        self._tick_histogram = _Histogram()
+        self._lag_window = _Window()
+        self._lag_histogram = _Histogram()
+
+        self.ticks_total = 0
+        self.overruns_total = 0
+        self.errors_total = 0
+        self.items_total: Dict[str, int] = {}
+        self.interval_seconds = 1.0
+        self.last_tick: Optional[Dict[str, Any]] = None
+        self._mirrored: Optional[Tuple[Dict[str, Any], str]] = None
+
+    # ========== 记录 ==========
+
+    def start_tick(self, water: int) -> PipelineTick:
+        return PipelineTick(water)
+
+    def finish_tick(self, tick: PipelineTick, interval_seconds: float):
+        total = time.perf_counter() - tick.started
+        lags = tick.probe.stop()
+        now = time.time()
+        overrun = total > interval_seconds
+        self.interval_seconds = interval_seconds
+
+        self.ticks_total += 1
+        self.overruns_total += overrun
+        self.errors_total += tick.error
+        self._tick_histogram.observe(total)
+        self._tick_window.add((total * 1000, overrun, tick.counts), now)
+
+        for stage, seconds in tick.durations.items():
+            self._stage_histograms[stage].observe(seconds)
+            self._stage_windows[stage].add(seconds * 1000, now)
+        for stage, count in tick.counts.items():
+            self.items_total[stage] = self.items_total.get(stage, 0) + count
+        for lag in lags:
+            self._lag_histogram.observe(lag)
+            self._lag_window.add(lag * 1000, now)
+
+        self.last_tick = {
+            "at": now,
+            "total_ms": round(total * 1000, 3),
+            "overrun": overrun,
+            "error": tick.error,
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in tick.durations.items()},
+            "counts": dict(tick.counts),
+            "loop_lag_max_ms": round(max(lags) * 1000, 3) if lags else None,
+        }
+
+    def mirror(self, snapshot: Dict[str, Any], prometheus: str):
+        """多进程模式：保存流水线进程发回来的视图，之后 snapshot() / prometheus() 直接返回它们"""
+        self._mirrored = (snapshot, prometheus)
+
+    # ========== 查询 ==========
+
+    def snapshot(self) -> Dict[str, Any]:
+        """最近 WINDOW_SECONDS 秒的滚动窗口视图"""
+        if self._mirrored is not None:
+            return self._mirrored[0]
+        now = time.time()
+        ticks = self._tick_window.values(now)
+        overruns = sum(1 for _, overrun, _ in ticks if overrun)
+
+        counts: Dict[str, List[int]] = {}
+        for _, _, tick_counts in ticks:
+            for stage, count in tick_counts.items():
+                counts.setdefault(stage, []).append(count)
+
+        return {
+            "window_seconds": WINDOW_SECONDS,
+            "interval_ms": round(self.interval_seconds * 1000, 3),
+            "ticks": len(ticks),
+            "overruns": overruns,
+            "overrun_ratio": round(overruns / len(ticks), 4) if ticks else None,
+            "tick_ms": summarize([total for total, _, _ in ticks], digits=3),
+            "loop_lag_ms": summarize(self._lag_window.values(now), digits=3),
+            "stages_ms": {stage: summarize(window.values(now), digits=3) for stage, window in self._stage_windows.items()},
+            "items": {stage: {"avg": round(sum(values) / len(values), 1), "max": max(values)}
+                      for stage, values in counts.items()},
+            "totals": {
+                "ticks": self.ticks_total,
+                "overruns": self.overruns_total,
+                "errors": self.errors_total,
+            },
+            "last_tick": self.last_tick,
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus 文本格式（0.0.4）"""
+        if self._mirrored is not None:
+            return self._mirrored[1]
+        lines = [
+            "# HELP pipeline_stage_duration_seconds 流水线每个阶段每一跳的耗时",
+            "# TYPE pipeline_stage_duration_seconds histogram",
+        ]
+        for stage, histogram in self._stage_histograms.items():
+            lines.extend(histogram.lines("pipeline_stage_duration_seconds", f'stage="{stage}"'))
+
+        lines += [
+            "# HELP pipeline_tick_duration_seconds 流水线一跳的总耗时",
+            "# TYPE pipeline_tick_duration_seconds histogram",
+        ]
+        lines.extend(self._tick_histogram.lines("pipeline_tick_duration_seconds"))
+
+        lines += [
+            "# HELP pipeline_loop_lag_seconds 流水线运行期间事件循环的调度延迟",
+            "# TYPE pipeline_loop_lag_seconds histogram",
+        ]
+        lines.extend(self._lag_histogram.lines("pipeline_loop_lag_seconds"))
+
+        lines += [
+            "# HELP pipeline_ticks_total 流水线跳数",
+            "# TYPE pipeline_ticks_total counter",
+            f"pipeline_ticks_total {self.ticks_total}",
+            "# HELP pipeline_tick_overruns_total 耗时超过放水间隔的跳数",
+            "# TYPE pipeline_tick_overruns_total counter",
+            f"pipeline_tick_overruns_total {self.overruns_total}",
+            "# HELP pipeline_tick_errors_total 处理失败的跳数",
+            "# TYPE pipeline_tick_errors_total counter",
+            f"pipeline_tick_errors_total {self.errors_total}",
+            "# HELP pipeline_interval_seconds 放水间隔",
+            "# TYPE pipeline_interval_seconds gauge",
+            f"pipeline_interval_seconds {self.interval_seconds}",
+            "# HELP pipeline_items_total 每个阶段累计输出条数（water 为输入）",
+            "# TYPE pipeline_items_total counter",
+        ]
+        lines.extend(f'pipeline_items_total{{stage="{stage}"}} {count}'
+                     for stage, count in self.items_total.items())
+
+        if self.last_tick:
+            lines += [
+                "# HELP pipeline_last_tick_items 最近一跳每个阶段的输出条数",
+                "# TYPE pipeline_last_tick_items gauge",
+            ]
+            lines.extend(f'pipeline_last_tick_items{{stage="{stage}"}} {count}'
+                         for stage, count in self.last_tick["counts"].items())
+
+        return "\n".join(lines) + "\n"
+
+
+# ==================== 全局单例 ====================
+_metrics: Optional[PipelineMetrics] = None
+
+
+def get_pipeline_metrics() -> PipelineMetrics:
+    """获取全局流水线指标"""
+    global _metrics
+    if _metrics is None:
+        _metrics = PipelineMetrics()
+    return _metrics
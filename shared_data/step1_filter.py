@@ -10,7 +10,10 @@ from typing import Dict, List, Any, Optional
 from collections import defaultdict
 from dataclasses import dataclass
 
+from hot_logger import get_hot_logger
+
 logger = logging.getLogger(__name__)
+hot = get_hot_logger(__name__)
 
 @dataclass
 class ExtractedData:
@@ -74,7 +77,6 @@ class Step1Filter:
     
     def __init__(self):
         self.stats = defaultdict(int)
-        self.last_log_time = 0
         self.log_interval = 120  # 2分钟
         self.process_count = 0
         self.log_detail_counter = 0  # 用于记录详细日志的计数器
@@ -89,8 +91,7 @@ class Step1Filter:
         # 检查是否需要每小时重置统计
         self._check_hourly_reset()
         
-        current_time = time.time()
-        should_log = (current_time - self.last_log_time) >= self.log_interval or self.process_count == 0
+        should_log = hot.allow("step1.process", every=self.log_interval)
         
         # 处理前日志 - 只在频率控制时打印
         if should_log:
@@ -145,7 +146,6 @@ class Step1Filter:
                 for data_type, count in sorted(self.stats.items()):
                     logger.debug(f"  • {data_type}: {count} 条")
             
-            self.last_log_time = current_time
             self.process_count = 0
         
         self.process_count += 1
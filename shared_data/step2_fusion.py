@@ -6,7 +6,6 @@
 
 import logging
 import asyncio  # ✅ [蚂蚁基因修复] 导入asyncio
-import time
 from typing import Dict, List, Any, Optional, TYPE_CHECKING
 from collections import defaultdict
 from dataclasses import dataclass
@@ -15,7 +14,10 @@ from dataclasses import dataclass
 if TYPE_CHECKING:
     from step1_filter import ExtractedData
 
+from hot_logger import get_hot_logger
+
 logger = logging.getLogger(__name__)
+hot = get_hot_logger(__name__)
 
 @dataclass 
 class FusedData:
@@ -40,9 +42,7 @@ class Step2Fusion:
             "success_groups": 0,
             "failed_groups": 0
         }
-        self.last_log_time = 0
         self.log_interval = 180  # 3分钟，单位：秒
-        self.process_count = 0
     
     # ✅ [蚂蚁基因修复] 改为异步方法
     async def process(self, step1_results: List["ExtractedData"]) -> List[FusedData]:
@@ -58,8 +58,7 @@ class Step2Fusion:
         self.stats.clear()
         
         # 频率控制：只偶尔显示处理日志
-        current_time = time.time()
-        should_log = (current_time - self.last_log_time) >= self.log_interval or self.process_count == 0
+        should_log = hot.allow("step2.process", every=self.log_interval)
         
         # 处理前日志 - 只在频率控制时打印
         if should_log:
@@ -92,8 +91,7 @@ class Step2Fusion:
             except Exception as e:
                 self.fusion_stats["failed_groups"] += 1
                 # 只在频率控制时打印错误
-                if should_log:
-                    logger.error(f"❌【流水线步骤2】融合失败: {key} - {e}")
+                hot.error("step2.fuse_error", "❌【流水线步骤2】融合失败: %s - %s", key, e, every=10)
                 continue
         
         # 处理后日志 - 只在频率控制时打印
@@ -132,12 +130,6 @@ class Step2Fusion:
             # 验证字段完整性（只针对成功融合的结果）
             if results:
                 await self._validate_fields(results)  # ✅ [蚂蚁基因修复] 改为异步调用
-            
-            self.last_log_time = current_time
-            # 重置计数（仅用于频率控制）
-            self.process_count = 0
-        
-        self.process_count += 1
         
         return results
     
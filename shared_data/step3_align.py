@@ -6,12 +6,14 @@
 
 import logging
 import asyncio  # ✅ [蚂蚁基因修复] 导入asyncio
-import time
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from hot_logger import get_hot_logger
+
 logger = logging.getLogger(__name__)
+hot = get_hot_logger(__name__)
 
 @dataclass
 class AlignedData:
@@ -46,16 +48,13 @@ class Step3Align:
     """第三步：双平台对齐 + 时间转换（精确匹配版）"""
     
     def __init__(self):
-        self.last_log_time = 0
         self.log_interval = 300  # 5分钟，单位：秒
-        self.process_count = 0
     
     # ✅ [蚂蚁基因修复] 改为异步方法
     async def process(self, fused_results: List) -> List[AlignedData]:
         """异步处理Step2的融合结果 - 使用精确匹配"""
         # 频率控制：只偶尔显示处理日志
-        current_time = time.time()
-        should_log = (current_time - self.last_log_time) >= self.log_interval or self.process_count == 0
+        should_log = hot.allow("step3.process", every=self.log_interval)
         
         # 处理前日志 - 只在频率控制时打印
         if should_log:
@@ -112,8 +111,7 @@ class Step3Align:
                                 
                     except Exception as e:
                         # 只在频率控制时打印错误
-                        if should_log:
-                            logger.error(f"❌【流水线步骤3】对齐失败: {coin} - {e}")
+                        hot.error("step3.align_error", "❌【流水线步骤3】对齐失败: %s - %s", coin, e, every=10)
                         continue
                 else:
                     match_errors.append({
@@ -144,12 +142,6 @@ class Step3Align:
                 logger.info(f"✅【流水线步骤3】时间转换: 全部 {len(align_results)} 个合约转换成功")
             else:
                 logger.warning(f"⚠️【流水线步骤3】时间转换: {time_conversion_errors} 个合约存在转换错误")
-            
-            self.last_log_time = current_time
-            # 重置计数（仅用于频率控制）
-            self.process_count = 0
-        
-        self.process_count += 1
         
         return align_results
     
@@ -11,7 +11,10 @@ import time
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 
+from hot_logger import get_hot_logger
+
 logger = logging.getLogger(__name__)
+hot = get_hot_logger(__name__)
 
 @dataclass
 class PlatformData:
@@ -49,9 +52,7 @@ class Step4Calc:
     def __init__(self):
         # 统一缓存结构：symbol -> exchange -> 数据
         self.platform_cache = {}
-        self.last_log_time = 0
         self.log_interval = 60  # 1分钟
-        self.process_count = 0
         
         # 保护统计集合（日志周期内累计，自动去重）
         self._protected_symbols = set()
@@ -61,8 +62,7 @@ class Step4Calc:
         """
         异步统一处理流程：1.智能更新缓存 2.从缓存计算
         """
-        current_time = time.time()
-        should_log = (current_time - self.last_log_time) >= self.log_interval or self.process_count == 0
+        should_log = hot.allow("step4.process", every=self.log_interval)
         
         # 处理前日志 - 只在频率控制时打印
         if should_log:
@@ -132,11 +132,6 @@ class Step4Calc:
             
             self._log_cache_status(batch_stats)
             self._log_calculation_report(batch_stats)
-            
-            self.last_log_time = current_time
-            self.process_count = 0
-        
-        self.process_count += 1
         
         return all_results
     
@@ -7,7 +7,6 @@
 
 import logging
 import asyncio  # ✅ [蚂蚁基因修复] 导入asyncio
-import time
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from collections import defaultdict
@@ -17,7 +16,10 @@ from decimal import Decimal, getcontext
 # 设置Decimal精度
 getcontext().prec = 28
 
+from hot_logger import get_hot_logger
+
 logger = logging.getLogger(__name__)
+hot = get_hot_logger(__name__)
 
 @dataclass
 class CrossPlatformData:
@@ -80,9 +82,7 @@ class Step5CrossCalc:
     """第五步：跨平台计算（专注数据计算版）"""
     
     def __init__(self):
-        self.last_log_time = 0
         self.log_interval = 120  # 2分钟，单位：秒
-        self.process_count = 0
     
     # ✅ [蚂蚁基因修复] 改为异步方法
     async def process(self, platform_results: List) -> List[CrossPlatformData]:
@@ -90,15 +90,13 @@ class Step5CrossCalc:
         异步处理Step4的单平台数据，只做数据计算，不做业务过滤
         """
         # 频率控制：只偶尔显示处理日志
-        current_time = time.time()
-        should_log = (current_time - self.last_log_time) >= self.log_interval or self.process_count == 0
+        should_log = hot.allow("step5.process", every=self.log_interval)
         
         if should_log:
             logger.info(f"✅【流水线步骤5】开始跨平台计算Step4输出的 {len(platform_results)} 条单平台数据...")
         
         if not platform_results:
-            if should_log:
-                logger.warning("⚠️【流水线步骤5】输入数据为空")
+            hot.warning("step5.empty_input", "⚠️【流水线步骤5】输入数据为空", every=self.log_interval)
             return []
         
         # 按symbol分组
@@ -125,8 +123,7 @@ class Step5CrossCalc:
                 if cross_data:
                     cross_results.append(cross_data)
             except Exception as e:
-                if should_log:
-                    logger.error(f"❌【流水线步骤5】跨平台计算失败: {symbol} - {e}")
+                hot.error("step5.calc_error", "❌【流水线步骤5】跨平台计算失败: %s - %s", symbol, e, every=10)
                 continue
         
         if should_log:
@@ -137,11 +134,6 @@ class Step5CrossCalc:
             
             # 只显示当前批次的统计
             await self._log_batch_statistics(total_contracts, actual_contracts, cross_results)  # ✅ 改为异步调用
-            
-            self.last_log_time = current_time
-            self.process_count = 0
-        
-        self.process_count += 1
         
         return cross_results
     
@@ -26,6 +26,9 @@ if PROJECT_ROOT not in sys.path:
 
 logger = logging.getLogger(__name__)
 
+# 多腿发射时差告警阈值（毫秒）
+DISPATCH_SKEW_WARN_MS = 50
+
 
 class SmartBrain:
     """
@@ -57,6 +60,7 @@ class SmartBrain:
         
         # ========== 下单工人（只负责执行，大脑不直接发数据给它） ==========
         self.trader = None
+        self.last_dispatch_report = None  # 最近一次多腿发射报告（两腿时差）
         
         # ========== 半自动工人 ==========
         self.leverage_worker = None      # 杠杆设置
@@ -203,6 +207,17 @@ class SmartBrain:
             else:
                 logger.warning("⚠️【智能大脑】frontend_relay 未设置，无法推送")
     
+    async def on_trader_dispatch_report(self, report):
+        """
+        接收下单工人的多腿发射报告（签名耗时、两腿发射时差）
+        
+        只记录最近一次，不转发给其它工人
+        """
+        self.last_dispatch_report = report
+        skew = report.get("wire_skew_ms")
+        if skew is not None and skew > DISPATCH_SKEW_WARN_MS:
+            logger.warning(f"⚠️【智能大脑】多腿发射时差过大: {skew}ms")
+    
     # ==================== 前端指令处理 ====================
     
     async def handle_frontend_command(self, command_data):
@@ -409,6 +424,11 @@ class SmartBrain:
             if self.trader:
                 await self.trader.stop()
             
+            # 6. 刷完数据库写入缓冲并关闭连接
+            data_database = getattr(self, 'data_database', None)
+            if data_database:
+                await data_database.close()
+            
             logger.info("✅【智能大脑】大脑核心已关闭")
         except Exception as e:
             logger.error(f"❌【智能大脑】关闭出错: {e}")
\ No newline at end of file
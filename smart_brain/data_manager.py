@@ -1,16 +1,47 @@
 """
 数据管理器 - 简化存储版
 只存储原始数据，不添加额外包装
+
+数据订阅（subscriptions.py）：
+工人用 subscribe() / wait_for_change() 登记关心的合约、交易所和字段，
+新数据存储后只在关心的值变化时唤醒工人，不再每秒轮询 get_xxx_data()。
+
+合约参考索引：
+合约面值/精度数据到达时按合约名建好索引（BTCUSDT 和 BTC-USDT-SWAP 两种写法都能查），
+下单关键路径上用 get_okx_contract() / get_binance_contract() 直接取，不再扫描整个合约列表。
+
+机会排行（opportunity_index.py）：
+行情到达时增量维护按费率差排序的合约排行，get_top_opportunities() 直接取前 k 个。
 """
 import asyncio
 import logging
 import os
 import time
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Iterable, Optional
+
+from .subscriptions import SubscriptionHub, DataSubscription, SOURCE_MARKET, SOURCE_USER
+from .opportunity_index import OpportunityIndex
+from .settlement_scheduler import get_settlement_scheduler
 
 logger = logging.getLogger(__name__)
 
+
+def symbol_aliases(symbol: str) -> tuple:
+    """
+    合约名的两种写法：BTCUSDT ↔ BTC-USDT-SWAP
+
+    返回: (原写法, 另一种写法)；无法转换时只返回原写法
+    """
+    if not symbol:
+        return ()
+    if symbol.endswith('-SWAP'):
+        return symbol, symbol[:-len('-SWAP')].replace('-', '')
+    if symbol.endswith('USDT'):
+        return symbol, f"{symbol[:-4]}-USDT-SWAP"
+    return (symbol,)
+
+
 class DataManager:
     def __init__(self, brain):
         self.brain = brain
@@ -35,6 +66,18 @@ class DataManager:
             'exchange_tokens': {},       # 专门存储listenKey
             'binance_ticker_24hr': {}    # 币安24小时涨跌幅数据
         }
+        
+        # 合约参考索引 {exchange: {合约名(两种写法): 合约数据}}，合约数据到达时整体重建
+        self._reference_index = {'okx': {}, 'binance': {}}
+        
+        # 私人数据视图 {exchange: data}（存储时重建，读取时不再逐条拼装）
+        self._user_view = {}
+        
+        # 数据订阅中心
+        self.subscriptions = SubscriptionHub()
+        
+        # 机会排行（按费率差排序）
+        self.opportunities = OpportunityIndex()
     
     # ==================== 接收步骤 ====================
     
@@ -64,6 +107,7 @@ class DataManager:
                     'source': 'reference_task'
                 }
                 self.last_reference_time = now
+                self._build_reference_index(exchange, private_data.get('data', {}))
                 logger.debug(f"✅【智能大脑】参考数据 {exchange}.{data_type} 已保存（不推送前端）")
                 
                 # ❌ 不再推送到前端（前端不需要面值/精度数据）
@@ -85,6 +129,7 @@ class DataManager:
                 }
                 self.last_account_time = now
                 logger.debug(f"✅【智能大脑】用户数据 {exchange} 已保存")
+                self._on_user_data_stored()
                 
                 # ✅ 推送存储后的私人数据
                 if self.brain.frontend_relay:
@@ -122,6 +167,7 @@ class DataManager:
                     'timestamp': private_data.get('timestamp', now.isoformat()),
                     'received_at': now.isoformat()
                 }
+                self._on_user_data_stored()
                 
                 # 推送未知类型数据
                 if self.brain.frontend_relay:
@@ -167,6 +213,11 @@ class DataManager:
             # ✅ 存储市场数据
             stored_data = await self._store_market_data_simplified(processed_data)
             
+            # ✅ 更新机会排行，通知订阅者（只唤醒关心的值有变化的工人）
+            if stored_data:
+                self.opportunities.update(stored_data)
+                self.subscriptions.publish(SOURCE_MARKET, stored_data)
+            
             # ✅ 推送存储后的市场数据
             if self.brain.frontend_relay and stored_data:
                 market_data_to_push = self.memory_store.get('market_data', {})
@@ -281,6 +332,118 @@ class DataManager:
                 'source': 'error'
             }
     
+    # ==================== 数据订阅 ====================
+    
+    def subscribe(self, *, market_symbols=None, market_fields: Optional[Iterable[str]] = None,
+                  user_exchanges=None, user_fields: Optional[Iterable[str]] = None,
+                  callback=None, name: str = '') -> DataSubscription:
+        """
+        登记数据订阅
+        
+        参数:
+            market_symbols: 关心的合约（列表 / 单个合约名 / ANY），None 表示不关心行情
+            market_fields: 只在这些行情字段变化时唤醒（None = 任一字段）
+            user_exchanges: 关心的交易所（列表 / 单个 / ANY），None 表示不关心私人数据
+            user_fields: 只在这些私人数据字段变化时唤醒（None = 任一字段）
+            callback: 变化时回调 callback(sub, source, keys)，不传则用 sub.wait()
+            name: 订阅名（日志 / 状态显示用）
+        """
+        sub = self.subscriptions.add(
+            name=name,
+            market_symbols=market_symbols, market_fields=market_fields,
+            user_exchanges=user_exchanges, user_fields=user_fields,
+            callback=callback,
+        )
+        self._prime_subscription(sub)
+        return sub
+    
+    def unsubscribe(self, sub: DataSubscription):
+        """取消订阅"""
+        sub.close()
+    
+    async def wait_for_change(self, timeout: float, **kwargs) -> bool:
+        """
+        一次性等待：关心的数据变化（返回 True）或超时（返回 False）
+        
+        参数同 subscribe()；用于"数据不完整，等下一次数据到达再重试"
+        """
+        sub = self.subscriptions.add(name=kwargs.pop('name', 'wait_for_change'), **kwargs)
+        try:
+            self._prime_subscription(sub, wake=False)
+            return await sub.wait(timeout=timeout)
+        finally:
+            sub.close()
+    
+    def _prime_subscription(self, sub: DataSubscription, wake: bool = True):
+        """
+        用当前数据初始化订阅的"上次看到的值"
+        
+        wake=True：已有数据算作一次变化（订阅后第一次 wait 立即返回）
+        wake=False：只记录现状，等下一次真正的变化
+        """
+        for source, items in ((SOURCE_MARKET, self.memory_store['market_data']),
+                              (SOURCE_USER, self._user_view)):
+            changed = sub._offer(source, items)
+            if changed and wake:
+                sub._fire(source, changed)
+    
+    def _on_user_data_stored(self):
+        """私人数据存储后：重建视图，通知订阅者"""
+        user_view = {}
+        for data in self.memory_store['user_data'].values():
+            exchange = data.get('exchange')
+            if exchange:
+                user_view[exchange] = data.get('data', {})
+        self._user_view = user_view
+        self.subscriptions.publish(SOURCE_USER, user_view)
+    
+    # ==================== 合约参考索引 ====================
+    
+    def _build_reference_index(self, exchange: str, contract_data: Dict):
+        """按合约名建索引（两种写法都建），建好后整体替换"""
+        id_field = {'okx': 'instId', 'binance': 'symbol'}.get(exchange)
+        if id_field is None:
+            return
+        
+        index = {}
+        for contract in contract_data.get('contracts', []) or []:
+            for alias in symbol_aliases(contract.get(id_field)):
+                index[alias] = contract
+        self._reference_index[exchange] = index
+        logger.debug(f"📇【智能大脑】{exchange} 合约参考索引已重建，{len(index)} 个键")
+    
+    def get_contract_reference(self, exchange: str, symbol: str) -> Optional[Dict]:
+        """
+        按合约名取合约参考数据（O(1)）
+        
+        参数:
+            exchange: okx / binance
+            symbol: BTCUSDT 或 BTC-USDT-SWAP 均可
+        返回:
+            欧易：instId / ctVal / lotSz / minSz / tickSz ...
+            币安：symbol / tickSize / stepSize / minQty ...
+            未找到返回 None
+        """
+        return self._reference_index.get(exchange, {}).get(symbol)
+    
+    def get_okx_contract(self, symbol: str) -> Optional[Dict]:
+        """欧易合约面值数据（ctVal / lotSz / minSz / tickSz）"""
+        return self.get_contract_reference('okx', symbol)
+    
+    def get_binance_contract(self, symbol: str) -> Optional[Dict]:
+        """币安合约精度数据（tickSize / stepSize / minQty）"""
+        return self.get_contract_reference('binance', symbol)
+    
+    # ==================== 机会排行 ====================
+    
+    def get_top_opportunities(self, k: Optional[int] = 10, **filters):
+        """
+        按费率差从大到小取前 k 个合约（参数见 OpportunityIndex.top_k）
+        
+        例：get_top_opportunities(1, min_rate_diff=0.8, max_okx_countdown=200, max_binance_countdown=200)
+        """
+        return self.opportunities.top_k(k, **filters)
+    
     # ==================== 数据查询接口（按来源）====================
     
     async def get_data_summary(self):
@@ -362,12 +525,7 @@ class DataManager:
     async def get_private_user_data(self):
         """获取私人用户数据详情"""
         try:
-            user_data = {}
-            for key, data in self.memory_store['user_data'].items():
-                await asyncio.sleep(0)
-                exchange = data.get('exchange')
-                if exchange:
-                    user_data[exchange] = data.get('data', {})
+            user_data = dict(self._user_view)
             
             return {
                 "source": "private_user",
@@ -383,12 +541,8 @@ class DataManager:
     async def get_okx_contracts_data(self):
         """获取OKX合约面值数据详情"""
         try:
-            contract_data = None
-            for key, data in self.memory_store['reference_data'].items():
-                await asyncio.sleep(0)
-                if 'okx' in key and 'contract' in key:
-                    contract_data = data.get('data', {})
-                    break
+            stored = self.memory_store['reference_data'].get('okx_contract_info')
+            contract_data = stored.get('data', {}) if stored else None
             
             return {
                 "source": "okx_contracts",
@@ -404,12 +558,8 @@ class DataManager:
     async def get_binance_contracts_data(self):
         """获取币安合约精度数据详情"""
         try:
-            contract_data = None
-            for key, data in self.memory_store['reference_data'].items():
-                await asyncio.sleep(0)
-                if 'binance' in key and 'contract_info' in key:
-                    contract_data = data.get('data', {})
-                    break
+            stored = self.memory_store['reference_data'].get('binance_contract_info')
+            contract_data = stored.get('data', {}) if stored else None
             
             return {
                 "source": "binance_contracts",
@@ -476,7 +626,8 @@ class DataManager:
             },
             "reference_data": {
                 "last_update": self._format_time_diff(self.last_reference_time) if self.last_reference_time else "从未更新",
-                "stored_count": len(self.memory_store['reference_data'])
+                "stored_count": len(self.memory_store['reference_data']),
+                "indexed_keys": {exchange: len(index) for exchange, index in self._reference_index.items()}
             },
             "binance_ticker_24hr": {
                 "stored_count": len(self.memory_store.get('binance_ticker_24hr', {})) - 1
@@ -496,6 +647,23 @@ class DataManager:
                 "stats": {}
             }
         
+        # 数据订阅
+        status["subscriptions"] = self.subscriptions.get_stats()
+        
+        # 结算时间调度误差
+        status["settlement_scheduler"] = get_settlement_scheduler().get_metrics()
+        
+        # 下单请求延迟（DNS / 建连 / 首字节 / 总耗时）
+        trader = getattr(self.brain, 'trader', None)
+        if trader and hasattr(trader, 'get_latency_metrics'):
+            status["trader_latency"] = trader.get_latency_metrics()
+        # 多腿并发发射的时差统计
+        if trader and hasattr(trader, 'get_dispatch_stats'):
+            status["trader_dispatch"] = trader.get_dispatch_stats()
+        # 订单生命周期：决策→发出→回执→成交
+        if trader and hasattr(trader, 'get_lifecycle_metrics'):
+            status["order_lifecycle"] = trader.get_lifecycle_metrics()
+        
         return status
     
     async def clear_stored_data(self, data_type: str = None):
@@ -511,18 +679,21 @@ class DataManager:
             
             if data_type == 'market':
                 self.memory_store['market_data'].clear()
+                self.opportunities.clear()
                 self.last_market_time = None
                 self.last_market_count = 0
                 message = f"清空市场数据，共{before_stats['market_data_count']}条"
                 
             elif data_type == 'user':
                 self.memory_store['user_data'].clear()
+                self._user_view = {}
                 self.last_account_time = None
                 self.last_trade_time = None
                 message = f"清空用户数据，共{before_stats['user_data_count']}条"
                 
             elif data_type == 'reference':
                 self.memory_store['reference_data'].clear()
+                self._reference_index = {'okx': {}, 'binance': {}}
                 self.last_reference_time = None
                 message = f"清空参考数据，共{before_stats['reference_data_count']}条"
                 
@@ -538,8 +709,11 @@ class DataManager:
                 
             elif data_type is None:
                 self.memory_store['market_data'].clear()
+                self.opportunities.clear()
                 self.memory_store['user_data'].clear()
+                self._user_view = {}
                 self.memory_store['reference_data'].clear()
+                self._reference_index = {'okx': {}, 'binance': {}}
                 self.memory_store['exchange_tokens'].clear()
                 self.memory_store['binance_ticker_24hr'].clear()
                 self.last_market_time = None
@@ -0,0 +1,150 @@
+"""
+机会排行索引 - 按费率差实时排序的合约列表
+
+行情数据每到一批，DataManager 调用 update()，只对本批变化的合约做
+"删旧位置 + 二分插入新位置"，排行始终有序，不需要每次全量扫描再求最大值。
+
+- 排序键：(-rate_diff, symbol)，费率差从大到小
+- 倒计时按数据到达时间自动折算（countdown - 已过去的秒数），两次推送之间也准确
+- top_k() 从头往后取：遇到费率差不够的直接停止，只为倒计时不满足的条目多走几步
+
+使用方式：
+    index = data_manager.opportunities
+    best = index.top_k(1, min_rate_diff=0.8, max_okx_countdown=200, max_binance_countdown=200)
+    # → [{'symbol': 'BTCUSDT', 'rate_diff': 1.2, 'okx_countdown': 150.3, 'binance_countdown': 150.1}]
+"""
+
+import bisect
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _to_float(value) -> Optional[float]:
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class OpportunityIndex:
+    """按费率差排序的合约索引"""
+
+    def __init__(self):
+        self._ranked: List[tuple] = []          # [(-rate_diff, symbol)] 升序 = 费率差降序
+        self._entries: Dict[str, tuple] = {}    # symbol -> (rate_diff, okx_cd, binance_cd, 到达时刻monotonic)
+        self.update_count = 0
+
+    def __len__(self):
+        return len(self._ranked)
+
+    # ========== 更新 ==========
+
+    def update(self, rows: Dict[str, Dict[str, Any]]):
+        """
+        更新一批合约（只处理传入的合约）
+
+        参数:
+            rows: {symbol: 简化行情数据}，需要 rate_diff / okx_countdown_seconds / binance_countdown_seconds
+        """
+        now = time.monotonic()
+        for symbol, row in rows.items():
+            if not isinstance(row, dict):
+                continue
+            rate_diff = _to_float(row.get('rate_diff'))
+            old = self._entries.get(symbol)
+
+            if old is not None and old[0] != rate_diff:
+                self._remove_ranked(old[0], symbol)
+
+            if rate_diff is None:
+                self._entries.pop(symbol, None)
+                continue
+
+            if old is None or old[0] != rate_diff:
+                bisect.insort(self._ranked, (-rate_diff, symbol))
+
+            self._entries[symbol] = (
+                rate_diff,
+                _to_float(row.get('okx_countdown_seconds')),
+                _to_float(row.get('binance_countdown_seconds')),
+                now,
+            )
+        self.update_count += 1
+
+    def _remove_ranked(self, rate_diff: Optional[float], symbol: str):
+        if rate_diff is None:
+            return
+        key = (-rate_diff, symbol)
+        i = bisect.bisect_left(self._ranked, key)
+        if i < len(self._ranked) and self._ranked[i] == key:
+            del self._ranked[i]
+
+    def clear(self):
+        self._ranked = []
+        self._entries = {}
+
+    # ========== 查询 ==========
+
+    def get(self, symbol: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """单个合约的当前条目（倒计时已折算到现在）"""
+        entry = self._entries.get(symbol)
+        if entry is None:
+            return None
+        return self._view(symbol, entry, time.monotonic() if now is None else now)
+
+    def top_k(self, k: Optional[int] = 10,
+              min_rate_diff: Optional[float] = None,
+              max_okx_countdown: Optional[float] = None,
+              max_binance_countdown: Optional[float] = None,
+              predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        """
+        按费率差从大到小取前 k 个满足条件的合约
+
+        参数:
+            k: 取几个（None = 全部满足条件的）
+            min_rate_diff: 费率差必须 > 该值
+            max_okx_countdown: 欧易结算倒计时必须 < 该值（秒）
+            max_binance_countdown: 币安结算倒计时必须 < 该值（秒）
+            predicate: 额外过滤条件，参数为返回的条目字典
+        """
+        now = time.monotonic()
+        result = []
+        for neg_rate, symbol in self._ranked:
+            if k is not None and len(result) >= k:
+                break
+            if min_rate_diff is not None and -neg_rate <= min_rate_diff:
+                break   # 后面的费率差只会更小
+
+            view = self._view(symbol, self._entries[symbol], now)
+            if max_okx_countdown is not None and not self._below(view['okx_countdown'], max_okx_countdown):
+                continue
+            if max_binance_countdown is not None and not self._below(view['binance_countdown'], max_binance_countdown):
+                continue
+            if predicate is not None and not predicate(view):
+                continue
+            result.append(view)
+        return result
+
+    @staticmethod
+    def _below(countdown: Optional[float], limit: float) -> bool:
+        return countdown is not None and countdown < limit
+
+    @staticmethod
+    def _view(symbol: str, entry: tuple, now: float) -> Dict[str, Any]:
+        rate_diff, okx_cd, binance_cd, received = entry
+        elapsed = now - received
+        return {
+            'symbol': symbol,
+            'rate_diff': rate_diff,
+            'okx_countdown': round(okx_cd - elapsed, 3) if okx_cd is not None else None,
+            'binance_countdown': round(binance_cd - elapsed, 3) if binance_cd is not None else None,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'symbols': len(self._ranked),
+            'updates': self.update_count,
+            'top': self.top_k(3),
+        }
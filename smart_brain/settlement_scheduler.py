@@ -0,0 +1,189 @@
+"""
+结算时间调度器 - 全自动工人共用的精确定时
+
+替代各工人自己 datetime.now() 算目标时间再 asyncio.sleep 一大段的做法：
+1. 目标时间用交易所服务器时间表示（本地时间 + 下单工人校准的时间偏移）
+2. 长等待分段睡：先睡到目标前 FINE_WINDOW_SECONDS，再按单调时钟睡完最后一段，
+   中途时间校准、系统时间跳变都不会把触发点带偏
+3. 每次触发记录调度误差（实际触发时刻 - 目标时刻，毫秒），可在 /api/brain/status 查看
+
+使用方式：
+    scheduler = get_settlement_scheduler()
+
+    # 每小时第57分（按币安服务器时间）
+    await scheduler.sleep_until_minute(57, exchange="binance", name="侦察兵")
+
+    # 相对某个合约的结算时间（row 为 DataManager 的简化行情数据）
+    await scheduler.sleep_until_settlement(row, "okx", offset_seconds=60, which="last", name="资金费后公式")
+
+时间偏移由下单工人同步服务器时间后调用 set_time_offset() 写入。
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from latency_stats import summarize
+
+logger = logging.getLogger(__name__)
+
+# 行情数据里结算时间字符串的格式（北京时间，见 shared_data/step3_align.py）
+SETTLEMENT_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+SETTLEMENT_TZ = timezone(timedelta(hours=8))
+
+FINE_WINDOW_SECONDS = 1.0     # 目标前最后这一段按单调时钟精确睡
+JITTER_HISTORY = 200          # 保留最近多少次触发的调度误差
+
+
+class SettlementScheduler:
+    """结算时间调度器（进程内单例，见 get_settlement_scheduler）"""
+
+    def __init__(self):
+        self._offsets_ms: Dict[str, int] = {}
+        self._jitters: deque = deque(maxlen=JITTER_HISTORY)
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._seq = 0
+
+    # ========== 服务器时间 ==========
+
+    def set_time_offset(self, exchange: str, offset_ms: int):
+        """写入交易所时间偏移（服务器时间 - 本地时间，毫秒）"""
+        self._offsets_ms[exchange] = int(offset_ms)
+
+    def server_time(self, exchange: Optional[str] = None) -> float:
+        """交易所服务器当前时间（秒）；不指定交易所或未校准时为本地时间"""
+        return time.time() + self._offsets_ms.get(exchange, 0) / 1000
+
+    def next_minute_ts(self, minute: int, exchange: Optional[str] = None) -> float:
+        """下一个"每小时第 minute 分 00 秒"的时间戳（服务器时间）"""
+        now = self.server_time(exchange)
+        hour_start = now - now % 3600
+        target = hour_start + minute * 60
+        if target <= now:
+            target += 3600
+        return target
+
+    @staticmethod
+    def settlement_ts(row: Optional[Dict[str, Any]], exchange: str, which: str = "current") -> Optional[float]:
+        """
+        从行情数据取结算时间戳（秒）
+
+        参数:
+            row: 简化行情数据（DataManager.memory_store['market_data'][symbol]）
+            exchange: okx / binance
+            which: current = 本次（即将到来的）结算，last = 上次结算
+        优先解析结算时间字符串（秒级精确）；没有时用倒计时（整秒向下取整）推算本次结算
+        """
+        if not row:
+            return None
+
+        text = row.get(f"{exchange}_{which}_settlement")
+        if text:
+            try:
+                return datetime.strptime(text, SETTLEMENT_TIME_FORMAT).replace(tzinfo=SETTLEMENT_TZ).timestamp()
+            except (TypeError, ValueError):
+                pass
+
+        if which == "current":
+            countdown = row.get(f"{exchange}_countdown_seconds")
+            if countdown is not None:
+                try:
+                    return time.time() + float(countdown)
+                except (TypeError, ValueError):
+                    return None
+        return None
+
+    # ========== 等待 ==========
+
+    async def sleep_until(self, target_ts: float, exchange: Optional[str] = None, name: str = "") -> float:
+        """
+        睡到服务器时间 target_ts
+
+        返回: 调度误差（毫秒，正数 = 晚了）；目标已过去时立即返回
+        """
+        self._seq += 1
+        token = self._seq
+        self._pending[token] = {"name": name, "exchange": exchange, "target_ts": target_ts}
+        try:
+            # 粗睡：每次醒来重新按服务器时间计算剩余时间（吸收期间的时间校准）
+            while True:
+                remaining = target_ts - self.server_time(exchange)
+                if remaining <= FINE_WINDOW_SECONDS:
+                    break
+                await asyncio.sleep(remaining - FINE_WINDOW_SECONDS)
+
+            # 精睡：最后一段按单调时钟
+            if remaining > 0:
+                deadline = time.monotonic() + remaining
+                await asyncio.sleep(remaining)
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(0)
+
+            jitter_ms = (self.server_time(exchange) - target_ts) * 1000
+            self._record(name, exchange, target_ts, jitter_ms)
+            return jitter_ms
+        finally:
+            self._pending.pop(token, None)
+
+    async def sleep_until_minute(self, minute: int, exchange: Optional[str] = None, name: str = "") -> float:
+        """睡到下一个"每小时第 minute 分"（服务器时间）"""
+        target = self.next_minute_ts(minute, exchange)
+        logger.info(
+            f"⏰【结算调度器】{name or '定时'} 目标 "
+            f"{datetime.fromtimestamp(target, SETTLEMENT_TZ).strftime('%H:%M:%S')}（{exchange or '本地'}时间），"
+            f"等待 {target - self.server_time(exchange):.1f} 秒"
+        )
+        return await self.sleep_until(target, exchange, name)
+
+    async def sleep_until_settlement(self, row: Optional[Dict[str, Any]], exchange: str,
+                                     offset_seconds: float = 0, which: str = "current",
+                                     name: str = "") -> Optional[float]:
+        """
+        睡到某合约结算时间 + offset_seconds（负数 = 结算前）
+
+        返回: 调度误差（毫秒）；行情里没有结算时间时返回 None（不等待）
+        """
+        settle_ts = self.settlement_ts(row, exchange, which)
+        if settle_ts is None:
+            return None
+        return await self.sleep_until(settle_ts + offset_seconds, exchange, name)
+
+    # ========== 指标 ==========
+
+    def _record(self, name: str, exchange: Optional[str], target_ts: float, jitter_ms: float):
+        self._jitters.append({
+            "name": name,
+            "exchange": exchange,
+            "target_ts": round(target_ts, 3),
+            "jitter_ms": round(jitter_ms, 3),
+        })
+        if jitter_ms > 100:
+            logger.warning(f"⚠️【结算调度器】{name} 触发偏晚 {jitter_ms:.1f}ms")
+        else:
+            logger.debug(f"⏱️【结算调度器】{name} 触发误差 {jitter_ms:.1f}ms")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """调度误差统计（最近 JITTER_HISTORY 次触发）"""
+        records = list(self._jitters)
+        return {
+            "time_offsets_ms": dict(self._offsets_ms),
+            "fired": len(records),
+            "abs_jitter_ms": summarize(abs(r["jitter_ms"]) for r in records),
+            "pending": list(self._pending.values()),
+            "recent": records[-5:],
+        }
+
+
+# ==================== 全局单例 ====================
+_scheduler: Optional[SettlementScheduler] = None
+
+
+def get_settlement_scheduler() -> SettlementScheduler:
+    """获取全局结算时间调度器"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SettlementScheduler()
+    return _scheduler
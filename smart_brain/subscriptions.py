@@ -0,0 +1,190 @@
+"""
+数据订阅 - 变化驱动，替代工人每秒轮询 DataManager
+
+工人登记自己关心的数据（哪些合约的哪些字段、哪个交易所的私人数据），
+DataManager 每次存储新数据后通知订阅中心，只有关心的值真的变了才唤醒工人。
+
+使用方式：
+    from smart_brain.subscriptions import ANY
+
+    # 1. 等待式：监控循环里替代 asyncio.sleep(1)
+    sub = data_manager.subscribe(market_symbols=["BTCUSDT"], market_fields=["rate_diff"],
+                                 user_exchanges=ANY, name="清仓工人")
+    while ...:
+        changed = await sub.wait(timeout=5)   # 有变化立即返回 True，超时返回 False
+    sub.close()
+
+    # 2. 回调式：变化时调用 callback(sub, source, keys)，返回协程会被 create_task
+    data_manager.subscribe(user_exchanges=["okx"], callback=on_okx_change)
+
+    # 3. 一次性：重试前等一次数据更新
+    await data_manager.wait_for_change(user_exchanges=ANY, timeout=1)
+
+来源：
+- market：公开市场数据，key 为合约名（BTCUSDT），字段为 _create_simplified_market_data 的字段
+- user：私人用户数据，key 为交易所（okx / binance），字段为用户数据里的中文字段
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SOURCE_MARKET = 'market'
+SOURCE_USER = 'user'
+
+ANY = '*'       # 关心该来源的所有 key
+
+
+class DataSubscription:
+    """一个订阅：关心的 key / 字段 + 唤醒方式（等待 或 回调）"""
+
+    def __init__(self, hub: "SubscriptionHub", sub_id: int, name: str,
+                 market_symbols=None, market_fields=None,
+                 user_exchanges=None, user_fields=None,
+                 callback: Optional[Callable] = None):
+        self._hub = hub
+        self.sub_id = sub_id
+        self.name = name or f"sub-{sub_id}"
+        self.callback = callback
+
+        # {来源: key集合 或 ANY}，None 表示不关心该来源
+        self.keys = {
+            SOURCE_MARKET: self._normalize_keys(market_symbols),
+            SOURCE_USER: self._normalize_keys(user_exchanges),
+        }
+        self.fields = {
+            SOURCE_MARKET: tuple(market_fields) if market_fields else None,
+            SOURCE_USER: tuple(user_fields) if user_fields else None,
+        }
+
+        # 每个 (来源, key) 上次看到的值（字段投影），用来判断是否真的变了
+        self._last: Dict[tuple, Any] = {}
+        self._event = asyncio.Event()
+        self.notify_count = 0
+        self.closed = False
+
+    @staticmethod
+    def _normalize_keys(keys):
+        if keys is None or keys == ANY:
+            return keys
+        if isinstance(keys, str):
+            return {keys}
+        return set(keys)
+
+    # ========== 对外接口 ==========
+
+    def set_market_symbols(self, symbols):
+        """更换关心的合约（例如持仓合约变了）"""
+        self.keys[SOURCE_MARKET] = self._normalize_keys(symbols)
+        self._last = {k: v for k, v in self._last.items() if k[0] != SOURCE_MARKET}
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待下一次变化
+
+        返回: True = 有变化，False = 超时（或已关闭）
+        上次 wait 之后发生的变化不会丢失（立即返回 True）
+        """
+        if self.closed:
+            return False
+        try:
+            if timeout is None:
+                await self._event.wait()
+            else:
+                await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._event.clear()
+        return not self.closed
+
+    def close(self):
+        """取消订阅"""
+        self.closed = True
+        self._hub.remove(self)
+        self._event.set()
+
+    # ========== 订阅中心调用 ==========
+
+    def _project(self, source: str, value: Any) -> Any:
+        fields = self.fields[source]
+        if fields is None or not isinstance(value, dict):
+            return value
+        return tuple(value.get(f) for f in fields)
+
+    def _offer(self, source: str, items: Dict[str, Any]) -> list:
+        """检查一批新值，返回真正变化了的 key"""
+        wanted = self.keys[source]
+        if wanted is None:
+            return []
+
+        keys = items.keys() if wanted == ANY else [k for k in wanted if k in items]
+        changed = []
+        for key in keys:
+            projected = self._project(source, items[key])
+            slot = (source, key)
+            if slot in self._last and self._last[slot] == projected:
+                continue
+            self._last[slot] = projected
+            changed.append(key)
+        return changed
+
+    def _fire(self, source: str, keys: list):
+        self.notify_count += 1
+        self._event.set()
+        if self.callback is None:
+            return
+        try:
+            result = self.callback(self, source, keys)
+            if asyncio.iscoroutine(result):
+                asyncio.create_task(result)
+        except Exception as e:
+            logger.error(f"❌【数据订阅】{self.name} 回调异常: {e}")
+
+
+class SubscriptionHub:
+    """订阅中心（DataManager 持有一个）"""
+
+    def __init__(self):
+        self._subs: Dict[int, DataSubscription] = {}
+        self._next_id = 0
+        self.publish_count = 0
+        self.wakeup_count = 0
+
+    def add(self, **kwargs) -> DataSubscription:
+        self._next_id += 1
+        sub = DataSubscription(self, self._next_id, **kwargs)
+        self._subs[sub.sub_id] = sub
+        logger.debug(f"📌【数据订阅】{sub.name} 已登记")
+        return sub
+
+    def remove(self, sub: DataSubscription):
+        if self._subs.pop(sub.sub_id, None) is not None:
+            logger.debug(f"📌【数据订阅】{sub.name} 已取消")
+
+    def publish(self, source: str, items: Dict[str, Any]):
+        """
+        发布一批新值（DataManager 存储完成后调用）
+
+        参数:
+            source: SOURCE_MARKET / SOURCE_USER
+            items: {key: 新值}（只传本次更新的 key）
+        """
+        if not self._subs or not items:
+            return
+        self.publish_count += 1
+        for sub in list(self._subs.values()):
+            changed = sub._offer(source, items)
+            if changed:
+                self.wakeup_count += 1
+                sub._fire(source, changed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "subscriptions": len(self._subs),
+            "names": [sub.name for sub in self._subs.values()],
+            "publishes": self.publish_count,
+            "wakeups": self.wakeup_count,
+        }
+
@@ -20,18 +20,35 @@
 4. 费率差缩小：rate_diff ≤ 0.3
 5/6. 资金费后公式：60秒倒计时结束后，综合盈亏 ≥ 0.5 或 ≤ -0.2
 7. 本小时不结算：结算时间更新后检测到倒计时 > 3610，安排第55分钟强制平仓（最后闸门）
+
+数据驱动：
+通过 DataManager.subscribe() 订阅私人数据和持仓合约的行情，数据变化时立即检测，
+不再固定每秒轮询；超过 MAX_IDLE_SECONDS 没有变化也会检测一次（兜底时间类条件）。
+
+定时：
+60秒倒计时从持仓合约的上次结算时间起算，第55分钟强制平仓按币安服务器时间，
+都由结算调度器（settlement_scheduler）精确唤醒。
 """
 
 import asyncio
 import logging
-import copy
-from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
-from ..templates import CLOSE_POSITION_OKX, CLOSE_POSITION_BINANCE
+from ..templates import CLOSE_POSITION_OKX_SPEC, CLOSE_POSITION_BINANCE_SPEC, clone_order
+from ...subscriptions import ANY
+from ...settlement_scheduler import get_settlement_scheduler
 
 logger = logging.getLogger(__name__)
 
+# 没有数据变化时，最长多久强制检测一次（秒）
+MAX_IDLE_SECONDS = 5
+
+# 资金费结算后多少秒开始公式检测
+FUNDING_DELAY_SECONDS = 60
+
+# 本小时不结算时，第几分钟强制平仓（让位给第57分钟的侦察兵）
+DELAYED_CLOSE_MINUTE = 55
+
 
 class FullAutoCloser:
     def __init__(self, brain):
@@ -72,6 +89,9 @@ class FullAutoCloser:
         # 防重入标志
         self._is_closing = False
         
+        # 数据订阅（监控循环运行期间有效）
+        self.data_sub = None
+        
         logger.info("🔚【全自动清仓工人】初始化完成")
     
     # ==================== 标签控制 ====================
@@ -137,6 +157,9 @@ class FullAutoCloser:
         """持续监控循环"""
         logger.info("🔄【全自动清仓工人】监控循环启动")
         
+        # 先只订阅私人数据，有持仓后再加上持仓合约的行情
+        self.data_sub = self.data_manager.subscribe(user_exchanges=ANY, name="全自动清仓工人")
+        
         while self.is_active:
             try:
                 # ========== 准备阶段：步骤1-3（执行一次，直到成功创建副本） ==========
@@ -149,7 +172,7 @@ class FullAutoCloser:
                     # 步骤2：读取数据
                     market_data, user_data = await self._fetch_data()
                     if market_data is None or user_data is None:
-                        await asyncio.sleep(1)
+                        await self._wait_for_data()
                         continue
                     
                     # 步骤3：填充平仓参数，创建副本
@@ -158,7 +181,7 @@ class FullAutoCloser:
                         logger.info("📦【全自动清仓工人】准备阶段完成，副本已创建，进入监控阶段")
                         break
                     
-                    await asyncio.sleep(1)
+                    await self._wait_for_data()
                 
                 if not self.is_active:
                     break
@@ -168,11 +191,14 @@ class FullAutoCloser:
                 # 重置防重复状态
                 self._reset_trigger_state()
                 
+                # 开始关心持仓合约的行情
+                self.data_sub.set_market_symbols([self.current_symbol] if self.current_symbol else None)
+                
                 while self.is_active:
                     # 更新数据
                     market_data, user_data = await self._fetch_data()
                     if market_data is None or user_data is None:
-                        await asyncio.sleep(1)
+                        await self._wait_for_data()
                         continue
                     
                     # 步骤4：缓存资金费结算时间，检测变化
@@ -184,10 +210,11 @@ class FullAutoCloser:
                     if triggered:
                         # 触发清仓，退出监控阶段，回到外层重新从准备阶段开始
                         logger.info("🔄【全自动清仓工人】清仓已触发，返回准备阶段")
+                        self.data_sub.set_market_symbols(None)
                         await asyncio.sleep(10)
                         break
                     
-                    await asyncio.sleep(1)
+                    await self._wait_for_data()
                 
             except asyncio.CancelledError:
                 logger.info("🛑【全自动清仓工人】监控循环被取消")
@@ -198,8 +225,14 @@ class FullAutoCloser:
                 logger.error(traceback.format_exc())
                 await asyncio.sleep(1)
         
+        self.data_sub.close()
+        self.data_sub = None
         logger.info("🛑【全自动清仓工人】监控循环结束")
     
+    async def _wait_for_data(self):
+        """等待关心的数据变化（最多 MAX_IDLE_SECONDS 秒）"""
+        await self.data_sub.wait(timeout=MAX_IDLE_SECONDS)
+    
     def _reset_trigger_state(self):
         """重置防重复触发状态"""
         self.last_orphan_type = None
@@ -212,8 +245,8 @@ class FullAutoCloser:
     
     def _init_close_cache(self):
         """拷贝平仓模板到缓存"""
-        self.okx_close_cache = copy.deepcopy(CLOSE_POSITION_OKX)
-        self.binance_close_cache = copy.deepcopy(CLOSE_POSITION_BINANCE)
+        self.okx_close_cache = CLOSE_POSITION_OKX_SPEC.new()
+        self.binance_close_cache = CLOSE_POSITION_BINANCE_SPEC.new()
     
     # ==================== 步骤2：读取数据 ====================
     
@@ -278,7 +311,7 @@ class FullAutoCloser:
             self.okx_close_cache['params']['posSide'] = okx_position_side
             
             # 创建副本
-            self.okx_close_copy = copy.deepcopy(self.okx_close_cache)
+            self.okx_close_copy = clone_order(self.okx_close_cache)
             logger.debug(f"📝【全自动清仓工人】欧易平仓参数已填充: {okx_inst_id}")
         else:
             self.okx_close_copy = None
@@ -312,7 +345,7 @@ class FullAutoCloser:
                 self.binance_close_cache['params']['side'] = 'BUY'
             
             # 创建副本
-            self.binance_close_copy = copy.deepcopy(self.binance_close_cache)
+            self.binance_close_copy = clone_order(self.binance_close_cache)
             logger.debug(f"📝【全自动清仓工人】币安平仓参数已填充: {binance_symbol}")
         else:
             self.binance_close_copy = None
@@ -359,23 +392,42 @@ class FullAutoCloser:
         # 任意一个变了，执行后续逻辑
         if settle_changed:
             self.last_formula_triggered = False
-            self._start_funding_delay_timer()
+            self._start_funding_delay_timer(market_data)
             
             # 新增：检测本小时是否结算
             if market_data is not None:
                 self._check_countdown_for_delayed_settle(market_data)
     
-    def _start_funding_delay_timer(self):
+    def _start_funding_delay_timer(self, market_data: Dict = None):
         """启动60秒倒计时任务"""
         self._cancel_funding_timer()
         self.funding_check_active = False
-        self.funding_timer_task = asyncio.create_task(self._funding_delay_timer())
+        row = market_data.get(self.current_symbol) if market_data and self.current_symbol else None
+        self.funding_timer_task = asyncio.create_task(self._funding_delay_timer(row))
         logger.info("⏰【全自动清仓工人】启动60秒倒计时，结束后开始公式检测")
     
-    async def _funding_delay_timer(self):
-        """60秒倒计时，结束后开启公式检测"""
+    async def _funding_delay_timer(self, row: Dict = None):
+        """
+        60秒倒计时，结束后开启公式检测
+        
+        以持仓合约实际的上次结算时间为起点（两个交易所取较晚的），按交易所服务器时间精确计时；
+        行情里没有结算时间、或结算时间已过去超过60秒（数据还没更新）时，从现在起算60秒
+        """
         try:
-            await asyncio.sleep(60)
+            scheduler = get_settlement_scheduler()
+            settled = [
+                (ts, exchange) for exchange in ("okx", "binance")
+                for ts in [scheduler.settlement_ts(row, exchange, which="last")] if ts
+            ]
+            if settled:
+                settle_ts, exchange = max(settled)
+                target = settle_ts + FUNDING_DELAY_SECONDS
+                if target > scheduler.server_time(exchange):
+                    await scheduler.sleep_until(target, exchange, name="资金费后公式检测")
+                else:
+                    settled = []
+            if not settled:
+                await asyncio.sleep(FUNDING_DELAY_SECONDS)
             if self.is_active:
                 self.funding_check_active = True
                 logger.info("✅【全自动清仓工人】60秒倒计时结束，开始公式检测")
@@ -428,20 +480,11 @@ class FullAutoCloser:
     async def _delayed_close_worker(self):
         """等待到本小时第55分钟，然后执行平仓"""
         try:
-            now = datetime.now()
-            
-            # 计算本小时第55分钟的时间
-            target_time = now.replace(minute=55, second=0, microsecond=0)
-            
-            # 如果当前时间已经过了第55分钟，取下一个小时
-            if now >= target_time:
-                target_time = target_time + timedelta(hours=1)
-            
-            wait_seconds = (target_time - now).total_seconds()
-            
-            logger.info(f"⏰【全自动清仓工人】安排延迟平仓: 目标时间={target_time.strftime('%Y-%m-%d %H:%M:%S')}, 等待 {wait_seconds:.0f} 秒")
-            
-            await asyncio.sleep(wait_seconds)
+            # 按币安服务器时间精确睡到第55分钟（已过第55分钟则取下一个小时）
+            logger.info("⏰【全自动清仓工人】安排延迟平仓（第55分钟）")
+            await get_settlement_scheduler().sleep_until_minute(
+                DELAYED_CLOSE_MINUTE, exchange="binance", name="全自动清仓第55分钟"
+            )
             
             if not self.is_active:
                 logger.info("🛑【全自动清仓工人】已停用，取消延迟平仓")
@@ -8,6 +8,7 @@
 3. 读取行情数据和私人数据（最多重试2次，共3次机会）
 4. 检测开仓条件，选出交易标的
 5. 生成开仓指令，发给大脑
+   （读取数据后先让下单工人预热凭证和签名密钥，开仓腿到达下单工人时只剩签名、并发发射）
 6. 收到标签 {"info": "结束全自动"} → 立刻重置所有状态，取消正在执行的任务
 
 重试规则：
@@ -27,12 +28,19 @@
 
 import asyncio
 import logging
-import copy
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Optional, Tuple
+
+from ...settlement_scheduler import get_settlement_scheduler
+from ..templates import OrderSpec, clone_order
 
 logger = logging.getLogger(__name__)
 
+# 每小时第几分钟执行侦察
+SCOUT_MINUTE = 57
+
+# 选标的时最多列出前几名候选（日志用）
+SELECT_LOG_TOP = 5
+
 
 class Scout:
     def __init__(self, brain):
@@ -45,7 +53,7 @@ class Scout:
         self.current_task = None        # 当前执行的侦察任务
         
         # 开仓指令模板
-        self.order_template = {
+        self.order_template = OrderSpec({
             "command": "place_order",
             "params": {
                 "position_mode": "cross",
@@ -55,7 +63,7 @@ class Scout:
                 "leverage": 20,
                 "direction": None
             }
-        }
+        })
         
         # 缓存
         self.cached_template = None
@@ -116,16 +124,11 @@ class Scout:
             self.scout_task = None
     
     async def _scout_loop(self):
-        """定时侦察循环 - 每小时第57分钟执行"""
+        """定时侦察循环 - 每小时第57分钟执行（按币安服务器时间，由结算调度器精确唤醒）"""
+        scheduler = get_settlement_scheduler()
         while self.is_active:
             try:
-                now = datetime.now()
-                next_run = self._calculate_next_run(now)
-                wait_seconds = (next_run - now).total_seconds()
-                
-                logger.info(f"⏰【全自动侦察兵】下次执行时间: {next_run.strftime('%Y-%m-%d %H:%M:%S')}，等待 {wait_seconds:.0f} 秒")
-                
-                await asyncio.sleep(wait_seconds)
+                await scheduler.sleep_until_minute(SCOUT_MINUTE, exchange="binance", name="全自动侦察兵")
                 
                 if not self.is_active:
                     break
@@ -145,16 +148,6 @@ class Scout:
                 logger.error(f"❌【全自动侦察兵】侦察循环异常: {e}")
                 await asyncio.sleep(60)
     
-    def _calculate_next_run(self, now: datetime) -> datetime:
-        """计算下一个第57分钟的时间，正确处理跨小时和跨天"""
-        current_hour_57 = now.replace(minute=57, second=0, microsecond=0)
-        
-        if now < current_hour_57:
-            return current_hour_57
-        else:
-            next_hour = now + timedelta(hours=1)
-            return next_hour.replace(minute=57, second=0, microsecond=0)
-    
     # ==================== 重试控制 ====================
     
     async def _execute_with_retry(self):
@@ -209,7 +202,7 @@ class Scout:
         """
         try:
             # 拷贝模板
-            self.cached_template = copy.deepcopy(self.order_template)
+            self.cached_template = self.order_template.new()
             
             # 步骤1：读取数据
             market_data, user_data = await self._fetch_both_data()
@@ -217,6 +210,9 @@ class Scout:
                 logger.warning("📭【全自动侦察兵】数据读取失败")
                 return False, True
             
+            # 步骤1.5：让下单工人提前备好凭证和签名密钥（开仓腿到达后只剩盖时间戳、签名、发射）
+            await self._prime_trader()
+            
             # 步骤2：检查持仓
             if not self._check_position(user_data):
                 logger.warning("📭【全自动侦察兵】已有持仓，禁止开新仓")
@@ -228,7 +224,7 @@ class Scout:
                 return False, False
             
             # 步骤4：筛选交易标的
-            selected_symbol = self._select_best_symbol(market_data)
+            selected_symbol = self._select_best_symbol()
             if selected_symbol is None:
                 logger.warning("📭【全自动侦察兵】无合适交易标的")
                 return False, True
@@ -342,9 +338,9 @@ class Scout:
             logger.error(f"❌【全自动侦察兵】检查资产异常: {e}")
             return False
     
-    def _select_best_symbol(self, market_data: Dict) -> Optional[str]:
+    def _select_best_symbol(self) -> Optional[str]:
         """
-        筛选最佳交易标的
+        筛选最佳交易标的（直接取 DataManager 的机会排行，不再全量扫描行情）
         
         条件（必须同时满足）：
         1. 费率差 > 0.8
@@ -353,61 +349,28 @@ class Scout:
         
         精选规则：
         - 1个合约：直接选中
-        - 多个合约：选费率差最大的
+        - 多个合约：选费率差最大的（排行第一）
         """
-        candidates: List[Dict] = []
-        
-        for symbol, data in market_data.items():
-            if not isinstance(data, dict):
-                continue
-            
-            try:
-                rate_diff = float(data.get('rate_diff') or 0)
-                okx_countdown = int(data.get('okx_countdown_seconds') or 0)
-                binance_countdown = int(data.get('binance_countdown_seconds') or 0)
-                
-                
-                # 这里的0.3，只是测试用，其实是0.8
-                
-                # 三个必须同时满足的条件
-                if rate_diff <= 0.3:
-                    logger.debug(f"⏭️【全自动侦察兵】{symbol} 费率差不足: {rate_diff} <= 0.8")
-                    continue
-                
-                if okx_countdown >= 200:
-                    logger.debug(f"⏭️【全自动侦察兵】{symbol} 欧易倒计时过长: {okx_countdown} >= 200")
-                    continue
-                
-                if binance_countdown >= 200:
-                    logger.debug(f"⏭️【全自动侦察兵】{symbol} 币安倒计时过长: {binance_countdown} >= 200")
-                    continue
-                
-                # 满足所有条件的合约
-                candidates.append({
-                    'symbol': symbol,
-                    'rate_diff': rate_diff,
-                    'okx_countdown': okx_countdown,
-                    'binance_countdown': binance_countdown
-                })
-                
-                logger.info(f"✅【全自动侦察兵】符合条件的合约: {symbol}, rate_diff={rate_diff}, 欧易倒计时={okx_countdown}秒, 币安倒计时={binance_countdown}秒")
-                
-            except Exception as e:
-                logger.debug(f"⚠️【全自动侦察兵】解析合约 {symbol} 数据异常: {e}")
-                continue
+        # 这里的0.3，只是测试用，其实是0.8
+        candidates = self.data_manager.get_top_opportunities(
+            SELECT_LOG_TOP,
+            min_rate_diff=0.3,
+            max_okx_countdown=200,
+            max_binance_countdown=200
+        )
         
         if not candidates:
             logger.warning("⚠️【全自动侦察兵】未找到同时满足三个条件的合约")
             return None
         
-        # 精选规则
+        for item in candidates:
+            logger.info(f"✅【全自动侦察兵】符合条件的合约: {item['symbol']}, rate_diff={item['rate_diff']}, 欧易倒计时={item['okx_countdown']}秒, 币安倒计时={item['binance_countdown']}秒")
+        
+        best = candidates[0]
         if len(candidates) == 1:
-            best = candidates[0]
             logger.info(f"🎯【全自动侦察兵】仅1个符合条件的合约，直接选中: {best['symbol']}")
         else:
-            # 选择费率差最大的
-            best = max(candidates, key=lambda x: x['rate_diff'])
-            logger.info(f"🎯【全自动侦察兵】共{len(candidates)}个合约符合条件，选费率差最大的: {best['symbol']} (rate_diff={best['rate_diff']})")
+            logger.info(f"🎯【全自动侦察兵】费率差前{len(candidates)}名符合条件，选费率差最大的: {best['symbol']} (rate_diff={best['rate_diff']})")
         
         return best['symbol']
     
@@ -451,6 +414,18 @@ class Scout:
             logger.error(f"❌【全自动侦察兵】计算保证金异常: {e}")
             return 10.0
     
+    # ==================== 预装 ====================
+    
+    async def _prime_trader(self):
+        """预热下单工人的凭证和签名密钥（失败不影响侦察流程）"""
+        trader = getattr(self.brain, 'trader', None)
+        if trader is None or not hasattr(trader, 'prime_credentials'):
+            return
+        try:
+            await trader.prime_credentials(("okx", "binance"))
+        except Exception as e:
+            logger.warning(f"⚠️【全自动侦察兵】预热下单工人失败: {e}")
+    
     # ==================== 发送指令 ====================
     
     async def _send_to_brain(self):
@@ -459,7 +434,7 @@ class Scout:
             logger.error("❌【全自动侦察兵】没有缓存的指令")
             return
         
-        instruction = copy.deepcopy(self.cached_template)
+        instruction = clone_order(self.cached_template)
         
         try:
             await self.brain.handle_frontend_command(instruction)
@@ -20,12 +20,12 @@
 15. 收到标签 {"info": "结束全自动"} → 立刻重置所有状态，取消正在执行的任务
 """
 
-import copy
 import asyncio
 import logging
 from typing import Dict, Any
 
-from ..templates import OCO_OKX, OCO_BINANCE
+from ..templates import OCO_OKX_SPEC, OCO_BINANCE_SPEC
+from ...subscriptions import ANY
 
 logger = logging.getLogger(__name__)
 
@@ -149,14 +149,14 @@ class FullAutoSlTpWorker:
     
     def _init_cache(self):
         """拷贝模板到缓存"""
-        self.okx_cache = copy.deepcopy(OCO_OKX)
-        self.binance_cache = copy.deepcopy(OCO_BINANCE)
+        self.okx_cache = OCO_OKX_SPEC.new()
+        self.binance_cache = OCO_BINANCE_SPEC.new()
         logger.info("📦【全自动止损止盈】模板已拷贝")
     
     # ==================== 读取数据 ====================
     
     async def _load_private_data(self) -> bool:
-        """读取私人数据，失败重试1次"""
+        """读取私人数据，不完整时等数据更新后重试1次"""
         max_attempts = 2
         
         for attempt in range(max_attempts):
@@ -178,14 +178,16 @@ class FullAutoSlTpWorker:
                 if not self.okx_symbol or self.okx_open_price <= 0 or not self.okx_position_side:
                     logger.warning(f"⚠️【全自动止损止盈】欧易私人数据不完整")
                     if attempt < max_attempts - 1:
-                        await asyncio.sleep(1)
+                        # 等私人数据更新（最多1秒）再重试
+                        await self.data_manager.wait_for_change(timeout=1, user_exchanges=ANY)
                         continue
                     return False
                 
                 if not self.binance_symbol or self.binance_open_price <= 0 or not self.binance_position_side:
                     logger.warning(f"⚠️【全自动止损止盈】币安私人数据不完整")
                     if attempt < max_attempts - 1:
-                        await asyncio.sleep(1)
+                        # 等私人数据更新（最多1秒）再重试
+                        await self.data_manager.wait_for_change(timeout=1, user_exchanges=ANY)
                         continue
                     return False
                 
@@ -209,22 +211,19 @@ class FullAutoSlTpWorker:
         
         for attempt in range(max_attempts):
             try:
-                result = await self.data_manager.get_okx_contracts_data()
-                contracts = result.get("data", [])
-                
-                for contract in contracts:
-                    if contract.get("instId") == okx_inst_id:
-                        self.okx_tick_sz = float(contract.get("tickSz", 0))
-                        
-                        if self.okx_tick_sz <= 0:
-                            logger.warning(f"⚠️【全自动止损止盈】欧易tickSz无效: {self.okx_tick_sz}")
-                            if attempt < max_attempts - 1:
-                                await asyncio.sleep(1)
-                                continue
-                            return False
-                        
-                        logger.info(f"✅【全自动止损止盈】欧易tickSz={self.okx_tick_sz}")
-                        return True
+                contract = self.data_manager.get_okx_contract(okx_inst_id)
+                if contract:
+                    self.okx_tick_sz = float(contract.get("tickSz", 0))
+                    
+                    if self.okx_tick_sz <= 0:
+                        logger.warning(f"⚠️【全自动止损止盈】欧易tickSz无效: {self.okx_tick_sz}")
+                        if attempt < max_attempts - 1:
+                            await asyncio.sleep(1)
+                            continue
+                        return False
+                    
+                    logger.info(f"✅【全自动止损止盈】欧易tickSz={self.okx_tick_sz}")
+                    return True
                 
                 logger.warning(f"⚠️【全自动止损止盈】未找到欧易合约 {okx_inst_id} 的面值数据")
                 if attempt < max_attempts - 1:
@@ -245,22 +244,19 @@ class FullAutoSlTpWorker:
         
         for attempt in range(max_attempts):
             try:
-                result = await self.data_manager.get_binance_contracts_data()
-                contracts = result.get("data", [])
-                
-                for contract in contracts:
-                    if contract.get("symbol") == self.binance_symbol:
-                        self.binance_tick_size = float(contract.get("tickSize", 0))
-                        
-                        if self.binance_tick_size <= 0:
-                            logger.warning(f"⚠️【全自动止损止盈】币安tickSize无效: {self.binance_tick_size}")
-                            if attempt < max_attempts - 1:
-                                await asyncio.sleep(1)
-                                continue
-                            return False
-                        
-                        logger.info(f"✅【全自动止损止盈】币安tickSize={self.binance_tick_size}")
-                        return True
+                contract = self.data_manager.get_binance_contract(self.binance_symbol)
+                if contract:
+                    self.binance_tick_size = float(contract.get("tickSize", 0))
+                    
+                    if self.binance_tick_size <= 0:
+                        logger.warning(f"⚠️【全自动止损止盈】币安tickSize无效: {self.binance_tick_size}")
+                        if attempt < max_attempts - 1:
+                            await asyncio.sleep(1)
+                            continue
+                        return False
+                    
+                    logger.info(f"✅【全自动止损止盈】币安tickSize={self.binance_tick_size}")
+                    return True
                 
                 logger.warning(f"⚠️【全自动止损止盈】未找到币安合约 {self.binance_symbol} 的精度数据")
                 if attempt < max_attempts - 1:
@@ -12,12 +12,12 @@
 7. 清空所有缓存
 """
 
-import copy
 import asyncio
 import logging
 from typing import Dict, Any
 
-from ..templates import CLOSE_POSITION_OKX, CLOSE_POSITION_BINANCE
+from ..templates import CLOSE_POSITION_OKX_SPEC, CLOSE_POSITION_BINANCE_SPEC
+from ...subscriptions import ANY
 
 logger = logging.getLogger(__name__)
 
@@ -130,8 +130,8 @@ class ClosePositionWorker:
     
     def _init_cache(self):
         """拷贝模板到缓存"""
-        self.okx_cache = copy.deepcopy(CLOSE_POSITION_OKX)
-        self.binance_cache = copy.deepcopy(CLOSE_POSITION_BINANCE)
+        self.okx_cache = CLOSE_POSITION_OKX_SPEC.new()
+        self.binance_cache = CLOSE_POSITION_BINANCE_SPEC.new()
         logger.info("📦【平仓工人】模板已拷贝")
     
     def _fill_symbols(self):
@@ -145,10 +145,13 @@ class ClosePositionWorker:
         logger.info(f"📝【平仓工人】合约名已填充: 欧易={self.okx_symbol}, 币安={self.binance_symbol}")
     
     async def _load_private_data(self) -> bool:
-        """读取私人数据，重试1次"""
+        """读取私人数据，不完整时等数据更新后重试1次"""
         max_attempts = 2
         
         for attempt in range(max_attempts):
+            if attempt > 0:
+                # 上一次数据不完整：等私人数据更新（最多1秒）再重试，不重读同一份数据
+                await self.data_manager.wait_for_change(timeout=1, user_exchanges=ANY)
             try:
                 result = await self.data_manager.get_private_user_data()
                 user_data = result.get("data", {})
@@ -181,8 +184,6 @@ class ClosePositionWorker:
                 
             except Exception as e:
                 logger.error(f"❌【平仓工人】读取私人数据失败 (尝试 {attempt+1}/{max_attempts}): {e}")
-                if attempt < max_attempts - 1:
-                    await asyncio.sleep(1)
         
         return False
     
@@ -12,12 +12,11 @@
 7. 清空缓存
 """
 
-import copy
 import asyncio
 import logging
 from typing import Dict, Any
 
-from ..templates import SET_LEVERAGE_OKX, SET_LEVERAGE_BINANCE
+from ..templates import SET_LEVERAGE_OKX_SPEC, SET_LEVERAGE_BINANCE_SPEC
 
 logger = logging.getLogger(__name__)
 
@@ -53,8 +52,8 @@ class LeverageWorker:
         logger.info("🔧【杠杆工人】开始执行")
         
         # 1. 拷贝模板
-        self.okx_cache = copy.deepcopy(SET_LEVERAGE_OKX)
-        self.binance_cache = copy.deepcopy(SET_LEVERAGE_BINANCE)
+        self.okx_cache = SET_LEVERAGE_OKX_SPEC.new()
+        self.binance_cache = SET_LEVERAGE_BINANCE_SPEC.new()
         logger.info("📦【杠杆工人】模板已拷贝")
         
         # 2. 检查持仓
@@ -15,13 +15,12 @@
 6. 60秒超时未收到全部条件 → 自动清空缓存，结束流程
 """
 
-import copy
 import asyncio
 import logging
 import math
 from typing import Dict, Any
 
-from ..templates import OPEN_MARKET_OKX, OPEN_MARKET_BINANCE
+from ..templates import OPEN_MARKET_OKX_SPEC, OPEN_MARKET_BINANCE_SPEC
 
 logger = logging.getLogger(__name__)
 
@@ -125,8 +124,8 @@ class OpenPositionWorker:
             logger.info("🔧【开仓工人】开始执行")
             
             # 1. 拷贝模板
-            self.okx_cache = copy.deepcopy(OPEN_MARKET_OKX)
-            self.binance_cache = copy.deepcopy(OPEN_MARKET_BINANCE)
+            self.okx_cache = OPEN_MARKET_OKX_SPEC.new()
+            self.binance_cache = OPEN_MARKET_BINANCE_SPEC.new()
             logger.info("📦【开仓工人】模板已拷贝")
             
             # 2. 读取行情数据
@@ -208,21 +207,18 @@ class OpenPositionWorker:
                 symbol = self.pending_params.get('symbol', '')
                 okx_symbol = self._convert_okx_symbol(symbol)
                 
-                result = await self.data_manager.get_okx_contracts_data()
-                contracts = result.get('data', [])
-                
-                for contract in contracts:
-                    if contract.get('instId') == okx_symbol:
-                        self.ctVal = float(contract.get('ctVal', 0))
-                        self.lotSz = float(contract.get('lotSz', 0))
-                        self.minSz = float(contract.get('minSz', 0))
-                        
-                        if self.ctVal <= 0 or self.lotSz <= 0 or self.minSz <= 0:
-                            logger.warning(f"⚠️【开仓工人】欧易面值异常: ctVal={self.ctVal}, lotSz={self.lotSz}, minSz={self.minSz}")
-                            continue
-                        
-                        logger.info(f"✅【开仓工人】欧易面值: ctVal={self.ctVal}, lotSz={self.lotSz}, minSz={self.minSz}")
-                        return True
+                contract = self.data_manager.get_okx_contract(okx_symbol)
+                if contract:
+                    self.ctVal = float(contract.get('ctVal', 0))
+                    self.lotSz = float(contract.get('lotSz', 0))
+                    self.minSz = float(contract.get('minSz', 0))
+                    
+                    if self.ctVal <= 0 or self.lotSz <= 0 or self.minSz <= 0:
+                        logger.warning(f"⚠️【开仓工人】欧易面值异常: ctVal={self.ctVal}, lotSz={self.lotSz}, minSz={self.minSz}")
+                        continue
+                    
+                    logger.info(f"✅【开仓工人】欧易面值: ctVal={self.ctVal}, lotSz={self.lotSz}, minSz={self.minSz}")
+                    return True
                 
                 logger.warning(f"⚠️【开仓工人】未找到欧易合约 {okx_symbol} 的面值数据")
                 
@@ -240,20 +236,17 @@ class OpenPositionWorker:
             try:
                 symbol = self.pending_params.get('symbol', '')
                 
-                result = await self.data_manager.get_binance_contracts_data()
-                contracts = result.get('data', [])
-                
-                for contract in contracts:
-                    if contract.get('symbol') == symbol:
-                        self.stepSize = float(contract.get('stepSize', 0))
-                        self.minQty = float(contract.get('minQty', 0))
-                        
-                        if self.stepSize <= 0 or self.minQty <= 0:
-                            logger.warning(f"⚠️【开仓工人】币安精度异常: stepSize={self.stepSize}, minQty={self.minQty}")
-                            continue
-                        
-                        logger.info(f"✅【开仓工人】币安精度: stepSize={self.stepSize}, minQty={self.minQty}")
-                        return True
+                contract = self.data_manager.get_binance_contract(symbol)
+                if contract:
+                    self.stepSize = float(contract.get('stepSize', 0))
+                    self.minQty = float(contract.get('minQty', 0))
+                    
+                    if self.stepSize <= 0 or self.minQty <= 0:
+                        logger.warning(f"⚠️【开仓工人】币安精度异常: stepSize={self.stepSize}, minQty={self.minQty}")
+                        continue
+                    
+                    logger.info(f"✅【开仓工人】币安精度: stepSize={self.stepSize}, minQty={self.minQty}")
+                    return True
                 
                 logger.warning(f"⚠️【开仓工人】未找到币安合约 {symbol} 的精度数据")
                 
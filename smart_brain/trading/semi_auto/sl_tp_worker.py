@@ -16,13 +16,13 @@
 11. 清空所有缓存
 """
 
-import copy
 import asyncio
 import logging
 import math
 from typing import Dict, Any
 
-from ..templates import OCO_OKX, OCO_BINANCE
+from ..templates import OCO_OKX_SPEC, OCO_BINANCE_SPEC
+from ...subscriptions import ANY
 
 logger = logging.getLogger(__name__)
 
@@ -170,8 +170,8 @@ class SlTpWorker:
     
     def _init_cache(self):
         """拷贝模板到缓存"""
-        self.okx_cache = copy.deepcopy(OCO_OKX)
-        self.binance_cache = copy.deepcopy(OCO_BINANCE)
+        self.okx_cache = OCO_OKX_SPEC.new()
+        self.binance_cache = OCO_BINANCE_SPEC.new()
         logger.info("📦【止损止盈工人】模板已拷贝")
     
     def _fill_symbols(self):
@@ -186,10 +186,13 @@ class SlTpWorker:
         logger.info(f"📝【止损止盈工人】合约名已填充: 欧易={self.okx_symbol}, 币安={self.binance_symbol}")
     
     async def _load_private_data(self) -> bool:
-        """读取私人数据，重试1次"""
+        """读取私人数据，不完整时等数据更新后重试1次"""
         max_attempts = 2
         
         for attempt in range(max_attempts):
+            if attempt > 0:
+                # 上一次数据不完整：等私人数据更新（最多1秒）再重试，不重读同一份数据
+                await self.data_manager.wait_for_change(timeout=1, user_exchanges=ANY)
             try:
                 result = await self.data_manager.get_private_user_data()
                 user_data = result.get("data", {})
@@ -228,8 +231,6 @@ class SlTpWorker:
                 
             except Exception as e:
                 logger.error(f"❌【止损止盈工人】读取私人数据失败 (尝试 {attempt+1}/{max_attempts}): {e}")
-                if attempt < max_attempts - 1:
-                    await asyncio.sleep(1)
         
         return False
     
@@ -239,19 +240,16 @@ class SlTpWorker:
         
         for attempt in range(max_attempts):
             try:
-                result = await self.data_manager.get_okx_contracts_data()
-                contracts = result.get("data", [])
-                
-                for contract in contracts:
-                    if contract.get("instId") == self.okx_symbol:
-                        self.okx_tick_sz = float(contract.get("tickSz", 0))
-                        
-                        if self.okx_tick_sz <= 0:
-                            logger.warning(f"⚠️【止损止盈工人】欧易tickSz无效: {self.okx_tick_sz}")
-                            continue
-                        
-                        logger.info(f"✅【止损止盈工人】欧易tickSz={self.okx_tick_sz}")
-                        return True
+                contract = self.data_manager.get_okx_contract(self.okx_symbol)
+                if contract:
+                    self.okx_tick_sz = float(contract.get("tickSz", 0))
+                    
+                    if self.okx_tick_sz <= 0:
+                        logger.warning(f"⚠️【止损止盈工人】欧易tickSz无效: {self.okx_tick_sz}")
+                        continue
+                    
+                    logger.info(f"✅【止损止盈工人】欧易tickSz={self.okx_tick_sz}")
+                    return True
                 
                 logger.warning(f"⚠️【止损止盈工人】未找到欧易合约 {self.okx_symbol} 的面值数据")
                 
@@ -268,19 +266,16 @@ class SlTpWorker:
         
         for attempt in range(max_attempts):
             try:
-                result = await self.data_manager.get_binance_contracts_data()
-                contracts = result.get("data", [])
-                
-                for contract in contracts:
-                    if contract.get("symbol") == self.binance_symbol:
-                        self.binance_tick_size = float(contract.get("tickSize", 0))
-                        
-                        if self.binance_tick_size <= 0:
-                            logger.warning(f"⚠️【止损止盈工人】币安tickSize无效: {self.binance_tick_size}")
-                            continue
-                        
-                        logger.info(f"✅【止损止盈工人】币安tickSize={self.binance_tick_size}")
-                        return True
+                contract = self.data_manager.get_binance_contract(self.binance_symbol)
+                if contract:
+                    self.binance_tick_size = float(contract.get("tickSize", 0))
+                    
+                    if self.binance_tick_size <= 0:
+                        logger.warning(f"⚠️【止损止盈工人】币安tickSize无效: {self.binance_tick_size}")
+                        continue
+                    
+                    logger.info(f"✅【止损止盈工人】币安tickSize={self.binance_tick_size}")
+                    return True
                 
                 logger.warning(f"⚠️【止损止盈工人】未找到币安合约 {self.binance_symbol} 的精度数据")
                 
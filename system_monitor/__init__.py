@@ -1,9 +1,10 @@
 """
 系统状态监控模块
-按需采集系统数据，不常驻运行
+按需采集系统数据，不常驻运行（事件循环监控除外，见 loop_monitor）
 """
 from .collector import SystemMonitor
-from .api import setup_monitor_routes
+from .loop_monitor import LoopMonitor, get_loop_monitor
+from .profiler import profile, ProfilerBusy
 
 __version__ = "1.0.0"
-__all__ = ['SystemMonitor', 'setup_monitor_routes']
\ No newline at end of file
+__all__ = ['SystemMonitor', 'LoopMonitor', 'get_loop_monitor', 'profile', 'ProfilerBusy']
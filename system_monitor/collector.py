@@ -1,84 +1,221 @@
 """
 系统数据采集器
-按需采集，不保存历史数据
+后台采样线程按固定节拍刷新，接口只读缓存
+
+原来每次 /api/monitor/* 请求都现场采集：cpu_percent(interval=0.1) 要在线程池里阻塞 100ms，
+collect_all 还按核数循环阻塞、现场遍历磁盘 / 网络 / 进程。现在：
+
+1. SystemSampler 后台线程每 SAMPLE_SECONDS 秒采一次轻量指标（CPU / 内存 / 进程 / 每个线程的CPU / 事件循环 /
+   多进程模式下每个子进程的CPU和内存），
+   每 FULL_SAMPLE_SECONDS 秒采一次完整指标（磁盘 / 网络 / 进程详情）
+2. CPU 全部用 psutil 的非阻塞差值（interval=None，和上一次采样比），不再 sleep
+3. 轻量指标另存一份环形历史（HISTORY_SIZE 个点），给前端画迷你走势图
+4. SystemMonitor 的方法只读缓存，O(1) 返回，可以直接在事件循环里调用
 """
 import os
 import sys
 import time
-import asyncio  # ✅ [蚂蚁基因修复] 导入asyncio
+import logging
+import threading
 import psutil
 import platform
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from .loop_monitor import get_loop_monitor
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_SECONDS = 5            # 轻量指标采样间隔
+FULL_SAMPLE_SECONDS = 30      # 完整指标采样间隔
+HISTORY_SIZE = 120            # 环形历史点数（120 × 5 秒 = 10 分钟）
+HEALTH_LIMIT_PERCENT = 90     # CPU / 内存 / 磁盘 超过这个百分比算不健康
+
+
+class SystemSampler:
+    """后台采样线程（每个进程一个，见 get_system_sampler）"""
 
-class SystemMonitor:
-    """系统监控器 - 按需采集（异步友好版）"""
-    
     def __init__(self):
-        self.start_time = time.time()
         self.pid = os.getpid()
-        
-    # ✅ [蚂蚁基因修复] 添加异步版本的方法，供外部调用
-    async def collect_all_async(self) -> Dict[str, Any]:
-        """异步采集所有系统数据（在线程池中执行）"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.collect_all)
-    
-    async def collect_light_async(self) -> Dict[str, Any]:
-        """异步采集轻量数据（在线程池中执行）"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.collect_light)
-    
-    async def check_health_async(self) -> Dict[str, Any]:
-        """异步健康检查（在线程池中执行）"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.check_health)
-    
-    # ==================== 同步方法（内部使用，会在线程池中执行）====================
-    
-    def collect_all(self) -> Dict[str, Any]:
-        """采集所有系统数据（同步版，供内部线程池调用）"""
-        return {
-            "timestamp": datetime.now().isoformat(),
+        self.process = psutil.Process(self.pid)
+        self.start_time = time.time()
+
+        self.light: Dict[str, Any] = {}
+        self.full: Dict[str, Any] = {}
+        self.health: Dict[str, Any] = {}
+        self.history: deque = deque(maxlen=HISTORY_SIZE)
+
+        self._thread_cpu: Dict[int, float] = {}
+        self._children: Dict[int, psutil.Process] = {}     # pid → psutil.Process（cpu_percent 要同一个对象才有差值）
+        self._last_light_at: Optional[float] = None
+        self._last_full_at = 0.0
+        self._static: Dict[str, Any] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    # ========== 启停 ==========
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._start_lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+            self._thread.start()
+        logger.info(f"✅【系统监控】后台采样已启动：每{SAMPLE_SECONDS}秒轻量 / 每{FULL_SAMPLE_SECONDS}秒完整")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # 一启动先采一轮，接口马上有数据（CPU 差值要到下一轮才有意义）
+        self._static = {
             "system": self._get_system_info(),
-            "cpu": self._get_cpu_info(),
-            "memory": self._get_memory_info(),
-            "disk": self._get_disk_info(),
-            "network": self._get_network_info(),
-            "process": self._get_process_info(),
             "python": self._get_python_info(),
-            "render": self._get_render_info()
+            "render": self._get_render_info(),
         }
-    
-    def collect_light(self) -> Dict[str, Any]:
-        """采集轻量数据（同步版，供内部线程池调用）"""
-        return {
+        while True:
+            try:
+                self._sample()
+            except Exception as e:
+                logger.error(f"❌【系统监控】采样失败: {e}")
+            if self._stop.wait(SAMPLE_SECONDS):
+                break
+
+    # ========== 采样（后台线程） ==========
+
+    def _sample(self):
+        now = time.time()
+        elapsed = now - self._last_light_at if self._last_light_at else None
+        self._last_light_at = now
+
+        memory = psutil.virtual_memory()
+        light = {
             "timestamp": datetime.now().isoformat(),
-            "cpu_percent": self._get_cpu_percent_safe(0.1),
-            "memory_used_mb": self._get_memory_used_mb(),
-            "memory_percent": psutil.virtual_memory().percent,
-            "disk_percent": psutil.disk_usage('/').percent,
-            "uptime_seconds": time.time() - self.start_time,
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_used_mb": memory.used / 1024 / 1024,
+            "memory_percent": memory.percent,
+            "disk_percent": self.full.get("disk", {}).get("percent", psutil.disk_usage('/').percent),
             "process_memory_mb": self._get_process_memory_mb(),
-            "process_cpu_percent": self._get_process_cpu_percent_safe(0.1)
+            "process_cpu_percent": self._get_process_cpu_percent(),
+            "threads": self._get_thread_cpu(elapsed),
+            "child_processes": self._get_child_processes(),
+            "event_loop": get_loop_monitor().snapshot(light=True),
         }
-    
-    # ✅ [蚂蚁基因修复] 安全获取CPU百分比（带interval）
-    def _get_cpu_percent_safe(self, interval: float = 0.1) -> float:
-        """安全获取CPU百分比（会阻塞，所以在线程池中执行）"""
+
+        if now - self._last_full_at >= FULL_SAMPLE_SECONDS:
+            self._last_full_at = now
+            self.full = {
+                "timestamp": light["timestamp"],
+                **self._static,
+                "cpu": self._get_cpu_info(),
+                "memory": self._get_memory_info(),
+                "disk": self._get_disk_info(),
+                "network": self._get_network_info(),
+                "process": self._get_process_info(),
+            }
+            light["disk_percent"] = self.full["disk"].get("percent", light["disk_percent"])
+
+        # 整个字典替换，读的一方拿到的总是完整的一轮
+        self.light = light
+        self.health = self._get_health(light)
+        self.history.append({
+            "t": round(now, 1),
+            "cpu": light["cpu_percent"],
+            "mem": light["memory_percent"],
+            "proc_cpu": light["process_cpu_percent"],
+            "proc_mem_mb": round(light["process_memory_mb"], 1),
+            "children_cpu": round(sum(c["cpu_percent"] or 0 for c in light["child_processes"]), 1),
+            "loop_lag_p95_ms": (light["event_loop"].get("lag_ms") or {}).get("p95"),
+        })
+
+    def _get_process_cpu_percent(self) -> float:
+        """进程CPU（和上一次采样的差值，不阻塞）"""
         try:
-            return psutil.cpu_percent(interval=interval)
-        except:
+            return self.process.cpu_percent(interval=None)
+        except Exception:
             return 0.0
-    
-    def _get_process_cpu_percent_safe(self, interval: float = 0.1) -> float:
-        """安全获取进程CPU百分比"""
+
+    def _get_process_memory_mb(self) -> float:
         try:
-            process = psutil.Process(self.pid)
-            return process.cpu_percent(interval=interval)
-        except:
+            return self.process.memory_info().rss / 1024 / 1024
+        except Exception:
             return 0.0
-    
+
+    def _get_thread_cpu(self, elapsed: Optional[float]) -> List[Dict[str, Any]]:
+        """每个线程的CPU占用（能看出是事件循环线程还是后台线程在忙）"""
+        try:
+            names = {thread.native_id: thread.name for thread in threading.enumerate()}
+            current = {t.id: t.user_time + t.system_time for t in self.process.threads()}
+        except Exception:
+            return []
+
+        result = []
+        for tid, cpu_seconds in current.items():
+            previous = self._thread_cpu.get(tid)
+            percent = None
+            if previous is not None and elapsed:
+                percent = round((cpu_seconds - previous) / elapsed * 100, 1)
+            result.append({
+                "name": names.get(tid, f"native-{tid}"),
+                "tid": tid,
+                "cpu_percent": percent,
+                "cpu_seconds": round(cpu_seconds, 2),
+            })
+        self._thread_cpu = current
+        result.sort(key=lambda t: t["cpu_percent"] or 0, reverse=True)
+        return result
+
+    def _get_child_processes(self) -> List[Dict[str, Any]]:
+        """多进程模式下每个子进程的CPU / 内存（WS 解码和流水线都在子进程里，只看主进程看不到）"""
+        from multi_process import get_process_supervisor
+
+        pids = get_process_supervisor().child_pids()
+        children = {}
+        result = []
+        for name, pid in pids.items():
+            process = self._children.get(pid)
+            try:
+                if process is None:
+                    process = psutil.Process(pid)
+                    process.cpu_percent(interval=None)     # 第一次只记基准
+                    percent = None
+                else:
+                    percent = process.cpu_percent(interval=None)
+                with process.oneshot():
+                    memory_mb = process.memory_info().rss / 1024 / 1024
+                    num_threads = process.num_threads()
+            except Exception:
+                continue
+            children[pid] = process
+            result.append({
+                "name": name,
+                "pid": pid,
+                "cpu_percent": percent,
+                "memory_mb": round(memory_mb, 1),
+                "num_threads": num_threads,
+            })
+        self._children = children
+        return result
+
+    def _get_health(self, light: Dict[str, Any]) -> Dict[str, Any]:
+        cpu_ok = light["cpu_percent"] < HEALTH_LIMIT_PERCENT
+        mem_ok = light["memory_percent"] < HEALTH_LIMIT_PERCENT
+        disk_ok = light["disk_percent"] < HEALTH_LIMIT_PERCENT
+        return {
+            "healthy": cpu_ok and mem_ok and disk_ok,
+            "cpu_ok": cpu_ok,
+            "memory_ok": mem_ok,
+            "disk_ok": disk_ok,
+            "timestamp": light["timestamp"]
+        }
+
     def _get_system_info(self) -> Dict[str, Any]:
         """获取系统信息"""
         try:
@@ -92,48 +229,32 @@ class SystemMonitor:
                 "processor": uname.processor,
                 "boot_time": datetime.fromtimestamp(psutil.boot_time()).isoformat()
             }
-        except:
+        except Exception:
             return {"error": "无法获取系统信息"}
-    
+
     def _get_cpu_info(self) -> Dict[str, Any]:
-        """获取CPU信息"""
+        """获取CPU信息（每核占用是和上一次完整采样的差值）"""
         try:
-            # ✅ [蚂蚁基因修复] 使用安全的带interval的调用
-            cpu_percent = []
-            for _ in range(psutil.cpu_count(logical=True) or 1):
-                cpu_percent.append(self._get_cpu_percent_safe(0.1))
-            
+            cpu_percent = psutil.cpu_percent(interval=None, percpu=True)
             cpu_freq = psutil.cpu_freq()
-            cpu_count = {
-                "physical": psutil.cpu_count(logical=False),
-                "logical": psutil.cpu_count(logical=True)
-            }
-            
             return {
                 "percent_per_core": cpu_percent,
                 "percent_total": sum(cpu_percent) / len(cpu_percent) if cpu_percent else 0,
                 "frequency_mhz": cpu_freq.current if cpu_freq else None,
-                "count": cpu_count,
-                "load_average": self._get_load_average()
+                "count": {
+                    "physical": psutil.cpu_count(logical=False),
+                    "logical": psutil.cpu_count(logical=True)
+                },
+                "load_average": list(os.getloadavg()) if hasattr(os, 'getloadavg') else None
             }
-        except:
+        except Exception:
             return {"error": "无法获取CPU信息"}
-    
-    def _get_load_average(self) -> Optional[list]:
-        """获取系统负载（Unix-like系统）"""
-        try:
-            if hasattr(os, 'getloadavg'):
-                return list(os.getloadavg())
-        except:
-            pass
-        return None
-    
+
     def _get_memory_info(self) -> Dict[str, Any]:
         """获取内存信息"""
         try:
             mem = psutil.virtual_memory()
             swap = psutil.swap_memory()
-            
             return {
                 "total_mb": mem.total / 1024 / 1024,
                 "available_mb": mem.available / 1024 / 1024,
@@ -143,30 +264,14 @@ class SystemMonitor:
                 "swap_used_mb": swap.used / 1024 / 1024,
                 "swap_percent": swap.percent
             }
-        except:
+        except Exception:
             return {"error": "无法获取内存信息"}
-    
-    def _get_memory_used_mb(self) -> float:
-        """获取已用内存（MB）"""
-        try:
-            return psutil.virtual_memory().used / 1024 / 1024
-        except:
-            return 0.0
-    
-    def _get_process_memory_mb(self) -> float:
-        """获取当前进程内存使用（MB）"""
-        try:
-            process = psutil.Process(self.pid)
-            return process.memory_info().rss / 1024 / 1024
-        except:
-            return 0.0
-    
+
     def _get_disk_info(self) -> Dict[str, Any]:
         """获取磁盘信息"""
         try:
             disk = psutil.disk_usage('/')
             io_counters = psutil.disk_io_counters()
-            
             return {
                 "total_gb": disk.total / 1024 / 1024 / 1024,
                 "used_gb": disk.used / 1024 / 1024 / 1024,
@@ -175,20 +280,17 @@ class SystemMonitor:
                 "read_bytes": io_counters.read_bytes if io_counters else 0,
                 "write_bytes": io_counters.write_bytes if io_counters else 0
             }
-        except:
+        except Exception:
             return {"error": "无法获取磁盘信息"}
-    
+
     def _get_network_info(self) -> Dict[str, Any]:
         """获取网络信息"""
         try:
             net_io = psutil.net_io_counters()
-            
-            # ✅ [蚂蚁基因修复] 将可能慢的net_connections调用放在try中，出错时返回0
             try:
                 net_connections = len(psutil.net_connections())
-            except:
+            except Exception:
                 net_connections = 0
-            
             return {
                 "bytes_sent": net_io.bytes_sent,
                 "bytes_recv": net_io.bytes_recv,
@@ -196,29 +298,27 @@ class SystemMonitor:
                 "packets_recv": net_io.packets_recv,
                 "active_connections": net_connections
             }
-        except:
+        except Exception:
             return {"error": "无法获取网络信息"}
-    
+
     def _get_process_info(self) -> Dict[str, Any]:
         """获取当前进程信息"""
         try:
-            process = psutil.Process(self.pid)
-            
-            with process.oneshot():
+            with self.process.oneshot():
                 return {
                     "pid": self.pid,
-                    "name": process.name(),
-                    "status": process.status(),
-                    "create_time": datetime.fromtimestamp(process.create_time()).isoformat(),
-                    "cpu_percent": self._get_process_cpu_percent_safe(0.1),
-                    "memory_percent": process.memory_percent(),
-                    "num_threads": process.num_threads(),
-                    "open_files": len(process.open_files()),
-                    "connections": len(process.connections())
+                    "name": self.process.name(),
+                    "status": self.process.status(),
+                    "create_time": datetime.fromtimestamp(self.process.create_time()).isoformat(),
+                    "cpu_percent": self.light.get("process_cpu_percent"),
+                    "memory_percent": self.process.memory_percent(),
+                    "num_threads": self.process.num_threads(),
+                    "open_files": len(self.process.open_files()),
+                    "connections": len(getattr(self.process, "net_connections", self.process.connections)())
                 }
-        except:
+        except Exception:
             return {"error": "无法获取进程信息"}
-    
+
     def _get_python_info(self) -> Dict[str, Any]:
         """获取Python环境信息"""
         return {
@@ -228,12 +328,9 @@ class SystemMonitor:
             "build": platform.python_build(),
             "path": sys.path
         }
-    
+
     def _get_render_info(self) -> Dict[str, Any]:
         """获取Render平台信息"""
-        render_info = {}
-        
-        # Render环境变量
         render_vars = [
             'RENDER_SERVICE_NAME',
             'RENDER_SERVICE_TYPE',
@@ -243,32 +340,71 @@ class SystemMonitor:
             'RENDER_GIT_BRANCH',
             'RENDER_GIT_COMMIT'
         ]
-        
-        for var in render_vars:
-            value = os.getenv(var)
-            if value:
-                render_info[var.lower()] = value
-        
-        return render_info
-    
+        return {var.lower(): os.getenv(var) for var in render_vars if os.getenv(var)}
+
+
+class SystemMonitor:
+    """系统监控器 - 只读后台采样的缓存（第一次使用时自动启动采样线程）"""
+
+    def __init__(self):
+        self.sampler = get_system_sampler()
+        self.sampler.start()
+        self.pid = self.sampler.pid
+        self.start_time = self.sampler.start_time
+
+    # 保留异步版本的方法（现在都是读缓存，不再需要线程池）
+    async def collect_all_async(self) -> Dict[str, Any]:
+        """异步采集所有系统数据"""
+        return self.collect_all()
+
+    async def collect_light_async(self) -> Dict[str, Any]:
+        """异步采集轻量数据"""
+        return self.collect_light()
+
+    async def check_health_async(self) -> Dict[str, Any]:
+        """异步健康检查"""
+        return self.check_health()
+
+    # ==================== 读缓存 ====================
+
+    def collect_all(self) -> Dict[str, Any]:
+        """所有系统数据（最近一次完整采样 + 最近一次轻量采样）"""
+        return {
+            **self.sampler.full,
+            "light": self.collect_light(),
+        }
+
+    def collect_light(self) -> Dict[str, Any]:
+        """轻量数据（最近一次轻量采样）"""
+        return {
+            **self.sampler.light,
+            "uptime_seconds": time.time() - self.start_time,
+            "sample_interval_seconds": SAMPLE_SECONDS,
+        }
+
     def check_health(self) -> Dict[str, Any]:
-        """健康检查（快速版）"""
-        try:
-            # 快速检查核心指标
-            cpu_ok = self._get_cpu_percent_safe(0.1) < 90
-            mem_ok = psutil.virtual_memory().percent < 90
-            disk_ok = psutil.disk_usage('/').percent < 90
-            
-            return {
-                "healthy": cpu_ok and mem_ok and disk_ok,
-                "cpu_ok": cpu_ok,
-                "memory_ok": mem_ok,
-                "disk_ok": disk_ok,
-                "timestamp": datetime.now().isoformat()
-            }
-        except:
-            return {
-                "healthy": False,
-                "error": "健康检查失败",
-                "timestamp": datetime.now().isoformat()
-            }
\ No newline at end of file
+        """健康检查（最近一次采样）"""
+        return self.sampler.health or {
+            "healthy": False,
+            "error": "尚未采样",
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def get_history(self) -> List[Dict[str, Any]]:
+        """轻量指标的环形历史（从旧到新）"""
+        return list(self.sampler.history)
+
+
+# ==================== 全局单例 ====================
+_sampler: Optional[SystemSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_system_sampler() -> SystemSampler:
+    """获取全局系统采样器"""
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = SystemSampler()
+    return _sampler
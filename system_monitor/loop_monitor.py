@@ -0,0 +1,340 @@
+"""
+事件循环健康监控
+==================================================
+代码里到处都是 asyncio.sleep(0)（"蚂蚁基因修复"），但一直没有测过到底是哪里在堵事件循环。
+这里常驻一个很轻的监控，回答三个问题：
+
+1. 调度延迟有多大？
+   探针任务每 PROBE_INTERVAL 秒醒一次，实际醒来时间 - 预期时间 = 调度延迟（最近 LAG_WINDOW_SECONDS 秒的分位数）
+
+2. 是谁堵住了循环？
+   看门狗线程发现探针超过 STALL_THRESHOLD 秒没醒，就抓一次事件循环线程的调用栈（sys._current_frames），
+   归到"模块.函数"上：堵得越久抓到的次数越多，次数 × WATCHDOG_INTERVAL ≈ 该处堵住的总时长。
+   另外把 loop.slow_callback_duration 设成同一个阈值；设置 LOOP_MONITOR_DEBUG=1 时打开 asyncio 调试模式，
+   asyncio 自己报告的慢回调（"Executing ... took ..."）也按协程名归类（调试模式有额外开销，默认关闭）
+
+3. 任务有没有泄漏？
+   每 TASK_SCAN_SECONDS 秒按协程名统计一次任务数，和一分钟前比较，
+   数量很大或涨得很快的（比如每条消息 create_task 一次）列为嫌疑
+
+使用方式：
+    from system_monitor.loop_monitor import get_loop_monitor
+    get_loop_monitor().start()          # 在要监控的事件循环里调用一次（launcher 启动时）
+    get_loop_monitor().snapshot()       # /api/monitor/loop
+    get_loop_monitor().snapshot(light=True)   # SystemMonitor.collect_light
+
+环境变量：
+    LOOP_SLOW_CALLBACK_MS   慢回调 / 卡顿阈值（毫秒，默认 100）
+    LOOP_MONITOR_DEBUG      =1 时打开 asyncio 调试模式
+==================================================
+"""
+
+import os
+import re
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from latency_stats import summarize
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE_INTERVAL = 0.02             # 探针间隔（秒）
+LAG_WINDOW_SECONDS = 60           # 调度延迟分位数的统计窗口（秒）
+STALL_THRESHOLD = int(os.getenv("LOOP_SLOW_CALLBACK_MS", "100")) / 1000
+WATCHDOG_INTERVAL = 0.02          # 看门狗检查 / 抓栈间隔（秒）
+STACK_DEPTH = 8                   # 卡顿记录里保留的调用栈层数
+RECENT_STALLS = 20                # 保留最近多少次卡顿的详情
+TOP_N = 15
+
+TASK_SCAN_SECONDS = 5             # 任务统计间隔（秒）
+TASK_HISTORY_SCANS = 13           # 保留多少次统计（13 次 × 5 秒 ≈ 1 分钟前可比）
+TASK_SUSPECT_COUNT = 200          # 同名任务超过这个数列为嫌疑
+TASK_SUSPECT_GROWTH = 50          # 一分钟内同名任务增加超过这个数列为嫌疑
+
+# asyncio 调试模式的慢回调日志：'Executing %s took %.3f seconds'
+_CORO_PATTERN = re.compile(r"coro=<([\w.<>]+)\(\)")
+_HANDLE_PATTERN = re.compile(r"<(?:Timer)?Handle ([\w.<>]+)\(")
+_LOCATION_PATTERN = re.compile(r"(?:running|defined) at ([^\s>:]+)")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _is_project_frame(frame) -> bool:
+    filename = frame.f_code.co_filename
+    return filename.startswith(PROJECT_ROOT) and "site-packages" not in filename
+
+
+def _task_name(task: asyncio.Task) -> str:
+    """按协程归类任务：模块.函数"""
+    coro = task.get_coro()
+    frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+    qualname = getattr(coro, "__qualname__", None) or type(coro).__name__
+    if frame is not None:
+        return f"{frame.f_globals.get('__name__', '?')}.{qualname}"
+    return qualname
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """接住 asyncio 调试模式的慢回调警告，按协程 / 回调名归类"""
+
+    def __init__(self, monitor: "LoopMonitor"):
+        super().__init__(level=logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record):
+        if not isinstance(record.msg, str) or not record.msg.startswith("Executing") \
+                or len(record.args or ()) != 2:
+            return
+        handle, seconds = record.args
+        text = str(handle)
+        match = _CORO_PATTERN.search(text) or _HANDLE_PATTERN.search(text)
+        where = match.group(1) if match else text[:120]
+        location = _LOCATION_PATTERN.search(text)
+        if location:
+            where = f"{where} ({os.path.relpath(location.group(1), PROJECT_ROOT)})"
+        self.monitor._record_slow_callback(where, seconds)
+
+
+class LoopMonitor:
+    """事件循环健康监控（每个进程一个，监控调用 start() 的那个事件循环）"""
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.loop_thread_name: Optional[str] = None
+        self.debug = os.getenv("LOOP_MONITOR_DEBUG") == "1"
+        self.started_at: Optional[float] = None
+
+        self._probe_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._slow_handler: Optional[_SlowCallbackHandler] = None
+
+        # 调度延迟（毫秒）
+        self._beat = time.monotonic()
+        self._lags: Deque[Tuple[float, float]] = deque(maxlen=int(LAG_WINDOW_SECONDS / PROBE_INTERVAL))
+
+        # 卡顿 / 慢回调计数：看门狗线程、asyncio 日志线程在写，采样线程和接口在读，
+        # 读写都拿这把锁（读时只拷一份，排序在锁外做）
+        self._counts_lock = threading.Lock()
+
+        # 卡顿（看门狗抓栈）
+        self.stalls_total = 0
+        self._stall_samples: Counter = Counter()
+        self._stall_max_ms: Dict[str, float] = {}
+        self._recent_stalls: Deque[Dict[str, Any]] = deque(maxlen=RECENT_STALLS)
+
+        # 慢回调（asyncio 调试模式）
+        self.slow_callbacks_total = 0
+        self._slow_callbacks: Counter = Counter()
+        self._slow_callback_max_ms: Dict[str, float] = {}
+
+        # 任务统计
+        self._task_history: Deque[Tuple[float, Counter]] = deque(maxlen=TASK_HISTORY_SCANS)
+
+    # ========== 启停 ==========
+
+    def start(self):
+        """在要监控的事件循环里调用"""
+        if self._probe_task and not self._probe_task.done():
+            return
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.loop_thread_name = threading.current_thread().name
+        self.started_at = time.time()
+        self._stop.clear()
+
+        self.loop.slow_callback_duration = STALL_THRESHOLD
+        if self.debug:
+            self.loop.set_debug(True)
+            self._slow_handler = _SlowCallbackHandler(self)
+            logging.getLogger("asyncio").addHandler(self._slow_handler)
+
+        self._beat = time.monotonic()
+        self._probe_task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"✅【循环监控】已启动：线程 {self.loop_thread_name}，卡顿阈值 {STALL_THRESHOLD * 1000:.0f}ms"
+                    f"{'，asyncio 调试模式已开启' if self.debug else ''}")
+
+    def stop(self):
+        self._stop.set()
+        if self._probe_task:
+            self._probe_task.cancel()
+        if self._slow_handler:
+            logging.getLogger("asyncio").removeHandler(self._slow_handler)
+            self._slow_handler = None
+
+    # ========== 探针（事件循环线程） ==========
+
+    async def _probe(self):
+        next_scan = 0.0
+        while True:
+            expected = self.loop.time() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+            now = self.loop.time()
+            self._beat = time.monotonic()
+            self._lags.append((now, max(0.0, now - expected) * 1000))
+
+            if now >= next_scan:
+                next_scan = now + TASK_SCAN_SECONDS
+                self._scan_tasks()
+
+    def _scan_tasks(self):
+        counts = Counter(_task_name(task) for task in asyncio.all_tasks(self.loop))
+        self._task_history.append((time.time(), counts))
+
+    # ========== 看门狗（独立线程） ==========
+
+    def _watch(self):
+        stall: Optional[Dict[str, Any]] = None
+        while not self._stop.wait(WATCHDOG_INTERVAL):
+            beat = self._beat
+            stalled_for = time.monotonic() - beat - PROBE_INTERVAL
+
+            if stall and stall["beat"] != beat:
+                self._finish_stall(stall)
+                stall = None
+            if stalled_for < STALL_THRESHOLD:
+                continue
+
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            where, stack = self._attribute(frame)
+            with self._counts_lock:
+                self._stall_samples[where] += 1
+                if stall is None:
+                    self.stalls_total += 1
+            if stall is None:
+                stall = {"beat": beat, "where": where, "stack": stack, "at": time.time()}
+            stall["ms"] = round(stalled_for * 1000, 1)
+        if stall:
+            self._finish_stall(stall)
+
+    def _finish_stall(self, stall: Dict[str, Any]):
+        where = stall["where"]
+        with self._counts_lock:
+            self._stall_max_ms[where] = max(self._stall_max_ms.get(where, 0.0), stall["ms"])
+            self._recent_stalls.append({k: v for k, v in stall.items() if k != "beat"})
+
+    @staticmethod
+    def _attribute(frame) -> Tuple[str, List[str]]:
+        """归到最内层的项目代码（跳过标准库 / 第三方库），同时留一段调用栈"""
+        where = None
+        stack = []
+        while frame is not None:
+            if _is_project_frame(frame):
+                if where is None:
+                    where = _frame_name(frame)
+                if len(stack) < STACK_DEPTH:
+                    stack.append(f"{_frame_name(frame)}:{frame.f_lineno}")
+            frame = frame.f_back
+        return where or "<外部库>", stack
+
+    # ========== asyncio 慢回调 ==========
+
+    def _record_slow_callback(self, where: str, seconds: float):
+        ms = round(seconds * 1000, 1)
+        with self._counts_lock:
+            self.slow_callbacks_total += 1
+            self._slow_callbacks[where] += 1
+            self._slow_callback_max_ms[where] = max(self._slow_callback_max_ms.get(where, 0.0), ms)
+
+    # ========== 查询 ==========
+
+    def _lag_stats(self) -> Optional[Dict[str, float]]:
+        cutoff = (self.loop.time() if self.loop else 0) - LAG_WINDOW_SECONDS
+        return summarize([lag for at, lag in list(self._lags) if at >= cutoff], percentiles=(50, 95, 99), digits=3)
+
+    def _task_summary(self, limit: int) -> Dict[str, Any]:
+        history = list(self._task_history)
+        if not history:
+            return {"total": None, "by_name": [], "suspects": []}
+        _, counts = history[-1]
+        _, baseline = history[0]
+
+        by_name = []
+        suspects = []
+        for name, count in counts.most_common():
+            growth = count - baseline.get(name, 0)
+            entry = {"name": name, "count": count, "growth": growth}
+            if len(by_name) < limit:
+                by_name.append(entry)
+            if count >= TASK_SUSPECT_COUNT or growth >= TASK_SUSPECT_GROWTH:
+                suspects.append(entry)
+        return {
+            "total": sum(counts.values()),
+            "growth_window_seconds": round(history[-1][0] - history[0][0]),
+            "by_name": by_name,
+            "suspects": suspects,
+        }
+
+    def snapshot(self, light: bool = False) -> Dict[str, Any]:
+        """当前状态；light=True 只给关键数字（SystemMonitor.collect_light 用）"""
+        running = bool(self._probe_task and not self._probe_task.done())
+        if not running and self.started_at is None:
+            return {"running": False}
+
+        with self._counts_lock:
+            stall_samples = Counter(self._stall_samples)
+            stall_max_ms = dict(self._stall_max_ms)
+            stalls_total = self.stalls_total
+            recent_stalls = list(self._recent_stalls)
+            slow_callbacks = Counter(self._slow_callbacks)
+            slow_callback_max_ms = dict(self._slow_callback_max_ms)
+            slow_callbacks_total = self.slow_callbacks_total
+
+        stall_top = [
+            {"where": where, "samples": samples,
+             "approx_ms": round(samples * WATCHDOG_INTERVAL * 1000),
+             "max_stall_ms": stall_max_ms.get(where)}
+            for where, samples in stall_samples.most_common(5 if light else TOP_N)
+        ]
+        result = {
+            "running": running,
+            "loop_thread": self.loop_thread_name,
+            "lag_ms": self._lag_stats(),
+            "stalls_total": stalls_total,
+            "stall_top": stall_top,
+            "tasks": self._task_summary(5 if light else TOP_N),
+        }
+        if light:
+            return result
+
+        result.update({
+            "debug": self.debug,
+            "probe_interval_ms": PROBE_INTERVAL * 1000,
+            "stall_threshold_ms": STALL_THRESHOLD * 1000,
+            "lag_window_seconds": LAG_WINDOW_SECONDS,
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at else None,
+            "recent_stalls": recent_stalls,
+            "slow_callbacks": {
+                "total": slow_callbacks_total,
+                "top": [{"where": where, "count": count, "max_ms": slow_callback_max_ms.get(where)}
+                        for where, count in slow_callbacks.most_common(TOP_N)],
+            },
+        })
+        return result
+
+
+# ==================== 全局单例 ====================
+_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """获取全局事件循环监控"""
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopMonitor()
+    return _monitor
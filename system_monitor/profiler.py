@@ -0,0 +1,214 @@
+"""
+采样分析器 - 线上不重启、不挂外部工具就能看 CPU 热点
+==================================================
+托管容器里没法 attach py-spy 之类的工具，这里用进程内的采样线程代替：
+每秒 hz 次调用 sys._current_frames() 抓本进程所有线程的调用栈
+（多进程模式下子进程经命令管道在自己进程里调用 profile()，见 multi_process/workers.py），
+跑满 seconds 秒后停止，按调用栈计数。
+
+输出两种格式：
+    collapsed   火焰图折叠格式，一行一个调用栈："线程;外层函数;...;内层函数 次数"
+                （flamegraph.pl、speedscope、https://www.speedscope.app 都能直接打开）
+    json        按函数汇总的自身 / 累计采样数 + 每个线程的采样数 + 折叠栈
+
+默认去掉空闲栈（事件循环在 select 里等、线程池 worker 在队列上等、threading 的 wait），
+只剩真正在跑的代码；idle=True 时保留。
+
+同一时间只允许一个分析任务（两个采样线程互相干扰，结果也没法看）。
+
+使用方式：
+    from system_monitor.profiler import profile, ProfilerBusy
+    result = await profile(seconds=10, hz=100)
+    text = result.collapsed()
+==================================================
+"""
+
+import math
+import os
+import sys
+import time
+import asyncio
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+MAX_SECONDS = 60          # 单次最长分析时间
+MAX_HZ = 1000             # 最高采样频率
+DEFAULT_SECONDS = 10
+DEFAULT_HZ = 100
+MAX_DEPTH = 128           # 每个调用栈最多保留的层数（从最外层截断）
+
+# 空闲栈：最内层 Python 帧是这些（文件名, 函数名）时视为在等待，不算 CPU
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class ProfilerBusy(RuntimeError):
+    """已有分析任务在运行"""
+
+
+_busy = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+class ProfileResult:
+    """一次分析的结果"""
+
+    def __init__(self, stacks: Counter, thread_samples: Counter, samples: int,
+                 idle_samples: int, seconds: float, hz: int, overhead: float):
+        self.stacks = stacks                    # (线程名, 帧, 帧, ...) → 次数
+        self.thread_samples = thread_samples    # 线程名 → 次数
+        self.samples = samples                  # 采样轮数
+        self.idle_samples = idle_samples
+        self.seconds = seconds
+        self.hz = hz
+        self.overhead = overhead                # 采样线程自身耗时占比
+
+    def collapsed(self) -> str:
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + "\n"
+
+    def top_functions(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """按函数汇总：self = 在最内层的次数，total = 出现在栈里的次数"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack[1:]
+            if frames:
+                own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        stack_total = sum(self.stacks.values()) or 1
+        return [
+            {"function": name, "self": count, "total": total[name],
+             "self_pct": round(count / stack_total * 100, 2),
+             "total_pct": round(total[name] / stack_total * 100, 2)}
+            for name, count in own.most_common(limit)
+        ]
+
+    def to_dict(self, limit: int = 30) -> Dict[str, Any]:
+        return {
+            "seconds": round(self.seconds, 3),
+            "hz": self.hz,
+            "samples": self.samples,
+            "stacks": sum(self.stacks.values()),
+            "idle_stacks_dropped": self.idle_samples,
+            "sampler_overhead_pct": round(self.overhead * 100, 2),
+            "threads": dict(self.thread_samples.most_common()),
+            "top_functions": self.top_functions(limit),
+            "collapsed": self.collapsed(),
+        }
+
+
+class _Sampler:
+    """采样线程主体"""
+
+    def __init__(self, seconds: float, hz: int, idle: bool, threads: Optional[Iterable[str]]):
+        self.seconds = seconds
+        self.interval = 1.0 / hz
+        self.hz = hz
+        self.idle = idle
+        self.threads = set(threads) if threads else None
+
+    def run(self) -> ProfileResult:
+        stacks: Counter = Counter()
+        thread_samples: Counter = Counter()
+        samples = idle_samples = 0
+        busy_time = 0.0
+        me = threading.get_ident()
+
+        started = time.perf_counter()
+        deadline = started + self.seconds
+        next_at = started
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                name = names.get(ident, f"thread-{ident}")
+                if self.threads is not None and name not in self.threads:
+                    continue
+                if not self.idle and _is_idle(frame):
+                    idle_samples += 1
+                    continue
+                labels = []
+                while frame is not None and len(labels) < MAX_DEPTH:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.reverse()
+                stacks[(name, *labels)] += 1
+                thread_samples[name] += 1
+            samples += 1
+            busy_time += time.perf_counter() - now
+
+            # 固定节拍采样；采样本身超时就不追，直接从现在算下一拍
+            next_at = max(next_at + self.interval, time.perf_counter())
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+
+        elapsed = time.perf_counter() - started
+        return ProfileResult(stacks, thread_samples, samples, idle_samples,
+                             elapsed, self.hz, busy_time / elapsed if elapsed else 0.0)
+
+
+async def profile(seconds: float = DEFAULT_SECONDS, hz: int = DEFAULT_HZ, idle: bool = False,
+                  threads: Optional[Iterable[str]] = None) -> ProfileResult:
+    """
+    对整个进程做一次限时采样（采样在独立线程里跑，不占事件循环，也不占默认线程池）
+
+    :param seconds: 采样时长，最多 MAX_SECONDS
+    :param hz: 每秒采样次数，最多 MAX_HZ
+    :param idle: 是否保留空闲栈
+    :param threads: 只采这些线程名（None = 全部）
+    :raises ProfilerBusy: 已有分析任务在运行
+    :raises ValueError: seconds / hz 不是有限数字（nan 会让截止时间永远到不了，采样线程停不下来）
+    """
+    seconds, hz = float(seconds), float(hz)
+    if not (math.isfinite(seconds) and math.isfinite(hz)):
+        raise ValueError("seconds / hz 必须是有限数字")
+    seconds = min(max(seconds, 0.1), MAX_SECONDS)
+    hz = min(max(int(hz), 1), MAX_HZ)
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy("已有分析任务在运行")
+
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future = loop.create_future()
+    sampler = _Sampler(seconds, hz, idle, threads)
+
+    def target():
+        try:
+            result = sampler.run()
+            loop.call_soon_threadsafe(_resolve, future, result, None)
+        except BaseException as e:  # 采样线程里的异常交回事件循环
+            loop.call_soon_threadsafe(_resolve, future, None, e)
+        finally:
+            _busy.release()
+
+    threading.Thread(target=target, name="profiler-sampler", daemon=True).start()
+    return await future
+
+
+def _resolve(future: asyncio.Future, result: Optional[ProfileResult], error: Optional[BaseException]):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -5,7 +5,7 @@ WebSocket连接池管理员 - 纯被动模式
 
 import asyncio
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable
 from datetime import datetime
 
 from .pool_manager import WebSocketPoolManager
@@ -67,6 +67,33 @@ class WebSocketAdmin:
             await self.stop()
             return False
     
+    async def start_exchange(self, exchange: str, symbols: List[str], mode: str, data_callback: Callable):
+        """
+        多进程模式：本进程只跑一个交易所的连接池
+        合约列表由主进程算好传进来（见 WebSocketPoolManager.plan_exchange_symbols），
+        行情交给 data_callback（发往流水线进程），重启请求仍由本管理员处理
+        """
+        if self._running:
+            logger.warning("[管理员]WebSocket模块已在运行中")
+            return True
+        
+        try:
+            logger.info(f"[管理员] 单交易所模式启动: {exchange}（{len(symbols)}个合约）")
+            self._pool_manager.data_callback = data_callback
+            await self._pool_manager._setup_exchange_pool_with_symbols(exchange, symbols, mode)
+            self._pool_manager.initialized = True
+            
+            asyncio.create_task(self._check_restart_requests_loop())
+            self._running = True
+            self._initialized = True
+            logger.info(f"✅ [管理员] {exchange} 连接池启动成功")
+            return True
+            
+        except Exception as e:
+            logger.error(f"[管理员] {exchange} 连接池启动失败: {e}")
+            await self.stop()
+            return False
+    
     async def _check_restart_requests_loop(self):
         """纯被动重启请求循环 - 只等待直接调用"""
         logger.info("[管理员] 🔕 进入纯被动模式，等待连接池直接请求")
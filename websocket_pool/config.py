@@ -3,12 +3,14 @@ WebSocket连接池配置 - 自管理模式
 """
 from typing import Dict, Any
 
-# 交易所配置
+from exchange_endpoints import rest_url, ws_url
+
+# 交易所配置（设置了 BINANCE_SIMULATOR_URL / OKX_SIMULATOR_URL 时地址指向本地模拟器，见 exchange_endpoints.py）
 EXCHANGE_CONFIGS = {
     "binance": {
-        "ws_public_url": "wss://fstream.binance.com/ws",
-        "ws_private_url": "wss://fstream.binance.com/ws",
-        "rest_url": "https://fapi.binance.com",
+        "ws_public_url": ws_url("binance", "/ws", "wss://fstream.binance.com/ws"),
+        "ws_private_url": ws_url("binance", "/ws", "wss://fstream.binance.com/ws"),
+        "rest_url": rest_url("binance", "https://fapi.binance.com"),
         
         # 连接配置
         "active_connections": 2,        # 主连接数
@@ -25,9 +27,9 @@ EXCHANGE_CONFIGS = {
         "ping_interval": 10,
     },
     "okx": {
-        "ws_public_url": "wss://ws.okx.com:8443/ws/v5/public",
-        "ws_private_url": "wss://ws.okx.com:8443/ws/v5/private",
-        "rest_url": "https://www.okx.com",
+        "ws_public_url": ws_url("okx", "/ws/v5/public", "wss://ws.okx.com:8443/ws/v5/public"),
+        "ws_private_url": ws_url("okx", "/ws/v5/private", "wss://ws.okx.com:8443/ws/v5/private"),
+        "rest_url": rest_url("okx", "https://www.okx.com"),
         
         # 连接配置
         "active_connections": 1,
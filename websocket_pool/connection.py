@@ -8,10 +8,14 @@ from datetime import datetime
 from typing import Dict, Any, Callable, Optional
 import websockets
 
+from hot_logger import get_hot_logger, lazy
+from replay.recorder import get_frame_recorder
+
 # 导入心跳策略
 from .heartbeat_strategy import create_heartbeat_strategy
 
 logger = logging.getLogger(__name__)
+hot = get_hot_logger(__name__)
 
 class ConnectionType:
     MASTER = "master"
@@ -48,6 +52,9 @@ class WebSocketConnection:
         self.receive_task = None
         self.delayed_subscribe_task = None
         
+        # 录制（设置了 WS_RECORD_DIR 才开启，见 replay/recorder.py）
+        self._recorder = get_frame_recorder()
+        
         # 🎯 新增：心跳策略（币安时为None）
         self.heartbeat_strategy = create_heartbeat_strategy(exchange, self)
         
@@ -61,19 +68,22 @@ class WebSocketConnection:
         self.reconnect_interval = 3
         self.min_subscribe_interval = 2.5
         
-        # 日志频率限制器
+        # 日志频率限制（每个连接各自的调用点，见 hot_logger）
         self._json_decode_error_count = 0
-        self._last_callback_error_log = None
+        self._site_json_error = f"{connection_id}.json_decode_error"
+        self._site_callback_error = f"{connection_id}.callback_error"
+        self._site_okx_parse_error = f"{connection_id}.okx_parse_error"
         
         logger.debug(f"WebSocketConnection初始化: {connection_id}")
     
+    def _full_name(self) -> str:
+        role_char = self.role_display.get(self.connection_type, "?")
+        return f"{self.connection_id}({role_char})"
+    
     def log_with_role(self, level: str, message: str):
         """带角色信息的日志"""
-        role_char = self.role_display.get(self.connection_type, "?")
-        full_name = f"{self.connection_id}({role_char})"
-        
         log_method = getattr(logger, level, logger.info)
-        log_method(f"[{full_name}] {message}")
+        log_method(f"[{self._full_name()}] {message}")
     
     async def connect(self):
         """建立WebSocket连接"""
@@ -369,6 +379,8 @@ class WebSocketConnection:
                 
                 # 如果不是心跳消息，处理业务数据
                 if not heartbeat_handled:
+                    if self._recorder is not None:
+                        self._recorder.record("public", self.exchange, self.connection_id, message)
                     asyncio.create_task(self._process_message(message))
                 
         except websockets.exceptions.ConnectionClosed as e:
@@ -402,9 +414,8 @@ class WebSocketConnection:
                 
         except json.JSONDecodeError:
             self._json_decode_error_count += 1
-            if self._json_decode_error_count <= 3 or self._json_decode_error_count % 10 == 0:
-                self.log_with_role("warning", 
-                    f"❌【连接池】无法解析JSON消息(第{self._json_decode_error_count}次)")
+            hot.warning(self._site_json_error, "[%s] ❌【连接池】无法解析JSON消息(第%s次)",
+                        lazy(self._full_name), self._json_decode_error_count, rate=0.1, burst=3)
         except Exception as e:
             self.log_with_role("error", f"❌【连接池】处理消息错误: {e}")
     
@@ -432,11 +443,8 @@ class WebSocketConnection:
             try:
                 await self.data_callback(processed)
             except Exception as e:
-                current_time = datetime.now()
-                if (self._last_callback_error_log is None or 
-                    (current_time - self._last_callback_error_log).total_seconds() > 30):
-                    self.log_with_role("warning", f"❌【连接池】数据回调失败: {e}")
-                    self._last_callback_error_log = current_time
+                hot.warning(self._site_callback_error, "[%s] ❌【连接池】数据回调失败: %s",
+                            lazy(self._full_name), e, every=30)
         
         elif event_type == "markPriceUpdate":
             symbol = data.get("s", "").upper()
@@ -453,11 +461,8 @@ class WebSocketConnection:
             try:
                 await self.data_callback(processed)
             except Exception as e:
-                current_time = datetime.now()
-                if (self._last_callback_error_log is None or 
-                    (current_time - self._last_callback_error_log).total_seconds() > 30):
-                    self.log_with_role("warning", f"❌【连接池】数据回调失败: {e}")
-                    self._last_callback_error_log = current_time
+                hot.warning(self._site_callback_error, "[%s] ❌【连接池】数据回调失败: %s",
+                            lazy(self._full_name), e, every=30)
     
     async def _process_okx_message(self, data):
         """处理欧意消息"""
@@ -527,11 +532,8 @@ class WebSocketConnection:
                     await self.data_callback(processed)
         
         except Exception as e:
-            current_time = datetime.now()
-            if (self._last_callback_error_log is None or 
-                (current_time - self._last_callback_error_log).total_seconds() > 10):
-                self.log_with_role("warning", f"❌【连接池】解析OKX数据失败: {e}")
-                self._last_callback_error_log = current_time
+            hot.warning(self._site_okx_parse_error, "[%s] ❌【连接池】解析OKX数据失败: %s",
+                        lazy(self._full_name), e, every=10)
     
     async def disconnect(self):
         """正常断开连接"""
@@ -8,7 +8,7 @@ import os
 import time
 import json
 import aiohttp
-from typing import Dict, Any, List, Optional, Set, Callable
+from typing import Dict, Any, List, Optional, Set, Callable, Tuple
 
 # 设置导入路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,18 +17,21 @@ if root_dir not in sys.path:
     sys.path.insert(0, root_dir)
 
 from shared_data.data_store import data_store
+from http_client import get_http_client
+from hot_logger import get_hot_logger, lazy
 from .exchange_pool import ExchangeWebSocketPool
 from .config import EXCHANGE_CONFIGS
 from .static_symbols import STATIC_SYMBOLS  # 导入静态合约
 
 logger = logging.getLogger(__name__)
+hot = get_hot_logger(__name__)
 
 # ============ 【固定数据回调函数】============
 async def default_data_callback(data):
-    """默认数据回调函数 - 带阈值清零版"""
+    """默认数据回调函数 - 计数 + 限流日志（每条行情都会走这里）"""
     try:
         if not data:
-            logger.debug("[数据回调] 收到空数据")
+            hot.debug("callback.empty", "[数据回调] 收到空数据", every=60)
             return
             
         exchange = data.get("exchange", "")
@@ -36,100 +39,83 @@ async def default_data_callback(data):
         data_type = data.get("data_type", "unknown")
         
         if not exchange:
-            logger.warning(f"[数据回调] 数据缺少exchange字段")
+            hot.warning("callback.no_exchange", "[数据回调] 数据缺少exchange字段", every=30)
             return
         if not symbol:
-            logger.warning(f"[数据回调] 数据缺少symbol字段")
+            hot.warning("callback.no_symbol", "[数据回调] 数据缺少symbol字段", every=30)
             return
         
-        # 计数器初始化
-        if not hasattr(default_data_callback, 'counter'):
-            default_data_callback.counter = 0
-            logger.info(f"🌎【数据回调初始化】计数器创建")
-        
-        # 先增加计数
-        default_data_callback.counter += 1
-        current_count = default_data_callback.counter
-        
-        # 等于或超过300万就清零
-        if current_count >= 3000000:
-            default_data_callback.counter = 0
-            current_count = 0
-            logger.info(f"🫗【数据回调阈值重置】达到300万条，计数器清零重新开始")
+        current_count = hot.count("callback.received")
         
         # 第一条数据
         if current_count == 1:
             logger.info(f"🎉【数据回调第一条数据】{exchange} {symbol} ({data_type})")
         
-        # 每30000条记录一次数据流动
-        if current_count % 30000 == 0:
-            logger.info(f"✅【数据回调已接收】{current_count:,}条数据 - 最新: {exchange} {symbol}")
-        
-        # 每300000条里程碑
-        if current_count % 300000 == 0:
-            logger.info(f"🏆【数据回调里程碑】{current_count:,} 条数据,已存储到data_store")
+        # 数据流动：按时间限流（不管行情多快，每分钟最多一条）
+        hot.info("callback.flow", "✅【数据回调已接收】%s条数据 - 最新: %s %s",
+                 lazy(format, current_count, ","), exchange, symbol, every=60)
         
         # 直接存储到data_store
         await data_store.update_market_data(exchange, symbol, data)
             
     except Exception as e:
-        logger.error(f"❌[数据回调] 存储失败: {e}")
+        hot.error("callback.store_error", "❌[数据回调] 存储失败: %s", e, every=10)
 
 # ============ 【极简HTTP合约获取器】============
 class SimpleSymbolFetcher:
-    """极简合约获取器 - 直接HTTP请求，3次重试+换IP"""
+    """极简合约获取器 - 共享连接池HTTP请求，3次重试+换IP"""
     
     # 币安API
-    BINANCE_URL = "https://fapi.binance.com/fapi/v1/exchangeInfo"
+    BINANCE_URL = f"{EXCHANGE_CONFIGS['binance']['rest_url']}/fapi/v1/exchangeInfo"
     
     # 欧意API - 直接获取U本位永续合约
-    OKX_URL = "https://www.okx.com/api/v5/public/instruments?instType=SWAP&quoteCcy=USDT"
+    OKX_URL = f"{EXCHANGE_CONFIGS['okx']['rest_url']}/api/v5/public/instruments?instType=SWAP&quoteCcy=USDT"
     
     async def _fetch_with_retry(self, exchange_name: str, url: str, parser_func: Callable) -> List[str]:
-        """通用重试获取函数 - 3次重试，每次新连接"""
+        """通用重试获取函数 - 3次重试，走共享连接池；被418封后下一次强制新连接（换IP）"""
+        fresh_connection = False
         for attempt in range(1, 4):  # 3次重试
             await asyncio.sleep(0)  # ✅ [蚂蚁基因修复] 循环开始让出CPU
             try:
-                # 每次创建新会话，强制新连接（换IP）
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                        
-                        # 处理418被封的情况
-                        if resp.status == 418:
-                            logger.warning(f"[{exchange_name}] IP被封（418），第{attempt}次尝试，等待后换IP重试")
-                            await asyncio.sleep(attempt * 3)  # 3秒、6秒、9秒递增
-                            continue
-                        
-                        # 处理其他4xx错误（不重试）
-                        if 400 <= resp.status < 500 and resp.status != 418:
-                            logger.error(f"[{exchange_name}] 客户端错误 {resp.status}，不重试")
-                            return []
-                        
-                        # 处理5xx错误（重试）
-                        if resp.status >= 500:
-                            logger.warning(f"[{exchange_name}] 服务端错误 {resp.status}，第{attempt}次尝试")
-                            await asyncio.sleep(attempt * 2)
-                            continue
-                        
-                        # 200成功
-                        if resp.status == 200:
-                            data = await resp.json()
-                            # ✅ [蚂蚁基因修复] 将同步解析函数放到线程池执行
-                            loop = asyncio.get_event_loop()
-                            symbols = await loop.run_in_executor(None, parser_func, data)
-                            
-                            if symbols:
-                                logger.info(f"✅ [{exchange_name}] HTTP获取成功: {len(symbols)}个合约 (第{attempt}次)")
-                                return symbols
-                            else:
-                                logger.warning(f"[{exchange_name}] 解析后为空列表，第{attempt}次尝试")
-                                await asyncio.sleep(2)
-                                continue
-                        
-                        # 其他状态码
-                        logger.warning(f"[{exchange_name}] 未知状态码 {resp.status}，第{attempt}次尝试")
+                resp = await get_http_client().get(url, timeout=10, fresh_connection=fresh_connection)
+                
+                # 处理418被封的情况
+                if resp.status == 418:
+                    logger.warning(f"[{exchange_name}] IP被封（418），第{attempt}次尝试，等待后换IP重试")
+                    fresh_connection = True
+                    await asyncio.sleep(attempt * 3)  # 3秒、6秒、9秒递增
+                    continue
+                
+                # 处理其他4xx错误（不重试）
+                if 400 <= resp.status < 500:
+                    logger.error(f"[{exchange_name}] 客户端错误 {resp.status}，不重试")
+                    return []
+                
+                # 处理5xx错误（重试）
+                if resp.status >= 500:
+                    logger.warning(f"[{exchange_name}] 服务端错误 {resp.status}，第{attempt}次尝试")
+                    await asyncio.sleep(attempt * 2)
+                    continue
+                
+                # 200成功
+                if resp.status == 200:
+                    data = resp.json()
+                    # ✅ [蚂蚁基因修复] 将同步解析函数放到线程池执行
+                    loop = asyncio.get_event_loop()
+                    symbols = await loop.run_in_executor(None, parser_func, data)
+                    
+                    if symbols:
+                        logger.info(f"✅ [{exchange_name}] HTTP获取成功: {len(symbols)}个合约 (第{attempt}次)")
+                        return symbols
+                    else:
+                        logger.warning(f"[{exchange_name}] 解析后为空列表，第{attempt}次尝试")
                         await asyncio.sleep(2)
                         continue
+                
+                # 其他状态码
+                logger.warning(f"[{exchange_name}] 未知状态码 {resp.status}，第{attempt}次尝试")
+                await asyncio.sleep(2)
+                continue
                         
             except asyncio.TimeoutError:
                 logger.warning(f"[{exchange_name}] 请求超时，第{attempt}次尝试")
@@ -356,8 +342,20 @@ class WebSocketPoolManager:
         logger.info("🚀【步骤3】初始化交易所连接池...")
         
         tasks = []
-        for exchange_name in ["binance", "okx"]:
+        for exchange_name, (symbols, mode) in self._select_exchange_symbols(common_symbols).items():
             await asyncio.sleep(0)  # ✅ [蚂蚁基因修复] 循环内让出CPU
+            task = asyncio.create_task(
+                self._setup_exchange_pool_with_symbols(exchange_name, symbols, mode)
+            )
+            tasks.append(task)
+        
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _select_exchange_symbols(self, common_symbols: Dict[str, List[str]]) -> Dict[str, Tuple[List[str], str]]:
+        """每个交易所用哪些合约：有双平台匹配结果用匹配结果，否则用原始列表（无合约的跳过）"""
+        selected = {}
+        for exchange_name in ["binance", "okx"]:
             if common_symbols and exchange_name in common_symbols:
                 symbols = common_symbols[exchange_name]
                 mode = "双平台模式"
@@ -368,14 +366,17 @@ class WebSocketPoolManager:
             if not symbols:
                 logger.warning(f"⚠️[{exchange_name}] 无合约可用，跳过初始化")
                 continue
-            
-            task = asyncio.create_task(
-                self._setup_exchange_pool_with_symbols(exchange_name, symbols, mode)
-            )
-            tasks.append(task)
-        
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+            selected[exchange_name] = (symbols, mode)
+        return selected
+    
+    async def plan_exchange_symbols(self) -> Dict[str, Tuple[List[str], str]]:
+        """
+        多进程模式用：只做获取 + 双平台匹配，不建连接池
+        返回 {交易所: (合约列表, 模式)}，由各交易所的行情进程自己建池
+        """
+        await self._fetch_all_exchange_symbols_independent()
+        common_symbols = await self._calculate_common_symbols()
+        return self._select_exchange_symbols(common_symbols)
     
     async def _setup_exchange_pool_with_symbols(self, exchange_name: str, symbols: List[str], mode: str):
         """使用指定合约列表初始化单个交易所连接池"""